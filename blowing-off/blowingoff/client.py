@@ -56,6 +56,7 @@ import httpx
 
 from .models import Base
 from .sync.engine import SyncEngine
+from .sync.protocol import CHANGE_WAIT_MAX
 from inbetweenies.sync import SyncResult
 from .mcp import LocalMCPClient
 from .graph import LocalGraphStorage, LocalGraphOperations
@@ -422,12 +423,19 @@ class BlowingOffClient:
         """Start background sync task.
 
         Automatically handles disconnected mode and retries when server becomes available.
+
+        Between syncs the loop parks on the server's change feed (PROTOCOL.md
+        §3.8) for up to ``interval`` seconds instead of sleeping, so a server
+        change is pulled within milliseconds and an idle house is not asked
+        for a full sync every tick. Local edits still go out at least every
+        ``interval``. Against a server without the feed it sleeps, as before.
         """
         async def sync_loop():
             consecutive_failures = 0
+            seen = None  # server_seq as of the last wait, from the change feed
             while True:
                 try:
-                    await asyncio.sleep(interval)
+                    seen = await self._wait_for_server_changes(seen, interval)
                     result = await self.sync()
 
                     if result.success:
@@ -447,6 +455,32 @@ class BlowingOffClient:
 
         self._background_task = asyncio.create_task(sync_loop())
 
+    async def _wait_for_server_changes(self, seen: Optional[int], interval: int) -> Optional[int]:
+        """Block until the server moves past ``seen`` or ``interval`` passes.
+
+        Returns the seq to wait past next time. It is read before the sync that
+        follows, so a change landing during that sync wakes the next wait at
+        once rather than being missed. The server holds one long poll for at
+        most ``CHANGE_WAIT_MAX`` seconds, so a longer interval is waited out
+        in several polls.
+        """
+        if seen is None:
+            await asyncio.sleep(interval)
+        remaining = float(interval)
+        try:
+            while True:
+                wait = min(remaining, CHANGE_WAIT_MAX)
+                notice = await self.sync_engine.protocol.wait_for_changes(seen, timeout=wait)
+                remaining -= wait
+                if seen is None or notice.get("changed") or remaining <= 0:
+                    return notice["seq"]
+        except (httpx.HTTPStatusError, httpx.TransportError):
+            # A server that predates the feed, or none reachable: fall back to
+            # the fixed interval and let sync() report disconnected mode.
+            if seen is not None:
+                await asyncio.sleep(interval)
+            return None
+
     def add_observer(self, callback: Callable):
         """Add observer for sync events."""
         self._observers.append(callback)
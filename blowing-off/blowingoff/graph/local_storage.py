@@ -8,7 +8,7 @@ entities and relationships that can be used offline.
 import json
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any
+from typing import Dict, List, Optional, Set, Any, Tuple
 from datetime import datetime
 
 from inbetweenies.models import Entity, EntityRelationship, EntityType, RelationshipType
@@ -286,6 +286,18 @@ class LocalGraphStorage:
             # Return latest version
             return versions[-1]
 
+    def current_versions(self) -> List[Tuple[str, str]]:
+        """(id, version) of the current version of every entity.
+
+        The input to the state digest (PROTOCOL.md §3.3-3.4); current means
+        the same thing get_entity() means, the last version stored.
+        """
+        return [
+            (entity_id, versions[-1].version)
+            for entity_id, versions in self._entities.items()
+            if versions
+        ]
+
     def get_entities_by_type(self, entity_type: EntityType) -> List[Entity]:
         """Get all entities of a specific type (latest versions only)"""
         type_key = entity_type.value if hasattr(entity_type, 'value') else str(entity_type)
@@ -58,12 +58,13 @@ USAGE:
         print(f"Sync failed: {result.errors}")
 """
 
-from .protocol import InbetweeniesProtocol
+from .protocol import InbetweeniesProtocol, IncompleteSyncStream
 from .engine import SyncEngine
 from inbetweenies.sync import SyncState, SyncResult
 
 __all__ = [
     "InbetweeniesProtocol",
+    "IncompleteSyncStream",
     "SyncEngine",
     "SyncState",
     "SyncResult",
@@ -44,13 +44,23 @@ import json
 
 from .protocol import InbetweeniesProtocol
 from inbetweenies.sync import SyncState, SyncResult, Change, Conflict, SyncOperation
+from inbetweenies.sync import (
+    STATE_DIGEST_SUM_CAPABILITY, bucket_leaves, subtree_digests, sum_digest,
+)
 from ..repositories import SyncMetadataRepository
-from inbetweenies.models import Entity, EntityType, SourceType
+from inbetweenies.models import (
+    Entity, EntityRelationship, EntityType, RelationshipType, SourceType,
+)
 
 
 class SyncEngine:
     """Main sync engine coordinating client-server synchronization using Entity model."""
 
+    # Pull as an NDJSON stream (PROTOCOL.md §3.6), applying each change as it
+    # downloads instead of after the whole response has been parsed. Opt-in
+    # until the servers this client talks to all serve the streamed form.
+    stream_pull = False
+
     def __init__(self, session: AsyncSession, base_url: str, auth_token: str, client_id: str = None):
         self.session = session
         self.base_url = base_url
@@ -108,20 +118,16 @@ class SyncEngine:
             # Get local changes (entities that need to be synced)
             local_changes = await self._get_local_changes(last_sync)
 
-            # Request sync from server
-            sync_response = await self.protocol.sync_request(
-                last_sync=last_sync,
-                entity_types=None  # Sync all entity types
-            )
-
-            # Process server changes
-            server_changes, conflicts = self.protocol.parse_sync_delta(sync_response)
+            if self.stream_pull:
+                sync_response, pulled_count = await self._pull_streamed(last_sync)
+                _, conflicts = self.protocol.parse_sync_delta(sync_response)
+                drained = sync_response
+            else:
+                sync_response, pulled_count, conflicts, drained = await self._pull_paged(last_sync)
 
-            # Apply server changes
-            pulled_count = 0
-            for change in server_changes:
-                if await self._apply_single_change(change):
-                    pulled_count += 1
+            # The pull is drained, so the cache should now match the server's
+            # state digest; if not, re-pull only what diverged (§3.4).
+            pulled_count += await self._repair_if_diverged(drained)
 
             # Push local changes if any
             pushed_entities = 0
@@ -174,6 +180,139 @@ class SyncEngine:
         finally:
             self._is_syncing = False
 
+    async def _pull_paged(self, last_sync: Optional[datetime]):
+        """Pull every page; returns (first response, pulled entity count,
+        conflicts, last response).
+
+        The server caps a response at one page of entities and edges together
+        and hands back a ``cursor`` while more remain (§9). Stopping at the
+        first page would leave the rest unpulled for good, since the watermark
+        saved afterwards moves past them. The watermark is the first page's
+        ``server_time``: a row written while later pages were fetched is at
+        worst pulled again next time, never skipped. The last page's
+        ``state_digest`` is the one that describes the drained state.
+        """
+        first = response = await self.protocol.sync_request(
+            last_sync=last_sync,
+            entity_types=None  # Sync all entity types
+        )
+        pulled_count = 0
+        conflicts = []
+        while True:
+            server_changes, page_conflicts = self.protocol.parse_sync_delta(response)
+            conflicts.extend(page_conflicts)
+            for change in server_changes:
+                if await self._apply_single_change(change):
+                    pulled_count += 1
+            # Edges after entities (PROTOCOL.md §5), from the relationship feed.
+            # A page is in replication order, so an edge's endpoints arrived
+            # on this page or an earlier one.
+            for relationship in InbetweeniesProtocol.parse_relationship_delta(response):
+                await self._apply_relationship_change(relationship)
+
+            cursor = response.get("cursor")
+            if not cursor:
+                return first, pulled_count, conflicts, response
+            response = await self.protocol.sync_request(
+                last_sync=last_sync, entity_types=None, cursor=cursor
+            )
+
+    async def _repair_if_diverged(self, response: Dict[str, Any]) -> int:
+        """Compare a drained pull's ``state_digest`` with the local cache's.
+
+        Only the sum form is compared: it is the one the client can compute
+        and the one repair_divergence walks. Skipped while local changes are
+        pending, since an unpushed edit is a difference the server has not
+        seen yet, not divergence; the next sync after the push checks again.
+
+        Returns the number of entities repair pulled (0 when in sync).
+        """
+        server_digest = response.get("state_digest")
+        if not server_digest or STATE_DIGEST_SUM_CAPABILITY not in response.get("capabilities", []):
+            return 0
+        if self.graph_operations.get_pending_entities():
+            return 0
+        if sum_digest(self.graph_operations.storage.current_versions()) == server_digest:
+            return 0
+        stats = await self.repair_divergence()
+        return stats["entities_pulled"]
+
+    async def repair_divergence(self) -> Dict[str, int]:
+        """Re-pull only the parts of the graph that differ from the server.
+
+        Walks the server's state-digest tree (PROTOCOL.md §3.4) against the
+        same tree computed over the local cache, descending only into children
+        whose digests differ, and applies the server's current versions from
+        each divergent leaf. The alternative is a full resync: downloading the
+        whole graph to repair what is usually a handful of rows.
+
+        Ids with a pending local change are left alone -- the pending mark
+        blocks pull-apply here exactly as in a normal sync (PROTOCOL.md §10),
+        so an unpushed edit is never overwritten by repair.
+
+        Returns counts: nodes fetched, leaves that diverged, entities pulled.
+        """
+        stats = {"nodes_fetched": 0, "leaves_diverged": 0, "entities_pulled": 0}
+        if not self.graph_operations:
+            return stats
+
+        storage = self.graph_operations.storage
+        leaves = bucket_leaves(storage.current_versions())
+        local_versions = dict(storage.current_versions())
+        pending = set(self.graph_operations.get_pending_entities())
+
+        frontier = [""]
+        while frontier:
+            prefix = frontier.pop()
+            node = await self.protocol.digest_node(prefix)
+            stats["nodes_fetched"] += 1
+            local_digest, local_children = subtree_digests(leaves, prefix)
+            if node["digest"] == local_digest:
+                continue
+            if len(prefix) < node["leaf_depth"]:
+                frontier.extend(
+                    child for child, digest in node.get("children", {}).items()
+                    if local_children.get(child) != digest
+                )
+                continue
+
+            stats["leaves_diverged"] += 1
+            changes, _ = self.protocol.parse_sync_delta({
+                "sync_type": "delta", "changes": node.get("changes", []),
+            })
+            for change in changes:
+                if change.entity_id in pending:
+                    continue
+                if local_versions.get(change.entity_id) == change.sync_id:
+                    continue
+                if await self._apply_single_change(change):
+                    stats["entities_pulled"] += 1
+
+        return stats
+
+    async def _pull_streamed(self, last_sync: Optional[datetime]):
+        """Pull via the streamed response; returns (trailer, pulled entity count).
+
+        Changes arrive in server_seq order, and an edge is always stamped after
+        the endpoint versions it references (§3.5), so applying each on arrival
+        satisfies §5 without holding edges back. If the stream is cut short,
+        IncompleteSyncStream propagates and the watermark is left where it was;
+        what was applied is re-served next time and applies idempotently.
+        """
+        pulled = 0
+
+        async def apply(sync_change):
+            nonlocal pulled
+            if sync_change.entity:
+                if await self._apply_single_change(InbetweeniesProtocol.to_change(sync_change)):
+                    pulled += 1
+            else:
+                for relationship in sync_change.relationships:
+                    await self._apply_relationship_change(relationship)
+
+        trailer = await self.protocol.sync_request_stream(last_sync, apply)
+        return trailer, pulled
+
     async def _get_local_changes(self, since: Optional[datetime]) -> List[Change]:
         """Build the push payload from the storage-backed pending set.
 
@@ -300,6 +439,31 @@ class SyncEngine:
             print(f"Error applying change: {e}")
             return False
 
+    async def _apply_relationship_change(self, relationship) -> bool:
+        """Apply one edge from the server's relationship feed (§3.5).
+
+        An edge with a pending local change is left alone, for the same reason
+        entities are (PROTOCOL.md §10): the unpushed edit would otherwise be
+        overwritten before it reached the server.
+        """
+        if relationship.id in self.graph_operations.get_pending_relationships():
+            return False
+        try:
+            await self.graph_operations.store_relationship(EntityRelationship(
+                id=relationship.id,
+                from_entity_id=relationship.from_entity_id,
+                from_entity_version=relationship.from_entity_version,
+                to_entity_id=relationship.to_entity_id,
+                to_entity_version=relationship.to_entity_version,
+                relationship_type=RelationshipType(relationship.relationship_type),
+                properties=relationship.properties,
+                user_id="sync",
+            ), mark_dirty=False)
+            return True
+        except ValueError as e:
+            print(f"Error applying relationship: {e}")
+            return False
+
     async def _push_local_changes(self, changes: List[Change]) -> Dict[str, Any]:
         """Push local changes to server."""
         if not changes:
@@ -29,7 +29,7 @@ This protocol enables:
 - Graceful handling of network failures
 
 KNOWN ISSUES:
-- No compression for large payloads yet
+- Streamed pulls (sync_request_stream) are opt-in; see SyncEngine.stream_pull
 - Missing protocol version negotiation
 - No support for partial entity sync
 - Timeout values could be configurable
@@ -41,6 +41,8 @@ REVISION HISTORY:
 - 2025-07-28: Enhanced error handling and timeouts
 - 2025-07-28: Added batch change support
 - 2025-07-28: Improved JSON serialization efficiency
+- 2026-10-16: Negotiated MessagePack/CBOR encoding and zstd/gzip compression (§3.7)
+- 2026-10-16: Change-feed long poll for background sync (§3.8)
 
 DEPENDENCIES:
 - httpx for async HTTP operations
@@ -55,6 +57,9 @@ USAGE:
     response = await protocol.sync_request(last_sync_time)
     changes, conflicts = protocol.parse_sync_delta(response)
 
+    # ...or stream them, applying each as it arrives
+    trailer = await protocol.sync_request_stream(last_sync_time, apply_change)
+
     # Push local changes
     result = await protocol.sync_push(local_changes)
     applied_ids, new_conflicts = protocol.parse_sync_result(result)
@@ -64,15 +69,32 @@ USAGE:
 """
 
 import json
-from typing import Dict, List, Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 import httpx
 from inbetweenies.models import Entity
 from inbetweenies.sync import Change, Conflict, SyncOperation
 from inbetweenies.sync import (
     VectorClock, EntityChange, RelationshipChange, SyncChange,
-    SyncFilters, SyncRequest, SyncResponse
+    SyncFilters, SyncRequest, SyncResponse, RELATIONSHIP_FEED_CAPABILITY,
+    STATE_DIGEST_SUM_CAPABILITY,
+    NDJSON_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, CBOR_MEDIA_TYPE,
 )
+from inbetweenies.sync import wire
+
+# The longest long poll the server holds on /sync/changes (PROTOCOL.md §3.8);
+# it answers a longer timeout with 422.
+CHANGE_WAIT_MAX = 55.0
+
+
+# Announced on every sync request; a server ignores any it does not know.
+# The sum state digest (§3.3) is served in O(1), where the legacy sorted one
+# costs the server a scan of every current row.
+CLIENT_CAPABILITIES = [STATE_DIGEST_SUM_CAPABILITY]
+
+
+class IncompleteSyncStream(Exception):
+    """A streamed sync body ended before its trailer (PROTOCOL.md §3.6)."""
 
 
 class InbetweeniesProtocol:
@@ -84,15 +106,99 @@ class InbetweeniesProtocol:
         self.client_id = client_id
         self.headers = {
             "Authorization": f"Bearer {auth_token}",
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            # Wire encodings this client reads (PROTOCOL.md §3.7). httpx
+            # undoes the Content-Encoding itself; the encoding is ours.
+            "Accept": ", ".join(wire.supported_media_types()),
+            "Accept-Encoding": ", ".join(wire.supported_codings()),
         }
+        # How request bodies are sent: JSON until a response shows the
+        # server reads something more compact (§3.7).
+        self.request_media_type = JSON_MEDIA_TYPE
+        self.request_coding: Optional[str] = None
 
     async def sync_request(
         self,
         last_sync: Optional[datetime],
+        entity_types: List[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Request one page of server changes using new protocol.
+
+        A response carries at most one page; a non-null ``cursor`` in it means
+        more remain, and is passed back here to fetch the next (§9).
+        """
+        request = self._pull_request(last_sync, entity_types, cursor)
+
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{self.base_url}/api/v1/sync/",
+                timeout=5.0,  # Fail fast
+                **self._encode_body(request)
+            )
+            response.raise_for_status()
+            return self._decode_response(response)
+
+    async def sync_request_stream(
+        self,
+        last_sync: Optional[datetime],
+        on_change: Callable[[SyncChange], Awaitable[None]],
         entity_types: List[str] = None
     ) -> Dict[str, Any]:
-        """Send sync request to get server changes using new protocol."""
+        """Pull server changes as a stream, applying each as it arrives (§3.6).
+
+        ``on_change`` is awaited for every change in feed order while the rest
+        of the body is still downloading. Returns the trailer, shaped like a
+        sync_request() response with an empty ``changes``, so the watermark
+        and conflict handling downstream are unchanged. Raises
+        IncompleteSyncStream if the body ends before its trailer; the changes
+        already applied are sound, but the watermark must not advance.
+        """
+        request = self._pull_request(last_sync, entity_types)
+        headers = {**self.headers, "Accept": NDJSON_MEDIA_TYPE}
+
+        async with httpx.AsyncClient() as client:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/api/v1/sync/",
+                json=request.model_dump(exclude_none=True, mode='json'),
+                headers=headers,
+                timeout=5.0  # Between reads, not for the whole body
+            ) as response:
+                response.raise_for_status()
+                async for kind, record in self.parse_sync_stream(response.aiter_lines()):
+                    if kind == "change":
+                        await on_change(record)
+                    else:
+                        return record
+
+    @staticmethod
+    async def parse_sync_stream(
+        lines: AsyncIterator[str]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Incremental parser for a streamed sync body (PROTOCOL.md §3.6).
+
+        Yields ``("change", SyncChange)`` for each change line as soon as it is
+        read, then ``("trailer", dict)`` once, and stops. Nothing is buffered
+        beyond the current line. Records of an unknown kind are skipped, so
+        the server can add some without breaking this client.
+        """
+        async for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record.pop("kind", None)
+            if kind == "change":
+                yield "change", SyncChange(**record["change"])
+            elif kind == "trailer":
+                record.setdefault("changes", [])
+                yield "trailer", record
+                return
+        raise IncompleteSyncStream("sync stream ended without a trailer")
+
+    def _pull_request(self, last_sync: Optional[datetime],
+                      entity_types: Optional[List[str]],
+                      cursor: Optional[str] = None) -> SyncRequest:
         # Build filters
         filters = None
         if last_sync or entity_types:
@@ -103,26 +209,22 @@ class InbetweeniesProtocol:
                 filters.entity_types = entity_types
 
         # Build sync request
-        request = SyncRequest(
+        return SyncRequest(
             protocol_version="inbetweenies-v2",
             device_id=self.client_id,
             user_id="client-user",  # TODO: get from auth
-            sync_type="delta" if last_sync else "full",
+            # A cursor resumes a pull, full or not, past the rows already
+            # served; the server only reads it on a delta.
+            sync_type="delta" if last_sync or cursor else "full",
             vector_clock=VectorClock(),
             changes=[],
-            filters=filters
+            filters=filters,
+            cursor=cursor,
+            # Ask for edges in the feed too (PROTOCOL.md §3.5); a server
+            # without the feature ignores this and serves entities only.
+            capabilities=CLIENT_CAPABILITIES + [RELATIONSHIP_FEED_CAPABILITY]
         )
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/v1/sync/",
-                json=request.model_dump(exclude_none=True, mode='json'),
-                headers=self.headers,
-                timeout=5.0  # Fail fast
-            )
-            response.raise_for_status()
-            return response.json()
-
     async def sync_push(self, changes: List[Change]) -> Dict[str, Any]:
         """Push local changes to server using new protocol."""
         # Convert changes to SyncChange objects
@@ -172,13 +274,72 @@ class InbetweeniesProtocol:
             user_id="client-user",  # TODO: get from auth
             sync_type="delta",
             vector_clock=VectorClock(),
-            changes=sync_changes
+            changes=sync_changes,
+            capabilities=list(CLIENT_CAPABILITIES)
         )
 
         async with httpx.AsyncClient() as client:
             response = await client.post(
                 f"{self.base_url}/api/v1/sync/",
-                json=request.model_dump(exclude_none=True, mode='json'),
+                timeout=5.0,  # Fail fast
+                **self._encode_body(request)
+            )
+            response.raise_for_status()
+            return self._decode_response(response)
+
+    def _encode_body(self, request: SyncRequest) -> Dict[str, Any]:
+        """httpx arguments for a sync POST, in the learned encoding (§3.7)."""
+        payload = request.model_dump(exclude_none=True, mode='json')
+        if self.request_media_type == JSON_MEDIA_TYPE and self.request_coding is None:
+            return {"json": payload, "headers": self.headers}
+        body = wire.encode(payload, self.request_media_type)
+        headers = {**self.headers, "Content-Type": self.request_media_type}
+        if self.request_coding and len(body) >= wire.MIN_COMPRESS_BYTES:
+            body = wire.compress(body, self.request_coding)
+            headers["Content-Encoding"] = self.request_coding
+        return {"content": body, "headers": headers}
+
+    def _decode_response(self, response) -> Dict[str, Any]:
+        """Decode a sync response, and learn what the server speaks from it."""
+        media_type = wire.media_type_of(response.headers.get("content-type"))
+        if media_type in (MSGPACK_MEDIA_TYPE, CBOR_MEDIA_TYPE):
+            payload = wire.decode(response.content, media_type)
+        else:
+            payload = response.json()
+        if media_type in wire.supported_media_types():
+            self.request_media_type = media_type
+        coding = response.headers.get("content-encoding")
+        if coding in wire.supported_codings():
+            self.request_coding = coding
+        return payload
+
+    async def wait_for_changes(self, after: Optional[int] = None,
+                               timeout: float = 25.0) -> Dict[str, Any]:
+        """Long-poll the change feed (PROTOCOL.md §3.8).
+
+        Returns ``{"seq": ..., "changed": ...}`` as soon as the server's
+        server_seq moves past ``after``, or after ``timeout`` seconds if it
+        does not. With no ``after`` it returns at once with the current seq.
+        """
+        params: Dict[str, Any] = {"timeout": timeout}
+        if after is not None:
+            params["after"] = after
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{self.base_url}/api/v1/sync/changes",
+                params=params,
+                headers=self.headers,
+                timeout=timeout + 5.0  # The server holds the request by design
+            )
+            response.raise_for_status()
+            return response.json()
+
+    async def digest_node(self, prefix: str = "") -> Dict[str, Any]:
+        """Fetch one node of the server's state-digest tree (PROTOCOL.md §3.4)."""
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{self.base_url}/api/v1/sync/digest",
+                params={"prefix": prefix},
                 headers=self.headers,
                 timeout=5.0  # Fail fast
             )
@@ -202,22 +363,7 @@ class InbetweeniesProtocol:
         # Parse changes from response
         for sync_change in sync_response.changes:
             if sync_change.entity:
-                # Convert to internal Change format
-                # Derive updated_at from the version (the wire EntityChange has no
-                # updated_at; the version encodes the UTC edit time). Falls back to
-                # now() only if the version can't be parsed.
-                updated_at = (Entity.version_timestamp(sync_change.entity.version)
-                              or datetime.now(timezone.utc))
-                change = Change(
-                    entity_type=sync_change.entity.entity_type,
-                    entity_id=sync_change.entity.id,
-                    operation=SyncOperation(sync_change.change_type.lower()),
-                    data=sync_change.entity.model_dump(),
-                    updated_at=updated_at,
-                    sync_id=sync_change.entity.version,
-                    client_sync_id=None  # Server changes don't have client sync ID
-                )
-                changes.append(change)
+                changes.append(InbetweeniesProtocol.to_change(sync_change))
 
         # Parse conflicts from response
         for conflict_info in sync_response.conflicts:
@@ -233,6 +379,39 @@ class InbetweeniesProtocol:
 
         return changes, conflicts
 
+    @staticmethod
+    def to_change(sync_change: SyncChange) -> Change:
+        """Convert a served entity change to the internal Change format."""
+        # Derive updated_at from the version (the wire EntityChange has no
+        # updated_at; the version encodes the UTC edit time). Falls back to
+        # now() only if the version can't be parsed.
+        updated_at = (Entity.version_timestamp(sync_change.entity.version)
+                      or datetime.now(timezone.utc))
+        return Change(
+            entity_type=sync_change.entity.entity_type,
+            entity_id=sync_change.entity.id,
+            operation=SyncOperation(sync_change.change_type.lower()),
+            data=sync_change.entity.model_dump(),
+            updated_at=updated_at,
+            sync_id=sync_change.entity.version,
+            client_sync_id=None  # Server changes don't have client sync ID
+        )
+
+    @staticmethod
+    def parse_relationship_delta(response: Dict[str, Any]) -> List[RelationshipChange]:
+        """The edges served in a sync response's relationship feed (§3.5).
+
+        Relationship-only changes, in feed order. parse_sync_delta skips them,
+        as it always has; a response from a server without the feature has
+        none.
+        """
+        return [
+            RelationshipChange(**relationship)
+            for sync_change in response.get("changes", [])
+            if not sync_change.get("entity")
+            for relationship in sync_change.get("relationships", [])
+        ]
+
     def parse_sync_result(self, response: Dict[str, Any]) -> tuple[List[str], List[Conflict]]:
         """Parse sync result response from new protocol."""
         applied_ids = []
@@ -0,0 +1,91 @@
+"""End-to-end: a sync whose pull leaves the cache off the server's digest repairs it.
+
+ADR-011 §4 / PROTOCOL.md §3.4. A delta pull only serves what changed since the
+watermark, so a cache row that went wrong without a change on the server --
+a lost write, a restored backup -- is never served again. The state digest is
+what notices it: after the pull drains, sync() compares the server's sum
+digest with its own and walks the bucket tree to re-pull the difference.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from blowingoff import BlowingOffClient
+from inbetweenies.models import Entity, EntityType, SourceType
+from inbetweenies.sync import sum_digest
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestSyncRepairsDivergence:
+
+    @pytest_asyncio.fixture
+    async def client(self, server_url, auth_token):
+        # A private directory: the graph store lives beside the DB file.
+        work_dir = tempfile.mkdtemp(prefix="blowingoff-repair-")
+        db_path = str(Path(work_dir) / "client.db")
+
+        client = BlowingOffClient(db_path)
+        await client.connect(server_url, auth_token, "test-divergence-repair")
+        yield client
+        await client.disconnect()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    async def _server_entity(self, server_url, auth_token) -> dict:
+        async with httpx.AsyncClient(base_url=server_url) as http:
+            response = await http.post(
+                "/api/v1/graph/entities",
+                headers={"Authorization": f"Bearer {auth_token}"},
+                json={
+                    "entity_type": "note",
+                    "name": "server-owned",
+                    "content": {},
+                    "source_type": "manual",
+                    "user_id": "server-user",
+                },
+            )
+            response.raise_for_status()
+            return response.json()["entity"]
+
+    async def test_a_stale_cache_row_is_repaired_by_the_next_sync(
+        self, client, server_url, auth_token
+    ):
+        served = await self._server_entity(server_url, auth_token)
+        result = await client.sync()
+        assert result.success, result.errors
+        assert (await client.graph_operations.get_entity(served["id"])).version == served["version"]
+
+        # Diverge without a server change: nothing pending, nothing to pull.
+        await client.graph_operations.store_entity(Entity(
+            id=served["id"],
+            version=Entity.create_version("corrupted"),
+            entity_type=EntityType.NOTE,
+            name="stale",
+            content={},
+            source_type=SourceType.MANUAL,
+            user_id="test-user",
+            parent_versions=[],
+        ), mark_dirty=False)
+
+        result = await client.sync()
+        assert result.success, result.errors
+
+        assert (await client.graph_operations.get_entity(served["id"])).version == served["version"]
+        assert result.pulled_entities >= 1
+        assert client.pending_changes_count == 0
+
+    async def test_an_in_sync_cache_is_left_alone(self, client, server_url, auth_token):
+        await self._server_entity(server_url, auth_token)
+        await client.sync()
+        before = sum_digest(client.graph_operations.storage.current_versions())
+
+        result = await client.sync()
+
+        assert result.success, result.errors
+        assert result.pulled_entities == 0
+        assert sum_digest(client.graph_operations.storage.current_versions()) == before
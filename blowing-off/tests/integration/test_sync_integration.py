@@ -104,6 +104,7 @@ class TestInbetweeniesProtocol:
                 "rejected": 0
             })
             mock_response.raise_for_status = Mock()
+            mock_response.headers = {"content-type": "application/json"}
 
             # Set the post method to return the response
             mock_client.post = AsyncMock(return_value=mock_response)
@@ -211,6 +212,7 @@ class TestSyncEngine:
                 }
             })
             mock_response.raise_for_status = Mock()
+            mock_response.headers = {"content-type": "application/json"}
             mock_client.post = AsyncMock(return_value=mock_response)
             mock_client.get = AsyncMock(return_value=mock_response)
 
@@ -265,6 +267,7 @@ class TestSyncEngine:
                 }
             })
             mock_response.raise_for_status = Mock()
+            mock_response.headers = {"content-type": "application/json"}
             mock_client.post = AsyncMock(return_value=mock_response)
 
             # Mock session
@@ -312,6 +315,7 @@ class TestSyncEngine:
                 }
             })
             mock_response.raise_for_status = Mock()
+            mock_response.headers = {"content-type": "application/json"}
             mock_client.post = AsyncMock(return_value=mock_response)
 
             # Mock session with proper return values
@@ -494,6 +498,7 @@ class TestSyncIntegration:
                 }
             })
             mock_response.raise_for_status = Mock()
+            mock_response.headers = {"content-type": "application/json"}
             mock_client.post = AsyncMock(return_value=mock_response)
 
             result = await sync_engine.sync()
@@ -2,15 +2,28 @@
 
 These cover the two correctness fixes that don't need a live server: deriving a
 server change's updated_at from its version (not the client clock), and parsing
-the response server_time into a UTC-aware watermark.
+the response server_time into a UTC-aware watermark. Also the incremental parser
+for streamed pulls (PROTOCOL.md §3.6), body encoding negotiation (§3.7) and
+the change-feed wait in background sync (§3.8).
 """
 
+import asyncio
+import json
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
-from blowingoff.sync.protocol import InbetweeniesProtocol
+import httpx
+import pytest
+
+from blowingoff import BlowingOffClient
+from blowingoff.sync.protocol import (
+    CHANGE_WAIT_MAX, CLIENT_CAPABILITIES, InbetweeniesProtocol, IncompleteSyncStream,
+)
 from blowingoff.sync.engine import SyncEngine
 from inbetweenies.models import Entity
-from inbetweenies.sync import SyncOperation
+from inbetweenies.sync import (
+    STATE_DIGEST_SUM_CAPABILITY, SyncOperation, SyncRequest, wire,
+)
 
 VERSION = "2026-06-15T10:00:00.123456+00:00-000001-alice"
 
@@ -65,3 +78,153 @@ def test_parse_server_time_handles_offset_z_naive_and_missing():
     # missing -> falls back to an aware "now"
     t4 = SyncEngine._parse_server_time(None)
     assert t4.tzinfo is not None
+
+
+def _stream_lines(response, with_trailer=True):
+    """The NDJSON lines a server would send for ``response``."""
+    lines = [json.dumps({"kind": "change", "seq": seq, "change": change})
+             for seq, change in enumerate(response["changes"], start=1)]
+    if with_trailer:
+        trailer = {k: v for k, v in response.items() if k != "changes"}
+        lines.append(json.dumps({"kind": "trailer", **trailer}))
+    return lines
+
+
+def _collect(lines, read_log=None):
+    async def source():
+        for line in lines:
+            if read_log is not None:
+                read_log.append("read")
+            yield line
+
+    async def run():
+        records = []
+        async for kind, record in InbetweeniesProtocol.parse_sync_stream(source()):
+            if read_log is not None:
+                read_log.append(kind)
+            records.append((kind, record))
+        return records
+
+    return asyncio.run(run())
+
+
+def test_parse_sync_stream_yields_each_change_before_reading_on():
+    read_log = []
+    records = _collect(_stream_lines(_response()), read_log)
+
+    # Incremental: the change is handed over before the trailer line is read.
+    assert read_log == ["read", "change", "read", "trailer"]
+    (_, change), (_, trailer) = records
+    assert change.entity.id == "e1"
+    assert trailer["server_time"] == "2026-06-15T10:00:01+00:00"
+    # Shaped like a sync_request() response, so the usual parsing applies.
+    assert _protocol().parse_sync_delta(trailer) == ([], [])
+
+
+def test_parse_sync_stream_skips_blank_lines_and_unknown_records():
+    lines = _stream_lines(_response())
+    lines[1:1] = ["", json.dumps({"kind": "progress", "done": 1})]
+
+    assert [kind for kind, _ in _collect(lines)] == ["change", "trailer"]
+
+
+def test_parse_sync_stream_without_a_trailer_is_incomplete():
+    with pytest.raises(IncompleteSyncStream):
+        _collect(_stream_lines(_response(), with_trailer=False))
+
+
+class _Response:
+    """Just enough of an httpx.Response for _decode_response."""
+
+    def __init__(self, payload, content_type="application/json", content_encoding=None):
+        self.headers = {"content-type": content_type}
+        if content_encoding:
+            self.headers["content-encoding"] = content_encoding
+        self._payload = payload
+        self.content = json.dumps(payload).encode()
+
+    def json(self):
+        return self._payload
+
+
+def _push_request(count):
+    return SyncRequest(device_id="d", user_id="u", sync_type="delta",
+                       filters={"modified_by": [f"user-{i}" for i in range(count)]})
+
+
+def test_request_bodies_stay_json_until_the_server_shows_otherwise():
+    protocol = _protocol()
+
+    assert "json" in protocol._encode_body(_push_request(500))
+
+    protocol._decode_response(_Response(_response(), content_encoding="gzip"))
+    kwargs = protocol._encode_body(_push_request(500))
+
+    assert kwargs["headers"]["Content-Encoding"] == "gzip"
+    assert json.loads(wire.decompress(kwargs["content"], "gzip"))["user_id"] == "u"
+
+
+def test_a_small_request_body_is_not_compressed():
+    protocol = _protocol()
+    protocol._decode_response(_Response(_response(), content_encoding="gzip"))
+
+    kwargs = protocol._encode_body(_push_request(1))
+
+    assert "Content-Encoding" not in kwargs["headers"]
+
+
+def test_every_request_announces_the_sum_state_digest():
+    """Otherwise the server serves the legacy digest, a sort of every row."""
+    pull = _protocol()._pull_request(None, None)
+
+    assert STATE_DIGEST_SUM_CAPABILITY in pull.capabilities
+    assert STATE_DIGEST_SUM_CAPABILITY in CLIENT_CAPABILITIES
+
+
+class _FeedProtocol:
+    def __init__(self, notice=None, error=None):
+        self.notice, self.error, self.calls = notice, error, []
+
+    async def wait_for_changes(self, after=None, timeout=25.0):
+        self.calls.append((after, timeout))
+        if self.error:
+            raise self.error
+        return self.notice
+
+
+def _client_with(protocol):
+    client = BlowingOffClient.__new__(BlowingOffClient)
+    client.sync_engine = SimpleNamespace(protocol=protocol)
+    return client
+
+
+def test_background_sync_waits_on_the_change_feed_past_what_it_has_seen():
+    protocol = _FeedProtocol(notice={"seq": 9, "changed": True})
+
+    seen = asyncio.run(_client_with(protocol)._wait_for_server_changes(7, interval=30))
+
+    assert seen == 9
+    assert protocol.calls == [(7, 30)]
+
+
+def test_an_interval_past_the_server_limit_is_waited_out_in_several_polls():
+    """The default daemon interval (60s) is above the longest poll the server holds."""
+    protocol = _FeedProtocol(notice={"seq": 7, "changed": False})
+
+    seen = asyncio.run(_client_with(protocol)._wait_for_server_changes(
+        7, interval=2 * CHANGE_WAIT_MAX + 20))
+
+    assert seen == 7
+    assert protocol.calls == [(7, CHANGE_WAIT_MAX), (7, CHANGE_WAIT_MAX), (7, 20)]
+    assert all(timeout <= CHANGE_WAIT_MAX for _, timeout in protocol.calls)
+
+
+def test_background_sync_falls_back_to_the_interval_without_a_feed():
+    request = httpx.Request("GET", "http://server/api/v1/sync/changes")
+    missing = httpx.HTTPStatusError("404", request=request,
+                                    response=httpx.Response(404, request=request))
+    protocol = _FeedProtocol(error=missing)
+
+    seen = asyncio.run(_client_with(protocol)._wait_for_server_changes(7, interval=0))
+
+    assert seen is None
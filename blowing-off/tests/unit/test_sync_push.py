@@ -28,6 +28,7 @@ import pytest_asyncio
 from blowingoff.graph.local_operations import LocalGraphOperations
 from blowingoff.graph.local_storage import LocalGraphStorage
 from blowingoff.sync.engine import SyncEngine
+from blowingoff.sync.protocol import InbetweeniesProtocol, IncompleteSyncStream
 from inbetweenies.models import (
     Entity,
     EntityRelationship,
@@ -35,7 +36,9 @@ from inbetweenies.models import (
     RelationshipType,
     SourceType,
 )
-from inbetweenies.sync import Change, SyncOperation
+from inbetweenies.sync import (
+    Change, EntityChange, RelationshipChange, SyncChange, SyncOperation,
+)
 
 
 @pytest.fixture
@@ -464,3 +467,220 @@ class TestPullDoesNotClobberThePushPayload:
 
         stored = [v.name for v in graph_ops.storage._entities[local.id]]
         assert "LOCAL-EDIT" in stored, "the local edit must remain in version history"
+
+
+
+class TestRelationshipFeed:
+    """Edges served in the pull (PROTOCOL.md §3.5) land locally, unless pending."""
+
+    def _edge(self, rel_id, source, target, **properties):
+        return {
+            "id": rel_id, "from_entity_id": source.id, "from_entity_version": source.version,
+            "to_entity_id": target.id, "to_entity_version": target.version,
+            "relationship_type": "located_in", "properties": properties,
+        }
+
+    async def _apply(self, engine, *edges):
+        response = {"changes": [
+            {"change_type": "update", "entity": None, "relationships": [edge]}
+            for edge in edges
+        ]}
+        for relationship in InbetweeniesProtocol.parse_relationship_delta(response):
+            await engine._apply_relationship_change(relationship)
+
+    @pytest.mark.asyncio
+    async def test_served_edges_are_stored_without_marking_them_pending(
+        self, engine, graph_ops
+    ):
+        device, room = make_entity("Lamp", EntityType.DEVICE), make_entity("Den")
+        for entity in (device, room):
+            await graph_ops.store_entity(entity, mark_dirty=False)
+
+        await self._apply(engine, self._edge("R1", device, room))
+
+        stored = await graph_ops.get_relationships()
+        assert [(r.id, r.to_entity_id) for r in stored] == [("R1", room.id)]
+        assert graph_ops.pending_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_a_pending_local_edge_is_not_overwritten(self, engine, graph_ops):
+        device, den, hall = (make_entity("Lamp", EntityType.DEVICE),
+                             make_entity("Den"), make_entity("Hall"))
+        for entity in (device, den, hall):
+            await graph_ops.store_entity(entity, mark_dirty=False)
+        await graph_ops.store_relationship(EntityRelationship(
+            id="R1", from_entity_id=device.id, from_entity_version=device.version,
+            to_entity_id=hall.id, to_entity_version=hall.version,
+            relationship_type=RelationshipType.LOCATED_IN, properties={},
+        ))  # unpushed local move
+
+        await self._apply(engine, self._edge("R1", device, den))
+
+        stored = await graph_ops.get_relationships()
+        assert [r.to_entity_id for r in stored] == [hall.id]
+
+
+class _StreamingProbe:
+    """Protocol double for a streamed pull: feeds changes, then the trailer."""
+
+    def __init__(self, sync_changes, complete=True):
+        self.sync_changes = sync_changes
+        self.complete = complete
+
+    async def sync_request_stream(self, last_sync, on_change, entity_types=None):
+        for sync_change in self.sync_changes:
+            await on_change(sync_change)
+        if not self.complete:
+            raise IncompleteSyncStream("sync stream ended without a trailer")
+        return {"sync_type": "delta", "changes": [], "conflicts": [],
+                "server_time": datetime.now(UTC).isoformat()}
+
+    parse_sync_delta = InbetweeniesProtocol.parse_sync_delta
+
+
+class _RecordingMetadataRepo(_NullMetadataRepo):
+    def __init__(self):
+        self.watermarks = []
+
+    async def update_sync_time(self, watermark, client_id):
+        self.watermarks.append(watermark)
+
+
+def _pull_engine(graph_ops, protocol, *, stream_pull):
+    engine = SyncEngine.__new__(SyncEngine)
+    engine.graph_operations = graph_ops
+    engine.protocol = protocol
+    engine.metadata_repo = _RecordingMetadataRepo()
+    engine.client_id = "test-client"
+    engine._sync_lock = asyncio.Lock()
+    engine._is_syncing = False
+    engine.stream_pull = stream_pull
+    return engine
+
+
+class TestStreamedPull:
+    """stream_pull applies the NDJSON feed (PROTOCOL.md §3.6) as it arrives."""
+
+    def _engine(self, graph_ops, protocol):
+        return _pull_engine(graph_ops, protocol, stream_pull=True)
+
+    def _feed(self):
+        device, room = make_entity("Lamp", EntityType.DEVICE), make_entity("Den")
+        changes = [
+            SyncChange(change_type="update", entity=EntityChange(
+                id=entity.id, version=entity.version, entity_type=entity.entity_type.value,
+                name=entity.name, content={}, source_type="manual", user_id="u",
+                parent_versions=[],
+            ))
+            for entity in (device, room)
+        ]
+        changes.append(SyncChange(change_type="update", entity=None, relationships=[
+            RelationshipChange(
+                id="R1", from_entity_id=device.id, from_entity_version=device.version,
+                to_entity_id=room.id, to_entity_version=room.version,
+                relationship_type="located_in", properties={},
+            )
+        ]))
+        return device, room, changes
+
+    @pytest.mark.asyncio
+    async def test_entities_and_edges_land_in_feed_order(self, graph_ops):
+        device, room, changes = self._feed()
+        engine = self._engine(graph_ops, _StreamingProbe(changes))
+
+        result = await engine.sync()
+
+        assert result.success, result.errors
+        assert result.pulled_entities == 2
+        assert set(graph_ops.storage._entities) == {device.id, room.id}
+        assert [r.id for r in await graph_ops.get_relationships()] == ["R1"]
+        assert len(engine.metadata_repo.watermarks) == 1
+
+    @pytest.mark.asyncio
+    async def test_a_cut_stream_keeps_what_arrived_but_not_the_watermark(self, graph_ops):
+        device, room, changes = self._feed()
+        engine = self._engine(graph_ops, _StreamingProbe(changes[:1], complete=False))
+
+        result = await engine.sync()
+
+        assert not result.success
+        assert list(graph_ops.storage._entities) == [device.id]
+        assert engine.metadata_repo.watermarks == []
+
+
+class _PagingProbe:
+    """Protocol double for the paged pull, with the server's cursor contract.
+
+    Rows are served in replication order, PAGE_SIZE at a time. ``cursor`` is
+    the last seq served while more remain, and is only honoured on a delta.
+    """
+
+    PAGE_SIZE = 500
+
+    def __init__(self, sync_changes):
+        self.rows = list(enumerate(sync_changes, start=1))
+        self.requests = []
+
+    async def sync_request(self, last_sync, entity_types=None, cursor=None):
+        request = InbetweeniesProtocol("http://server", "t", "c")._pull_request(
+            last_sync, entity_types, cursor
+        )
+        self.requests.append(request)
+        after = int(request.cursor) if request.sync_type == "delta" and request.cursor else 0
+        remaining = [change for seq, change in self.rows if seq > after]
+        page = remaining[:self.PAGE_SIZE]
+        more = len(remaining) > self.PAGE_SIZE
+        return {
+            "sync_type": request.sync_type, "conflicts": [],
+            "changes": [change.model_dump(mode="json") for change in page],
+            "cursor": str(after + len(page)) if more else None,
+            "server_time": f"2026-06-15T10:00:0{len(self.requests)}+00:00",
+        }
+
+    parse_sync_delta = InbetweeniesProtocol.parse_sync_delta
+
+
+class TestPagedPull:
+    """A pull follows ``cursor`` until the server says it is drained (§9)."""
+
+    @pytest.mark.asyncio
+    async def test_every_page_of_mixed_rows_is_pulled_before_the_watermark(
+        self, graph_ops, monkeypatch
+    ):
+        # Every local store rewrites the whole file; that is not what this tests.
+        monkeypatch.setattr(graph_ops.storage, "_save_data", lambda: None)
+        rooms = [make_entity(f"Room {i}") for i in range(400)]
+        devices = [make_entity(f"Lamp {i}", EntityType.DEVICE) for i in range(400)]
+        feed = []
+        for room, device in zip(rooms, devices):
+            feed += [
+                SyncChange(change_type="update", entity=EntityChange(
+                    id=entity.id, version=entity.version,
+                    entity_type=entity.entity_type.value, name=entity.name, content={},
+                    source_type="manual", user_id="u", parent_versions=[],
+                ))
+                for entity in (room, device)
+            ]
+            feed.append(SyncChange(change_type="update", entity=None, relationships=[
+                RelationshipChange(
+                    id=f"R-{device.id}", from_entity_id=device.id,
+                    from_entity_version=device.version, to_entity_id=room.id,
+                    to_entity_version=room.version, relationship_type="located_in",
+                    properties={},
+                )
+            ]))
+        probe = _PagingProbe(feed)
+        engine = _pull_engine(graph_ops, probe, stream_pull=False)
+
+        result = await engine.sync()
+
+        assert result.success, result.errors
+        assert len(feed) > 2 * _PagingProbe.PAGE_SIZE
+        assert len(probe.requests) == 3
+        assert result.pulled_entities == 800
+        assert len(graph_ops.storage._entities) == 800
+        assert len(await graph_ops.get_relationships()) == 400
+        # Saved once, after the last page, and taken from the first.
+        assert engine.metadata_repo.watermarks == [
+            datetime(2026, 6, 15, 10, 0, 1, tzinfo=UTC)
+        ]
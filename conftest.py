@@ -74,14 +74,15 @@ def _find_free_port() -> int:
     raise RuntimeError("Could not allocate a free ephemeral port")
 
 
-def _drain(process: subprocess.Popen) -> str:
+def _drain(process: subprocess.Popen, log_path: str) -> str:
     """Best-effort capture of a dead/dying server's output, for diagnostics."""
     try:
-        stdout, stderr = process.communicate(timeout=5)
+        process.wait(timeout=5)
     except subprocess.TimeoutExpired:
         process.kill()
-        stdout, stderr = process.communicate()
-    return f"--- server stdout ---\n{stdout or ''}\n--- server stderr ---\n{stderr or ''}"
+        process.wait()
+    with open(log_path, errors="replace") as log:
+        return f"--- server output ---\n{log.read()}"
 
 
 def _stop(process: subprocess.Popen) -> None:
@@ -99,7 +100,7 @@ class _ServerStartupError(RuntimeError):
     """Raised when our server subprocess did not come up. Always fatal."""
 
 
-def _await_health(process: subprocess.Popen, base_url: str) -> None:
+def _await_health(process: subprocess.Popen, base_url: str, log_path: str) -> None:
     """Block until *our* server answers /health, or raise.
 
     ``process.poll()`` is re-checked on every attempt: if the subprocess has
@@ -115,7 +116,7 @@ def _await_health(process: subprocess.Popen, base_url: str) -> None:
         if process.poll() is not None:
             raise _ServerStartupError(
                 f"FunkyGibbon test server exited with code {process.returncode} "
-                f"before becoming ready.\n{_drain(process)}"
+                f"before becoming ready.\n{_drain(process, log_path)}"
             )
         try:
             response = httpx.get(f"{base_url}/health", timeout=2.0)
@@ -129,7 +130,7 @@ def _await_health(process: subprocess.Popen, base_url: str) -> None:
     _stop(process)
     raise _ServerStartupError(
         f"FunkyGibbon test server at {base_url} was not healthy within "
-        f"{SERVER_START_TIMEOUT:.0f}s (last: {last_error}).\n{_drain(process)}"
+        f"{SERVER_START_TIMEOUT:.0f}s (last: {last_error}).\n{_drain(process, log_path)}"
     )
 
 
@@ -227,18 +228,22 @@ def funkygibbon_server(funkygibbon_admin_password):
         )
 
     # cwd is the throwaway work dir so the server's audit logs and any stray
-    # .env pickup stay out of the repo.
-    process = subprocess.Popen(
-        [sys.executable, "-m", "funkygibbon"],
-        cwd=work_dir,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env=env,
-    )
+    # .env pickup stay out of the repo. Output goes to a file, not a pipe:
+    # nothing reads a pipe while the tests run, so once the access log fills
+    # its buffer the server blocks on write and every request times out.
+    log_path = os.path.join(work_dir, "server.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "funkygibbon"],
+            cwd=work_dir,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            text=True,
+            env=env,
+        )
 
     try:
-        _await_health(process, base_url)
+        _await_health(process, base_url, log_path)
         token = _login(base_url, funkygibbon_admin_password)
     except _ServerStartupError as exc:
         _stop(process)
@@ -127,6 +127,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     # plus the drift check in GraphIndexService.ensure_current().
     print(f"Graph index owner ready (enabled={app.state.graph_index.enabled})")
 
+    # Recompute graph analytics in the background as the index changes.
+    app.state.graph_index.analytics.start()
+
     # Start rate limiter cleanup task
     await auth_rate_limiter.start_cleanup_task()
     print("Rate limiter started")
@@ -145,11 +148,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     # Shutdown
     print("Shutting down")
 
+    # Drop any half-loaded background rebuild.
+    await app.state.graph_index.stop()
+
     # Stop backup scheduler
     shutdown_scheduler()
     print("Backup scheduler stopped")
 
     # Stop background tasks
+    await app.state.graph_index.analytics.stop()
     await auth_rate_limiter.stop_cleanup_task()
     await audit_logger.stop_pattern_detection()
     print("Background tasks stopped")
@@ -2,7 +2,7 @@
 Shared FastAPI dependencies.
 
 ADR-003: the graph index is owned by the application (``app.state.graph_index``)
-and reaches routers only through the two dependencies below. Routers must not
+and reaches routers only through the dependencies below. Routers must not
 construct a ``GraphIndex``, and there is no module-level instance anywhere.
 """
 
@@ -10,7 +10,7 @@ from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
-from ..graph.index import GraphIndex
+from ..graph.index import GraphIndex, ReadSnapshot
 from ..graph.index_service import GraphIndexService
 
 
@@ -40,3 +40,16 @@ async def get_graph_index(
     costs a rebuild rather than a wrong answer.
     """
     return await service.ensure_current(db)
+
+
+async def get_graph_snapshot(
+    db: AsyncSession = Depends(get_db),
+    service: GraphIndexService = Depends(get_graph_index_service),
+) -> ReadSnapshot:
+    """A frozen copy of the index that reflects storage.
+
+    Same drift check as :func:`get_graph_index`. For endpoints that run their
+    traversal in a worker thread, which must never touch the live index.
+    """
+    await service.ensure_current(db)
+    return service.traversal_snapshot()
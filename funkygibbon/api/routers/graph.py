@@ -5,20 +5,26 @@ This module provides REST endpoints for graph operations including
 entity management, relationship creation, and search functionality.
 """
 
-from typing import List, Optional, Dict, Any
+import asyncio
+import json
+from typing import Annotated, AsyncIterator, List, Optional, Dict, Any
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
+from inbetweenies.sync import NDJSON_MEDIA_TYPE
+
 from ...database import get_db
 from ...models import Entity, EntityType, SourceType, EntityRelationship, RelationshipType
 from ...repositories.graph import GraphRepository
-from ...graph.index import GraphIndex
+from ...graph.costs import EdgeCosts, unit_cost
+from ...graph.index import GraphIndex, GraphTraversals, ReadSnapshot
 from ...graph.index_service import GraphIndexService
 from ...search.engine import SearchEngine
-from ..dependencies import get_graph_index, get_graph_index_service
+from ..dependencies import get_graph_index, get_graph_index_service, get_graph_snapshot
 
 
 # Pydantic models for API
@@ -54,11 +60,64 @@ class SearchQuery(BaseModel):
     limit: int = Field(default=10, le=100)
 
 
-class PathQuery(BaseModel):
-    """Schema for path finding requests"""
+class PathOptions(BaseModel):
+    """Traversal options shared by the path and reachability queries"""
+    max_depth: int = Field(default=10, le=20)
+    direction: str = Field(default="outgoing", pattern="^(outgoing|undirected)$")
+    relationship_types: Optional[List[RelationshipType]] = None
+
+
+class PathQuery(PathOptions):
+    """Schema for path finding requests.
+
+    ``weighted`` ranks routes by ``EdgeCosts`` (relationship type and
+    properties) instead of hop count; ``relationship_costs`` overrides the
+    per-type costs. ``k`` > 1 also returns the next-best loopless routes.
+    """
     from_entity_id: str
     to_entity_id: str
-    max_depth: int = Field(default=10, le=20)
+    weighted: bool = False
+    k: int = Field(default=1, ge=1, le=10)
+    relationship_costs: Optional[Dict[RelationshipType, Annotated[float, Field(ge=0)]]] = None
+
+
+# Batch queries answer many pairs with one traversal per source; the caps keep
+# a single request's response (and the distance matrix) bounded.
+class MultiPathQuery(PathOptions):
+    """Schema for one-source, many-target path requests"""
+    from_entity_id: str
+    to_entity_ids: List[str] = Field(min_length=1, max_length=500)
+
+
+class DistanceQuery(PathOptions):
+    """Schema for many-to-many distance matrix requests"""
+    from_entity_ids: List[str] = Field(min_length=1, max_length=50)
+    to_entity_ids: List[str] = Field(min_length=1, max_length=500)
+
+
+class ReachabilityQuery(PathOptions):
+    """Schema for set reachability requests"""
+    from_entity_ids: List[str] = Field(min_length=1, max_length=500)
+    to_entity_ids: List[str] = Field(min_length=1, max_length=500)
+
+
+class CycleQuery(BaseModel):
+    """Schema for whole-graph cycle detection.
+
+    Every relationship type is followed unless ``relationship_types`` narrows
+    it, e.g. to CONTROLS / TRIGGERED_BY / AUTOMATES for automation feedback
+    loops.
+    """
+    relationship_types: Optional[List[RelationshipType]] = None
+    max_length: Optional[int] = Field(default=None, ge=1, le=20)
+    max_cycles: int = Field(default=100, ge=1, le=1000)
+
+
+# Search steps one cycle request may take; past it the answer is partial.
+CYCLE_SEARCH_STEPS = 100_000
+
+# Most entities one subgraph request may return; past it the answer is partial.
+SUBGRAPH_MAX_NODES = 10_000
 
 
 # Create router
@@ -69,6 +128,10 @@ router = APIRouter(prefix="/graph", tags=["graph"])
 # `get_graph_index` (readers) / `get_graph_index_service` (writers), both
 # imported from ..dependencies. They are re-exported for backwards
 # compatibility with modules that used to import get_graph_index from here.
+#
+# Traversal endpoints take `get_graph_snapshot` instead and run the walk itself
+# in a worker thread (asyncio.to_thread) against that frozen copy, so a long
+# traversal does not hold up every other request on the one event loop.
 __all__ = ["router", "get_graph_index", "get_graph_index_service"]
 
 
@@ -315,16 +378,42 @@ async def search_graph(
     }
 
 
+def _path_entities(graph: GraphTraversals, path: List[str]) -> List[Dict[str, Any]]:
+    """Entity summaries for the hops of a path"""
+    path_entities = []
+    for entity_id in path:
+        entity = graph.entities.get(entity_id)
+        if entity:
+            path_entities.append({
+                "id": entity.id,
+                "name": entity.name,
+                "type": entity.entity_type.value
+            })
+    return path_entities
+
+
+def _traversal_options(query: PathOptions) -> Dict[str, Any]:
+    return {
+        "max_depth": query.max_depth,
+        "direction": query.direction,
+        "rel_types": query.relationship_types,
+    }
+
+
 @router.post("/path", response_model=Dict[str, Any])
 async def find_path(
     path_query: PathQuery,
-    graph: GraphIndex = Depends(get_graph_index)
+    graph: ReadSnapshot = Depends(get_graph_snapshot)
 ):
     """Find shortest path between two entities"""
-    path = graph.find_path(
+    if path_query.weighted or path_query.k > 1:
+        return await _weighted_paths(path_query, graph)
+
+    path = await asyncio.to_thread(
+        graph.find_path,
         path_query.from_entity_id,
         path_query.to_entity_id,
-        path_query.max_depth
+        **_traversal_options(path_query)
     )
 
     if not path:
@@ -335,36 +424,128 @@ async def find_path(
             "found": False
         }
 
-    # Get entity details for path
-    path_entities = []
-    for entity_id in path:
-        entity = graph.entities.get(entity_id)
-        if entity:
-            path_entities.append({
-                "id": entity.id,
-                "name": entity.name,
-                "type": entity.entity_type.value
-            })
-
     return {
         "from": path_query.from_entity_id,
         "to": path_query.to_entity_id,
-        "path": path_entities,
+        "path": _path_entities(graph, path),
         "length": len(path) - 1,
         "found": True
     }
 
 
+async def _weighted_paths(path_query: PathQuery, graph: ReadSnapshot) -> Dict[str, Any]:
+    """Cheapest-first routes; the best one is also reported as ``path``"""
+    costs = (
+        EdgeCosts(type_costs=path_query.relationship_costs or {})
+        if path_query.weighted else unit_cost
+    )
+    found = await asyncio.to_thread(
+        graph.find_weighted_paths,
+        path_query.from_entity_id,
+        path_query.to_entity_id,
+        k=path_query.k,
+        costs=costs,
+        **_traversal_options(path_query)
+    )
+    routes = [
+        {
+            "path": _path_entities(graph, route["path"]),
+            "relationship_types": [rel.relationship_type.value for rel in route["relationships"]],
+            "length": len(route["path"]) - 1,
+            "cost": route["cost"]
+        }
+        for route in found
+    ]
+    best = routes[0] if routes else None
+    return {
+        "from": path_query.from_entity_id,
+        "to": path_query.to_entity_id,
+        "path": best["path"] if best else [],
+        "length": best["length"] if best else 0,
+        "cost": best["cost"] if best else None,
+        "found": bool(routes),
+        "paths": routes
+    }
+
+
+@router.post("/paths", response_model=Dict[str, Any])
+async def find_paths(
+    path_query: MultiPathQuery,
+    graph: ReadSnapshot = Depends(get_graph_snapshot)
+):
+    """Find shortest paths from one entity to many, with a single traversal"""
+    paths = await asyncio.to_thread(
+        graph.find_paths,
+        path_query.from_entity_id,
+        path_query.to_entity_ids,
+        **_traversal_options(path_query)
+    )
+
+    return {
+        "from": path_query.from_entity_id,
+        "paths": {
+            to_id: {
+                "path": _path_entities(graph, path),
+                "length": len(path) - 1 if path else 0,
+                "found": bool(path)
+            }
+            for to_id, path in paths.items()
+        },
+        "found": sum(1 for path in paths.values() if path)
+    }
+
+
+@router.post("/distances", response_model=Dict[str, Any])
+async def get_distance_matrix(
+    distance_query: DistanceQuery,
+    graph: ReadSnapshot = Depends(get_graph_snapshot)
+):
+    """Hop counts between every source and every target (null if unreachable)"""
+    distances = await asyncio.to_thread(
+        graph.distance_matrix,
+        distance_query.from_entity_ids,
+        distance_query.to_entity_ids,
+        **_traversal_options(distance_query)
+    )
+    return {
+        "from": distance_query.from_entity_ids,
+        "to": distance_query.to_entity_ids,
+        "distances": distances
+    }
+
+
+@router.post("/reachable", response_model=Dict[str, Any])
+async def get_reachable_entities(
+    reachability_query: ReachabilityQuery,
+    graph: ReadSnapshot = Depends(get_graph_snapshot)
+):
+    """Which targets can be reached from any of the sources"""
+    reachable = await asyncio.to_thread(
+        graph.reachable,
+        reachability_query.from_entity_ids,
+        reachability_query.to_entity_ids,
+        **_traversal_options(reachability_query)
+    )
+
+    return {
+        "from": reachability_query.from_entity_ids,
+        "reachable": [i for i in reachability_query.to_entity_ids if i in reachable],
+        "unreachable": [i for i in reachability_query.to_entity_ids if i not in reachable],
+        "count": len(reachable)
+    }
+
+
 @router.get("/entities/{entity_id}/connected", response_model=Dict[str, Any])
 async def get_connected_entities(
     entity_id: str,
     relationship_type: Optional[RelationshipType] = Query(None, description="Filter by relationship type"),
     direction: str = Query("both", pattern="^(incoming|outgoing|both)$", description="Direction of relationships"),
     max_depth: int = Query(1, le=5, description="Maximum traversal depth"),
-    graph: GraphIndex = Depends(get_graph_index)
+    graph: ReadSnapshot = Depends(get_graph_snapshot)
 ):
     """Get entities connected to a given entity"""
-    connected = graph.get_connected_entities(
+    connected = await asyncio.to_thread(
+        graph.get_connected_entities,
         entity_id,
         rel_type=relationship_type,
         direction=direction,
@@ -386,6 +567,58 @@ async def get_connected_entities(
     }
 
 
+def _ndjson_line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+@router.get("/entities/{entity_id}/subgraph")
+async def get_entity_subgraph(
+    entity_id: str,
+    depth: int = Query(1, ge=0, le=5, description="Hops from the entity"),
+    relationship_types: Optional[List[RelationshipType]] = Query(None, description="Only follow these relationship types"),
+    entity_types: Optional[List[EntityType]] = Query(None, description="Only include these entity types"),
+    direction: str = Query("both", pattern="^(incoming|outgoing|both)$", description="Direction of relationships"),
+    max_nodes: int = Query(1000, ge=1, le=SUBGRAPH_MAX_NODES, description="Most entities to return"),
+    graph: ReadSnapshot = Depends(get_graph_snapshot)
+):
+    """Stream the k-hop neighbourhood of an entity as NDJSON.
+
+    One ``entity`` line per entity, nearest first, then one ``relationship``
+    line per edge among them, then a ``trailer`` with the counts and whether
+    ``max_nodes`` truncated the neighbourhood. The subgraph is extracted from
+    a read snapshot before the first byte is sent, so writes do not tear it.
+    """
+    if entity_id not in graph.entities:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    subgraph = await asyncio.to_thread(
+        graph.get_ego_subgraph,
+        entity_id,
+        depth=depth,
+        rel_types=relationship_types,
+        entity_types=entity_types,
+        direction=direction,
+        max_nodes=max_nodes,
+    )
+
+    async def lines() -> AsyncIterator[bytes]:
+        for member_id, entity in subgraph["entities"].items():
+            yield _ndjson_line({
+                "kind": "entity",
+                "depth": subgraph["depths"][member_id],
+                "entity": entity.to_dict(),
+            })
+        for rel in subgraph["relationships"]:
+            yield _ndjson_line({"kind": "relationship", "relationship": rel.to_dict()})
+        yield _ndjson_line({
+            "kind": "trailer",
+            "entity_count": len(subgraph["entities"]),
+            "relationship_count": len(subgraph["relationships"]),
+            "truncated": subgraph["truncated"],
+        })
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
 @router.get("/entities/{entity_id}/similar", response_model=Dict[str, Any])
 async def find_similar_entities(
     entity_id: str,
@@ -405,9 +638,120 @@ async def find_similar_entities(
     }
 
 
+@router.post("/cycles", response_model=Dict[str, Any])
+async def find_cycles(
+    cycle_query: CycleQuery,
+    graph: ReadSnapshot = Depends(get_graph_snapshot)
+):
+    """Find loops anywhere in the graph, such as automation feedback loops"""
+    found = await asyncio.to_thread(
+        graph.find_all_cycles,
+        cycle_query.relationship_types,
+        max_length=cycle_query.max_length,
+        max_cycles=cycle_query.max_cycles,
+        max_steps=CYCLE_SEARCH_STEPS,
+    )
+
+    def summary(entity_ids):
+        return [
+            {"id": entity_id, "name": graph.entities[entity_id].name,
+             "type": graph.entities[entity_id].entity_type.value}
+            for entity_id in entity_ids
+        ]
+
+    return {
+        "cycles": [
+            {"path": summary(cycle), "length": len(cycle) - 1}
+            for cycle in found["cycles"]
+        ],
+        "count": len(found["cycles"]),
+        "complete": found["complete"],
+        "components": [
+            {"entity_ids": component, "size": len(component)}
+            for component in found["components"]
+        ],
+    }
+
+
 @router.get("/statistics", response_model=Dict[str, Any])
 async def get_graph_statistics(
-    graph: GraphIndex = Depends(get_graph_index)
+    graph: GraphIndex = Depends(get_graph_index),
+    service: GraphIndexService = Depends(get_graph_index_service)
+):
+    """Get graph statistics, with the index's rebuild record and the latest
+    analytics headline if any"""
+    stats = graph.get_statistics()
+    stats["index"] = {
+        "generation": service.generation,
+        "rebuilds": service.rebuild_count,
+        "rebuilding": service.rebuilding,
+        "last_rebuild_ms": service.last_rebuild_ms,
+        "total_rebuild_ms": service.total_rebuild_ms,
+    }
+    analytics = service.analytics
+    if not analytics.is_current:
+        analytics.notify()
+    stats["analytics"] = None if analytics.latest is None else {
+        **analytics.latest.summary(),
+        "current": analytics.is_current,
+    }
+    return stats
+
+
+@router.get("/analytics", response_model=Dict[str, Any])
+async def get_graph_analytics(
+    top: int = Query(10, ge=1, le=100, description="Entities listed per metric"),
+    entity_id: Optional[str] = Query(None, description="Also report this entity's scores"),
+    wait: bool = Query(False, description="Compute now if the cached run is out of date"),
+    graph: GraphIndex = Depends(get_graph_index),
+    service: GraphIndexService = Depends(get_graph_index_service)
 ):
-    """Get graph statistics"""
-    return graph.get_statistics()
+    """PageRank, betweenness, hub/authority scores and connected components.
+
+    Served from the run cached for the index generation; a stale run is
+    returned as such while the next one computes in the background, unless
+    ``wait`` asks for a fresh one (computed in a worker thread).
+    """
+    analytics = service.analytics
+    if not analytics.is_current:
+        if wait:
+            await analytics.compute_now()
+        else:
+            analytics.notify()
+    result = analytics.latest
+    if result is None:
+        return {"status": "pending", "generation": None, "index_generation": service.generation}
+
+    def ranked(metric):
+        return [
+            {
+                "entity_id": ranked_id,
+                "name": graph.entities[ranked_id].name if ranked_id in graph.entities else None,
+                "score": score,
+            }
+            for ranked_id, score in result.top(metric, top)
+        ]
+
+    response = {
+        "status": "current" if analytics.is_current else "stale",
+        "generation": result.generation,
+        "index_generation": service.generation,
+        "backend": result.backend,
+        "elapsed_ms": result.elapsed_ms,
+        "entity_count": len(result.ids),
+        "pagerank": ranked("pagerank"),
+        "betweenness": ranked("betweenness"),
+        "betweenness_sampled": result.betweenness_sampled,
+        "hubs": ranked("hubs"),
+        "authorities": ranked("authorities"),
+        "components": {
+            "count": len(result.component_sizes),
+            "sizes": result.component_sizes[:top],
+        },
+    }
+    if entity_id is not None:
+        scores = result.scores(entity_id)
+        if scores is None:
+            raise HTTPException(status_code=404, detail="Entity not in the analysed graph")
+        response["entity"] = {"entity_id": entity_id, **scores}
+    return response
@@ -12,9 +12,10 @@ from pydantic import BaseModel
 
 from ...database import get_db
 from ...repositories.graph_impl import SQLGraphOperations
-from ...graph.index import GraphIndex
+from ...graph.index import ReadSnapshot
+from ...graph.index_service import GraphIndexService
 from ...mcp.server import FunkyGibbonMCPServer
-from ..dependencies import get_graph_index
+from ..dependencies import get_graph_index_service, get_graph_snapshot
 
 
 class MCPToolCall(BaseModel):
@@ -28,7 +29,8 @@ router = APIRouter(prefix="/mcp", tags=["mcp"])
 
 async def get_mcp_server(
     db: AsyncSession = Depends(get_db),
-    graph: GraphIndex = Depends(get_graph_index)
+    service: GraphIndexService = Depends(get_graph_index_service),
+    snapshot: ReadSnapshot = Depends(get_graph_snapshot)
 ) -> FunkyGibbonMCPServer:
     """Build the MCP server for this request.
 
@@ -36,9 +38,10 @@ async def get_mcp_server(
     binds a database session, and a cached instance kept serving the *first*
     request's session forever. The graph index it wraps is the application's one
     index (ADR-003) -- the same object every time, kept current by write-through
-    and the drift check -- so there is nothing expensive to cache here.
+    and the drift check -- so there is nothing expensive to cache here. Its
+    traversals read the snapshot of that index for this request's generation.
     """
-    return FunkyGibbonMCPServer(graph, SQLGraphOperations(db))
+    return FunkyGibbonMCPServer(service.index, SQLGraphOperations(db), snapshot)
 
 
 @router.get("/tools", response_model=Dict[str, Any])
@@ -5,24 +5,38 @@ Handles sync requests, conflict resolution, and delta synchronization
 between FunkyGibbon server and clients.
 """
 
-import hashlib
+import asyncio
+import heapq
+import json
 import logging
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Set, Tuple, Union
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select, update
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from funkygibbon.api.dependencies import get_graph_index_service
 from funkygibbon.database import get_db
-from funkygibbon.graph.index_service import write_through_applied_changes
+from funkygibbon.graph.change_feed import ChangeFeed
+from funkygibbon.graph.index_service import (
+    GraphIndexService, current_server_seq, write_through_applied_changes,
+)
+from funkygibbon.repositories.replication import ReplicationStateRepository
+from funkygibbon.repositories.sequence import SequenceAllocator
 from inbetweenies.models import (
     Entity, EntityRelationship, EntityType, RelationshipType, SourceType,
 )
 from inbetweenies.sync import (
     VectorClock, EntityChange, RelationshipChange, SyncChange,
     SyncFilters, SyncRequest, ConflictInfo, SyncStats, SyncResponse,
-    ConflictResolver,
+    ConflictResolver, STATE_DIGEST_SUM_CAPABILITY, BUCKET_DEPTH, DigestTreeNode,
+    RELATIONSHIP_FEED_CAPABILITY, NDJSON_MEDIA_TYPE, JSON_MEDIA_TYPE, ChangeNotice,
 )
+from inbetweenies.sync import wire
+from inbetweenies.sync.digest import is_bucket_prefix
 
 
 # Router
@@ -32,7 +46,98 @@ logger = logging.getLogger(__name__)
 # pages rather than one unbounded body; the loop is what matters, not the number.
 PAGE_SIZE = 500
 
-router = APIRouter(prefix="/api/v1/sync", tags=["sync"])
+# Optional protocol features this server implements (SyncRequest.capabilities).
+SERVER_CAPABILITIES = frozenset({STATE_DIGEST_SUM_CAPABILITY, RELATIONSHIP_FEED_CAPABILITY})
+
+# Rows fetched per round trip by a streamed sync (PROTOCOL.md §3.6). Bounds the
+# server's memory for the pull regardless of how much the stream carries.
+STREAM_BATCH = 200
+
+# Change-feed waits (PROTOCOL.md §3.8), in seconds. A long poll is held for
+# at most CHANGE_WAIT_MAX, below the idle timeout of common proxies. An SSE
+# stream sends a comment every CHANGE_KEEPALIVE so intermediaries keep it open.
+CHANGE_WAIT_DEFAULT = 25.0
+CHANGE_WAIT_MAX = 55.0
+CHANGE_KEEPALIVE = 15.0
+CHANGE_STREAM_DEFAULT = 300.0
+CHANGE_STREAM_MAX = 3600.0
+
+# Largest a compressed sync body may inflate to before it is refused with 413.
+MAX_DECOMPRESSED_BODY = wire.MAX_DECOMPRESSED_BYTES
+
+
+
+class _WireRequest(Request):
+    """A request body in a negotiated wire encoding, read as JSON (§3.7).
+
+    FastAPI parses a body through ``request.json()``, and only for a body
+    labelled JSON. Overriding ``body()`` and ``json()`` is the documented
+    seam for a custom body format; the route relabels the request so FastAPI
+    takes this path, and validation sees the same dict JSON would give.
+    """
+
+    def __init__(self, scope, receive, media_type: str, coding: Optional[str]):
+        super().__init__(scope, receive)
+        self._wire_media_type = media_type
+        self._wire_coding = coding
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            if self._wire_coding:
+                try:
+                    body = wire.decompress(body, self._wire_coding, MAX_DECOMPRESSED_BODY)
+                except wire.BodyTooLarge:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Sync body inflates past {MAX_DECOMPRESSED_BODY} bytes",
+                    )
+            self._body = body
+        return self._body
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = wire.decode(await self.body(), self._wire_media_type)
+        return self._json
+
+
+class WireRoute(APIRoute):
+    """Route that accepts any request encoding in inbetweenies.sync.wire.
+
+    A plain JSON body takes FastAPI's own path untouched. Anything else is
+    415 unless this process has the codec for it. A body that fails to decode
+    is a 400, as malformed JSON is, and one that inflates past
+    ``MAX_DECOMPRESSED_BODY`` is a 413.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            media_type = wire.media_type_of(request.headers.get("content-type"))
+            coding = request.headers.get("content-encoding", "").strip().lower()
+            coding = None if coding in ("", "identity") else coding
+            if media_type == JSON_MEDIA_TYPE and coding is None:
+                return await handler(request)
+            if media_type not in wire.supported_media_types() or (
+                coding is not None and coding not in wire.supported_codings()
+            ):
+                raise HTTPException(
+                    status_code=415,
+                    detail=f"Unsupported sync body encoding: {media_type}"
+                           + (f" with {coding}" if coding else ""),
+                )
+            relabelled = dict(request.scope)
+            relabelled["headers"] = [
+                (name, value) for name, value in request.scope["headers"]
+                if name not in (b"content-type", b"content-encoding")
+            ] + [(b"content-type", JSON_MEDIA_TYPE.encode())]
+            return await handler(_WireRequest(relabelled, request.receive, media_type, coding))
+
+        return route_handler
+
+
+router = APIRouter(prefix="/api/v1/sync", tags=["sync"], route_class=WireRoute)
 
 
 def _to_utc(dt: Optional[datetime]) -> Optional[datetime]:
@@ -44,6 +149,82 @@ def _to_utc(dt: Optional[datetime]) -> Optional[datetime]:
     return dt.astimezone(timezone.utc)
 
 
+def _cursor_value(request: SyncRequest) -> int:
+    """The request cursor as a server_seq watermark; 400 if it is not one."""
+    try:
+        return int(request.cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"cursor must be a server_seq integer, got {request.cursor!r}",
+        )
+
+
+# Every column of a version row the push path writes, in table order.
+# id_bucket is derived by its column default.
+_VERSION_COLUMNS = (
+    "id", "version", "entity_type", "name", "content", "source_type", "user_id",
+    "parent_versions", "created_at", "updated_at", "is_latest", "server_seq",
+)
+
+
+class _ApplyBatch:
+    """In-memory staging for one push (ADR-011 §3).
+
+    ``stored`` is the current row of each pushed id as prefetched; ``current``
+    starts as a copy and follows every decision made in this push, so the
+    second change to an id is resolved against the first. ``held`` is every
+    (id, version) already stored or staged, for idempotency. ``inserts`` are
+    the version rows to write, in apply order.
+    """
+
+    def __init__(self, stored: Dict[str, Entity], held: Set[Tuple[str, str]]):
+        self.stored = stored
+        self.current: Dict[str, Entity] = dict(stored)
+        self.held = held
+        self.inserts: List[Entity] = []
+
+
+class _PushOutcome:
+    """What applying a push decided, for whichever response form carries it."""
+
+    def __init__(self, *, start_time: datetime, conflicts: List[ConflictInfo],
+                 applied: List[str], applied_relationships: List[str],
+                 honoured: List[str], state_digest: str, server_time: datetime):
+        self.start_time = start_time
+        self.conflicts = conflicts
+        self.applied = applied
+        self.applied_relationships = applied_relationships
+        self.honoured = honoured
+        self.state_digest = state_digest
+        self.server_time = server_time
+
+
+async def _merge_by_seq(streams) -> AsyncIterator[Union[Entity, EntityRelationship]]:
+    """Merge row streams that are each ordered by server_seq into one.
+
+    heapq.merge for async iterators: one row per stream is buffered.
+    """
+    heads = []
+    for index, stream in enumerate(streams):
+        row = await anext(stream, None)
+        if row is not None:
+            heads.append((row.server_seq or 0, index, row))
+    heapq.heapify(heads)
+    while heads:
+        _, index, row = heads[0]
+        yield row
+        following = await anext(streams[index], None)
+        if following is None:
+            heapq.heappop(heads)
+        else:
+            heapq.heapreplace(heads, (following.server_seq or 0, index, following))
+
+
+def _ndjson_line(record: dict) -> bytes:
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+
 class SyncHandler:
     """Handle sync protocol requests (inbetweenies-v2, see PROTOCOL.md).
 
@@ -59,6 +240,88 @@ class SyncHandler:
 
     async def handle_sync_request(self, request: SyncRequest) -> SyncResponse:
         """Process sync request and return changes."""
+        push = await self._apply_push(request)
+
+        # --- Compute outgoing (server -> client) changes ---
+        # ADR-002 §4: the page is capped and filtered in SQL, and the query asks
+        # for one row past the cap — that extra row is how we know more remain.
+        # `cursor` is the highest server_seq in this page; the client loops
+        # until it comes back null.
+        rows: List[Union[Entity, EntityRelationship]] = await self._outgoing_entities(request)
+        if RELATIONSHIP_FEED_CAPABILITY in push.honoured:
+            # Both tables share one sequence (PROTOCOL.md §3.5), so the page is
+            # a merge of two keyset reads. Each read is capped at PAGE_SIZE + 1,
+            # which is enough: the first PAGE_SIZE + 1 rows of the merge can
+            # only come from the first PAGE_SIZE + 1 of each side.
+            relationships = await self._outgoing_relationships(request)
+            rows = list(heapq.merge(rows, relationships, key=lambda row: row.server_seq or 0))
+            rows = rows[:PAGE_SIZE + 1]
+        more_remain = len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE]
+        cursor = None
+        if more_remain and rows:
+            cursor = str(rows[-1].server_seq or 0)
+
+        return self._build_response(
+            request, push, [self._row_to_sync_change(row) for row in rows], cursor,
+        )
+
+    async def stream_sync_request(self, request: SyncRequest) -> AsyncIterator[bytes]:
+        """Process a sync request and stream its changes as NDJSON (PROTOCOL.md §3.6).
+
+        The push half is identical to :meth:`handle_sync_request` and has
+        committed by the time this returns, so a push error is still an HTTP
+        error rather than a truncated body. The pull half is not paged: one
+        server-side cursor per table is drained in ``server_seq`` order, one
+        line per row, and the metadata that a JSON response carries up front
+        follows the last change as a trailer. A body without a trailer is
+        incomplete, however many changes it carried.
+
+        The paged JSON response has to hold a whole page -- rows, SyncChange
+        models and the encoded body -- before the first byte is sent. This
+        holds ``STREAM_BATCH`` rows, and the client can start applying as soon
+        as the first line lands.
+        """
+        push = await self._apply_push(request)
+        # Built here, not in the generator, so a bad filter is still a 400.
+        queries = [self._outgoing_entities_query(request)]
+        if RELATIONSHIP_FEED_CAPABILITY in push.honoured:
+            queries.append(self._outgoing_relationships_query(request))
+        return self._stream_changes(request, push, queries)
+
+    async def _stream_changes(self, request: SyncRequest, push: "_PushOutcome",
+                              queries: list) -> AsyncIterator[bytes]:
+        streams = [
+            await self.db_session.stream_scalars(
+                query.execution_options(yield_per=STREAM_BATCH)
+            )
+            for query in queries
+        ]
+        try:
+            async for row in _merge_by_seq(streams):
+                yield _ndjson_line({
+                    "kind": "change",
+                    "seq": row.server_seq,
+                    "change": self._row_to_sync_change(row).model_dump(mode="json"),
+                })
+        except Exception:
+            # Headers are gone; the only way left to signal failure is to
+            # withhold the trailer, which the client treats as incomplete.
+            logger.exception("Streamed sync aborted before the trailer")
+            return
+        finally:
+            for stream in streams:
+                await stream.close()
+
+        # The stream is drained, so there is no cursor to resume from.
+        trailer = self._build_response(request, push, [], None)
+        yield _ndjson_line({
+            "kind": "trailer",
+            **trailer.model_dump(mode="json", exclude={"changes"}),
+        })
+
+    async def _apply_push(self, request: SyncRequest) -> "_PushOutcome":
+        """Apply and commit the client's changes; the push half of a sync."""
         start_time = datetime.now(timezone.utc)
 
         if request.protocol_version != "inbetweenies-v2":
@@ -73,11 +336,15 @@ class SyncHandler:
         applied: List[str] = []
         applied_relationships: List[str] = []
 
+        # Decided in memory against one prefetch, written in one round trip
+        # (_write_batch). Order still matters and is preserved: a later change
+        # to the same id sees the outcome of an earlier one in this push.
+        batch = await self._prefetch_batch(request.changes)
         for change in request.changes:
             if change.change_type in ("create", "update"):
-                persisted = await self._apply_incoming(change, conflicts)
+                persisted = self._apply_incoming(change, conflicts, batch)
             elif change.change_type == "delete":
-                persisted = await self._handle_delete(change)
+                persisted = self._handle_delete(change, batch)
             else:
                 persisted = False
             # `change.entity` is optional: a change may carry only relationships
@@ -85,19 +352,27 @@ class SyncHandler:
             # entity id to acknowledge.
             if persisted and change.entity and change.entity.id not in applied:
                 applied.append(change.entity.id)
+        await self._write_batch(batch)
 
         # Relationships only after every entity in the batch has been applied:
         # an edge references its endpoints at a specific version and the table
         # carries a composite FK on (entity_id, entity_version), so the endpoints
         # must already exist (PROTOCOL.md §5, entities before relationships).
-        for change in request.changes:
-            for relationship in change.relationships:
-                if await self._persist_relationship(relationship, request.user_id):
-                    if relationship.id not in applied_relationships:
-                        applied_relationships.append(relationship.id)
+        applied_relationships = await self._persist_relationships(
+            [r for change in request.changes for r in change.relationships],
+            request.user_id,
+        )
+
+        # Capabilities are negotiated once per request; the response names the
+        # ones honoured, and the client reads the digest definition from there.
+        honoured = [c for c in request.capabilities if c in SERVER_CAPABILITIES]
+        # Read before the commit so it describes exactly the state this commit
+        # makes durable, and so a drift repair of the digest row (rare) lands
+        # in the same transaction rather than being dropped with the session.
+        state_digest = await self._state_digest(honoured)
 
-        # ADR-011 §3: ONE transaction for the whole push. _insert_version and
-        # _persist_relationship only flush, so nothing above this line is
+        # ADR-011 §3: ONE transaction for the whole push. _write_batch and
+        # _persist_relationships only flush, so nothing above this line is
         # durable yet. Committing per change — as this did — meant a crash
         # mid-batch left the server half-updated with no record of how far it
         # got, and the client holding acknowledgements for work that had been
@@ -124,60 +399,52 @@ class SyncHandler:
         # next `since`. Capture it now; everything applied above is <= it.
         server_time = datetime.now(timezone.utc)
 
-        # --- Compute outgoing (server -> client) changes ---
-        entities = await self._outgoing_entities(request)
-
-        # Filters (apply to both full and delta).
-        if request.filters:
-            if request.filters.entity_types:
-                wanted = {EntityType(et) for et in request.filters.entity_types}
-                entities = [e for e in entities if e.entity_type in wanted]
-            if request.filters.modified_by:
-                wanted_users = set(request.filters.modified_by)
-                entities = [e for e in entities if e.user_id in wanted_users]
-
-        # ADR-002 §4: cap the page and hand back a resume point. Responses were
-        # unbounded — a first full sync returned the entire graph in one body.
-        # `cursor` is the highest server_seq in this page; the client loops
-        # until it comes back null.
-        more_remain = len(entities) > PAGE_SIZE
-        entities = entities[:PAGE_SIZE]
-        cursor = None
-        if more_remain and entities:
-            cursor = str(max(e.server_seq or 0 for e in entities))
-
-        response_changes = []
-        for entity in entities:
-            deleted = bool((entity.content or {}).get("deleted"))
-            response_changes.append(SyncChange(
-                change_type="delete" if deleted else "update",
-                entity=self._entity_to_change(entity),
-            ))
+        return _PushOutcome(
+            start_time=start_time,
+            conflicts=conflicts,
+            applied=applied,
+            applied_relationships=applied_relationships,
+            honoured=honoured,
+            state_digest=state_digest,
+            server_time=server_time,
+        )
 
-        duration_ms = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
+    def _build_response(self, request: SyncRequest, push: "_PushOutcome",
+                        changes: List[SyncChange], cursor: Optional[str]) -> SyncResponse:
+        duration_ms = (datetime.now(timezone.utc) - push.start_time).total_seconds() * 1000
 
         return SyncResponse(
             sync_type=request.sync_type,
-            changes=response_changes,
-            conflicts=conflicts,
-            applied=applied,
-            applied_relationships=applied_relationships,
+            changes=changes,
+            conflicts=push.conflicts,
+            applied=push.applied,
+            applied_relationships=push.applied_relationships,
             vector_clock=request.vector_clock,  # RESERVED — echoed, never read
-            server_time=server_time.isoformat(),
+            server_time=push.server_time.isoformat(),
             cursor=cursor,
-            state_digest=await self._state_digest(),
+            state_digest=push.state_digest,
+            capabilities=push.honoured,
             sync_stats=SyncStats(
                 # Counts stay consistent with the acknowledgement lists: they
                 # report what landed, not what was merely attempted.
-                entities_synced=len(applied),
-                relationships_synced=len(applied_relationships),
-                conflicts_resolved=len(conflicts),
+                entities_synced=len(push.applied),
+                relationships_synced=len(push.applied_relationships),
+                conflicts_resolved=len(push.conflicts),
                 duration_ms=duration_ms,
             ),
         )
 
     async def _outgoing_entities(self, request: SyncRequest) -> List[Entity]:
-        """The current rows this request should receive, in replication order.
+        """One page of the current rows this request should receive.
+
+        Returns at most ``PAGE_SIZE + 1`` rows in replication order; the caller
+        trims the extra row and uses its presence to decide whether to hand
+        back a cursor. Everything that narrows the result — the delta bound and
+        the ``entity_types``/``modified_by`` filters — is a WHERE clause, so a
+        page costs O(page) against the ``(is_latest, server_seq)`` index no
+        matter how large the graph is. It used to load every current row past
+        the cursor, filter in Python and only then slice, which made every page
+        of a first full sync a whole-table read.
 
         Two delta mechanisms, deliberately:
 
@@ -190,50 +457,91 @@ class SyncHandler:
         A client sending both gets the cursor: it is the stronger statement, and
         `updated_at` cannot separate rows written in the same microsecond.
         """
+        stmt = self._outgoing_entities_query(request).limit(PAGE_SIZE + 1)
+        result = await self.db_session.execute(stmt)
+        return list(result.scalars().all())
+
+    def _outgoing_entities_query(self, request: SyncRequest):
+        """Every current row this request should receive, in replication order."""
         stmt = select(Entity).where(Entity.is_latest.is_(True))
 
         if request.sync_type == "delta":
             if request.cursor:
+                stmt = stmt.where(Entity.server_seq > _cursor_value(request))
+            elif request.filters and request.filters.since:
+                since = _to_utc(request.filters.since)
+                # Strictly greater than `since` (exclusive lower bound, §4).
+                stmt = stmt.where(Entity.updated_at > since)
+
+        # Filters apply to both full and delta.
+        if request.filters:
+            if request.filters.entity_types:
                 try:
-                    stmt = stmt.where(Entity.server_seq > int(request.cursor))
+                    wanted = {EntityType(et) for et in request.filters.entity_types}
                 except ValueError:
                     raise HTTPException(
                         status_code=400,
-                        detail=f"cursor must be a server_seq integer, got {request.cursor!r}",
+                        detail=f"Unknown entity_types filter: {request.filters.entity_types}",
                     )
-            elif request.filters and request.filters.since:
-                since = _to_utc(request.filters.since)
-                # Strictly greater than `since` (exclusive lower bound, §4).
-                stmt = stmt.where(Entity.updated_at > since)
+                stmt = stmt.where(Entity.entity_type.in_(wanted))
+            if request.filters.modified_by:
+                stmt = stmt.where(Entity.user_id.in_(set(request.filters.modified_by)))
 
         # Ordered by the replication axis so paging is stable: without this the
         # page boundary is whatever order the database happened to return, and a
-        # row can be skipped or repeated across pages.
-        stmt = stmt.order_by(Entity.server_seq)
+        # row can be skipped or repeated across pages. The cursor is a keyset
+        # bound on that same column, so resuming never re-reads earlier pages.
+        return stmt.order_by(Entity.server_seq)
+
+    async def _outgoing_relationships(self, request: SyncRequest) -> List[EntityRelationship]:
+        """One page of the relationship feed (PROTOCOL.md §3.5).
+
+        The edge counterpart of :meth:`_outgoing_entities`, with the same delta
+        bounds and the same ``PAGE_SIZE + 1`` cap, against
+        ``ix_entity_relationships_server_seq``. Edges used to be absent from
+        the pull entirely, so a client could only learn of one by refetching
+        the graph. ``modified_by`` narrows edges too; ``entity_types`` does not,
+        since an edge has no entity type.
+        """
+        stmt = self._outgoing_relationships_query(request).limit(PAGE_SIZE + 1)
         result = await self.db_session.execute(stmt)
         return list(result.scalars().all())
 
-    async def _state_digest(self) -> str:
-        """sha256 over the sorted (id, version) set of every current row.
+    def _outgoing_relationships_query(self, request: SyncRequest):
+        """Every edge this request should receive, in replication order."""
+        stmt = select(EntityRelationship)
+
+        if request.sync_type == "delta":
+            if request.cursor:
+                stmt = stmt.where(EntityRelationship.server_seq > _cursor_value(request))
+            elif request.filters and request.filters.since:
+                since = _to_utc(request.filters.since)
+                stmt = stmt.where(EntityRelationship.updated_at > since)
+
+        if request.filters and request.filters.modified_by:
+            stmt = stmt.where(EntityRelationship.user_id.in_(set(request.filters.modified_by)))
+
+        return stmt.order_by(EntityRelationship.server_seq)
 
-        ADR-011 §4. Divergence between a server and a replica is otherwise
-        undetectable: both sides believe they are in sync, because both applied
-        every change they were told about. A client compares this against the
-        same computation over its own cache and resyncs on mismatch.
+    async def _state_digest(self, honoured: List[str]) -> str:
+        """Digest of the (id, version) set of every current row (ADR-011 §4).
 
-        Deliberately the degenerate form of the Merkle tree in the deleted sync
-        stack: at this scale one hash over the id/version pairs delivers the
-        verification value, and a tree would be machinery without a payload.
+        Divergence between a server and a replica is otherwise undetectable:
+        both sides believe they are in sync, because both applied every change
+        they were told about. A client compares this against the same
+        computation over its own cache and resyncs on mismatch.
+
+        This used to re-read and re-hash every current row on every response,
+        pure pushes included. The digest is now maintained incrementally by
+        every version insert (ReplicationStateRepository), so a client that
+        announces the sum capability is served in O(1). Everyone else still
+        gets the original sorted sha256, memoized per state, so the wire
+        meaning of ``state_digest`` never changes under an existing client.
         """
-        result = await self.db_session.execute(
-            select(Entity.id, Entity.version)
-            .where(Entity.is_latest.is_(True))
-            .order_by(Entity.id)
-        )
-        digest = hashlib.sha256()
-        for entity_id, version in result.all():
-            digest.update(f"{entity_id}\x1f{version}\x1e".encode())
-        return digest.hexdigest()
+        replication = ReplicationStateRepository(self.db_session)
+        if STATE_DIGEST_SUM_CAPABILITY in honoured:
+            return await replication.digest()
+        return await replication.sorted_digest()
 
     async def _latest_entities(self) -> Dict[str, Entity]:
         """Return the current row per entity id, read from is_latest (ADR-002 §1).
@@ -253,57 +561,63 @@ class SyncHandler:
         )
         return {entity.id: entity for entity in result.scalars().all()}
 
-    async def _current_row(self, entity_id: str) -> Optional[Entity]:
-        """The current row for one id — the push path's version of the above.
+    async def _prefetch_batch(self, changes: List[SyncChange]) -> "_ApplyBatch":
+        """Load everything the push needs to decide, in two queries.
 
-        ADR-002 §3: applying a change needs the latest row for that id, not a
-        table scan. This is what made a 50-change push O(history x changes).
+        ADR-002 §3 made the push resolve each id rather than scan the table,
+        but still one id at a time: a current-row read per change, then per
+        insert a `session.get` idempotency probe, a demoting UPDATE, a
+        `max(server_seq)` and a flush. A 500-change push was thousands of
+        statements. Now the current row of every pushed id comes back from
+        one IN query, and which pushed (id, version) pairs we already hold
+        from a second.
         """
+        ids = {c.entity.id for c in changes if c.entity}
+        pairs = {(c.entity.id, c.entity.version) for c in changes if c.entity}
+        if not ids:
+            return _ApplyBatch({}, set())
+
+        result = await self.db_session.execute(
+            select(Entity).where(Entity.id.in_(ids), Entity.is_latest.is_(True))
+        )
+        current = {entity.id: entity for entity in result.scalars().all()}
         result = await self.db_session.execute(
-            select(Entity).where(Entity.id == entity_id, Entity.is_latest.is_(True))
+            select(Entity.id, Entity.version)
+            .where(tuple_(Entity.id, Entity.version).in_(pairs))
         )
-        return result.scalars().first()
+        return _ApplyBatch(current, {tuple(row) for row in result.all()})
 
-    async def _next_server_seq(self) -> int:
-        """Allocate the next replication stamp.
+    async def _allocate_server_seqs(self, count: int) -> int:
+        """Reserve ``count`` replication stamps and return the first.
 
         Gap-free and assigned in apply order, so a delta cursor is exact.
         Wall-clock cannot do this: two rows written in the same microsecond are
         indistinguishable to `updated_at > since`, and a clock adjustment can
-        move rows across a cursor a client has already passed.
+        move rows across a cursor a client has already passed. One counter
+        UPDATE for the whole push (SequenceAllocator), not an aggregate per row.
         """
-        result = await self.db_session.execute(select(func.max(Entity.server_seq)))
-        return (result.scalar() or 0) + 1
+        return await SequenceAllocator(self.db_session).allocate(count)
 
-    async def _insert_version(
-        self, change: SyncChange, *, deleted: bool = False, becomes_latest: bool = True
+    def _insert_version(
+        self, change: SyncChange, batch: "_ApplyBatch", *,
+        deleted: bool = False, becomes_latest: bool = True,
     ) -> None:
-        """Insert a new immutable version row (idempotent on (id, version)).
+        """Stage a new immutable version row (idempotent on (id, version)).
 
         Args:
             becomes_latest: whether this version is the resolution winner. False
                 stores it as history — a losing version preserved per ADR-011
                 §2, which must never be served as current.
 
-        Does NOT commit: the whole push batch is one transaction (ADR-011 §3),
-        so a crash leaves nothing applied and nothing acknowledged rather than
-        a half-applied batch.
+        Writes nothing: the row joins the batch, and _write_batch inserts the
+        whole push inside its one transaction (ADR-011 §3), so a crash leaves
+        nothing applied and nothing acknowledged rather than a half-applied
+        batch.
         """
-        existing_row = await self.db_session.get(
-            Entity, (change.entity.id, change.entity.version)
-        )
-        if existing_row is not None:
+        key = (change.entity.id, change.entity.version)
+        if key in batch.held:
             return  # already applied this exact version
 
-        if becomes_latest:
-            # Demote the incumbent in the same transaction, so there is never a
-            # moment with two current rows for one id.
-            await self.db_session.execute(
-                update(Entity)
-                .where(Entity.id == change.entity.id, Entity.is_latest.is_(True))
-                .values(is_latest=False)
-            )
-
         content = dict(change.entity.content or {})
         if deleted:
             content["deleted"] = True
@@ -319,13 +633,64 @@ class SyncHandler:
             parent_versions=change.entity.parent_versions or [],
             created_at=now,
             updated_at=now,
-            is_latest=becomes_latest,
-            server_seq=await self._next_server_seq(),
         )
-        self.db_session.add(entity)
-        await self.db_session.flush()
+        batch.held.add(key)
+        batch.inserts.append(entity)
+        if becomes_latest:
+            batch.current[entity.id] = entity
+
+    async def _write_batch(self, batch: "_ApplyBatch") -> None:
+        """Write a staged push: one demoting UPDATE and one executemany INSERT.
 
-    async def _apply_incoming(self, change: SyncChange, conflicts: List[ConflictInfo]) -> bool:
+        An id edited twice in one push gets both rows, but only the last
+        winner is current; the earlier one lands as history, exactly as if the
+        two changes had arrived in separate pushes. server_seq is allocated as
+        one contiguous range in apply order, so the delta cursor stays exact.
+        """
+        if not batch.inserts:
+            return
+
+        # Demote the incumbents in the same transaction as the inserts, so there
+        # is never a committed moment with two current rows for one id.
+        # RETURNING hands back the demoted versions for the state digest.
+        superseded = [
+            entity_id for entity_id, row in batch.stored.items()
+            if batch.current.get(entity_id) is not row
+        ]
+        demoted: List[tuple] = []
+        if superseded:
+            result = await self.db_session.execute(
+                update(Entity)
+                .where(Entity.id.in_(superseded), Entity.is_latest.is_(True))
+                .values(is_latest=False)
+                .returning(Entity.id, Entity.version)
+                .execution_options(synchronize_session=False)
+            )
+            demoted = [tuple(row) for row in result.all()]
+            # The prefetched rows are in the identity map; keep them truthful
+            # for anything else that reads them in this session, without
+            # marking them dirty (the UPDATE above already wrote the value).
+            for entity_id in superseded:
+                set_committed_value(batch.stored[entity_id], "is_latest", False)
+
+        first_seq = await self._allocate_server_seqs(len(batch.inserts))
+        rows = []
+        for offset, entity in enumerate(batch.inserts):
+            entity.is_latest = batch.current.get(entity.id) is entity
+            entity.server_seq = first_seq + offset
+            rows.append({
+                column: getattr(entity, column) for column in _VERSION_COLUMNS
+            })
+        await self.db_session.execute(insert(Entity), rows)
+
+        await ReplicationStateRepository(self.db_session).record_batch(
+            added=[(e.id, e.version) for e in batch.inserts if e.is_latest],
+            removed=demoted,
+            server_seq=first_seq + len(batch.inserts) - 1,
+        )
+
+    def _apply_incoming(self, change: SyncChange, conflicts: List[ConflictInfo],
+                        batch: "_ApplyBatch") -> bool:
         """Apply a create/update: fast-forward if based on our latest, else resolve.
 
         Returns True when the change reached a terminal outcome and the client
@@ -339,13 +704,12 @@ class SyncHandler:
         if not change.entity:
             return False  # relationships-only change; nothing to apply here
 
-        # ADR-002 §3: resolve THIS id, not the whole table. Scanning every
-        # version of every entity once per pushed change is what made a
-        # 50-change push cost O(history x changes).
-        existing = await self._current_row(change.entity.id)
+        # ADR-002 §3: resolve THIS id, not the whole table — now against the
+        # batch prefetch, which also reflects earlier changes in this push.
+        existing = batch.current.get(change.entity.id)
 
         if existing is None:
-            await self._insert_version(change)
+            self._insert_version(change, batch)
             return True
 
         if existing.version == change.entity.version:
@@ -361,17 +725,17 @@ class SyncHandler:
             # unchallenged. Record the version it supersedes if it wins, so the
             # version DAG stays connected (same repair as the tombstone path).
             change.entity.parent_versions = [existing.version]
-            return await self._resolve_conflict(change, existing, conflicts)
+            return self._resolve_conflict(change, existing, conflicts, batch)
 
         if existing.version in parents:
-            await self._insert_version(change)  # fast-forward
+            self._insert_version(change, batch)  # fast-forward
             return True
 
         # Client edited from a version we have since superseded.
-        return await self._resolve_conflict(change, existing, conflicts)
+        return self._resolve_conflict(change, existing, conflicts, batch)
 
-    async def _resolve_conflict(self, change: SyncChange, existing: Entity,
-                                conflicts: List[ConflictInfo]) -> bool:
+    def _resolve_conflict(self, change: SyncChange, existing: Entity,
+                          conflicts: List[ConflictInfo], batch: "_ApplyBatch") -> bool:
         """Resolve a concurrent edit canonically (LWW + version tiebreak, §7).
 
         Always returns True: the change was *processed*, which is what an ack
@@ -399,11 +763,11 @@ class SyncHandler:
         remote_wins = resolution.winner.get("version") == change.entity.version
 
         if remote_wins:
-            await self._insert_version(change)
+            self._insert_version(change, batch)
             resolved_version = change.entity.version
         else:
             resolved_version = existing.version
-            await self._preserve_losing_version(change, existing)
+            self._preserve_losing_version(change, batch)
 
         conflicts.append(ConflictInfo(
             entity_id=change.entity.id,
@@ -414,7 +778,7 @@ class SyncHandler:
         ))
         return True
 
-    async def _preserve_losing_version(self, change: SyncChange, existing: Entity) -> None:
+    def _preserve_losing_version(self, change: SyncChange, batch: "_ApplyBatch") -> None:
         """Store a losing version as a non-latest row so its content survives.
 
         ADR-011 §2: a write may lose *prominence* but never *existence*. The
@@ -429,9 +793,9 @@ class SyncHandler:
         risk of being served — every version is preserved now, not just the
         conveniently-sorted ones.
         """
-        await self._insert_version(change, becomes_latest=False)
+        self._insert_version(change, batch, becomes_latest=False)
 
-    async def _handle_delete(self, change: SyncChange) -> bool:
+    def _handle_delete(self, change: SyncChange, batch: "_ApplyBatch") -> bool:
         """Apply a delete as a tombstone version (content.deleted = true, §8).
 
         Returns True whenever the entity is deleted server-side afterwards —
@@ -441,10 +805,8 @@ class SyncHandler:
         """
         if not change.entity:
             return False
-        # ADR-002 §3: resolve THIS id, not the whole table. Scanning every
-        # version of every entity once per pushed change is what made a
-        # 50-change push cost O(history x changes).
-        existing = await self._current_row(change.entity.id)
+        # ADR-002 §3: resolve THIS id, not the whole table (see _apply_incoming).
+        existing = batch.current.get(change.entity.id)
         if existing is None:
             return True  # nothing to delete - the desired state already holds
         if bool((existing.content or {}).get("deleted")):
@@ -453,69 +815,158 @@ class SyncHandler:
         # tombstone supersedes the latest known version.
         if existing.version not in (change.entity.parent_versions or []):
             change.entity.parent_versions = [existing.version]
-        await self._insert_version(change, deleted=True)
+        self._insert_version(change, batch, deleted=True)
         return True
 
-    async def _persist_relationship(self, relationship: RelationshipChange,
-                                    user_id: Optional[str] = None) -> bool:
-        """Persist one inbound edge; returns True if it is now stored (§3.1).
+    async def _persist_relationships(self, relationships: List[RelationshipChange],
+                                     user_id: Optional[str] = None) -> List[str]:
+        """Persist a push's inbound edges; returns the ids now stored (§3.1).
 
         Idempotent on the relationship ``id`` (the primary key): re-pushing the
         same edge updates that row rather than inserting a duplicate. Unlike
         entities, relationships are not versioned — the row itself carries the
         endpoint versions, so an edge that follows its endpoints onto a new
         entity version is the same row with new ``*_entity_version`` values.
+
+        Batched like the entity apply: one query checks every referenced
+        endpoint, one loads the rows being re-pushed, and one flush writes the
+        lot. This used to be two endpoint lookups, a row lookup and a flush per
+        edge, which dominated a push that re-imports a house. The result is the
+        same as applying the edges one at a time in push order: the returned
+        ids keep first-acknowledged order, and an id pushed twice ends up with
+        the last of its valid changes.
         """
-        try:
-            rel_type = RelationshipType(relationship.relationship_type)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unknown relationship_type: {relationship.relationship_type}",
-            )
+        for relationship in relationships:
+            try:
+                RelationshipType(relationship.relationship_type)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown relationship_type: {relationship.relationship_type}",
+                )
+        if not relationships:
+            return []
 
         # Both endpoints must exist at exactly the referenced version — the table
         # has a composite FK on (entity_id, entity_version). A dangling endpoint
         # is skipped rather than fatal: the entity may simply not have reached us
         # yet, and the caller reports the shortfall via sync_stats.
-        for entity_id, entity_version in (
-            (relationship.from_entity_id, relationship.from_entity_version),
-            (relationship.to_entity_id, relationship.to_entity_version),
-        ):
-            if await self.db_session.get(Entity, (entity_id, entity_version)) is None:
-                return False
+        endpoints = {
+            pair
+            for r in relationships
+            for pair in ((r.from_entity_id, r.from_entity_version),
+                         (r.to_entity_id, r.to_entity_version))
+        }
+        result = await self.db_session.execute(
+            select(Entity.id, Entity.version)
+            .where(tuple_(Entity.id, Entity.version).in_(endpoints))
+        )
+        present = {tuple(row) for row in result.all()}
+
+        # Later changes to the same id overwrite earlier ones, as sequential
+        # updates of one row would.
+        accepted: Dict[str, RelationshipChange] = {}
+        for relationship in relationships:
+            if ((relationship.from_entity_id, relationship.from_entity_version) in present
+                    and (relationship.to_entity_id, relationship.to_entity_version) in present):
+                accepted[relationship.id] = relationship
+        if not accepted:
+            return []
 
-        now = datetime.now(timezone.utc)
-        properties = dict(relationship.properties or {})
-        existing = await self.db_session.get(EntityRelationship, relationship.id)
+        result = await self.db_session.execute(
+            select(EntityRelationship).where(EntityRelationship.id.in_(list(accepted)))
+        )
+        existing = {row.id: row for row in result.scalars().all()}
 
-        if existing is None:
-            self.db_session.add(EntityRelationship(
-                id=relationship.id,
+        # Every stored edge is restamped, new or re-pushed: the stamp is what
+        # puts it in the relationship feed past other clients' cursors.
+        first_seq = await SequenceAllocator(self.db_session).allocate(len(accepted))
+        now = datetime.now(timezone.utc)
+        for offset, (rel_id, relationship) in enumerate(accepted.items()):
+            fields = dict(
                 from_entity_id=relationship.from_entity_id,
                 from_entity_version=relationship.from_entity_version,
                 to_entity_id=relationship.to_entity_id,
                 to_entity_version=relationship.to_entity_version,
-                relationship_type=rel_type,
-                properties=properties,
+                relationship_type=RelationshipType(relationship.relationship_type),
+                properties=dict(relationship.properties or {}),
                 user_id=user_id,
-                created_at=now,
                 updated_at=now,
-            ))
-        else:
-            existing.from_entity_id = relationship.from_entity_id
-            existing.from_entity_version = relationship.from_entity_version
-            existing.to_entity_id = relationship.to_entity_id
-            existing.to_entity_version = relationship.to_entity_version
-            existing.relationship_type = rel_type
-            existing.properties = properties
-            existing.user_id = user_id
-            existing.updated_at = now
-
-        # Flush, not commit: this row belongs to the batch transaction opened
-        # by handle_sync_request (ADR-011 §3).
+                server_seq=first_seq + offset,
+            )
+            row = existing.get(rel_id)
+            if row is None:
+                self.db_session.add(EntityRelationship(id=rel_id, created_at=now, **fields))
+            else:
+                for name, value in fields.items():
+                    setattr(row, name, value)
+
+        # Flush, not commit: these rows belong to the batch transaction opened
+        # by handle_sync_request (ADR-011 §3). The unit of work groups the new
+        # rows into multi-row INSERTs and the updates into executemany.
         await self.db_session.flush()
-        return True
+
+        # dict.fromkeys: de-duplicated, in first-seen order.
+        return list(dict.fromkeys(r.id for r in relationships if r.id in accepted))
+
+    async def digest_tree_node(self, prefix: str) -> DigestTreeNode:
+        """One node of the state-digest bucket tree (PROTOCOL.md §3.4).
+
+        A client whose digest disagrees with ours used to have one remedy: a
+        full resync, downloading the whole graph to repair what is usually a
+        handful of rows. The tree lets it find the divergent leaves in
+        BUCKET_DEPTH round trips each and pull only those, so repair costs
+        O(diff * log N). The root's digest is the sum-form state_digest.
+
+        Interior nodes are summed from the maintained per-bucket digests; only
+        a leaf touches the entities table, and then only its own rows.
+        """
+        if not is_bucket_prefix(prefix):
+            raise HTTPException(
+                status_code=400,
+                detail=f"prefix must be at most {BUCKET_DEPTH} lowercase hex digits, got {prefix!r}",
+            )
+        replication = ReplicationStateRepository(self.db_session)
+        digest, children = await replication.tree_node(prefix)
+        node = DigestTreeNode(
+            prefix=prefix, leaf_depth=BUCKET_DEPTH, digest=digest, children=children,
+        )
+        if len(prefix) == BUCKET_DEPTH:
+            node.changes = [
+                self._entity_to_sync_change(entity)
+                for entity in await replication.bucket_entities(prefix)
+            ]
+        # digest() may have repaired a drifted digest; keep that work.
+        await self.db_session.commit()
+        return node
+
+    def _row_to_sync_change(self, row: Union[Entity, EntityRelationship]) -> SyncChange:
+        if isinstance(row, Entity):
+            return self._entity_to_sync_change(row)
+        return self._relationship_to_sync_change(row)
+
+    def _entity_to_sync_change(self, entity: Entity) -> SyncChange:
+        """A current row as a server->client change (tombstones as deletes, §8)."""
+        deleted = bool((entity.content or {}).get("deleted"))
+        return SyncChange(
+            change_type="delete" if deleted else "update",
+            entity=self._entity_to_change(entity),
+        )
+
+    def _relationship_to_sync_change(self, relationship: EntityRelationship) -> SyncChange:
+        """A relationship row as a relationship-only server->client change (§3.5)."""
+        return SyncChange(
+            change_type="update",
+            relationships=[RelationshipChange(
+                id=relationship.id,
+                from_entity_id=relationship.from_entity_id,
+                from_entity_version=relationship.from_entity_version,
+                to_entity_id=relationship.to_entity_id,
+                to_entity_version=relationship.to_entity_version,
+                relationship_type=relationship.relationship_type.value,
+                properties=relationship.properties or {},
+            )],
+        )
 
     def _entity_to_change(self, entity: Entity) -> EntityChange:
         """Convert a stored entity to its wire EntityChange."""
@@ -534,11 +985,140 @@ class SyncHandler:
 @router.post("/", response_model=SyncResponse)
 async def sync_data(
     request: SyncRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Main sync endpoint.
+
+    ``Accept: application/x-ndjson`` opts in to the streamed form
+    (PROTOCOL.md §3.6); anything else gets the paged response, in the
+    encoding and compression negotiated by Accept/Accept-Encoding (§3.7).
+    """
+    handler = SyncHandler(db)
+    if NDJSON_MEDIA_TYPE in http_request.headers.get("accept", ""):
+        return StreamingResponse(
+            await handler.stream_sync_request(request),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    return _negotiated(http_request, await handler.handle_sync_request(request))
+
+
+def _negotiated(http_request: Request, payload: SyncResponse):
+    """Encode a response as the client asked (PROTOCOL.md §3.7).
+
+    A client that negotiates nothing gets the model back, and FastAPI
+    serialises it exactly as before.
+    """
+    media_type = wire.negotiate(
+        http_request.headers.get("accept"), wire.supported_media_types()
+    ) or JSON_MEDIA_TYPE
+    coding = wire.negotiate(
+        http_request.headers.get("accept-encoding"), wire.supported_codings()
+    )
+    if media_type == JSON_MEDIA_TYPE and coding is None:
+        return payload
+
+    body = wire.encode(payload.model_dump(mode="json"), media_type)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if coding is not None and len(body) >= wire.MIN_COMPRESS_BYTES:
+        body = wire.compress(body, coding)
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@router.get("/digest", response_model=DigestTreeNode)
+async def sync_digest_tree(
+    prefix: str = Query("", description="Bucket prefix, 0-3 lowercase hex digits; empty for the root"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Main sync endpoint"""
+    """State-digest bucket tree for targeted divergence repair (PROTOCOL.md §3.4)."""
     handler = SyncHandler(db)
-    return await handler.handle_sync_request(request)
+    return await handler.digest_tree_node(prefix)
+
+
+@router.get("/changes", response_model=ChangeNotice)
+async def sync_changes(
+    after: Optional[int] = Query(None, ge=0, description="server_seq the client has seen; omit to read the current one"),
+    timeout: float = Query(CHANGE_WAIT_DEFAULT, ge=0, le=CHANGE_WAIT_MAX, description="Seconds to wait for a change"),
+    db: AsyncSession = Depends(get_db),
+    service: GraphIndexService = Depends(get_graph_index_service),
+):
+    """Long-poll until server_seq moves past ``after`` (PROTOCOL.md §3.8).
+
+    Replaces polling the full sync endpoint on a timer: an idle subscriber
+    costs one indexed read per wait, and wakes within milliseconds of a
+    committed write rather than at the next tick.
+    """
+    feed = service.changes
+    async with feed.subscription():
+        seq = await _read_and_release(db, feed)
+        if after is None or seq > after:
+            return ChangeNotice(seq=seq, changed=after is not None)
+        changed = await feed.wait_past(after, timeout)
+    return ChangeNotice(seq=max(feed.latest, after), changed=changed)
+
+
+@router.get("/changes/stream")
+async def sync_change_stream(
+    http_request: Request,
+    after: Optional[int] = Query(None, ge=0, description="server_seq the client has seen; Last-Event-ID is used if omitted"),
+    timeout: float = Query(CHANGE_STREAM_DEFAULT, gt=0, le=CHANGE_STREAM_MAX, description="Seconds before the server ends the stream"),
+    db: AsyncSession = Depends(get_db),
+    service: GraphIndexService = Depends(get_graph_index_service),
+):
+    """Server-Sent Events form of :func:`sync_changes` (PROTOCOL.md §3.8).
+
+    One ``change`` event each time server_seq moves, carrying the new value
+    as the event id, so a reconnecting EventSource resumes from
+    ``Last-Event-ID`` without missing a change. Changes that land while an
+    event is being delivered coalesce into the next one.
+    """
+    if after is None:
+        last_event_id = http_request.headers.get("last-event-id", "")
+        after = int(last_event_id) if last_event_id.isdigit() else None
+    return StreamingResponse(
+        _change_events(db, service.changes, after, timeout),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _change_events(db: AsyncSession, feed: ChangeFeed, after: Optional[int],
+                         timeout: float) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    async with feed.subscription():
+        seq = await _read_and_release(db, feed)
+        if after is None:
+            # No baseline yet: announce the current one, change nothing.
+            yield _sse_event("ready", seq)
+            cursor = seq
+        else:
+            cursor = after
+        while (remaining := deadline - loop.time()) > 0:
+            if feed.latest > cursor or await feed.wait_past(cursor, min(CHANGE_KEEPALIVE, remaining)):
+                cursor = feed.latest
+                yield _sse_event("change", cursor)
+            else:
+                yield b": keepalive\n\n"
+
+
+async def _read_and_release(db: AsyncSession, feed: ChangeFeed) -> int:
+    """Read server_seq, publish it, and hand the connection back.
+
+    Subscribers park for up to a minute. Holding a pooled connection -- and
+    with it a SQLite read snapshot that stalls WAL checkpoints -- for that
+    long would make idle subscribers the most expensive clients there are.
+    """
+    seq = await current_server_seq(db)
+    await db.rollback()
+    feed.publish(seq)
+    return seq
+
+
+def _sse_event(event: str, seq: int) -> bytes:
+    data = json.dumps({"seq": seq})
+    return f"id: {seq}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
 
 
 @router.get("/status")
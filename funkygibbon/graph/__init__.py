@@ -7,7 +7,11 @@ Graph operations module for FunkyGibbon
 never by constructing a ``GraphIndex`` of its own.
 """
 
-from .index import GraphIndex, GraphNode, is_tombstoned
+from .adjacency import CompactAdjacency
+from .analytics import AnalyticsEngine, GraphAnalytics, compute_analytics, export_graph
+from .costs import EdgeCosts, unit_cost
+from .hierarchy import CONTAINMENT_TYPES, HierarchyIndex
+from .index import GraphIndex, GraphNode, GraphTraversals, ReadSnapshot, is_tombstoned
 from .index_service import (
     GraphIndexService,
     StorageMarker,
@@ -18,17 +22,30 @@ from .index_service import (
     unbind_graph_index_service,
     write_through_applied_changes,
 )
+from .trigrams import TrigramIndex
 
 __all__ = [
+    'AnalyticsEngine',
+    'CONTAINMENT_TYPES',
+    'CompactAdjacency',
+    'EdgeCosts',
+    'GraphAnalytics',
     'GraphIndex',
     'GraphNode',
     'GraphIndexService',
+    'GraphTraversals',
+    'HierarchyIndex',
+    'ReadSnapshot',
     'StorageMarker',
+    'TrigramIndex',
     'assert_single_worker_posture',
     'bind_graph_index_service',
+    'compute_analytics',
     'current_graph_index_service',
+    'export_graph',
     'graph_index_enabled',
     'is_tombstoned',
     'unbind_graph_index_service',
+    'unit_cost',
     'write_through_applied_changes',
 ]
@@ -0,0 +1,929 @@
+"""
+Integer-interned, array-backed adjacency for GraphIndex traversal.
+
+``GraphNode`` keeps each edge as a ``(relationship, id)`` tuple in a Python
+list, twice (once per endpoint), and traversal hashes entity id strings at
+every step. At house scale that is harmless; at 100k+ edges the tuples, list
+slots and string hashing are most of both the memory and the time a traversal
+costs. This module is the traversal engine ``find_path`` and
+``get_connected_entities`` run on instead:
+
+* **Interning** -- every entity id is mapped once to a dense integer *slot*;
+  every relationship to an integer *edge* slot in an arena of parallel
+  ``array`` columns (source, target, type code, liveness). The relationship
+  object itself is kept only once, in ``edges``.
+* **CSR per relationship type and direction** -- ``compact()`` lays each
+  type's edges out as compressed sparse rows: ``offsets[slot]`` ..
+  ``offsets[slot + 1]`` index into flat ``neighbours``/``edges`` arrays. A
+  type-filtered traversal never touches another type's edges.
+* **Delta overlay** -- write-through (ADR-003 decision 2) must stay O(1), so an
+  edge added after the last compaction goes into a small per-slot overlay and a
+  removed edge is only marked dead. Once the overlay and the dead edges
+  together outgrow ``COMPACT_RATIO`` of the compacted base, the next write folds
+  them back in with one O(V+E) ``compact()``, amortised O(1) per write.
+
+Slots are internal: ``compact()`` renumbers them, so nothing outside this
+class may hold one across a mutation. Columns use the ``"i"`` typecode, which
+caps a single index at 2**31 entities or edges.
+"""
+
+import heapq
+from array import array
+from collections import deque
+from typing import (
+    Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Set, Tuple,
+)
+
+OUTGOING = 0
+INCOMING = 1
+
+# Fold the overlay back into CSR once pending changes exceed this share of the
+# compacted edges, but never for fewer than COMPACT_MIN_PENDING -- a house of a
+# few hundred edges would otherwise recompact on nearly every write.
+COMPACT_RATIO = 0.25
+COMPACT_MIN_PENDING = 1024
+
+# (total cost, entity ids, edge payloads) -- one result of cheapest_paths
+WeightedPath = Tuple[float, List[str], List[Any]]
+
+
+class _CSR:
+    """Compressed sparse rows for one relationship type in one direction."""
+
+    __slots__ = ("rows", "offsets", "neighbours", "edges")
+
+    def __init__(self, offsets: array, neighbours: array, edges: array):
+        self.rows = len(offsets) - 1
+        self.offsets = offsets
+        self.neighbours = neighbours
+        self.edges = edges
+
+
+class CompactAdjacency:
+    """Edges of a graph as integer arrays, keyed by interned entity slots.
+
+    Single event loop, no lock, like the ``GraphIndex`` that owns it: every
+    method is a synchronous critical section.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every node and edge."""
+        self.ids: List[str] = []
+        self.slots: Dict[str, int] = {}
+        self._node_alive = bytearray()
+
+        self.edges: List[Any] = []
+        self._edge_source = array("i")
+        self._edge_target = array("i")
+        self._edge_type = array("i")
+        self._edge_alive = bytearray()
+
+        self._type_codes: Dict[Hashable, int] = {}
+        self._types: List[Hashable] = []
+
+        # [direction][type code] -> CSR over the slots that existed at compaction
+        self._base: Tuple[Dict[int, _CSR], Dict[int, _CSR]] = ({}, {})
+        # [direction][type code] -> {slot: [edge, ...]} for edges since then
+        self._overlay: Tuple[Dict[int, Dict[int, List[int]]], ...] = ({}, {})
+        self._base_edges = 0
+        self._dead_in_base = 0
+        self._pending = 0
+        self._bulk = False
+        # True while a snapshot() shares _node_alive and _edge_alive
+        self._flags_shared = False
+
+    def snapshot(self) -> "CompactAdjacency":
+        """A read-only view that later writes to this one never reach. O(overlay).
+
+        Between compactions a write only appends to the interning tables,
+        payloads and edge columns, and ``compact()`` and ``clear()`` replace
+        every table rather than modify it, so the view shares all of them,
+        CSR base included, and only sees the slots and edges that existed when
+        it was taken (``_slot``). The liveness flags are flipped in place, so
+        they are shared copy-on-write: the next write here copies them first
+        (``_own_flags``). Only the overlay, which compaction keeps small, is
+        copied. Each append is atomic under the GIL, so a worker thread may
+        read the view while the event loop keeps writing here. The view is for
+        reading: mutate it and the shared tables go with it.
+        """
+        view = CompactAdjacency.__new__(CompactAdjacency)
+        view.__dict__.update(self.__dict__)
+        view._overlay = tuple(
+            {code: {slot: list(edges) for slot, edges in rows.items()}
+             for code, rows in overlay.items()}
+            for overlay in self._overlay
+        )
+        self._flags_shared = True
+        return view
+
+    def _own_flags(self) -> None:
+        """Copy the liveness flags a snapshot shares before they change. O(V + E)
+        at C speed, once per snapshot."""
+        self._node_alive = bytearray(self._node_alive)
+        self._edge_alive = bytearray(self._edge_alive)
+        self._flags_shared = False
+
+    # ------------------------------------------------------------------
+    # Nodes
+    # ------------------------------------------------------------------
+
+    def _slot(self, entity_id: str) -> Optional[int]:
+        """The slot of ``entity_id``, or None if it was interned after this
+        table was -- which only a snapshot can see, through the shared
+        ``slots``."""
+        slot = self.slots.get(entity_id)
+        if slot is None or slot >= len(self._node_alive):
+            return None
+        return slot
+
+    def _intern(self, entity_id: str) -> int:
+        slot = self.slots.get(entity_id)
+        if slot is None:
+            slot = len(self.ids)
+            self.slots[entity_id] = slot
+            self.ids.append(entity_id)
+            self._node_alive.append(0)
+        return slot
+
+    def add_node(self, entity_id: str) -> None:
+        """Mark an entity as present; traversal only ever visits present nodes."""
+        if self._flags_shared:
+            self._own_flags()
+        self._node_alive[self._intern(entity_id)] = 1
+
+    def remove_node(self, entity_id: str) -> None:
+        """Mark an entity as absent. Its slot is reclaimed by the next compaction."""
+        slot = self.slots.get(entity_id)
+        if slot is not None and self._node_alive[slot]:
+            if self._flags_shared:
+                self._own_flags()
+            self._node_alive[slot] = 0
+            self._note_pending()
+
+    def has_node(self, entity_id: str) -> bool:
+        slot = self._slot(entity_id)
+        return slot is not None and bool(self._node_alive[slot])
+
+    @property
+    def node_count(self) -> int:
+        return sum(self._node_alive)
+
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+
+    @property
+    def edge_count(self) -> int:
+        return sum(self._edge_alive)
+
+    def begin_bulk(self) -> None:
+        """Skip overlay maintenance until the next ``compact()``.
+
+        For a full load: every edge goes straight to the arena and one
+        compaction at the end lays them all out, instead of growing an overlay
+        as large as the graph first.
+        """
+        self._bulk = True
+
+    def add_edge(self, payload: Any, source_id: str, target_id: str, rel_type: Hashable) -> None:
+        """Append an edge. ``payload`` is what traversal hands back for it."""
+        if self._flags_shared:
+            self._own_flags()
+        source = self._intern(source_id)
+        target = self._intern(target_id)
+        code = self._type_codes.get(rel_type)
+        if code is None:
+            code = self._type_codes[rel_type] = len(self._types)
+            self._types.append(rel_type)
+
+        edge = len(self.edges)
+        self.edges.append(payload)
+        self._edge_source.append(source)
+        self._edge_target.append(target)
+        self._edge_type.append(code)
+        self._edge_alive.append(1)
+        if self._bulk:
+            return
+
+        self._overlay[OUTGOING].setdefault(code, {}).setdefault(source, []).append(edge)
+        self._overlay[INCOMING].setdefault(code, {}).setdefault(target, []).append(edge)
+        self._note_pending()
+
+    def remove_edge(
+        self,
+        payload: Any,
+        source_id: str,
+        rel_type: Hashable,
+        target_id: Optional[str] = None,
+    ) -> bool:
+        """Mark the edge carrying ``payload`` dead. Returns True if it was present.
+
+        The payload itself stays in ``edges`` until the next compaction, which
+        keeps ``edges`` append-only for the snapshots that share it.
+
+        Scans the shorter of the source's outgoing row and, given
+        ``target_id``, the target's incoming row within ``rel_type``: O(1)
+        for an edge on a hub whichever end the hub is, without a per-edge
+        lookup table.
+        """
+        if self._bulk:
+            # A bulk-loaded edge is in neither the base nor the overlay yet.
+            self.compact()
+        code = self._type_codes.get(rel_type)
+        slot, direction = self.slots.get(source_id), OUTGOING
+        if code is None or slot is None:
+            return False
+        target = self.slots.get(target_id) if target_id is not None else None
+        if target is not None and self._degree(target, INCOMING, code) < self._degree(slot, OUTGOING, code):
+            slot, direction = target, INCOMING
+        for edge in self._adjacent(slot, direction, (code,), edges=True)[1]:
+            if self.edges[edge] is payload:
+                if self._flags_shared:
+                    self._own_flags()
+                self._edge_alive[edge] = 0
+                if edge < self._base_edges:
+                    self._dead_in_base += 1
+                self._note_pending()
+                return True
+        return False
+
+    def _degree(self, slot: int, direction: int, code: int) -> int:
+        """Edges, live or dead, stored in one row of one type. O(1)."""
+        count = 0
+        table = self._base[direction].get(code)
+        if table is not None and slot < table.rows:
+            count = table.offsets[slot + 1] - table.offsets[slot]
+        extra = self._overlay[direction].get(code)
+        if extra:
+            count += len(extra.get(slot, ()))
+        return count
+
+    def _note_pending(self) -> None:
+        self._pending += 1
+        if self._pending > max(COMPACT_MIN_PENDING, self._base_edges * COMPACT_RATIO):
+            self.compact()
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self) -> None:
+        """Rebuild the CSR base from every live node and edge. O(V + E).
+
+        Dead edges are dropped and slots renumbered densely; a slot survives
+        if its node is present or a live edge still points at it.
+        """
+        live_edges = [e for e, alive in enumerate(self._edge_alive) if alive]
+
+        keep = bytearray(self._node_alive)
+        for e in live_edges:
+            keep[self._edge_source[e]] = 1
+            keep[self._edge_target[e]] = 1
+        renumber = array("i", [-1]) * len(self.ids)
+        ids: List[str] = []
+        for slot, kept in enumerate(keep):
+            if kept:
+                renumber[slot] = len(ids)
+                ids.append(self.ids[slot])
+
+        self.ids = ids
+        self.slots = {entity_id: slot for slot, entity_id in enumerate(ids)}
+        self._node_alive = bytearray(
+            self._node_alive[old] for old, new in enumerate(renumber) if new >= 0
+        )
+
+        edges: List[Any] = []
+        sources, targets, codes = array("i"), array("i"), array("i")
+        for e in live_edges:
+            edges.append(self.edges[e])
+            sources.append(renumber[self._edge_source[e]])
+            targets.append(renumber[self._edge_target[e]])
+            codes.append(self._edge_type[e])
+        self.edges = edges
+        self._edge_source, self._edge_target, self._edge_type = sources, targets, codes
+        self._edge_alive = bytearray(b"\x01") * len(edges)
+
+        rows = len(ids)
+        self._base = (
+            self._build_csr(rows, sources, targets),
+            self._build_csr(rows, targets, sources),
+        )
+        self._overlay = ({}, {})
+        self._base_edges = len(edges)
+        self._dead_in_base = 0
+        self._pending = 0
+        self._bulk = False
+        self._flags_shared = False
+
+    def _build_csr(self, rows: int, near: array, far: array) -> Dict[int, _CSR]:
+        """Counting sort of edges by (type, near slot), stable in edge order."""
+        counts: Dict[int, array] = {}
+        for e, code in enumerate(self._edge_type):
+            row_counts = counts.get(code)
+            if row_counts is None:
+                row_counts = counts[code] = array("i", [0]) * (rows + 1)
+            row_counts[near[e] + 1] += 1
+
+        csr: Dict[int, _CSR] = {}
+        cursor: Dict[int, array] = {}
+        for code, offsets in counts.items():
+            for slot in range(rows):
+                offsets[slot + 1] += offsets[slot]
+            size = offsets[rows]
+            csr[code] = _CSR(offsets, array("i", [0]) * size, array("i", [0]) * size)
+            cursor[code] = array("i", offsets)
+
+        for e, code in enumerate(self._edge_type):
+            position = cursor[code][near[e]]
+            cursor[code][near[e]] = position + 1
+            table = csr[code]
+            table.neighbours[position] = far[e]
+            table.edges[position] = e
+        return csr
+
+    # ------------------------------------------------------------------
+    # Traversal
+    # ------------------------------------------------------------------
+
+    def _codes(self, rel_types: Optional[Sequence[Hashable]]) -> List[int]:
+        if rel_types is None:
+            return list(range(len(self._types)))
+        return [self._type_codes[t] for t in rel_types if t in self._type_codes]
+
+    def _adjacent(
+        self, slot: int, direction: int, codes: Sequence[int], edges: bool = False
+    ) -> Tuple[List[int], List[int]]:
+        """Live neighbour slots of ``slot`` across type codes, and with
+        ``edges=True`` the parallel edge slots.
+
+        With no dead base edges -- the state right after a compaction -- each
+        type's row is a single C-level slice of the CSR arrays.
+        """
+        found: List[int] = []
+        found_edges: List[int] = []
+        alive = self._edge_alive
+        base = self._base[direction]
+        overlay = self._overlay[direction]
+        for code in codes:
+            table = base.get(code)
+            if table is not None and slot < table.rows:
+                lo, hi = table.offsets[slot], table.offsets[slot + 1]
+                if lo == hi:
+                    pass
+                elif not self._dead_in_base:
+                    found += table.neighbours[lo:hi]
+                    if edges:
+                        found_edges += table.edges[lo:hi]
+                else:
+                    for neighbour, edge in zip(table.neighbours[lo:hi], table.edges[lo:hi]):
+                        if alive[edge]:
+                            found.append(neighbour)
+                            found_edges.append(edge)
+            extra = overlay.get(code) if overlay else None
+            if extra and slot in extra:
+                far = self._edge_target if direction == OUTGOING else self._edge_source
+                for edge in extra[slot]:
+                    if alive[edge]:
+                        found.append(far[edge])
+                        found_edges.append(edge)
+        return found, found_edges
+
+    def _reader(self, direction: int, codes: Sequence[int]):
+        """A ``slot -> live neighbour slots`` function, specialised once per
+        query so the per-node step is a bare slice whenever it can be."""
+        base = self._base[direction]
+        if self._dead_in_base or any(code in self._overlay[direction] for code in codes):
+            return lambda slot: self._adjacent(slot, direction, codes)[0]
+        tables = [base[code] for code in codes if code in base]
+        if len(tables) == 1:
+            offsets, neighbours, rows = tables[0].offsets, tables[0].neighbours, tables[0].rows
+            return lambda slot: neighbours[offsets[slot]:offsets[slot + 1]] if slot < rows else ()
+
+        def read(slot: int) -> List[int]:
+            found: List[int] = []
+            for table in tables:
+                if slot < table.rows:
+                    found += table.neighbours[table.offsets[slot]:table.offsets[slot + 1]]
+            return found
+        return read
+
+    def find_path(
+        self,
+        from_id: str,
+        to_id: str,
+        max_depth: int,
+        rel_types: Optional[Sequence[Hashable]] = None,
+        undirected: bool = False,
+    ) -> List[str]:
+        """Shortest path of at most ``max_depth`` hops; [] if none.
+
+        Bidirectional BFS: one frontier grows forward from the source along
+        outgoing edges, the other backward from the target along incoming edges
+        (both along either direction when ``undirected``), and each step
+        expands whichever frontier is smaller. On a graph of branching factor b
+        that is about 2*b**(d/2) nodes visited instead of b**d. Each side keeps
+        parent pointers and distances, and the path is assembled once, when the
+        searches meet.
+
+        A meeting is only accepted once the whole level that found it has been
+        expanded, keeping the shortest; the first meeting seen in a level is
+        not necessarily the shortest.
+        """
+        start, goal = self._slot(from_id), self._slot(to_id)
+        if start is None or goal is None:
+            return []
+        alive = self._node_alive
+        if not alive[start] or not alive[goal]:
+            return []
+        if start == goal:
+            return [from_id]
+
+        codes = self._codes(rel_types)
+        both = (OUTGOING, INCOMING)
+        forward = [self._reader(d, codes) for d in (both if undirected else (OUTGOING,))]
+        backward = [self._reader(d, codes) for d in (both if undirected else (INCOMING,))]
+
+        parents = ({start: -1}, {goal: -1})
+        distance = ({start: 0}, {goal: 0})
+        frontiers = ([start], [goal])
+        depths = [0, 0]
+        while depths[0] + depths[1] < max_depth and frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            readers = forward if side == 0 else backward
+            parent, other = parents[side], distance[1 - side]
+            seen = distance[side]
+            depth = depths[side] + 1
+            best, meet = None, None
+            next_frontier = []
+            for current in frontiers[side]:
+                for read in readers:
+                    for neighbour in read(current):
+                        if neighbour in seen or not alive[neighbour]:
+                            continue
+                        parent[neighbour] = current
+                        seen[neighbour] = depth
+                        next_frontier.append(neighbour)
+                        if neighbour in other:
+                            total = depth + other[neighbour]
+                            if best is None or total < best:
+                                best, meet = total, neighbour
+            if meet is not None:
+                return self._join(parents, meet)
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+            depths[side] = depth
+        return []
+
+    def _join(self, parents: Tuple[Dict[int, int], Dict[int, int]], meet: int) -> List[str]:
+        """Source-to-meet from the forward parents, then meet-to-target."""
+        path = []
+        slot = meet
+        while slot != -1:
+            path.append(self.ids[slot])
+            slot = parents[0][slot]
+        path.reverse()
+        slot = parents[1][meet]
+        while slot != -1:
+            path.append(self.ids[slot])
+            slot = parents[1][slot]
+        return path
+
+    def search(
+        self,
+        from_ids: Sequence[str],
+        max_depth: int,
+        rel_types: Optional[Sequence[Hashable]] = None,
+        undirected: bool = False,
+        goals: Optional[Sequence[str]] = None,
+    ) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+        """One BFS from every source at once; ``(distance, parent)`` by entity id.
+
+        The batch queries are built on this: one call answers a single source
+        against any number of targets, or a set of sources against a set of
+        targets. With ``goals`` the search stops as soon as every goal has been
+        reached rather than exhausting ``max_depth``.
+        """
+        alive = self._node_alive
+        starts = [slot for slot in map(self._slot, from_ids) if slot is not None and alive[slot]]
+        codes = self._codes(rel_types)
+        readers = [self._reader(d, codes)
+                   for d in ((OUTGOING, INCOMING) if undirected else (OUTGOING,))]
+        pending = None
+        if goals is not None:
+            pending = {slot for slot in map(self._slot, goals) if slot is not None} - set(starts)
+
+        distance = {slot: 0 for slot in starts}
+        parent = {slot: -1 for slot in starts}
+        frontier = list(distance)
+        depth = 0
+        while frontier and depth < max_depth and (pending is None or pending):
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for read in readers:
+                    for neighbour in read(current):
+                        if neighbour in distance or not alive[neighbour]:
+                            continue
+                        distance[neighbour] = depth
+                        parent[neighbour] = current
+                        next_frontier.append(neighbour)
+                        if pending is not None:
+                            pending.discard(neighbour)
+            frontier = next_frontier
+
+        ids = self.ids
+        return (
+            {ids[slot]: d for slot, d in distance.items()},
+            {ids[slot]: (ids[p] if p != -1 else None) for slot, p in parent.items()},
+        )
+
+    def cheapest_paths(
+        self,
+        from_id: str,
+        to_id: str,
+        cost: Callable[[Any], float],
+        k: int = 1,
+        max_depth: int = 10,
+        rel_types: Optional[Sequence[Hashable]] = None,
+        undirected: bool = False,
+        heuristic: Optional[Callable[[str], float]] = None,
+    ) -> List[WeightedPath]:
+        """Up to ``k`` cheapest loopless paths, cheapest first (Yen's algorithm).
+
+        ``cost`` maps an edge payload to a non-negative cost. Each path is
+        found by Dijkstra over a binary heap. With a consistent ``heuristic``
+        (a lower bound on the remaining cost from an entity id that never drops
+        by more than an edge's cost across that edge) it is A*.
+        The first path is one plain search. Every later one is the cheapest
+        *spur*: a detour from some node of an accepted path that avoids the
+        edges earlier paths took from the same root prefix.
+
+        ``max_depth`` bounds the hops of every path. Hop-bounded Dijkstra
+        settles ``(node, hops)`` labels rather than nodes: a label is dropped
+        only if the same node was already settled at no more hops, which it
+        was at no more cost, because labels pop in cost order.
+        """
+        start, goal = self._slot(from_id), self._slot(to_id)
+        if start is None or goal is None or k < 1:
+            return []
+        if not self._node_alive[start] or not self._node_alive[goal]:
+            return []
+
+        codes = self._codes(rel_types)
+        directions = (OUTGOING, INCOMING) if undirected else (OUTGOING,)
+        costs: Dict[int, float] = {}
+
+        def edge_cost(edge: int) -> float:
+            known = costs.get(edge)
+            if known is None:
+                known = costs[edge] = cost(self.edges[edge])
+                if known < 0:
+                    raise ValueError(f"negative edge cost {known} for {self.edges[edge]!r}")
+            return known
+
+        estimate = None
+        if heuristic is not None:
+            estimate = lambda slot: heuristic(self.ids[slot])  # noqa: E731
+
+        first = self._dijkstra(start, goal, edge_cost, max_depth, codes, directions,
+                               set(), set(), estimate)
+        if first is None:
+            return []
+        accepted = [first]
+        queued: Set[Tuple[int, ...]] = {first[2]}
+        candidates: List[Tuple[float, int, Tuple[int, ...], Tuple[int, ...]]] = []
+        tie = 0
+        while len(accepted) < k:
+            _, last_nodes, last_edges = accepted[-1]
+            for i in range(len(last_edges)):
+                root_nodes, root_edges = last_nodes[:i + 1], last_edges[:i]
+                banned_edges = {
+                    edges[i] for _, nodes, edges in accepted
+                    if len(edges) > i and nodes[:i + 1] == root_nodes and edges[:i] == root_edges
+                }
+                spur = self._dijkstra(
+                    root_nodes[-1], goal, edge_cost, max_depth - i, codes, directions,
+                    set(root_nodes[:-1]), banned_edges, estimate,
+                )
+                if spur is None:
+                    continue
+                _, spur_nodes, spur_edges = spur
+                edges = root_edges + spur_edges
+                if edges in queued:
+                    continue
+                queued.add(edges)
+                total = sum(edge_cost(e) for e in edges)
+                tie += 1
+                heapq.heappush(candidates, (total, tie, root_nodes[:-1] + spur_nodes, edges))
+            if not candidates:
+                break
+            total, _, nodes, edges = heapq.heappop(candidates)
+            accepted.append((total, nodes, edges))
+
+        ids, payloads = self.ids, self.edges
+        return [
+            (total, [ids[n] for n in nodes], [payloads[e] for e in edges])
+            for total, nodes, edges in accepted
+        ]
+
+    def _dijkstra(
+        self,
+        start: int,
+        goal: int,
+        edge_cost: Callable[[int], float],
+        max_hops: int,
+        codes: Sequence[int],
+        directions: Sequence[int],
+        banned_nodes: Set[int],
+        banned_edges: Set[int],
+        estimate: Optional[Callable[[int], float]],
+    ) -> Optional[Tuple[float, Tuple[int, ...], Tuple[int, ...]]]:
+        """Cheapest ``start``..``goal`` path of at most ``max_hops`` edges."""
+        if start == goal:
+            return (0.0, (start,), ())
+        alive = self._node_alive
+        # label -> (parent label, edge); a label is (slot, hops)
+        parents: Dict[Tuple[int, int], Tuple[Optional[Tuple[int, int]], int]] = {(start, 0): (None, -1)}
+        settled_hops: Dict[int, int] = {}
+        best: Dict[Tuple[int, int], float] = {(start, 0): 0.0}
+        tie = 0
+        heap = [(estimate(start) if estimate else 0.0, 0.0, tie, start, 0)]
+        while heap:
+            _, spent, _, slot, hops = heapq.heappop(heap)
+            if settled_hops.get(slot, max_hops + 1) <= hops:
+                continue
+            settled_hops[slot] = hops
+            if slot == goal:
+                return self._labels_to_path(parents, (slot, hops), spent)
+            if hops == max_hops:
+                continue
+            for direction in directions:
+                found, edges = self._adjacent(slot, direction, codes, edges=True)
+                for neighbour, edge in zip(found, edges):
+                    if (edge in banned_edges or neighbour in banned_nodes
+                            or not alive[neighbour]
+                            or settled_hops.get(neighbour, max_hops + 1) <= hops + 1):
+                        continue
+                    label = (neighbour, hops + 1)
+                    total = spent + edge_cost(edge)
+                    if total < best.get(label, float("inf")):
+                        best[label] = total
+                        parents[label] = ((slot, hops), edge)
+                        tie += 1
+                        priority = total + (estimate(neighbour) if estimate else 0.0)
+                        heapq.heappush(heap, (priority, total, tie, neighbour, hops + 1))
+        return None
+
+    @staticmethod
+    def _labels_to_path(parents, label, spent) -> Tuple[float, Tuple[int, ...], Tuple[int, ...]]:
+        nodes, edges = [], []
+        while label is not None:
+            parent, edge = parents[label]
+            nodes.append(label[0])
+            if edge != -1:
+                edges.append(edge)
+            label = parent
+        nodes.reverse()
+        edges.reverse()
+        return spent, tuple(nodes), tuple(edges)
+
+    def walk(
+        self,
+        entity_id: str,
+        directions: Sequence[int],
+        max_depth: int,
+        rel_types: Optional[Sequence[Hashable]] = None,
+    ) -> Iterator[Tuple[str, Any, int, int]]:
+        """Breadth-first ``(neighbour id, edge payload, direction, distance)``.
+
+        Every live edge leaving a visited node is reported, including edges back
+        to nodes already seen; a node is expanded at most once.
+        """
+        start = self._slot(entity_id)
+        if start is None or not self._node_alive[start]:
+            return
+        alive = self._node_alive
+        codes = self._codes(rel_types)
+        visited = {start}
+        queue = deque([(start, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            for direction in directions:
+                found, edges = self._adjacent(current, direction, codes, edges=True)
+                for neighbour, edge in zip(found, edges):
+                    if not alive[neighbour]:
+                        continue
+                    yield self.ids[neighbour], self.edges[edge], direction, depth + 1
+                    if neighbour not in visited and depth + 1 < max_depth:
+                        visited.add(neighbour)
+                        queue.append((neighbour, depth + 1))
+
+    def neighbourhood(
+        self,
+        entity_id: str,
+        directions: Sequence[int],
+        max_depth: int,
+        rel_types: Optional[Sequence[Hashable]] = None,
+        admit: Optional[Callable[[str], bool]] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Tuple[Dict[str, int], List[Any], bool]:
+        """The ``max_depth``-hop ego network of ``entity_id``.
+
+        Breadth-first over ``directions``, expanding only nodes ``admit``
+        accepts (the centre always is); a rejected node is neither included
+        nor walked through. Then every live edge of ``rel_types`` between two
+        included nodes is collected from its source's outgoing row, so the
+        whole cost is the degrees of the included nodes, never the graph.
+
+        Returns:
+            ``({id: hops from the centre}, [edge payload], truncated)`` with ids
+            in BFS order; ``truncated`` is True when ``max_nodes`` stopped the
+            search with admissible nodes left unvisited.
+        """
+        start = self._slot(entity_id)
+        if start is None or not self._node_alive[start]:
+            return {}, [], False
+        alive = self._node_alive
+        codes = self._codes(rel_types)
+        readers = [self._reader(direction, codes) for direction in directions]
+        depth = {start: 0}
+        rejected: Set[int] = set()
+        truncated = False
+        queue = deque([start])
+        while queue and not truncated:
+            current = queue.popleft()
+            if depth[current] >= max_depth:
+                continue
+            for read in readers:
+                for neighbour in read(current):
+                    if neighbour in depth or neighbour in rejected or not alive[neighbour]:
+                        continue
+                    if admit is not None and not admit(self.ids[neighbour]):
+                        rejected.add(neighbour)
+                        continue
+                    if max_nodes is not None and len(depth) >= max_nodes:
+                        truncated = True
+                        break
+                    depth[neighbour] = depth[current] + 1
+                    queue.append(neighbour)
+                if truncated:
+                    break
+
+        payloads = []
+        for slot in depth:
+            found, edges = self._adjacent(slot, OUTGOING, codes, edges=True)
+            payloads += [self.edges[edge] for target, edge in zip(found, edges) if target in depth]
+        return {self.ids[slot]: hops for slot, hops in depth.items()}, payloads, truncated
+
+    def _successors(self, codes: Sequence[int]) -> Callable[[int], List[int]]:
+        """``slot -> distinct live successor slots`` over these type codes."""
+        read = self._reader(OUTGOING, codes)
+        alive = self._node_alive
+        return lambda slot: list(dict.fromkeys(n for n in read(slot) if alive[n]))
+
+    def strongly_connected_components(
+        self, rel_types: Optional[Sequence[Hashable]] = None
+    ) -> List[List[str]]:
+        """Every strongly connected component that contains a cycle.
+
+        Iterative Tarjan over the outgoing edges of ``rel_types``, O(V+E).
+        A component qualifies if it has two or more entities, or one with an
+        edge to itself.
+        """
+        return [
+            [self.ids[slot] for slot in component]
+            for component in self._cyclic_components(self._successors(self._codes(rel_types)))
+        ]
+
+    def _cyclic_components(self, successors: Callable[[int], List[int]]) -> List[List[int]]:
+        order: Dict[int, int] = {}
+        low: Dict[int, int] = {}
+        on_stack: Set[int] = set()
+        stack: List[int] = []
+        found: List[List[int]] = []
+        for root in range(len(self._node_alive)):
+            if root in order or not self._node_alive[root]:
+                continue
+            order[root] = low[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(successors(root)))]
+            while work:
+                slot, pending = work[-1]
+                for successor in pending:
+                    if successor not in order:
+                        order[successor] = low[successor] = len(order)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(successors(successor))))
+                        break
+                    if successor in on_stack:
+                        low[slot] = min(low[slot], order[successor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[slot])
+                    if low[slot] == order[slot]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == slot:
+                                break
+                        if len(component) > 1 or slot in successors(slot):
+                            found.append(component)
+        return found
+
+    def simple_cycles(
+        self,
+        rel_types: Optional[Sequence[Hashable]] = None,
+        max_length: Optional[int] = None,
+        max_cycles: int = 100,
+        max_steps: int = 100_000,
+    ) -> Tuple[List[List[str]], bool]:
+        """Elementary cycles over the outgoing edges of ``rel_types``.
+
+        Johnson's algorithm, run per strongly connected component: each cycle
+        is reported once, from its lowest-slot entity, as a closed list of
+        ids (first id repeated last). A path that reaches ``max_length`` hops
+        is cut off and treated as closed, which only unblocks more than
+        Johnson would -- slower, never a missed or duplicated cycle.
+
+        The search stops after ``max_cycles`` cycles or ``max_steps``
+        entities pushed onto the search path, whichever comes first.
+
+        Returns:
+            ``(cycles, complete)``; ``complete`` is False when a budget ran out
+        """
+        successors = self._successors(self._codes(rel_types))
+        cycles: List[List[str]] = []
+        steps = 0
+        for component in self._cyclic_components(successors):
+            members = set(component)
+            for start in sorted(component):
+                # Only entities above ``start`` may be used, so a cycle is found
+                # from its lowest member and nowhere else.
+                def nexts(slot: int, start: int = start) -> List[int]:
+                    return [n for n in successors(slot) if n in members and n >= start]
+
+                blocked = {start}
+                blocked_by: Dict[int, Set[int]] = {}
+                closed: Set[int] = set()
+                path = [start]
+                work = [(start, nexts(start))]
+                while work:
+                    slot, pending = work[-1]
+                    if pending:
+                        successor = pending.pop()
+                        if successor == start:
+                            cycles.append([self.ids[s] for s in path] + [self.ids[start]])
+                            closed.update(path)
+                            if len(cycles) >= max_cycles:
+                                return cycles, False
+                        elif successor not in blocked:
+                            if max_length is not None and len(path) >= max_length:
+                                closed.update(path)
+                                continue
+                            steps += 1
+                            if steps > max_steps:
+                                return cycles, False
+                            path.append(successor)
+                            work.append((successor, nexts(successor)))
+                            closed.discard(successor)
+                            blocked.add(successor)
+                            continue
+                    if not pending:
+                        if slot in closed:
+                            self._unblock(slot, blocked, blocked_by)
+                        else:
+                            for successor in nexts(slot):
+                                blocked_by.setdefault(successor, set()).add(slot)
+                        work.pop()
+                        path.pop()
+        return cycles, True
+
+    @staticmethod
+    def _unblock(slot: int, blocked: Set[int], blocked_by: Dict[int, Set[int]]) -> None:
+        pending = {slot}
+        while pending:
+            current = pending.pop()
+            if current in blocked:
+                blocked.discard(current)
+                pending.update(blocked_by.pop(current, ()))
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the integer columns (excludes ids and edge payloads)."""
+        total = sum(a.itemsize * len(a) for a in (
+            self._edge_source, self._edge_target, self._edge_type))
+        total += len(self._edge_alive) + len(self._node_alive)
+        for direction in self._base:
+            for table in direction.values():
+                total += sum(a.itemsize * len(a)
+                             for a in (table.offsets, table.neighbours, table.edges))
+        return total
@@ -0,0 +1,430 @@
+"""
+Whole-graph analytics, computed off the event loop.
+
+``GraphIndex.calculate_centrality`` reports one entity's raw degree. The
+questions a house graph is really asked -- which entities everything hangs
+off, which ones sit between otherwise separate parts, how many disconnected
+islands there are -- need the whole graph at once:
+
+* **PageRank** over the edges as stored. Containment edges point child ->
+  parent, so homes and busy rooms rank high.
+* **HITS** hub and authority scores: controllers and bridges are hubs, the
+  things they point at are authorities.
+* **Betweenness** (Brandes) over the undirected graph, normalised to [0, 1].
+  Brandes is O(V*E), so past ``BETWEENNESS_PIVOTS`` entities it is estimated
+  from that many sampled sources, with a fixed seed so repeated runs agree.
+* **Weakly connected components**, largest first.
+
+:func:`export_graph` copies the index into two integer edge arrays on the
+event loop -- the only step that reads the live index, O(V+E) and
+synchronous, so it sees one consistent state (ADR-003 decision 4).
+:func:`compute_analytics` then runs on that copy in a worker thread. NumPy is
+optional: when it is importable PageRank and HITS run as vectorised
+``bincount`` iterations, otherwise as plain loops with the same results.
+
+:class:`AnalyticsEngine` keeps one :class:`GraphAnalytics` per
+``GraphIndexService.generation``. Every generation bump notifies it, and a
+background task recomputes after ``ANALYTICS_DEBOUNCE_SECONDS`` of quiet, so
+a sync burst costs one run rather than one per write. Every bump restarts
+that wait, up to ``ANALYTICS_MAX_DELAY_SECONDS`` after the first, so a steady
+trickle of writes cannot put the run off for good.
+"""
+
+import asyncio
+import heapq
+import logging
+import random
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional accelerator
+    np = None
+
+from .index import GraphIndex
+
+logger = logging.getLogger(__name__)
+
+PAGERANK_DAMPING = 0.85
+# Power iteration stops once the L1 change per entity falls below this.
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+# Exact betweenness up to this many entities; sampled sources beyond it.
+BETWEENNESS_PIVOTS = 256
+# Quiet time after a generation bump before recomputing.
+ANALYTICS_DEBOUNCE_SECONDS = 1.0
+# Longest a recompute waits for quiet once something is pending.
+ANALYTICS_MAX_DELAY_SECONDS = 10.0
+
+METRICS = ("pagerank", "betweenness", "hubs", "authorities")
+
+
+@dataclass(frozen=True)
+class GraphExport:
+    """The index reduced to entity ids and an ``(sources, targets)`` edge
+    list of their positions in ``ids``."""
+
+    ids: List[str]
+    sources: Sequence[int]
+    targets: Sequence[int]
+
+
+def export_graph(index: GraphIndex) -> GraphExport:
+    """Copy the index's nodes and edges; edges to absent entities are skipped."""
+    ids = list(index.nodes)
+    slots = {entity_id: slot for slot, entity_id in enumerate(ids)}
+    sources, targets = array("i"), array("i")
+    for rel in index.all_relationships():
+        source, target = slots.get(rel.from_entity_id), slots.get(rel.to_entity_id)
+        if source is not None and target is not None:
+            sources.append(source)
+            targets.append(target)
+    return GraphExport(ids=ids, sources=sources, targets=targets)
+
+
+@dataclass(frozen=True)
+class GraphAnalytics:
+    """Every metric for one generation of the index, indexed like ``ids``.
+
+    ``components[i]`` is the component of ``ids[i]``, numbered largest first
+    with sizes in ``component_sizes``.
+    """
+
+    generation: int
+    ids: List[str]
+    pagerank: List[float]
+    betweenness: List[float]
+    hubs: List[float]
+    authorities: List[float]
+    components: List[int]
+    component_sizes: List[int]
+    betweenness_sampled: bool
+    backend: str
+    elapsed_ms: float
+
+    def top(self, metric: str, limit: int) -> List[Tuple[str, float]]:
+        """The ``limit`` highest-scoring ``(entity_id, score)`` pairs."""
+        scores = getattr(self, metric)
+        ranked = heapq.nsmallest(
+            limit, range(len(self.ids)), key=lambda slot: (-scores[slot], self.ids[slot])
+        )
+        return [(self.ids[slot], scores[slot]) for slot in ranked]
+
+    def scores(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """One entity's metrics, or None if it was not in this generation."""
+        try:
+            slot = self.ids.index(entity_id)
+        except ValueError:
+            return None
+        found: Dict[str, Any] = {metric: getattr(self, metric)[slot] for metric in METRICS}
+        found["component"] = self.components[slot]
+        found["component_size"] = self.component_sizes[self.components[slot]]
+        return found
+
+    def summary(self) -> Dict[str, Any]:
+        """The headline numbers ``/graph/statistics`` reports."""
+        return {
+            "generation": self.generation,
+            "components": len(self.component_sizes),
+            "largest_component": self.component_sizes[0] if self.component_sizes else 0,
+            "top_pagerank": [entity_id for entity_id, _ in self.top("pagerank", 3)],
+            "top_betweenness": [entity_id for entity_id, _ in self.top("betweenness", 3)],
+        }
+
+
+def compute_analytics(export: GraphExport, generation: int) -> GraphAnalytics:
+    """Every metric for an exported graph. CPU-bound; run it in a thread."""
+    start = time.perf_counter()
+    n = len(export.ids)
+    neighbours = _undirected(n, export.sources, export.targets)
+    if np is not None:
+        sources = np.asarray(export.sources, dtype=np.intp)
+        targets = np.asarray(export.targets, dtype=np.intp)
+        pagerank = _pagerank_numpy(n, sources, targets)
+        hubs, authorities = _hits_numpy(n, sources, targets)
+        backend = "numpy"
+    else:
+        pagerank = _pagerank_python(n, export.sources, export.targets)
+        hubs, authorities = _hits_python(n, export.sources, export.targets)
+        backend = "python"
+    betweenness, sampled = _betweenness(neighbours)
+    components, component_sizes = _components(neighbours)
+    return GraphAnalytics(
+        generation=generation,
+        ids=export.ids,
+        pagerank=pagerank,
+        betweenness=betweenness,
+        hubs=hubs,
+        authorities=authorities,
+        components=components,
+        component_sizes=component_sizes,
+        betweenness_sampled=sampled,
+        backend=backend,
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+    )
+
+
+def _undirected(n: int, sources: Sequence[int], targets: Sequence[int]) -> List[List[int]]:
+    """Simple undirected neighbour lists: no self-loops, no parallel edges."""
+    neighbours: List[set] = [set() for _ in range(n)]
+    for source, target in zip(sources, targets):
+        if source != target:
+            neighbours[source].add(target)
+            neighbours[target].add(source)
+    return [sorted(adjacent) for adjacent in neighbours]
+
+
+# ----------------------------------------------------------------------
+# PageRank and HITS: power iteration, vectorised or not
+# ----------------------------------------------------------------------
+
+def _pagerank_python(n: int, sources: Sequence[int], targets: Sequence[int]) -> List[float]:
+    if n == 0:
+        return []
+    out_degree = [0] * n
+    for source in sources:
+        out_degree[source] += 1
+    dangling = [slot for slot in range(n) if not out_degree[slot]]
+    rank = [1.0 / n] * n
+    for _ in range(MAX_ITERATIONS):
+        # Rank on entities without outgoing edges is spread over everyone.
+        base = (1 - PAGERANK_DAMPING) / n + PAGERANK_DAMPING * sum(rank[s] for s in dangling) / n
+        following = [base] * n
+        for source, target in zip(sources, targets):
+            following[target] += PAGERANK_DAMPING * rank[source] / out_degree[source]
+        change = sum(abs(a - b) for a, b in zip(following, rank))
+        rank = following
+        if change < n * TOLERANCE:
+            break
+    return rank
+
+
+def _pagerank_numpy(n: int, sources, targets) -> List[float]:
+    if n == 0:
+        return []
+    out_degree = np.bincount(sources, minlength=n).astype(float)
+    dangling = out_degree == 0
+    share = np.divide(PAGERANK_DAMPING, out_degree, out=np.zeros(n), where=~dangling)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        base = (1 - PAGERANK_DAMPING) / n + PAGERANK_DAMPING * rank[dangling].sum() / n
+        following = np.bincount(targets, weights=(rank * share)[sources], minlength=n) + base
+        change = np.abs(following - rank).sum()
+        rank = following
+        if change < n * TOLERANCE:
+            break
+    return rank.tolist()
+
+
+def _normalised(values: List[float]) -> List[float]:
+    total = sum(values)
+    return [value / total for value in values] if total else values
+
+
+def _hits_python(
+    n: int, sources: Sequence[int], targets: Sequence[int]
+) -> Tuple[List[float], List[float]]:
+    """Hub and authority scores, each summing to 1 (all zero with no edges)."""
+    if not sources:
+        return [0.0] * n, [0.0] * n
+    hubs = [1.0 / n] * n
+    for _ in range(MAX_ITERATIONS):
+        authorities = [0.0] * n
+        for source, target in zip(sources, targets):
+            authorities[target] += hubs[source]
+        authorities = _normalised(authorities)
+        following = [0.0] * n
+        for source, target in zip(sources, targets):
+            following[source] += authorities[target]
+        following = _normalised(following)
+        change = sum(abs(a - b) for a, b in zip(following, hubs))
+        hubs = following
+        if change < n * TOLERANCE:
+            break
+    return hubs, authorities
+
+
+def _hits_numpy(n: int, sources, targets) -> Tuple[List[float], List[float]]:
+    if not len(sources):
+        return [0.0] * n, [0.0] * n
+    hubs = np.full(n, 1.0 / n)
+    authorities = np.zeros(n)
+    for _ in range(MAX_ITERATIONS):
+        authorities = np.bincount(targets, weights=hubs[sources], minlength=n)
+        authorities /= authorities.sum()
+        following = np.bincount(sources, weights=authorities[targets], minlength=n)
+        following /= following.sum()
+        change = np.abs(following - hubs).sum()
+        hubs = following
+        if change < n * TOLERANCE:
+            break
+    return hubs.tolist(), authorities.tolist()
+
+
+# ----------------------------------------------------------------------
+# Betweenness and components: breadth-first, pure Python either way
+# ----------------------------------------------------------------------
+
+def _betweenness(neighbours: List[List[int]]) -> Tuple[List[float], bool]:
+    """Brandes' algorithm on the undirected graph; ``(scores, sampled)``."""
+    n = len(neighbours)
+    centrality = [0.0] * n
+    if n <= 2:
+        return centrality, False
+
+    pivots: Sequence[int] = range(n)
+    scale = 1.0
+    sampled = n > BETWEENNESS_PIVOTS
+    if sampled:
+        pivots = random.Random(0).sample(range(n), BETWEENNESS_PIVOTS)
+        scale = n / BETWEENNESS_PIVOTS
+
+    for pivot in pivots:
+        order = []
+        predecessors: Dict[int, List[int]] = {}
+        paths = {pivot: 1}
+        distance = {pivot: 0}
+        queue = deque([pivot])
+        while queue:
+            current = queue.popleft()
+            order.append(current)
+            for adjacent in neighbours[current]:
+                if adjacent not in distance:
+                    distance[adjacent] = distance[current] + 1
+                    paths[adjacent] = 0
+                    queue.append(adjacent)
+                if distance[adjacent] == distance[current] + 1:
+                    paths[adjacent] += paths[current]
+                    predecessors.setdefault(adjacent, []).append(current)
+
+        dependency = dict.fromkeys(order, 0.0)
+        for current in reversed(order):
+            for previous in predecessors.get(current, ()):
+                dependency[previous] += paths[previous] / paths[current] * (1 + dependency[current])
+            if current != pivot:
+                centrality[current] += dependency[current]
+
+    # Each unordered pair is counted from both ends.
+    norm = scale / ((n - 1) * (n - 2))
+    return [value * norm for value in centrality], sampled
+
+
+def _components(neighbours: List[List[int]]) -> Tuple[List[int], List[int]]:
+    """Component number per entity, numbered by size, and the sizes."""
+    n = len(neighbours)
+    label = [-1] * n
+    sizes = []
+    for root in range(n):
+        if label[root] != -1:
+            continue
+        component = len(sizes)
+        label[root] = component
+        size = 0
+        queue = deque([root])
+        while queue:
+            current = queue.popleft()
+            size += 1
+            for adjacent in neighbours[current]:
+                if label[adjacent] == -1:
+                    label[adjacent] = component
+                    queue.append(adjacent)
+        sizes.append(size)
+
+    by_size = sorted(range(len(sizes)), key=lambda component: -sizes[component])
+    renumber = {old: new for new, old in enumerate(by_size)}
+    return [renumber[component] for component in label], [sizes[old] for old in by_size]
+
+
+# ----------------------------------------------------------------------
+# Background engine
+# ----------------------------------------------------------------------
+
+class AnalyticsEngine:
+    """Keeps ``latest`` in step with an index's generation.
+
+    Owned by ``GraphIndexService``, which calls :meth:`notify` on every
+    generation bump. Nothing runs in the background until :meth:`start`
+    (the application lifespan); :meth:`compute_now` works regardless.
+    """
+
+    def __init__(
+        self,
+        index: GraphIndex,
+        generation: Callable[[], int],
+        *,
+        debounce: float = ANALYTICS_DEBOUNCE_SECONDS,
+        max_delay: float = ANALYTICS_MAX_DELAY_SECONDS,
+    ):
+        self.index = index
+        self._generation = generation
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.latest: Optional[GraphAnalytics] = None
+        self.started = False
+        self._task: Optional[asyncio.Task] = None
+        # Loop times of the latest notify() and of the first one not yet run.
+        self._notified_at = 0.0
+        self._pending_since = 0.0
+
+    @property
+    def is_current(self) -> bool:
+        return self.latest is not None and self.latest.generation == self._generation()
+
+    def start(self) -> None:
+        """Recompute in the background from now on."""
+        self.started = True
+
+    async def stop(self) -> None:
+        """Stop recomputing and wait out a run in progress."""
+        self.started = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self) -> None:
+        """The generation moved: restart the quiet period before a recompute."""
+        if not self.started:
+            return
+        loop = asyncio.get_running_loop()
+        self._notified_at = loop.time()
+        if self._task is None or self._task.done():
+            self._pending_since = self._notified_at
+            self._task = loop.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        # Loops rather than returning after one run, so writes that land while
+        # a run is in progress are picked up by the next one.
+        loop = asyncio.get_running_loop()
+        while self.started:
+            due = min(self._notified_at + self.debounce, self._pending_since + self.max_delay)
+            if loop.time() < due:
+                await asyncio.sleep(due - loop.time())
+                continue
+            self._pending_since = loop.time()
+            if self.is_current:
+                return
+            try:
+                await self.compute_now()
+            except Exception:
+                logger.exception("Graph analytics run failed")
+                return
+
+    async def compute_now(self) -> GraphAnalytics:
+        """Export the index as it is now and compute its analytics in a thread."""
+        export = export_graph(self.index)
+        result = await asyncio.to_thread(compute_analytics, export, self._generation())
+        if self.latest is None or result.generation >= self.latest.generation:
+            self.latest = result
+        logger.info(
+            "Graph analytics for generation %d: %d entities in %.1fms (%s)",
+            result.generation, len(result.ids), result.elapsed_ms, result.backend,
+        )
+        return result
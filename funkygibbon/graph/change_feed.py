@@ -0,0 +1,77 @@
+"""
+In-process wake-up for sync subscribers (PROTOCOL.md §3.8).
+
+A client that wants to hear about server changes used to poll the full sync
+endpoint on a timer. Every poll paid for the digest read and the outgoing
+query, even in an idle house where the answer was always "nothing". A
+subscriber now parks on a :class:`ChangeFeed` until ``server_seq`` moves past
+its cursor. The GraphIndexService write-through hooks publish to the feed,
+because they already run after every committed write (ADR-003 decision 2).
+
+The feed carries no data, only the highest stamp it has heard of. Subscribers
+re-read storage before and after waiting, so a write that bypassed
+write-through costs at most one subscriber timeout, never a missed change.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+
+class ChangeFeed:
+    """Highest published ``server_seq`` plus an event for waiters.
+
+    Single event loop, no lock: every method is a synchronous critical section
+    apart from the wait itself, as with GraphIndexService. The event is created
+    lazily and replaced on every publish, so it always belongs to the loop that
+    is waiting on it.
+    """
+
+    def __init__(self):
+        self.latest = 0
+        self.subscribers = 0
+        self._event: Optional[asyncio.Event] = None
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Whether a publish would wake anyone; publishers skip the read if not."""
+        return self.subscribers > 0
+
+    def publish(self, seq: Optional[int]) -> None:
+        """Record that storage has reached ``seq`` and wake every waiter."""
+        if seq is None or seq <= self.latest:
+            return
+        self.latest = seq
+        event, self._event = self._event, None
+        if event is not None:
+            event.set()
+
+    @asynccontextmanager
+    async def subscription(self):
+        """Count the caller as a subscriber for the duration of the block.
+
+        Enter before reading storage. A write that commits between that read
+        and :meth:`wait_past` then still publishes, because someone is
+        listening, and the wait returns at once instead of missing it.
+        """
+        self.subscribers += 1
+        try:
+            yield self
+        finally:
+            self.subscribers -= 1
+
+    async def wait_past(self, cursor: int, timeout: float) -> bool:
+        """Wait until ``latest > cursor``; False if ``timeout`` runs out first."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.latest <= cursor:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            if self._event is None:
+                self._event = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return self.latest > cursor
+        return True
@@ -0,0 +1,125 @@
+"""
+Maintained ancestor closure for the containment hierarchies.
+
+"Which home is this device in" and "what is under this zone" are walks up and
+down ``LOCATED_IN`` / ``PART_OF`` / ``CONTAINED_IN`` edges. ``GraphTraversal``
+walks them one awaited ``get_relationships`` per hop. A :class:`HierarchyIndex`
+instead keeps, per relationship type, every entity's full set of ancestors and
+descendants, so "is A above B" is a set lookup and listing what is under an
+entity costs only the size of the answer.
+
+The direction is the schema's (``inbetweenies.graph.traversal``'s
+``CHILD_TO_PARENT_TYPES``): a containment edge points from the child to its
+parent. Data need not form a tree -- a device may sit in two zones, and bad
+data may loop -- so this is a closure table rather than pre/post-order
+intervals, which only label forests. Ancestry matches ``GraphTraversal``
+exactly: an entity on a cycle is never its own ancestor.
+
+Maintenance costs, with ``below`` the child and its descendants and ``above``
+the parent and its ancestors:
+
+* linking child -> parent adds ``below x above`` pairs, each O(1);
+* unlinking recomputes the ancestors of each entity in ``below`` by climbing
+  the remaining parent edges, so it costs ``|below|`` climbs.
+
+House hierarchies are a handful of levels deep, so both stay small.
+"""
+
+from collections import defaultdict, deque
+from typing import Dict, Set
+
+from inbetweenies.graph.traversal import CHILD_TO_PARENT_TYPES
+
+from ..models import RelationshipType
+
+# Relationship types whose ancestry is indexed.
+CONTAINMENT_TYPES = CHILD_TO_PARENT_TYPES
+
+_Closure = Dict[str, Set[str]]
+
+
+class HierarchyIndex:
+    """Ancestor/descendant closure per containment type, by entity id.
+
+    Single event loop, no lock, like the ``GraphIndex`` that owns it. Empty
+    sets are dropped, so an entity outside every hierarchy costs nothing.
+    """
+
+    def __init__(self):
+        # type -> child -> parent -> number of edges between them; an edge
+        # re-pushed under a second id must not unlink on its first removal.
+        self.parents: Dict[RelationshipType, Dict[str, Dict[str, int]]] = defaultdict(dict)
+        self.ancestors: Dict[RelationshipType, _Closure] = defaultdict(dict)
+        self.descendants: Dict[RelationshipType, _Closure] = defaultdict(dict)
+
+    def clear(self) -> None:
+        self.parents.clear()
+        self.ancestors.clear()
+        self.descendants.clear()
+
+    def link(self, child_id: str, parent_id: str, rel_type: RelationshipType) -> None:
+        """Record one ``child -> parent`` edge of ``rel_type``."""
+        if rel_type not in CONTAINMENT_TYPES or child_id == parent_id:
+            return
+        parents = self.parents[rel_type].setdefault(child_id, {})
+        parents[parent_id] = parents.get(parent_id, 0) + 1
+        if parents[parent_id] > 1:
+            return
+
+        ancestors, descendants = self.ancestors[rel_type], self.descendants[rel_type]
+        above = {parent_id} | ancestors.get(parent_id, set())
+        for entity_id in {child_id} | descendants.get(child_id, set()):
+            gained = above - ancestors.get(entity_id, set())
+            gained.discard(entity_id)
+            if gained:
+                ancestors.setdefault(entity_id, set()).update(gained)
+                for ancestor_id in gained:
+                    descendants.setdefault(ancestor_id, set()).add(entity_id)
+
+    def unlink(self, child_id: str, parent_id: str, rel_type: RelationshipType) -> None:
+        """Forget one ``child -> parent`` edge of ``rel_type``."""
+        by_child = self.parents.get(rel_type)
+        parents = by_child.get(child_id) if by_child else None
+        if not parents or parent_id not in parents:
+            return
+        parents[parent_id] -= 1
+        if parents[parent_id]:
+            return
+        del parents[parent_id]
+        if not parents:
+            del by_child[child_id]
+
+        ancestors, descendants = self.ancestors[rel_type], self.descendants[rel_type]
+        for entity_id in {child_id} | descendants.get(child_id, set()):
+            kept = self._climb(by_child, entity_id)
+            for ancestor_id in ancestors.get(entity_id, set()) - kept:
+                below = descendants[ancestor_id]
+                below.discard(entity_id)
+                if not below:
+                    del descendants[ancestor_id]
+            if kept:
+                ancestors[entity_id] = kept
+            else:
+                ancestors.pop(entity_id, None)
+
+    @staticmethod
+    def _climb(by_child: Dict[str, Dict[str, int]], entity_id: str) -> Set[str]:
+        """Every entity above ``entity_id`` by the parent edges alone."""
+        found: Set[str] = set()
+        queue = deque([entity_id])
+        while queue:
+            for parent_id in by_child.get(queue.popleft(), ()):
+                if parent_id not in found and parent_id != entity_id:
+                    found.add(parent_id)
+                    queue.append(parent_id)
+        return found
+
+    def is_ancestor(self, ancestor_id: str, entity_id: str, rel_type: RelationshipType) -> bool:
+        """True when ``ancestor_id`` is above ``entity_id`` under ``rel_type``."""
+        return ancestor_id in self.ancestors.get(rel_type, {}).get(entity_id, ())
+
+    def ancestors_of(self, entity_id: str, rel_type: RelationshipType) -> Set[str]:
+        return set(self.ancestors.get(rel_type, {}).get(entity_id, ()))
+
+    def descendants_of(self, entity_id: str, rel_type: RelationshipType) -> Set[str]:
+        return set(self.descendants.get(rel_type, {}).get(entity_id, ()))
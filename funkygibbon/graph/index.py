@@ -17,17 +17,50 @@ only implements the data structure and its incremental maintenance:
   the lookup dictionaries, so a REST-created entity was findable by name but
   invisible to traversal until the process restarted (finding F2).
 * ``_build_nodes()`` is a full rebuild and is therefore **load-time only**
-  (``load_from_storage``). Mutations must never need it.
+  (``load_from_storage`` / ``load_rows``). Mutations must never need it.
 * Tombstoned entities (``content["deleted"] is True``) are excluded at load and
   removed from the index on write-through.
+
+TRAVERSAL ENGINE
+----------------
+``find_path``, ``get_connected_entities`` and ``get_ego_subgraph`` run on
+``adjacency``, a ``CompactAdjacency`` (``funkygibbon.graph.adjacency``)
+holding the same edges as integer-interned CSR arrays per relationship type.
+It is maintained by the same three mutators as ``nodes`` and compacted by
+``_build_nodes()``. ``nodes`` remains the per-entity view the statistics,
+centrality and cycle helpers read.
+
+READ SNAPSHOTS
+--------------
+The traversal queries live on ``GraphTraversals`` and read nothing but
+``entities`` and ``adjacency``. A ``ReadSnapshot`` freezes exactly those two at
+one generation, so a long traversal can run in a worker thread against it
+while write-through keeps mutating the live index on the event loop. Both are
+copy-on-write: a snapshot shares what the last compaction (or the last entity
+map copy) laid down and copies only the changes since.
+
+HIERARCHY
+---------
+``hierarchy``, a ``HierarchyIndex`` (``funkygibbon.graph.hierarchy``), holds
+the ancestor closure of every containment type (``LOCATED_IN``, ``PART_OF``,
+``CONTAINED_IN``), linked and unlinked by the same edge mutators, so
+``is_ancestor`` / ``get_ancestors`` / ``get_descendants`` never walk.
 """
 
-from typing import Dict, List, Set, Optional, Tuple, Any
-from collections import deque, defaultdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+from collections import defaultdict
 from dataclasses import dataclass
 
-from ..models import Entity, EntityRelationship, RelationshipType
+from ..models import Entity, EntityRelationship, EntityType, RelationshipType
 from ..repositories.graph import GraphRepository
+from .adjacency import COMPACT_MIN_PENDING, COMPACT_RATIO, INCOMING, OUTGOING, CompactAdjacency
+from .costs import EdgeCosts
+from .hierarchy import CONTAINMENT_TYPES, HierarchyIndex
+from .trigrams import TrigramIndex
+
+
+# Edge directions ``find_path`` can follow.
+PATH_DIRECTIONS = ("outgoing", "undirected")
 
 
 def is_tombstoned(entity: Entity) -> bool:
@@ -35,66 +68,469 @@ def is_tombstoned(entity: Entity) -> bool:
     return bool((entity.content or {}).get("deleted"))
 
 
+def _degree(node: "GraphNode") -> int:
+    return len(node.incoming) + len(node.outgoing)
+
+
+def _check_containment(rel_type: RelationshipType) -> None:
+    if rel_type not in CONTAINMENT_TYPES:
+        raise ValueError(
+            f"{rel_type.value} is not a containment type; hierarchy queries take "
+            f"one of {sorted(t.value for t in CONTAINMENT_TYPES)}"
+        )
+
+
+# An insertion-ordered set of relationships: a dict keyed by the relationship
+# object itself (ORM instances hash by identity), so adding and removing one
+# edge is O(1) however many share its endpoint or type.
+RelationshipBucket = Dict[EntityRelationship, None]
+
+
+class _FrozenEntities(Mapping):
+    """A read-only entity map: a dict nobody writes to any more, and the
+    entities changed since it was copied (None for one removed)."""
+
+    __slots__ = ("_base", "_changed")
+
+    def __init__(self, base: Dict[str, Entity], changed: Dict[str, Optional[Entity]]):
+        self._base = base
+        self._changed = changed
+
+    def __getitem__(self, entity_id: str) -> Entity:
+        if entity_id in self._changed:
+            entity = self._changed[entity_id]
+            if entity is None:
+                raise KeyError(entity_id)
+            return entity
+        return self._base[entity_id]
+
+    def __iter__(self) -> Iterator[str]:
+        changed = self._changed
+        yield from (i for i in self._base if i not in changed)
+        yield from (i for i, entity in changed.items() if entity is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 @dataclass
 class GraphNode:
-    """Node in the graph with entity data and connections"""
+    """Node in the graph with entity data and connections.
+
+    ``outgoing``/``incoming`` map each relationship to the entity at its far
+    end; iterate ``.items()`` for ``(relationship, id)`` pairs.
+    """
     entity: Entity
-    outgoing: List[Tuple[EntityRelationship, str]]  # (relationship, target_id)
-    incoming: List[Tuple[EntityRelationship, str]]  # (relationship, source_id)
+    outgoing: Dict[EntityRelationship, str]  # relationship -> target_id
+    incoming: Dict[EntityRelationship, str]  # relationship -> source_id
+
+
+class GraphTraversals:
+    """Traversal queries that read only ``entities`` and ``adjacency``.
+
+    Shared by the live :class:`GraphIndex` and its :class:`ReadSnapshot`
+    copies, so one query can run on the event loop against the index or in a
+    worker thread against a snapshot.
+    """
+
+    entities: Mapping[str, Entity]
+    adjacency: CompactAdjacency
+
+    def find_path(
+        self,
+        from_id: str,
+        to_id: str,
+        max_depth: int = 10,
+        direction: str = "outgoing",
+        rel_types: Optional[List[RelationshipType]] = None,
+    ) -> List[str]:
+        """
+        Find a shortest path between two entities (bidirectional BFS).
+
+        Args:
+            from_id: Source entity ID
+            to_id: Target entity ID
+            max_depth: Maximum number of hops
+            direction: "outgoing" follows edges source-to-target only;
+                "undirected" follows them either way
+            rel_types: Only traverse relationships of these types
+
+        Returns:
+            List of entity IDs forming the path, empty if no path exists
+        """
+        if direction not in PATH_DIRECTIONS:
+            raise ValueError(f"direction must be one of {PATH_DIRECTIONS}, not {direction!r}")
+        if from_id not in self.entities or to_id not in self.entities:
+            return []
+        return self.adjacency.find_path(
+            from_id, to_id, max_depth, rel_types, undirected=direction == "undirected"
+        )
+
+    def find_weighted_paths(
+        self,
+        from_id: str,
+        to_id: str,
+        k: int = 1,
+        costs: Optional[Callable[[EntityRelationship], float]] = None,
+        max_depth: int = 10,
+        direction: str = "outgoing",
+        rel_types: Optional[List[RelationshipType]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        The ``k`` cheapest loopless paths between two entities.
+
+        Dijkstra for the best path, Yen's algorithm for the alternatives; see
+        ``CompactAdjacency.cheapest_paths``.
+
+        Args:
+            from_id: Source entity ID
+            to_id: Target entity ID
+            k: How many paths to return at most
+            costs: Cost of one hop (default ``EdgeCosts()``; pass
+                ``unit_cost`` to rank by hop count)
+            max_depth, direction, rel_types: As for ``find_path``
+
+        Returns:
+            Cheapest first, each ``{"path": [ids], "relationships": [rels],
+            "cost": float}``; empty if no path exists
+        """
+        if direction not in PATH_DIRECTIONS:
+            raise ValueError(f"direction must be one of {PATH_DIRECTIONS}, not {direction!r}")
+        if from_id not in self.entities or to_id not in self.entities:
+            return []
+        found = self.adjacency.cheapest_paths(
+            from_id, to_id, costs or EdgeCosts(), k=k, max_depth=max_depth,
+            rel_types=rel_types, undirected=direction == "undirected",
+        )
+        return [
+            {"path": path, "relationships": relationships, "cost": cost}
+            for cost, path, relationships in found
+        ]
+
+    def _search(
+        self,
+        from_ids: List[str],
+        max_depth: int,
+        direction: str,
+        rel_types: Optional[List[RelationshipType]],
+        goals: Optional[List[str]] = None,
+    ) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+        if direction not in PATH_DIRECTIONS:
+            raise ValueError(f"direction must be one of {PATH_DIRECTIONS}, not {direction!r}")
+        return self.adjacency.search(
+            [i for i in from_ids if i in self.entities], max_depth, rel_types,
+            undirected=direction == "undirected", goals=goals,
+        )
+
+    def find_paths(
+        self,
+        from_id: str,
+        to_ids: List[str],
+        max_depth: int = 10,
+        direction: str = "outgoing",
+        rel_types: Optional[List[RelationshipType]] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        Shortest paths from one entity to many, with a single BFS.
+
+        Args:
+            from_id: Source entity ID
+            to_ids: Target entity IDs
+            max_depth, direction, rel_types: As for ``find_path``
+
+        Returns:
+            Path (list of entity IDs) per target; empty where none exists
+        """
+        _, parent = self._search([from_id], max_depth, direction, rel_types, goals=to_ids)
+        paths = {}
+        for to_id in to_ids:
+            path = []
+            if to_id in parent:
+                step: Optional[str] = to_id
+                while step is not None:
+                    path.append(step)
+                    step = parent[step]
+                path.reverse()
+            paths[to_id] = path
+        return paths
+
+    def distance_matrix(
+        self,
+        from_ids: List[str],
+        to_ids: List[str],
+        max_depth: int = 10,
+        direction: str = "outgoing",
+        rel_types: Optional[List[RelationshipType]] = None,
+    ) -> Dict[str, Dict[str, Optional[int]]]:
+        """
+        Hop counts from every source to every target: one BFS per source.
+
+        Returns:
+            ``{from_id: {to_id: hops or None}}``; None where unreachable
+            within ``max_depth``
+        """
+        matrix = {}
+        for from_id in from_ids:
+            distance, _ = self._search([from_id], max_depth, direction, rel_types, goals=to_ids)
+            matrix[from_id] = {
+                to_id: distance.get(to_id)
+                for to_id in to_ids
+            }
+        return matrix
+
+    def reachable(
+        self,
+        from_ids: List[str],
+        to_ids: List[str],
+        max_depth: int = 10,
+        direction: str = "outgoing",
+        rel_types: Optional[List[RelationshipType]] = None,
+    ) -> Set[str]:
+        """
+        Targets reachable from *any* of the sources: one multi-source BFS.
+
+        Returns:
+            The subset of ``to_ids`` reachable within ``max_depth``
+        """
+        distance, _ = self._search(from_ids, max_depth, direction, rel_types, goals=to_ids)
+        return {to_id for to_id in to_ids if to_id in distance}
+
+    def get_connected_entities(
+        self,
+        entity_id: str,
+        rel_type: Optional[RelationshipType] = None,
+        direction: str = "both",
+        max_depth: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Get entities connected to the given entity.
+
+        Args:
+            entity_id: Center entity ID
+            rel_type: Filter by relationship type
+            direction: "outgoing", "incoming", or "both"
+            max_depth: How many hops to traverse
+
+        Returns:
+            List of dictionaries with entity and relationship info
+        """
+        if entity_id not in self.entities:
+            return []
+
+        directions = {
+            "outgoing": (OUTGOING,),
+            "incoming": (INCOMING,),
+            "both": (OUTGOING, INCOMING),
+        }.get(direction, ())
+        return [
+            {
+                "entity": self.entities[neighbour_id],
+                "relationship": rel,
+                "direction": "outgoing" if edge_direction == OUTGOING else "incoming",
+                "distance": distance,
+            }
+            for neighbour_id, rel, edge_direction, distance in self.adjacency.walk(
+                entity_id, directions, max_depth, None if rel_type is None else (rel_type,)
+            )
+            if neighbour_id in self.entities
+        ]
+
+    def get_ego_subgraph(
+        self,
+        entity_id: str,
+        depth: int = 1,
+        rel_types: Optional[List[RelationshipType]] = None,
+        entity_types: Optional[List[EntityType]] = None,
+        direction: str = "both",
+        max_nodes: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        The k-hop neighbourhood of an entity and the edges among it.
 
+        Costs the degrees of the entities returned, not the size of the
+        graph (``CompactAdjacency.neighbourhood``).
 
-class GraphIndex:
+        Args:
+            entity_id: Center entity ID
+            depth: How many hops to include
+            rel_types: Only follow and return relationships of these types
+            entity_types: Only include (and walk through) entities of these
+                types; the center is always included
+            direction: "outgoing", "incoming", or "both"
+            max_nodes: Stop once this many entities are included
+
+        Returns:
+            ``{"entities": {id: Entity}, "depths": {id: hops},
+            "relationships": [...], "truncated": bool}``, entities nearest
+            first; ``truncated`` is True when ``max_nodes`` cut the search short
+        """
+        directions = {
+            "outgoing": (OUTGOING,),
+            "incoming": (INCOMING,),
+            "both": (OUTGOING, INCOMING),
+        }[direction]
+        admit = None
+        if entity_types is not None:
+            allowed = set(entity_types)
+
+            def admit(neighbour_id: str) -> bool:
+                entity = self.entities.get(neighbour_id)
+                return entity is not None and entity.entity_type in allowed
+
+        depths, relationships, truncated = self.adjacency.neighbourhood(
+            entity_id, directions, depth, rel_types, admit=admit, max_nodes=max_nodes
+        )
+        return {
+            "entities": {eid: self.entities[eid] for eid in depths if eid in self.entities},
+            "depths": depths,
+            "relationships": relationships,
+            "truncated": truncated,
+        }
+
+    def strongly_connected_components(
+        self, rel_types: Optional[List[RelationshipType]] = None
+    ) -> List[List[str]]:
+        """
+        Groups of entities that can all reach each other, i.e. contain a loop.
+
+        One iterative Tarjan pass over the whole index; see
+        ``CompactAdjacency.strongly_connected_components``.
+
+        Args:
+            rel_types: Only follow relationships of these types
+
+        Returns:
+            Entity ID lists, largest first; single entities only with a self-loop
+        """
+        components = self.adjacency.strongly_connected_components(rel_types)
+        return sorted(components, key=len, reverse=True)
+
+    def find_all_cycles(
+        self,
+        rel_types: Optional[List[RelationshipType]] = None,
+        max_length: Optional[int] = None,
+        max_cycles: int = 100,
+        max_steps: int = 100_000,
+    ) -> Dict[str, Any]:
+        """
+        Every elementary cycle in the graph, within a budget.
+
+        Unlike ``find_cycles`` this needs no start entity: Johnson's algorithm
+        runs inside each strongly connected component and reports each cycle
+        once (``CompactAdjacency.simple_cycles``).
+
+        Args:
+            rel_types: Only follow relationships of these types
+            max_length: Longest cycle to report, in hops (None for any)
+            max_cycles: Stop after this many cycles
+            max_steps: Stop after this many search steps
+
+        Returns:
+            ``{"cycles": [closed id lists], "components": [id lists],
+            "complete": bool}``; ``complete`` is False when a budget ran out
+        """
+        cycles, complete = self.adjacency.simple_cycles(
+            rel_types, max_length=max_length, max_cycles=max_cycles, max_steps=max_steps
+        )
+        return {
+            "cycles": cycles,
+            "components": self.strongly_connected_components(rel_types),
+            "complete": complete,
+        }
+
+
+class GraphIndex(GraphTraversals):
     """In-memory graph structure for fast operations"""
 
     def __init__(self):
         # Core data structures
         self.entities: Dict[str, Entity] = {}
         self.nodes: Dict[str, GraphNode] = {}
-        self.relationships_by_source: Dict[str, List[EntityRelationship]] = defaultdict(list)
-        self.relationships_by_target: Dict[str, List[EntityRelationship]] = defaultdict(list)
-        self.relationships_by_type: Dict[RelationshipType, List[EntityRelationship]] = defaultdict(list)
+        self.relationships_by_source: Dict[str, RelationshipBucket] = defaultdict(dict)
+        self.relationships_by_target: Dict[str, RelationshipBucket] = defaultdict(dict)
+        self.relationships_by_type: Dict[RelationshipType, RelationshipBucket] = defaultdict(dict)
 
         # Indices for fast lookup
         self.entities_by_type: Dict[str, Set[str]] = defaultdict(set)
         self.entities_by_name: Dict[str, Set[str]] = defaultdict(set)
+        # Trigram postings over the keys of entities_by_name, for fuzzy lookup.
+        self.name_trigrams = TrigramIndex()
 
         # Identity map for relationships that carry an id, so re-adding the same
         # edge (sync re-push, endpoint version bump) replaces it instead of
         # duplicating it.
         self.relationships_by_id: Dict[str, EntityRelationship] = {}
 
+        # Integer-array copy of the edges that traversal runs on.
+        self.adjacency = CompactAdjacency()
+        # Ancestor closure of the containment types.
+        self.hierarchy = HierarchyIndex()
+
+        # Statistics counters, kept by the mutators so get_statistics never
+        # scans: the sum over nodes of len(incoming) + len(outgoing), and the
+        # number of nodes where that is zero.
+        self.degree_total = 0
+        self.isolated_count = 0
+
+        # The copy of ``entities`` that read snapshots share, and every entity
+        # changed since it was taken (None for removed); see frozen_entities.
+        self._entities_frozen: Optional[Dict[str, Entity]] = None
+        self._entities_changed: Dict[str, Optional[Entity]] = {}
+
     async def load_from_storage(self, graph_repo: GraphRepository):
         """
         Load graph data from persistent storage into memory.
 
-        This is the only place a full ``_build_nodes()`` rebuild happens
-        (ADR-003 decision 2). Tombstoned entities are skipped (decision 5).
+        Streams the two lean queries of ``GraphRepository.stream_index_entities``
+        and ``stream_index_relationships`` straight into the index, so no full
+        result list or ORM identity map is held alongside it. Filtering is the
+        same as ``load_rows``.
 
         Args:
             graph_repo: Repository to load data from
         """
-        # Clear existing data
         self.clear()
+        self.adjacency.begin_bulk()
 
-        # Load all entity types
-        from ..models import EntityType
-        for entity_type in EntityType:
-            entities = await graph_repo.get_entities_by_type(entity_type)
-            for entity in entities:
-                if is_tombstoned(entity):
-                    continue
+        async for entity in graph_repo.stream_index_entities():
+            if not is_tombstoned(entity):
                 self._add_entity(entity)
+        async for rel in graph_repo.stream_index_relationships():
+            if rel.from_entity_id in self.entities and rel.to_entity_id in self.entities:
+                self._add_relationship(rel)
 
-        # Load all relationships. An edge whose endpoint is missing (deleted, or
-        # never synced) is dropped rather than left dangling.
-        relationships = await graph_repo.get_relationships(include_all_versions=False)
+        self._build_nodes()
+
+    def load_rows(self, entities: Iterable[Entity], relationships: Iterable[EntityRelationship]):
+        """
+        Replace the whole index with these rows.
+
+        With ``load_from_storage``, the only place a full ``_build_nodes()``
+        rebuild happens (ADR-003 decision 2); for rows already in hand. Tombstoned
+        entities are skipped (decision 5), and an edge whose endpoint is missing
+        (deleted, or never synced) is dropped rather than left dangling.
+
+        Args:
+            entities: Latest entity versions
+            relationships: Relationship rows
+        """
+        self.clear()
+        self.adjacency.begin_bulk()
+
+        for entity in entities:
+            if not is_tombstoned(entity):
+                self._add_entity(entity)
         for rel in relationships:
             if rel.from_entity_id in self.entities and rel.to_entity_id in self.entities:
                 self._add_relationship(rel)
 
-        # Build graph nodes (load-time full rebuild)
         self._build_nodes()
 
+    def all_relationships(self) -> Iterator[EntityRelationship]:
+        """Every indexed edge, once each."""
+        for rels in self.relationships_by_source.values():
+            yield from rels
+
     def clear(self):
         """Clear all graph data"""
         self.entities.clear()
@@ -104,7 +540,39 @@ class GraphIndex:
         self.relationships_by_type.clear()
         self.entities_by_type.clear()
         self.entities_by_name.clear()
+        self.name_trigrams.clear()
         self.relationships_by_id.clear()
+        self.adjacency.clear()
+        self.hierarchy.clear()
+        self.degree_total = 0
+        self.isolated_count = 0
+        self._entities_frozen = None
+        self._entities_changed = {}
+
+    def frozen_entities(self) -> Mapping[str, Entity]:
+        """``entities`` as it is now, for a ``ReadSnapshot``. O(changes).
+
+        Shares one copy of the map with every earlier caller and copies only
+        the entries written since. The shared copy is retaken once those
+        outgrow ``COMPACT_RATIO`` of it, as the adjacency recompacts, so the
+        cost is amortised O(1) per write.
+        """
+        frozen = self._entities_frozen
+        changed = self._entities_changed
+        if frozen is None or len(changed) > max(COMPACT_MIN_PENDING, len(frozen) * COMPACT_RATIO):
+            frozen = self._entities_frozen = dict(self.entities)
+            changed = self._entities_changed = {}
+        return _FrozenEntities(frozen, dict(changed))
+
+    def adopt(self, other: "GraphIndex") -> None:
+        """Take over every structure of ``other``, which must not be used again.
+
+        The swap half of a double-buffered rebuild: ``other`` is loaded while
+        this index keeps serving, then one synchronous step replaces its
+        contents, so a reader on the event loop sees the old graph or the new
+        one, never a half-cleared mix. Holders of this object stay valid.
+        """
+        self.__dict__.update(other.__dict__)
 
     # ------------------------------------------------------------------
     # Incremental maintenance (write-through)
@@ -125,9 +593,7 @@ class GraphIndex:
             # old name.
             old_name = previous.name.lower()
             if old_name != entity.name.lower():
-                self.entities_by_name[old_name].discard(entity.id)
-                if not self.entities_by_name[old_name]:
-                    del self.entities_by_name[old_name]
+                self._unindex_name(old_name, entity.id)
             old_type = previous.entity_type.value
             if old_type != entity.entity_type.value:
                 self.entities_by_type[old_type].discard(entity.id)
@@ -135,30 +601,37 @@ class GraphIndex:
                     del self.entities_by_type[old_type]
 
         self.entities[entity.id] = entity
+        if self._entities_frozen is not None:
+            self._entities_changed[entity.id] = entity
         self.entities_by_type[entity.entity_type.value].add(entity.id)
 
         # Index by name (case-insensitive)
         name_lower = entity.name.lower()
-        self.entities_by_name[name_lower].add(entity.id)
+        named = self.entities_by_name[name_lower]
+        if not named:
+            self.name_trigrams.add(name_lower)
+        named.add(entity.id)
 
         # Maintain the traversal structure incrementally. This is the half that
         # was missing before ADR-003: without it the entity exists for name
         # lookups but `find_path` cannot see it.
         node = self.nodes.get(entity.id)
         if node is None:
-            self.nodes[entity.id] = GraphNode(
+            node = self.nodes[entity.id] = GraphNode(
                 entity=entity,
-                outgoing=[
-                    (rel, rel.to_entity_id)
-                    for rel in self.relationships_by_source.get(entity.id, [])
-                ],
-                incoming=[
-                    (rel, rel.from_entity_id)
-                    for rel in self.relationships_by_target.get(entity.id, [])
-                ],
+                outgoing={
+                    rel: rel.to_entity_id
+                    for rel in self.relationships_by_source.get(entity.id, ())
+                },
+                incoming={
+                    rel: rel.from_entity_id
+                    for rel in self.relationships_by_target.get(entity.id, ())
+                },
             )
+            self._count_node(node, 1)
         else:
             node.entity = entity
+        self.adjacency.add_node(entity.id)
 
     def _add_relationship(self, rel: EntityRelationship):
         """Add or replace a relationship, keeping the node adjacency lists in step."""
@@ -167,39 +640,57 @@ class GraphIndex:
             if existing is not None:
                 self._detach_relationship(existing)
 
-        self.relationships_by_source[rel.from_entity_id].append(rel)
-        self.relationships_by_target[rel.to_entity_id].append(rel)
-        self.relationships_by_type[rel.relationship_type].append(rel)
+        self.relationships_by_source[rel.from_entity_id][rel] = None
+        self.relationships_by_target[rel.to_entity_id][rel] = None
+        self.relationships_by_type[rel.relationship_type][rel] = None
         if rel.id:
             self.relationships_by_id[rel.id] = rel
+        self.adjacency.add_edge(rel, rel.from_entity_id, rel.to_entity_id, rel.relationship_type)
+        self.hierarchy.link(rel.from_entity_id, rel.to_entity_id, rel.relationship_type)
 
         source_node = self.nodes.get(rel.from_entity_id)
         if source_node is not None:
-            source_node.outgoing.append((rel, rel.to_entity_id))
+            before = _degree(source_node)
+            source_node.outgoing[rel] = rel.to_entity_id
+            self._degree_changed(before, _degree(source_node))
         target_node = self.nodes.get(rel.to_entity_id)
         if target_node is not None:
-            target_node.incoming.append((rel, rel.from_entity_id))
+            before = _degree(target_node)
+            target_node.incoming[rel] = rel.from_entity_id
+            self._degree_changed(before, _degree(target_node))
 
     def _detach_relationship(self, rel: EntityRelationship):
-        """Remove one relationship object from every structure that holds it."""
+        """Remove one relationship object from every structure that holds it.
+
+        O(1) in the dict structures, each keyed by the relationship (see
+        ``RelationshipBucket``); buckets that empty are dropped. The adjacency
+        scans the lesser of the edge's two endpoint rows within its type.
+        """
         for bucket, key in (
             (self.relationships_by_source, rel.from_entity_id),
             (self.relationships_by_target, rel.to_entity_id),
+            (self.relationships_by_type, rel.relationship_type),
         ):
-            existing = bucket.get(key)
-            if existing:
-                bucket[key] = [r for r in existing if r is not rel]
-
-        typed = self.relationships_by_type.get(rel.relationship_type)
-        if typed:
-            self.relationships_by_type[rel.relationship_type] = [r for r in typed if r is not rel]
+            rels = bucket.get(key)
+            if rels is not None:
+                rels.pop(rel, None)
+                if not rels:
+                    del bucket[key]
 
         source_node = self.nodes.get(rel.from_entity_id)
         if source_node is not None:
-            source_node.outgoing = [edge for edge in source_node.outgoing if edge[0] is not rel]
+            before = _degree(source_node)
+            source_node.outgoing.pop(rel, None)
+            self._degree_changed(before, _degree(source_node))
         target_node = self.nodes.get(rel.to_entity_id)
         if target_node is not None:
-            target_node.incoming = [edge for edge in target_node.incoming if edge[0] is not rel]
+            before = _degree(target_node)
+            target_node.incoming.pop(rel, None)
+            self._degree_changed(before, _degree(target_node))
+        self.adjacency.remove_edge(
+            rel, rel.from_entity_id, rel.relationship_type, rel.to_entity_id
+        )
+        self.hierarchy.unlink(rel.from_entity_id, rel.to_entity_id, rel.relationship_type)
 
         if rel.id and self.relationships_by_id.get(rel.id) is rel:
             del self.relationships_by_id[rel.id]
@@ -216,27 +707,67 @@ class GraphIndex:
         entity = self.entities.pop(entity_id, None)
         if entity is None:
             return False
+        if self._entities_frozen is not None:
+            self._entities_changed[entity_id] = None
 
-        name_lower = entity.name.lower()
-        self.entities_by_name[name_lower].discard(entity_id)
-        if not self.entities_by_name[name_lower]:
-            del self.entities_by_name[name_lower]
+        self._unindex_name(entity.name.lower(), entity_id)
 
         type_key = entity.entity_type.value
         self.entities_by_type[type_key].discard(entity_id)
         if not self.entities_by_type[type_key]:
             del self.entities_by_type[type_key]
 
-        touching = list(self.relationships_by_source.get(entity_id, []))
-        touching += list(self.relationships_by_target.get(entity_id, []))
+        touching = list(self.relationships_by_source.get(entity_id, ()))
+        touching += list(self.relationships_by_target.get(entity_id, ()))
         for rel in touching:
             self._detach_relationship(rel)
 
         self.relationships_by_source.pop(entity_id, None)
         self.relationships_by_target.pop(entity_id, None)
-        self.nodes.pop(entity_id, None)
+        node = self.nodes.pop(entity_id, None)
+        if node is not None:
+            self._count_node(node, -1)
+        self.adjacency.remove_node(entity_id)
         return True
 
+    def _unindex_name(self, name_lower: str, entity_id: str) -> None:
+        """Drop one entity from a name, and the name once nobody has it."""
+        named = self.entities_by_name.get(name_lower)
+        if named is None:
+            return
+        named.discard(entity_id)
+        if not named:
+            del self.entities_by_name[name_lower]
+            self.name_trigrams.discard(name_lower)
+
+    def _degree_changed(self, before: int, after: int) -> None:
+        """Account for one node's degree going from ``before`` to ``after``."""
+        self.degree_total += after - before
+        if before == 0 and after:
+            self.isolated_count -= 1
+        elif after == 0 and before:
+            self.isolated_count += 1
+
+    def _count_node(self, node: GraphNode, sign: int) -> None:
+        """Add (``sign`` 1) or drop (-1) a whole node in the counters."""
+        degree = _degree(node)
+        self.degree_total += sign * degree
+        if degree == 0:
+            self.isolated_count += sign
+
+    def count_degrees(self) -> Tuple[int, int]:
+        """``(degree_total, isolated_count)`` by a full O(V) scan of ``nodes``.
+
+        What the counters must equal; ``_build_nodes`` resets them from it and
+        tests compare against it.
+        """
+        degree_total = isolated = 0
+        for node in self.nodes.values():
+            degree = _degree(node)
+            degree_total += degree
+            isolated += degree == 0
+        return degree_total, isolated
+
     def upsert_entity(self, entity: Entity) -> None:
         """Write-through entry point: apply an entity version to the index.
 
@@ -268,138 +799,61 @@ class GraphIndex:
         """
         self.nodes.clear()
         for entity_id, entity in self.entities.items():
-            outgoing = [
-                (rel, rel.to_entity_id)
-                for rel in self.relationships_by_source.get(entity_id, [])
-            ]
-            incoming = [
-                (rel, rel.from_entity_id)
-                for rel in self.relationships_by_target.get(entity_id, [])
-            ]
+            outgoing = {
+                rel: rel.to_entity_id
+                for rel in self.relationships_by_source.get(entity_id, ())
+            }
+            incoming = {
+                rel: rel.from_entity_id
+                for rel in self.relationships_by_target.get(entity_id, ())
+            }
 
             self.nodes[entity_id] = GraphNode(
                 entity=entity,
                 outgoing=outgoing,
                 incoming=incoming
             )
+        self.degree_total, self.isolated_count = self.count_degrees()
+        self.adjacency.compact()
 
-    def find_path(self, from_id: str, to_id: str, max_depth: int = 10) -> List[str]:
+    def is_ancestor(self, ancestor_id: str, entity_id: str, rel_type: RelationshipType) -> bool:
         """
-        Find shortest path between two entities using BFS.
+        Whether one entity contains another, directly or transitively. O(1).
 
         Args:
-            from_id: Source entity ID
-            to_id: Target entity ID
-            max_depth: Maximum search depth
-
-        Returns:
-            List of entity IDs forming the path, empty if no path exists
+            ancestor_id: The would-be container (e.g. a HOME)
+            entity_id: The would-be contained entity (e.g. a DEVICE)
+            rel_type: A containment type (``LOCATED_IN``, ``PART_OF``,
+                ``CONTAINED_IN``)
         """
-        if from_id not in self.nodes or to_id not in self.nodes:
-            return []
-
-        if from_id == to_id:
-            return [from_id]
-
-        # BFS
-        queue = deque([(from_id, [from_id])])
-        visited = {from_id}
-        depth = 0
-
-        while queue and depth < max_depth:
-            level_size = len(queue)
-
-            for _ in range(level_size):
-                current, path = queue.popleft()
+        _check_containment(rel_type)
+        return self.hierarchy.is_ancestor(ancestor_id, entity_id, rel_type)
 
-                # Check all outgoing connections
-                node = self.nodes.get(current)
-                if node:
-                    for rel, next_id in node.outgoing:
-                        if next_id == to_id:
-                            return path + [to_id]
-
-                        if next_id not in visited and next_id in self.nodes:
-                            visited.add(next_id)
-                            queue.append((next_id, path + [next_id]))
-
-            depth += 1
-
-        return []
-
-    def get_connected_entities(
-        self,
-        entity_id: str,
-        rel_type: Optional[RelationshipType] = None,
-        direction: str = "both",
-        max_depth: int = 1
-    ) -> List[Dict[str, Any]]:
+    def get_ancestors(self, entity_id: str, rel_type: RelationshipType) -> List[Entity]:
         """
-        Get entities connected to the given entity.
+        Every entity above this one under a containment type.
 
-        Args:
-            entity_id: Center entity ID
-            rel_type: Filter by relationship type
-            direction: "outgoing", "incoming", or "both"
-            max_depth: How many hops to traverse
+        The same set as ``GraphTraversal.get_ancestors`` with no depth limit,
+        read from the maintained closure instead of walked.
 
         Returns:
-            List of dictionaries with entity and relationship info
+            Ancestor entities, in no particular order
         """
-        if entity_id not in self.nodes:
-            return []
+        _check_containment(rel_type)
+        return [self.entities[i] for i in self.hierarchy.ancestors_of(entity_id, rel_type)
+                if i in self.entities]
 
-        results = []
-        visited = {entity_id}
-        queue = deque([(entity_id, 0)])
-
-        while queue:
-            current_id, depth = queue.popleft()
-
-            if depth >= max_depth:
-                continue
+    def get_descendants(self, entity_id: str, rel_type: RelationshipType) -> List[Entity]:
+        """
+        Every entity below this one under a containment type, in time
+        proportional to their number.
 
-            node = self.nodes.get(current_id)
-            if not node:
-                continue
-
-            # Process outgoing relationships
-            if direction in ("outgoing", "both"):
-                for rel, target_id in node.outgoing:
-                    if rel_type and rel.relationship_type != rel_type:
-                        continue
-
-                    if target_id in self.entities:
-                        results.append({
-                            "entity": self.entities[target_id],
-                            "relationship": rel,
-                            "direction": "outgoing",
-                            "distance": depth + 1
-                        })
-
-                        if target_id not in visited and depth + 1 < max_depth:
-                            visited.add(target_id)
-                            queue.append((target_id, depth + 1))
-
-            # Process incoming relationships
-            if direction in ("incoming", "both"):
-                for rel, source_id in node.incoming:
-                    if rel_type and rel.relationship_type != rel_type:
-                        continue
-
-                    if source_id in self.entities:
-                        results.append({
-                            "entity": self.entities[source_id],
-                            "relationship": rel,
-                            "direction": "incoming",
-                            "distance": depth + 1
-                        })
-
-                        if source_id not in visited and depth + 1 < max_depth:
-                            visited.add(source_id)
-                            queue.append((source_id, depth + 1))
-
-        return results
+        Returns:
+            Descendant entities, in no particular order
+        """
+        _check_containment(rel_type)
+        return [self.entities[i] for i in self.hierarchy.descendants_of(entity_id, rel_type)
+                if i in self.entities]
 
     def find_entities_by_name(self, name: str, fuzzy: bool = True) -> List[Entity]:
         """
@@ -415,11 +869,10 @@ class GraphIndex:
         name_lower = name.lower()
 
         if fuzzy:
-            # Find all names that contain the search term
+            # Find all names that contain the search term, by trigram postings
             matching_ids = set()
-            for indexed_name, entity_ids in self.entities_by_name.items():
-                if name_lower in indexed_name:
-                    matching_ids.update(entity_ids)
+            for indexed_name in self.name_trigrams.containing(name_lower, self.entities_by_name):
+                matching_ids.update(self.entities_by_name[indexed_name])
 
             return [self.entities[eid] for eid in matching_ids if eid in self.entities]
         else:
@@ -439,8 +892,8 @@ class GraphIndex:
             Dictionary with entities and relationships
         """
         subgraph_entities = {
-            eid: entity for eid, entity in self.entities.items()
-            if eid in entity_ids
+            eid: self.entities[eid] for eid in entity_ids
+            if eid in self.entities
         }
 
         subgraph_relationships = []
@@ -448,7 +901,7 @@ class GraphIndex:
         if include_relationships:
             for entity_id in entity_ids:
                 # Get outgoing relationships where target is also in subgraph
-                for rel in self.relationships_by_source.get(entity_id, []):
+                for rel in self.relationships_by_source.get(entity_id, ()):
                     if rel.to_entity_id in entity_ids:
                         subgraph_relationships.append(rel)
 
@@ -502,7 +955,7 @@ class GraphIndex:
             if not node:
                 return
 
-            for rel, next_id in node.outgoing:
+            for rel, next_id in node.outgoing.items():
                 if next_id == start_id and len(path) > 2:
                     # Found a cycle
                     cycles.append(path + [start_id])
@@ -520,6 +973,10 @@ class GraphIndex:
         """
         Get graph statistics.
 
+        O(number of types): totals come from the per-type buckets, degrees
+        from the counters the mutators maintain (``count_degrees`` is the
+        full-scan equivalent).
+
         Returns:
             Dictionary with various graph metrics
         """
@@ -533,21 +990,31 @@ class GraphIndex:
             for rel_type, rels in self.relationships_by_type.items()
         }
 
-        # Calculate average degree
-        total_degree = sum(
-            len(node.incoming) + len(node.outgoing)
-            for node in self.nodes.values()
-        )
-        avg_degree = total_degree / len(self.nodes) if self.nodes else 0
+        avg_degree = self.degree_total / len(self.nodes) if self.nodes else 0
 
         return {
             "total_entities": len(self.entities),
-            "total_relationships": sum(len(rels) for rels in self.relationships_by_source.values()),
+            "total_relationships": sum(relationship_type_counts.values()),
             "entity_types": entity_type_counts,
             "relationship_types": relationship_type_counts,
             "average_degree": avg_degree,
-            "isolated_entities": len([
-                node for node in self.nodes.values()
-                if not node.incoming and not node.outgoing
-            ])
+            "isolated_entities": self.isolated_count,
         }
+
+
+class ReadSnapshot(GraphTraversals):
+    """The traversal state of a :class:`GraphIndex` at one generation, frozen.
+
+    Holds ``GraphIndex.frozen_entities()`` and a ``CompactAdjacency.snapshot()``,
+    so writes to the live index never reach it and nothing else mutates it:
+    its queries may run in a worker thread while the event loop keeps writing.
+    Both share the bulk of their state with the index and copy only what
+    changed since its last compaction, so taking one is not O(V + E). Entities
+    themselves are shared; write-through replaces them rather than changing
+    them.
+    """
+
+    def __init__(self, index: GraphIndex, generation: int):
+        self.generation = generation
+        self.entities = index.frozen_entities()
+        self.adjacency = index.adjacency.snapshot()
@@ -22,38 +22,56 @@ with an application-owned service:
 3. **Generation-tagged rebuild as the safety net** -- the service remembers a
    cheap storage marker and re-reads it on every indexed read. If storage moved
    without the index being told, that is a write path which bypassed rule 2: the
-   service logs loudly and rebuilds.
+   service logs loudly and rebuilds (see DOUBLE-BUFFERED REBUILD).
 4. **One worker process** -- asserted at startup, see
    ``assert_single_worker_posture``.
 5. **Deleted entities excluded** -- tombstones are dropped at load and removed
    on write-through (see ``GraphIndex.upsert_entity``).
 
-STAGE-C NOTE ON THE GENERATION MARKER
--------------------------------------
-ADR-003 decision 3 specifies the ADR-002 ``server_seq`` as the generation tag,
-and since Stage C that is what ``StorageMarker`` carries: ``max(server_seq)``
-for entities, plus row count and ``max(updated_at)`` for
-relationships, which is one cheap aggregate query per table and is enough to
-notice any insert, update or tombstone. When ADR-002 lands, replace
-``StorageMarker``/``_read_marker`` with a single ``max(server_seq)`` read and
-compare monotonically -- the rest of this module does not change.
+GENERATION MARKER
+-----------------
+ADR-003 decision 3 specifies the ADR-002 ``server_seq`` as the generation tag.
+Entity versions and relationship writes draw their stamps from one sequence
+(``funkygibbon.repositories.sequence``), so the highest stamp in either table
+moves on every insert, update or tombstone a writer stamps. ``StorageMarker``
+keeps it next to the row count of each table and the newest relationship
+``updated_at``: a bypassing writer does not stamp, and a row it deletes or
+purges leaves the highest stamp where it was. The check is one round trip.
+
+DOUBLE-BUFFERED REBUILD
+-----------------------
+A rebuild loads a fresh *shadow* ``GraphIndex`` and then swaps its contents
+into the live one with ``GraphIndex.adopt``, a synchronous step, so a reader
+never sees a half-cleared index. Drift found on a loaded index starts that
+rebuild as a background task, in a session of its own on the same database as
+the request that noticed it; that request and every one after it keep reading
+the previous generation until the swap. Write-through keeps patching the live
+index meanwhile and logs each change, and the log is replayed onto the shadow
+before the swap so nothing written during the load is lost. Only the first
+load, with nothing to serve yet, is awaited by the readers that need it. A
+background rebuild that fails keeps the old marker and is retried after a
+backoff that doubles per consecutive failure, rather than on the next read.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import time
 from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Iterable, Optional, Sequence
+from typing import Callable, Iterable, List, Optional, Sequence
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import Entity, EntityRelationship
 from ..repositories.graph import GraphRepository
-from .index import GraphIndex
+from .analytics import AnalyticsEngine
+from .change_feed import ChangeFeed
+from .index import GraphIndex, ReadSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +81,11 @@ logger = logging.getLogger(__name__)
 # configuration in which more than one worker process is permitted.
 GRAPH_INDEX_ENABLED_ENV = "GRAPH_INDEX_ENABLED"
 
+# A failed background rebuild is retried after this long, doubling per
+# consecutive failure up to the cap.
+REBUILD_RETRY_SECONDS = 1.0
+REBUILD_RETRY_MAX_SECONDS = 300.0
+
 # Worker-count environment variables understood by uvicorn/gunicorn deployments.
 _WORKER_ENV_VARS = ("WEB_CONCURRENCY", "UVICORN_WORKERS", "GUNICORN_WORKERS")
 
@@ -111,45 +134,50 @@ def assert_single_worker_posture() -> None:
 class StorageMarker:
     """Generation tag for the index: ADR-002's ``server_seq`` (ADR-003 §3).
 
-    ``max(server_seq)`` is the generation the index was built at. It is
-    monotonic and assigned in apply order, so a single integer comparison
-    answers "has anything been written since?".
-
-    This replaces a stand-in of row counts plus ``max(updated_at)``, used while
-    ``server_seq`` did not exist. That stand-in had a real blind spot: an
-    in-place update that changed neither the row count nor a timestamp within
-    the clock's resolution was invisible to it, so drift could go undetected —
-    the exact failure it exists to catch.
-
-    Relationships are not versioned and carry no ``server_seq``, so their count
-    and ``max(updated_at)`` are still the best available signal for that table.
+    The highest ``server_seq`` in storage is the generation the index was
+    built at. It is monotonic and assigned in apply order, so it answers
+    "has anything been written since?" for every writer that stamps -- which
+    is every write path in this server.
+
+    The rest is for the writers the drift check exists to catch, which do not
+    stamp. A row deleted or purged behind the index's back leaves the highest
+    stamp unchanged but not the row count; an unstamped row inserted does the
+    same; and an edge rewritten in place by hand still moves its
+    ``updated_at``. On their own, counts and timestamps were the marker before
+    ``server_seq`` existed, and missed an in-place update within the clock's
+    resolution; next to the stamp they only have to catch what bypasses it.
     """
 
-    entity_seq: Optional[int] = None
+    seq: Optional[int] = None
+    entity_rows: int = 0
     relationship_rows: int = 0
-    latest_relationship_update: Optional[Any] = None
+    relationships_changed_at: Optional[datetime] = None
 
 
 async def _read_marker(db: AsyncSession) -> StorageMarker:
-    """Read the generation tag. Two aggregates, no row scan."""
-    entity_seq = (await db.execute(select(func.max(Entity.server_seq)))).scalar()
-    relationships = (
-        await db.execute(
-            select(func.count(EntityRelationship.id), func.max(EntityRelationship.updated_at))
-        )
-    ).one()
+    """Read the generation tag. One round trip of five aggregates."""
+    (entity_seq, relationship_seq, entity_rows, relationship_rows,
+     relationships_changed_at) = (await db.execute(select(
+        select(func.max(Entity.server_seq)).scalar_subquery(),
+        select(func.max(EntityRelationship.server_seq)).scalar_subquery(),
+        select(func.count()).select_from(Entity).scalar_subquery(),
+        select(func.count()).select_from(EntityRelationship).scalar_subquery(),
+        select(func.max(EntityRelationship.updated_at)).scalar_subquery(),
+    ))).one()
+    seq = None
+    if entity_seq is not None or relationship_seq is not None:
+        seq = max(entity_seq or 0, relationship_seq or 0)
     return StorageMarker(
-        entity_seq=entity_seq,
-        relationship_rows=relationships[0] or 0,
-        latest_relationship_update=_as_marker_value(relationships[1]),
+        seq=seq,
+        entity_rows=entity_rows,
+        relationship_rows=relationship_rows,
+        relationships_changed_at=relationships_changed_at,
     )
 
 
-def _as_marker_value(value: Any) -> Any:
-    """Normalise a timestamp aggregate so equality is stable across drivers."""
-    if isinstance(value, datetime):
-        return value.isoformat()
-    return value
+async def current_server_seq(db: AsyncSession) -> int:
+    """The highest ``server_seq`` in storage; 0 for an empty database."""
+    return (await _read_marker(db)).seq or 0
 
 
 class GraphIndexService:
@@ -161,67 +189,211 @@ class GraphIndexService:
     critical section, so it cannot interleave with another coroutine.
     """
 
-    def __init__(self, index: Optional[GraphIndex] = None, *, enabled: Optional[bool] = None):
+    def __init__(
+        self,
+        index: Optional[GraphIndex] = None,
+        *,
+        enabled: Optional[bool] = None,
+    ):
         # The index instance is created once and mutated in place forever after:
-        # rebuilds clear and refill *this* object rather than replacing it, so
-        # references handed out earlier stay valid.
+        # rebuilds load a shadow and swap its contents into *this* object rather
+        # than replacing it, so references handed out earlier stay valid.
         self.index = index if index is not None else GraphIndex()
         self.enabled = graph_index_enabled() if enabled is None else enabled
         self.loaded = False
         # Monotonic counter bumped on every write-through and every rebuild.
-        # Purely an observability hook (tests assert on it, logs report it) —
-        # drift detection uses StorageMarker's server_seq, not this.
+        # An observability hook (tests assert on it, logs report it) and the
+        # key analytics results are cached by -- drift detection uses
+        # StorageMarker's server_seq, not this.
         self.generation = 0
         self.rebuild_count = 0
+        # Wall-clock cost of the last rebuild and of all of them, load to swap.
+        self.last_rebuild_ms: Optional[float] = None
+        self.total_rebuild_ms = 0.0
+        # The background drift rebuild in flight, if any, and the write-through
+        # changes made since it started, replayed onto its shadow index.
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._replay: Optional[List[Callable[[GraphIndex], None]]] = None
+        # Consecutive background rebuild failures, and the monotonic time the
+        # rebuild they still owe may be retried (None when none is owed).
+        self._rebuild_failures = 0
+        self._retry_at: Optional[float] = None
+        # Serialises the first load: concurrent first readers await one load.
+        self._first_load = asyncio.Lock()
+        # Whole-graph analytics, recomputed in the background per generation
+        # once the application starts it (funkygibbon.graph.analytics).
+        self.analytics = AnalyticsEngine(self.index, lambda: self.generation)
+        # The last read snapshot handed out; reused until the generation moves.
+        self._snapshot: Optional[ReadSnapshot] = None
         self._marker: Optional[StorageMarker] = None
+        # Sync subscribers parked until server_seq moves (PROTOCOL.md §3.8).
+        # Published from the write-through hooks below whether or not the
+        # index itself is enabled or loaded: a subscriber is waiting on
+        # storage, not on the index.
+        self.changes = ChangeFeed()
+
+    def _advance(self) -> None:
+        """Bump the generation after the index changed."""
+        self.generation += 1
+        self.analytics.notify()
+
+    def _apply(self, change: Callable[[GraphIndex], None]) -> None:
+        """Apply a write-through change to the live index, and log it for the
+        shadow of a rebuild in flight."""
+        change(self.index)
+        if self._replay is not None:
+            self._replay.append(change)
+
+    @property
+    def rebuilding(self) -> bool:
+        """Whether a background rebuild is loading its shadow index."""
+        return self._rebuild_task is not None
 
     # ------------------------------------------------------------------
     # Load / rebuild
     # ------------------------------------------------------------------
 
     async def rebuild(self, db: AsyncSession, *, reason: str) -> None:
-        """Reload the whole index from storage, in place."""
+        """Reload the whole index from storage into a shadow, then swap it in.
+
+        The live index keeps serving, and taking write-through, until the
+        swap. Changes written through meanwhile are replayed onto the shadow
+        first; upserts and removals by id are idempotent, so a change the
+        load already saw is harmless to apply again.
+        """
         if not self.enabled:
             return
-        await self.index.load_from_storage(GraphRepository(db))
-        self._marker = await _read_marker(db)
+        started = time.perf_counter()
+        shadow = GraphIndex()
+        self._replay = []
+        try:
+            await shadow.load_from_storage(GraphRepository(db))
+            marker = await _read_marker(db)
+            for change in self._replay:
+                change(shadow)
+        finally:
+            replayed, self._replay = len(self._replay), None
+
+        self.index.adopt(shadow)
+        # A write-through during the load re-recorded the marker after its
+        # own write, as it does on the live index; keep the later of the two.
+        if self._marker is None or (self._marker.seq or 0) <= (marker.seq or 0):
+            self._marker = marker
+        self.changes.publish(self._marker.seq)
         self.loaded = True
-        self.generation += 1
+        self._advance()
+        self._rebuild_failures = 0
+        self._retry_at = None
         self.rebuild_count += 1
+        self.last_rebuild_ms = (time.perf_counter() - started) * 1000
+        self.total_rebuild_ms += self.last_rebuild_ms
         logger.info(
-            "GraphIndex rebuilt (%s): %d entities, %d edges, generation=%d",
+            "GraphIndex rebuilt (%s) in %.1fms: %d entities, %d edges, "
+            "%d changes replayed, generation=%d",
             reason,
+            self.last_rebuild_ms,
             len(self.index.entities),
             len(self.index.relationships_by_id),
+            replayed,
             self.generation,
         )
 
-    async def ensure_current(self, db: AsyncSession) -> GraphIndex:
-        """Return an index that reflects storage.
+    def _start_rebuild(self, db: AsyncSession, *, reason: str) -> None:
+        """Rebuild in a background task with its own session on ``db``'s
+        database; the request that asked does not wait for it."""
+        bind = db.bind
+
+        async def run() -> None:
+            async with AsyncSession(bind, expire_on_commit=False) as session:
+                await self.rebuild(session, reason=reason)
+
+        self._rebuild_task = asyncio.create_task(run())
+        self._rebuild_task.add_done_callback(self._rebuild_finished)
+
+    def _rebuild_finished(self, task: asyncio.Task) -> None:
+        self._rebuild_task = None
+        if task.cancelled() or task.exception() is None:
+            return
+        # Keep the marker and owe a rebuild instead: a storage error that
+        # fails every rebuild must not start another on every read.
+        self._rebuild_failures += 1
+        delay = min(
+            REBUILD_RETRY_SECONDS * 2 ** (self._rebuild_failures - 1), REBUILD_RETRY_MAX_SECONDS
+        )
+        self._retry_at = time.monotonic() + delay
+        logger.error(
+            "Background GraphIndex rebuild failed (%d in a row); retrying in %.0fs",
+            self._rebuild_failures,
+            delay,
+            exc_info=task.exception(),
+        )
+
+    async def wait_for_rebuild(self) -> None:
+        """Wait for the background rebuild in flight, if any, to swap or fail."""
+        task = self._rebuild_task
+        if task is not None:
+            await asyncio.wait([task])
+
+    async def stop(self) -> None:
+        """Cancel a background rebuild in flight (application shutdown)."""
+        task = self._rebuild_task
+        if task is not None:
+            task.cancel()
+            await asyncio.wait([task])
 
-        Loads on first use, then compares the recorded marker with storage on
-        every read. A mismatch means some write path bypassed write-through
-        (ADR-003 decision 3), which is a bug worth shouting about -- but the read
-        still gets correct data because we rebuild before returning.
+    async def ensure_current(self, db: AsyncSession) -> GraphIndex:
+        """Return the index, loading it on first use and checking for drift.
+
+        The first load is awaited; concurrent first readers share it. After
+        that the recorded marker is compared with storage on every read. A
+        mismatch means some write path bypassed write-through (ADR-003
+        decision 3), which is a bug worth shouting about. It starts a
+        background rebuild, and until that swaps in, this read and the ones
+        after it get the previous generation rather than waiting for a full
+        load. After a failed rebuild the marker check is skipped: the retry
+        is already owed and starts once its backoff has passed.
         """
         if not self.enabled:
             return self.index
 
         if not self.loaded:
-            await self.rebuild(db, reason="initial load")
+            async with self._first_load:
+                if not self.loaded:
+                    await self.rebuild(db, reason="initial load")
             return self.index
 
+        if self._rebuild_task is not None:
+            return self.index
+        if self._retry_at is not None:
+            if time.monotonic() >= self._retry_at:
+                self._start_rebuild(db, reason="retrying a failed rebuild")
+            return self.index
         current = await _read_marker(db)
-        if current != self._marker:
+        if current != self._marker and self._rebuild_task is None:
             logger.warning(
                 "GraphIndex drift detected (recorded=%s storage=%s) -- a write path "
-                "bypassed write-through (ADR-003). Rebuilding.",
+                "bypassed write-through (ADR-003). Rebuilding in the background.",
                 self._marker,
                 current,
             )
-            await self.rebuild(db, reason="drift detected")
+            self._start_rebuild(db, reason="drift detected")
         return self.index
 
+    def traversal_snapshot(self) -> ReadSnapshot:
+        """A frozen copy of the index at the current generation.
+
+        For traversals that run in a worker thread (``asyncio.to_thread``)
+        instead of on the event loop, where one long walk would stall every
+        other request. The copy is copy-on-write, costing the changes since
+        the last compaction rather than the graph, and is still taken at most
+        once per generation and shared by every reader of that generation;
+        call ``ensure_current`` first, as for the index itself.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.generation != self.generation:
+            snapshot = self._snapshot = ReadSnapshot(self.index, self.generation)
+        return snapshot
+
     # ------------------------------------------------------------------
     # Write-through
     # ------------------------------------------------------------------
@@ -233,28 +405,24 @@ class GraphIndexService:
         tombstone (``content["deleted"]``) removes the entity from the index.
         """
         if not self.enabled:
+            await self._publish(db)
             return
         if not self.loaded:
             # Nothing to patch yet: the index has never been loaded, so the
             # first read pulls this write in with everything else.
+            await self._publish(db)
             return
-        self.index.upsert_entity(entity)
-        self.generation += 1
+        self._apply(lambda index: index.upsert_entity(entity))
+        self._advance()
         await self._sync_marker(db)
 
     async def relationship_written(self, db: AsyncSession, rel: EntityRelationship) -> None:
         """Record a relationship that was just written to storage."""
-        if not self.enabled:
-            return
-        if not self.loaded:
+        if not self.enabled or not self.loaded:
+            await self._publish(db)
             return
-        # An edge is only useful once both endpoints are in the index; if one is
-        # missing (tombstoned, or not yet synced) the edge is dropped, matching
-        # what load_from_storage does.
-        if (rel.from_entity_id in self.index.entities
-                and rel.to_entity_id in self.index.entities):
-            self.index.upsert_relationship(rel)
-        self.generation += 1
+        self._apply(lambda index: _index_relationship(index, rel))
+        self._advance()
         await self._sync_marker(db)
 
     async def apply_external_writes(
@@ -274,12 +442,14 @@ class GraphIndexService:
 
         Cost is O(len(ids)) queries, not a rebuild.
         """
-        if not self.enabled:
-            return
         if not entity_ids and not relationship_ids:
             return
+        if not self.enabled:
+            await self._publish(db)
+            return
         if not self.loaded:
             # First read will load everything, including these writes.
+            await self._publish(db)
             return
 
         repo = GraphRepository(db)
@@ -287,10 +457,10 @@ class GraphIndexService:
         for entity_id in _unique(entity_ids):
             entity = await repo.get_entity(entity_id)
             if entity is None:
-                self.index.remove_entity(entity_id)
+                self._apply(lambda index, entity_id=entity_id: index.remove_entity(entity_id))
             else:
                 # upsert_entity removes tombstones and adds/replaces anything else
-                self.index.upsert_entity(entity)
+                self._apply(lambda index, entity=entity: index.upsert_entity(entity))
 
         if relationship_ids:
             wanted = set(_unique(relationship_ids))
@@ -301,15 +471,11 @@ class GraphIndexService:
             ).scalars().all()
             for rel in found:
                 wanted.discard(rel.id)
-                if (rel.from_entity_id in self.index.entities
-                        and rel.to_entity_id in self.index.entities):
-                    self.index.upsert_relationship(rel)
-                else:
-                    self.index.remove_relationship(rel.id)
+                self._apply(lambda index, rel=rel: _index_relationship(index, rel))
             for missing_id in wanted:
-                self.index.remove_relationship(missing_id)
+                self._apply(lambda index, missing_id=missing_id: index.remove_relationship(missing_id))
 
-        self.generation += 1
+        self._advance()
         await self._sync_marker(db)
         logger.debug(
             "GraphIndex write-through: %d entities, %d relationships, generation=%d",
@@ -325,6 +491,29 @@ class GraphIndexService:
         marker and rebuild -- the drift net firing on our own writes.
         """
         self._marker = await _read_marker(db)
+        self.changes.publish(self._marker.seq)
+
+    async def _publish(self, db: AsyncSession) -> None:
+        """Wake change-feed subscribers when there is no index to patch.
+
+        Costs the marker read only while someone is subscribed, so an idle
+        house with the index disabled pays nothing per write.
+        """
+        if self.changes.has_subscribers:
+            self.changes.publish((await _read_marker(db)).seq)
+
+
+def _index_relationship(index: GraphIndex, rel: EntityRelationship) -> None:
+    """Add or replace an edge, or drop it while an endpoint is missing.
+
+    An edge is only useful once both endpoints are in the index; if one is
+    missing (tombstoned, or not yet synced) the edge is dropped, matching what
+    load_from_storage does.
+    """
+    if rel.from_entity_id in index.entities and rel.to_entity_id in index.entities:
+        index.upsert_relationship(rel)
+    else:
+        index.remove_relationship(rel.id)
 
 
 def _unique(values: Iterable[str]) -> Iterable[str]:
@@ -0,0 +1,70 @@
+"""
+Trigram posting lists for substring search over entity names.
+
+``GraphIndex.find_entities_by_name(fuzzy=True)`` answers "which names contain
+this text". Testing every distinct name is O(names) per query. A
+:class:`TrigramIndex` maps each three-character window of each name to the
+names containing it. Any name containing the query contains every trigram of
+the query, so intersecting those postings, smallest first, yields a short
+candidate list. Only the candidates are checked with a real substring test,
+so results are exactly those of the scan.
+
+Queries shorter than three characters have no trigram to look up and fall
+back to the scan.
+"""
+
+from typing import Dict, Iterable, List, Set
+
+GRAM = 3
+
+
+def trigrams(text: str) -> Set[str]:
+    """Every distinct ``GRAM``-character window of ``text``."""
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class TrigramIndex:
+    """Names by trigram. Callers pass names already case-folded.
+
+    Single event loop, no lock, like the ``GraphIndex`` that owns it.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+
+    def clear(self) -> None:
+        self.postings.clear()
+
+    def add(self, name: str) -> None:
+        for gram in trigrams(name):
+            self.postings.setdefault(gram, set()).add(name)
+
+    def discard(self, name: str) -> None:
+        for gram in trigrams(name):
+            names = self.postings.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.postings[gram]
+
+    def containing(self, query: str, names: Iterable[str]) -> List[str]:
+        """The names that contain ``query``.
+
+        ``names`` is every indexed name, scanned only when ``query`` is too
+        short to have trigrams.
+        """
+        if len(query) < GRAM:
+            return [name for name in names if query in name]
+        lists = []
+        for gram in trigrams(query):
+            posting = self.postings.get(gram)
+            if not posting:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates &= posting
+            if not candidates:
+                return []
+        return [name for name in candidates if query in name]
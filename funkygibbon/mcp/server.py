@@ -6,9 +6,12 @@ as tools for AI agents and external systems.
 """
 
 from typing import Dict, Any, Optional, List
+import asyncio
 import logging
 
-from ..graph.index import GraphIndex
+from ..graph.costs import EdgeCosts, unit_cost
+from ..graph.index import GraphIndex, ReadSnapshot
+from ..models import RelationshipType
 from ..repositories.graph_impl import SQLGraphOperations
 from .tools import MCP_TOOLS
 
@@ -17,10 +20,18 @@ logger = logging.getLogger(__name__)
 
 
 class FunkyGibbonMCPServer:
-    """MCP server exposing graph operations"""
+    """MCP server exposing graph operations.
 
-    def __init__(self, graph_index: GraphIndex, graph_ops: SQLGraphOperations):
+    Writes patch the live ``graph_index``. Traversals read ``snapshot``, a
+    ``ReadSnapshot`` of it, and the heavy ones (k-shortest paths, the
+    whole-graph cycle search) run in a worker thread against it, as the graph
+    router's do, so they never hold the event loop.
+    """
+
+    def __init__(self, graph_index: GraphIndex, graph_ops: SQLGraphOperations,
+                 snapshot: ReadSnapshot):
         self.graph = graph_index
+        self.snapshot = snapshot
         self.graph_ops = graph_ops
         self.tools = {tool["name"]: tool for tool in MCP_TOOLS}
 
@@ -150,14 +161,102 @@ class FunkyGibbonMCPServer:
         self,
         from_entity_id: str,
         to_entity_id: str,
-        max_depth: int = 10
+        max_depth: int = 10,
+        direction: str = "outgoing",
+        relationship_types: Optional[List[str]] = None,
+        weighted: bool = False,
+        k: int = 1
     ) -> Dict[str, Any]:
-        """Find path between entities"""
-        result = await self.graph_ops.find_path_tool(from_entity_id, to_entity_id, max_depth)
-        if result.success:
-            return result.result
-        else:
-            raise Exception(result.error)
+        """Find path between entities.
+
+        Answered from the index snapshot in a worker thread; the index supports
+        the direction and relationship-type options. Storage is only asked when
+        the index does not hold the source (index disabled), and its BFS is
+        outgoing-only and unfiltered.
+        """
+        graph = self.snapshot
+        if from_entity_id not in graph.entities:
+            if direction != "outgoing" or relationship_types or weighted or k > 1:
+                raise Exception("direction, relationship_types, weighted and k need the graph index")
+            result = await self.graph_ops.find_path_tool(from_entity_id, to_entity_id, max_depth)
+            if result.success:
+                return result.result
+            else:
+                raise Exception(result.error)
+
+        rel_types = [RelationshipType(t) for t in relationship_types] if relationship_types else None
+        if weighted or k > 1:
+            routes = await asyncio.to_thread(
+                graph.find_weighted_paths,
+                from_entity_id,
+                to_entity_id,
+                k=max(1, min(k, 10)),
+                costs=EdgeCosts() if weighted else unit_cost,
+                max_depth=max_depth,
+                direction=direction,
+                rel_types=rel_types,
+            )
+            paths = [
+                {
+                    "path": self._path_summary(route["path"]),
+                    "relationship_types": [r.relationship_type.value for r in route["relationships"]],
+                    "length": len(route["path"]) - 1,
+                    "cost": route["cost"]
+                }
+                for route in routes
+            ]
+            return {
+                "from": from_entity_id,
+                "to": to_entity_id,
+                "path": paths[0]["path"] if paths else [],
+                "length": paths[0]["length"] if paths else 0,
+                "cost": paths[0]["cost"] if paths else None,
+                "found": bool(paths),
+                "paths": paths
+            }
+
+        path = await asyncio.to_thread(
+            graph.find_path,
+            from_entity_id,
+            to_entity_id,
+            max_depth,
+            direction=direction,
+            rel_types=rel_types,
+        )
+        return {
+            "from": from_entity_id,
+            "to": to_entity_id,
+            "path": self._path_summary(path),
+            "length": max(len(path) - 1, 0),
+            "found": bool(path)
+        }
+
+    async def _handle_find_cycles(
+        self,
+        relationship_types: Optional[List[str]] = None,
+        max_length: Optional[int] = None,
+        max_cycles: int = 100
+    ) -> Dict[str, Any]:
+        """Find loops anywhere in the graph, from the index snapshot in a worker thread."""
+        found = await asyncio.to_thread(
+            self.snapshot.find_all_cycles,
+            [RelationshipType(t) for t in relationship_types] if relationship_types else None,
+            max_length=None if max_length is None else max(1, min(max_length, 20)),
+            max_cycles=max(1, min(max_cycles, 1000)),
+        )
+        return {
+            "cycles": [
+                {"path": self._path_summary(cycle), "length": len(cycle) - 1}
+                for cycle in found["cycles"]
+            ],
+            "count": len(found["cycles"]),
+            "complete": found["complete"],
+            "components": [len(component) for component in found["components"]]
+        }
+
+    def _path_summary(self, path: List[str]) -> List[Dict[str, Any]]:
+        entities = [self.snapshot.entities[entity_id] for entity_id in path]
+        return [{"id": e.id, "name": e.name, "type": e.entity_type.value} for e in entities]
 
     async def _handle_get_entity_details(
         self,
@@ -170,7 +269,7 @@ class FunkyGibbonMCPServer:
         if result.success:
             # Add connected entities if requested
             if include_connected:
-                connected = self.graph.get_connected_entities(entity_id)
+                connected = self.snapshot.get_connected_entities(entity_id)
                 result.result["connected_entities"] = [
                     {
                         "entity": conn["entity"].to_dict(),
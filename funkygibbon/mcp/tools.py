@@ -151,11 +151,59 @@ MCP_TOOLS: List[Dict[str, Any]] = [
                     "type": "integer",
                     "description": "Maximum search depth (default: 10)",
                     "default": 10
+                },
+                "direction": {
+                    "type": "string",
+                    "enum": ["outgoing", "undirected"],
+                    "description": "Follow relationships source-to-target only, or either way",
+                    "default": "outgoing"
+                },
+                "relationship_types": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only traverse relationships of these types"
+                },
+                "weighted": {
+                    "type": "boolean",
+                    "description": "Rank routes by relationship type and properties "
+                                   "(e.g. prefer doors over windows) instead of hop count",
+                    "default": False
+                },
+                "k": {
+                    "type": "integer",
+                    "description": "Number of alternative routes to return, cheapest first (default: 1)",
+                    "default": 1
                 }
             },
             "required": ["from_entity_id", "to_entity_id"]
         }
     },
+    {
+        "name": "find_cycles",
+        "description": "Find loops anywhere in the graph, such as automations that "
+                       "trigger each other in a feedback loop",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "relationship_types": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only follow relationships of these types "
+                                   "(e.g. controls, triggered_by, automates)"
+                },
+                "max_length": {
+                    "type": "integer",
+                    "description": "Longest loop to report, in hops (default: any)"
+                },
+                "max_cycles": {
+                    "type": "integer",
+                    "description": "Maximum number of loops to return (default: 100)",
+                    "default": 100
+                }
+            },
+            "required": []
+        }
+    },
     {
         "name": "get_entity_details",
         "description": "Get detailed information about an entity",
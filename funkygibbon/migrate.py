@@ -35,6 +35,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+from inbetweenies.models.buckets import bucket_of
+
 # A stray Z immediately after a ±HH:MM UTC offset is the doubled-Z bug.
 _DOUBLED_Z = re.compile(r"([+-]\d{2}:\d{2})Z")
 
@@ -214,6 +216,8 @@ def run_migration(conn: sqlite3.Connection, *, apply: bool) -> Dict[str, int]:
         )
 
     stats.update(_backfill_access_columns(cur))
+    stats.update(_backfill_relationship_seq(cur))
+    stats.update(_backfill_digest_buckets(cur))
 
     if apply:
         conn.commit()
@@ -266,6 +270,14 @@ def _backfill_access_columns(cur) -> Dict[str, int]:
         )
     stats["server_seq_set"] = len(rows)
 
+    # The running state digest (ADR-011 §4) and the server_seq counter were
+    # stamped against the old server_seq values. Drop both; the server
+    # rebuilds the digest on first read and reseeds the counter on first write.
+    if _has_table(cur, "replication_state"):
+        cur.execute("DELETE FROM replication_state")
+    if _has_table(cur, "sequence_counters"):
+        cur.execute("DELETE FROM sequence_counters")
+
     # Indexes are created by SQLAlchemy's metadata on a fresh database; add them
     # here for a file that predates them.
     cur.execute("CREATE INDEX IF NOT EXISTS ix_entities_is_latest_server_seq "
@@ -276,6 +288,71 @@ def _backfill_access_columns(cur) -> Dict[str, int]:
     return stats
 
 
+def _backfill_relationship_seq(cur) -> Dict[str, int]:
+    """Add and populate entity_relationships.server_seq (PROTOCOL.md §3.5).
+
+    Runs after the entity backfill above and continues its numbering, so every
+    existing edge sorts after every existing entity version -- in particular
+    after the endpoints it references. Insertion order (rowid) stands in for
+    write order among the edges themselves; like the entity backfill, exact
+    history is unrecoverable and uniqueness and monotonicity are what matter.
+    """
+    existing = {row[1] for row in
+                cur.execute("PRAGMA table_info(entity_relationships)").fetchall()}
+    if "server_seq" not in existing:
+        cur.execute("ALTER TABLE entity_relationships ADD COLUMN server_seq INTEGER")
+
+    base = cur.execute("SELECT COALESCE(MAX(server_seq), 0) FROM entities").fetchone()[0]
+    ids = [row[0] for row in
+           cur.execute("SELECT id FROM entity_relationships ORDER BY rowid").fetchall()]
+    cur.executemany(
+        "UPDATE entity_relationships SET server_seq = ? WHERE id = ?",
+        [(base + offset, rid) for offset, rid in enumerate(ids, start=1)],
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_entity_relationships_server_seq "
+                "ON entity_relationships (server_seq)")
+    # The counter was dropped by the entity backfill; it reseeds from the
+    # highest stamp in either table on the next write.
+    return {"relationship_server_seq_set": len(ids)}
+
+
+def _backfill_digest_buckets(cur) -> Dict[str, int]:
+    """Add and populate entities.id_bucket, the state-digest tree leaf (§3.4).
+
+    Idempotent like the backfill above. The value is a pure function of the
+    id, so recomputing it for every row is always safe. The per-bucket sums
+    are dropped rather than recomputed here: the server rebuilds them, with
+    the rest of the running digest, on first read.
+    """
+    existing = {row[1] for row in cur.execute("PRAGMA table_info(entities)").fetchall()}
+    if "id_bucket" not in existing:
+        cur.execute("ALTER TABLE entities ADD COLUMN id_bucket VARCHAR(8)")
+
+    ids = [row[0] for row in cur.execute("SELECT DISTINCT id FROM entities").fetchall()]
+    cur.executemany(
+        "UPDATE entities SET id_bucket = ? WHERE id = ?",
+        [(bucket_of(eid), eid) for eid in ids],
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_entities_id_bucket "
+                "ON entities (id_bucket, is_latest)")
+    if _has_table(cur, "replication_buckets"):
+        cur.execute("DELETE FROM replication_buckets")
+    if _has_table(cur, "replication_state"):
+        cur.execute("DELETE FROM replication_state")
+        # The legacy-digest memo column, for a table that predates it.
+        columns = {row[1] for row in
+                   cur.execute("PRAGMA table_info(replication_state)").fetchall()}
+        if "sorted_hash" not in columns:
+            cur.execute("ALTER TABLE replication_state ADD COLUMN sorted_hash VARCHAR(64)")
+    return {"id_bucket_set": len(ids)}
+
+
+def _has_table(cur, name: str) -> bool:
+    return cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
 def backup_db(db_path: Path) -> Path:
     """Copy the database (and any -wal/-shm) to a timestamped backup."""
     stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
@@ -25,6 +25,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy import text
 
 from inbetweenies.models import Base, Entity, EntityType, SourceType, EntityRelationship, RelationshipType, Blob, BlobType, BlobStatus
+from funkygibbon.repositories.sequence import SequenceAllocator
 
 # Default database URL - can be overridden by environment variable
 # Use 'or' to handle empty string case
@@ -48,6 +49,10 @@ class GraphPopulator:
             # Clear in reverse dependency order
             await conn.execute(text("DELETE FROM entity_relationships"))
             await conn.execute(text("DELETE FROM entities"))
+            # The running state digest describes the rows just deleted; the
+            # next sync rebuilds it from what this script inserts.
+            await conn.execute(text("DELETE FROM replication_state"))
+            await conn.execute(text("DELETE FROM sequence_counters"))
             # Try to clear blobs table if it exists
             try:
                 await conn.execute(text("DELETE FROM blobs"))
@@ -624,6 +629,16 @@ class GraphPopulator:
             await self.create_relationship(session, blower_photo_note, pvfy_blower, RelationshipType.HAS_BLOB,
                                          {"blob_type": "photo"})
 
+            # Stamp server_seq (ADR-002 §2) in creation order, one range for
+            # the whole script, so the delta cursor sees these rows. Every
+            # edge was created after both its endpoints, so it sorts after them.
+            with session.no_autoflush:
+                created = [obj for obj in session.new
+                           if isinstance(obj, (Entity, EntityRelationship))]
+                first_seq = await SequenceAllocator(session).allocate(len(created))
+            for offset, row in enumerate(created):
+                row.server_seq = first_seq + offset
+
             # Commit all changes
             await session.commit()
 
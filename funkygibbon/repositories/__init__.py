@@ -6,9 +6,13 @@ Graph-based repositories only.
 
 from .base import BaseRepository, ConflictResolver
 from .graph import GraphRepository
+from .replication import ReplicationStateRepository
+from .sequence import SequenceAllocator
 
 __all__ = [
     "BaseRepository",
     "ConflictResolver",
     "GraphRepository",
+    "ReplicationStateRepository",
+    "SequenceAllocator",
 ]
@@ -5,16 +5,32 @@ This module provides the repository pattern implementation for graph operations,
 handling storage and retrieval of entities and relationships.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Type
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy import and_, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, raiseload, selectinload
 
 from ..models import Entity, EntityType, EntityRelationship, RelationshipType
 from .base import BaseRepository
+from .replication import ReplicationStateRepository
+from .sequence import SequenceAllocator
+
+# The columns the in-memory graph index keeps per row: everything to_dict()
+# and traversal read, none of the ORM relationship collections.
+INDEX_ENTITY_COLUMNS = (
+    "id", "version", "entity_type", "name", "content", "source_type", "user_id",
+    "parent_versions", "is_latest", "server_seq", "created_at", "updated_at",
+)
+INDEX_RELATIONSHIP_COLUMNS = (
+    "id", "from_entity_id", "from_entity_version", "to_entity_id", "to_entity_version",
+    "relationship_type", "properties", "user_id", "server_seq", "created_at", "updated_at",
+)
+
+# Rows fetched per round trip when streaming the index load.
+INDEX_LOAD_BATCH_SIZE = 1000
 
 
 class GraphRepository(BaseRepository[Entity]):
@@ -48,22 +64,30 @@ class GraphRepository(BaseRepository[Entity]):
         # the INSERT rather than by __init__. A plain `if entity.is_latest:`
         # therefore skips the demotion for exactly the common case — a new
         # version — and leaves two rows marked current.
+        demoted: List[str] = []
         if entity.is_latest is not False:
             entity.is_latest = True
             # Demote the incumbent in the same transaction as the insert.
-            await self.db.execute(
+            result = await self.db.execute(
                 update(Entity)
                 .where(Entity.id == entity.id,
                        Entity.version != entity.version,
                        Entity.is_latest.is_(True))
                 .values(is_latest=False)
+                .returning(Entity.version)
             )
+            demoted = list(result.scalars().all())
         if entity.server_seq is None:
-            next_seq = (await self.db.execute(select(func.max(Entity.server_seq)))).scalar()
-            entity.server_seq = (next_seq or 0) + 1
+            entity.server_seq = await SequenceAllocator(self.db).allocate()
 
         self.db.add(entity)
         await self.db.flush()
+        # Same rule as is_latest: the state digest (ADR-011 §4) is maintained
+        # by every writer, or the drift check has to rebuild it from scratch.
+        await ReplicationStateRepository(self.db).record_version(
+            entity.id, entity.version, entity.server_seq,
+            is_latest=entity.is_latest, demoted_versions=demoted,
+        )
         return entity
 
     async def get_entity(self, entity_id: str, version: Optional[str] = None) -> Optional[Entity]:
@@ -156,6 +180,9 @@ class GraphRepository(BaseRepository[Entity]):
         # Generate ID if not provided
         if not relationship.id:
             relationship.id = str(uuid4())
+        # Same replication axis as entity versions, so the sync feed serves
+        # this edge past any cursor taken before it (ADR-002 §2).
+        relationship.server_seq = await SequenceAllocator(self.db).allocate()
 
         self.db.add(relationship)
         await self.db.flush()
@@ -228,6 +255,61 @@ class GraphRepository(BaseRepository[Entity]):
 
         return relationships
 
+    async def stream_index_entities(
+        self, batch_size: int = INDEX_LOAD_BATCH_SIZE
+    ) -> AsyncIterator[Entity]:
+        """
+        Stream every latest entity version, for a full graph index load.
+
+        One query over ``is_latest`` that loads only ``INDEX_ENTITY_COLUMNS``
+        and is read ``batch_size`` rows at a time, instead of one query per
+        entity type that also selectin-loads both relationship collections
+        the index never reads. Relationship attributes raise if touched.
+
+        Args:
+            batch_size: Rows per fetch
+
+        Yields:
+            Latest entity versions, tombstones included
+        """
+        stmt = select(Entity).where(Entity.is_latest.is_(True))
+        async for entity in self._stream_lean(Entity, INDEX_ENTITY_COLUMNS, stmt, batch_size):
+            yield entity
+
+    async def stream_index_relationships(
+        self, batch_size: int = INDEX_LOAD_BATCH_SIZE
+    ) -> AsyncIterator[EntityRelationship]:
+        """
+        Stream every relationship, for a full graph index load.
+
+        As ``stream_index_entities``; unlike ``get_relationships`` the
+        endpoint entities are not loaded alongside.
+
+        Args:
+            batch_size: Rows per fetch
+
+        Yields:
+            Relationships
+        """
+        stmt = select(EntityRelationship)
+        async for rel in self._stream_lean(
+            EntityRelationship, INDEX_RELATIONSHIP_COLUMNS, stmt, batch_size
+        ):
+            yield rel
+
+    async def _stream_lean(
+        self, model: Type, columns: Sequence[str], stmt, batch_size: int
+    ) -> AsyncIterator[Any]:
+        # Consumed a partition at a time: one greenlet hop per batch rather
+        # than per row, which is most of the cost of iterating row by row.
+        stmt = stmt.options(
+            load_only(*[getattr(model, name) for name in columns]), raiseload("*")
+        ).execution_options(yield_per=batch_size)
+        result = await self.db.stream(stmt)
+        async for partition in result.scalars().partitions():
+            for row in partition:
+                yield row
+
     async def search_entities(
         self,
         query: str,
@@ -13,6 +13,7 @@ from sqlalchemy.orm import selectinload
 from inbetweenies.graph import GraphOperations, GraphSearch
 from inbetweenies.mcp import MCPTools
 from inbetweenies.models import Entity, EntityType, EntityRelationship, RelationshipType, SourceType
+from .graph import GraphRepository
 
 
 class SQLGraphOperations(MCPTools):
@@ -28,10 +29,13 @@ class SQLGraphOperations(MCPTools):
         self.db = db
 
     async def store_entity(self, entity: Entity) -> Entity:
-        """Store an entity in the database"""
-        self.db.add(entity)
-        await self.db.flush()
-        return entity
+        """Store an entity in the database.
+
+        Delegates to GraphRepository.store_entity so MCP writes maintain
+        is_latest, server_seq and the state digest like every other writer
+        (ADR-002 §1, ADR-011 §4) instead of inserting a bare row.
+        """
+        return await GraphRepository(self.db).store_entity(entity)
 
     async def get_entity(self, entity_id: str, version: Optional[str] = None) -> Optional[Entity]:
         """Get an entity by ID and optional version"""
@@ -96,16 +100,13 @@ class SQLGraphOperations(MCPTools):
         return list(result.scalars().all())
 
     async def store_relationship(self, relationship: EntityRelationship) -> EntityRelationship:
-        """Store a relationship in the database"""
-        from uuid import uuid4
-
-        # Generate ID if not provided
-        if not relationship.id:
-            relationship.id = str(uuid4())
+        """Store a relationship in the database.
 
-        self.db.add(relationship)
-        await self.db.flush()
-        return relationship
+        Delegates to GraphRepository.store_relationship for the same reason as
+        store_entity: the edge is stamped with server_seq like every other
+        write, so the sync feed and the index drift check both see it.
+        """
+        return await GraphRepository(self.db).store_relationship(relationship)
 
     async def get_relationships(
         self,
@@ -0,0 +1,253 @@
+"""
+Replication State Repository
+
+Maintains the incremental state digest (ADR-011 §4) in the ``replication_state``
+singleton row, so a sync response costs one primary-key read for its digest
+instead of a scan and re-hash of every current row. The same writes keep one
+sum per leaf of the digest tree in ``replication_buckets`` (PROTOCOL.md §3.4).
+"""
+
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from inbetweenies.models import Entity, ReplicationBucket, ReplicationState
+from inbetweenies.sync.digest import (
+    bucket_leaves, bucket_of, combine, entry_hash, format_sum, parse_sum,
+    sorted_digest, subtree_digests,
+)
+from .sequence import SequenceAllocator
+
+
+logger = logging.getLogger(__name__)
+
+class ReplicationStateRepository:
+    """Owns the ``replication_state`` row.
+
+    Every writer that inserts an Entity version calls :meth:`record_version`
+    in the same transaction, after flushing the row. The digest then moves
+    with the data it describes: a rolled-back push rolls back its digest
+    update too, and there is no window where one is committed without the
+    other.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Initialize with database session"""
+        self.db = db
+
+    async def record_version(
+        self,
+        entity_id: str,
+        version: str,
+        server_seq: int,
+        *,
+        is_latest: bool,
+        demoted_versions: Iterable[str] = (),
+    ) -> None:
+        """Fold one inserted version into the digest.
+
+        Args:
+            server_seq: the stamp allocated to the inserted row. Recorded even
+                for a non-latest row: the set is unchanged, but the drift
+                check compares against max(server_seq), which did move.
+            is_latest: whether the inserted row became current.
+            demoted_versions: versions of this id the insert demoted, as
+                returned by the demoting UPDATE.
+
+        Does NOT flush or commit; it rides the caller's transaction.
+        """
+        await self.record_batch(
+            added=[(entity_id, version)] if is_latest else [],
+            removed=[(entity_id, v) for v in demoted_versions],
+            server_seq=server_seq,
+        )
+
+    async def record_batch(
+        self,
+        *,
+        added: Iterable[Tuple[str, str]],
+        removed: Iterable[Tuple[str, str]],
+        server_seq: int,
+    ) -> None:
+        """Fold a whole batch of inserts and demotions into the digest at once.
+
+        Args:
+            added: (id, version) pairs that became current.
+            removed: (id, version) pairs that stopped being current.
+            server_seq: the highest stamp the batch allocated.
+
+        A constant number of statements however large the batch: one read of
+        the state row, one read of the touched buckets, and one write each.
+        Call it after the batch's rows are flushed.
+        """
+        row = (await self.db.execute(
+            select(ReplicationState.state_hash)
+            .where(ReplicationState.id == ReplicationState.SINGLETON_ID)
+        )).first()
+        if row is None:
+            # First write against a database that predates this table (or was
+            # restored without it). The inserted rows are already flushed, so
+            # a rebuild from the table includes them.
+            await self.rebuild()
+            return
+
+        added_by_bucket: Dict[str, List[int]] = {}
+        removed_by_bucket: Dict[str, List[int]] = {}
+        for pairs, by_bucket in ((added, added_by_bucket), (removed, removed_by_bucket)):
+            for entity_id, version in pairs:
+                by_bucket.setdefault(bucket_of(entity_id), []).append(
+                    entry_hash(entity_id, version)
+                )
+
+        accumulator = combine(
+            parse_sum(row.state_hash),
+            [h for hashes in added_by_bucket.values() for h in hashes],
+            [h for hashes in removed_by_bucket.values() for h in hashes],
+        )
+        await self.db.execute(
+            update(ReplicationState)
+            .where(ReplicationState.id == ReplicationState.SINGLETON_ID)
+            .values(state_hash=format_sum(accumulator), state_seq=server_seq,
+                    sorted_hash=None)
+        )
+        await self._adjust_buckets(added_by_bucket, removed_by_bucket)
+
+    async def digest(self) -> str:
+        """The ``sha256-sum`` state digest, repaired if it has drifted.
+
+        Two indexed point reads. If ``state_seq`` disagrees with
+        ``max(server_seq)`` some writer inserted a version without calling
+        :meth:`record_version`; the digest is recomputed from the table and
+        the discrepancy logged, because serving a stale digest would tell
+        every client it has diverged when it has not.
+        """
+        row = (await self.db.execute(
+            select(ReplicationState.state_hash, ReplicationState.state_seq)
+            .where(ReplicationState.id == ReplicationState.SINGLETON_ID)
+        )).first()
+        max_seq = await self._max_server_seq()
+        if row is not None and row.state_seq == max_seq:
+            return row.state_hash
+        if row is not None:
+            logger.warning(
+                "State digest drifted (state_seq=%s, max server_seq=%s); rebuilding",
+                row.state_seq, max_seq,
+            )
+        return await self.rebuild()
+
+    async def sorted_digest(self) -> str:
+        """The legacy ``sha256-sorted`` digest, for clients without the capability.
+
+        O(N) the first time a given state is asked for, O(1) after that: the
+        result is kept in the state row, which every write clears, so a client
+        that does not speak the sum capability is served from it for as long
+        as nothing changes -- the common case for a poll.
+
+        Does NOT commit; the memo rides the caller's transaction.
+        """
+        await self.digest()  # repairs the state row first, if anything drifted
+        cached = (await self.db.execute(
+            select(ReplicationState.sorted_hash)
+            .where(ReplicationState.id == ReplicationState.SINGLETON_ID)
+        )).scalar()
+        if cached is None:
+            cached = sorted_digest(await self._current_pairs())
+            await self.db.execute(
+                update(ReplicationState)
+                .where(ReplicationState.id == ReplicationState.SINGLETON_ID)
+                .values(sorted_hash=cached)
+            )
+        return cached
+
+    async def tree_node(self, prefix: str) -> Tuple[str, Dict[str, str]]:
+        """Digest of one node of the bucket tree and of its non-empty children.
+
+        Reads only ``replication_buckets`` rows under ``prefix`` -- at most
+        4096 for the root, one for a leaf -- never the entities table.
+        """
+        await self.digest()  # repairs the buckets too, if anything drifted
+        result = await self.db.execute(
+            select(ReplicationBucket.bucket, ReplicationBucket.state_hash)
+            .where(ReplicationBucket.bucket.startswith(prefix, autoescape=True))
+        )
+        leaves = {bucket: parse_sum(state_hash) for bucket, state_hash in result.all()}
+        return subtree_digests(leaves, prefix)
+
+    async def bucket_entities(self, bucket: str) -> List[Entity]:
+        """The current rows of one leaf bucket, via ix_entities_id_bucket."""
+        result = await self.db.execute(
+            select(Entity)
+            .where(Entity.id_bucket == bucket, Entity.is_latest.is_(True))
+            .order_by(Entity.id)
+        )
+        return list(result.scalars().all())
+
+    async def rebuild(self) -> str:
+        """Recompute the digest and its buckets from the table and store them. O(N).
+
+        Does NOT commit; it rides the caller's transaction.
+        """
+        leaves = bucket_leaves(await self._current_pairs())
+        state_hash = format_sum(combine(0, leaves.values()))
+        await self.db.execute(delete(ReplicationBucket))
+        if leaves:
+            await self.db.execute(insert(ReplicationBucket), [
+                {"bucket": bucket, "state_hash": format_sum(value)}
+                for bucket, value in leaves.items()
+            ])
+        await self.db.execute(
+            delete(ReplicationState)
+            .where(ReplicationState.id == ReplicationState.SINGLETON_ID)
+        )
+        max_seq = await self._max_server_seq()
+        await self.db.execute(insert(ReplicationState).values(
+            id=ReplicationState.SINGLETON_ID,
+            state_hash=state_hash,
+            state_seq=max_seq,
+        ))
+        # A writer that bypassed the digest most likely bypassed the allocator
+        # too; without this the next allocation would reuse its stamps.
+        await SequenceAllocator(self.db).advance_to(max_seq)
+        return state_hash
+
+    async def _adjust_buckets(self, added: Dict[str, List[int]],
+                              removed: Dict[str, List[int]]) -> None:
+        touched = set(added) | set(removed)
+        if not touched:
+            return
+        result = await self.db.execute(
+            select(ReplicationBucket.bucket, ReplicationBucket.state_hash)
+            .where(ReplicationBucket.bucket.in_(touched))
+        )
+        stored = {bucket: parse_sum(state_hash) for bucket, state_hash in result.all()}
+
+        updates, inserts = [], []
+        for bucket in sorted(touched):
+            value = format_sum(combine(
+                stored.get(bucket, 0), added.get(bucket, ()), removed.get(bucket, ())
+            ))
+            if bucket in stored:
+                updates.append({"b_bucket": bucket, "b_hash": value})
+            else:
+                inserts.append({"bucket": bucket, "state_hash": value})
+        if updates:
+            await self.db.execute(
+                update(ReplicationBucket.__table__)
+                .where(ReplicationBucket.__table__.c.bucket == bindparam("b_bucket"))
+                .values(state_hash=bindparam("b_hash")),
+                updates,
+            )
+        if inserts:
+            await self.db.execute(insert(ReplicationBucket), inserts)
+
+    async def _current_pairs(self):
+        result = await self.db.execute(
+            select(Entity.id, Entity.version).where(Entity.is_latest.is_(True))
+        )
+        return [(entity_id, version) for entity_id, version in result.all()]
+
+    async def _max_server_seq(self) -> int:
+        result = await self.db.execute(select(func.max(Entity.server_seq)))
+        return result.scalar() or 0
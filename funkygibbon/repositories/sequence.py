@@ -0,0 +1,87 @@
+"""
+Sequence Allocator
+
+Hands out ``server_seq`` stamps (ADR-002 §2) from the persisted counter in
+``sequence_counters``. Every writer used to run ``max(server_seq) + 1`` for
+each row it inserted: one aggregate per row, and a bulk write paid it N times.
+A writer now reserves the whole range it needs with one
+``UPDATE ... RETURNING``.
+
+Entity versions and relationship writes draw from the one sequence, so a
+single cursor orders both tables and an edge is always stamped after the
+endpoint versions it references.
+"""
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from inbetweenies.models import Entity, EntityRelationship, SequenceCounter
+
+
+SERVER_SEQ = "server_seq"
+
+
+class SequenceAllocator:
+    """Allocates contiguous ranges of a named sequence.
+
+    The counter row is updated in the caller's transaction, so the stamps a
+    transaction takes are exactly the stamps it commits: a rollback returns
+    its range, and the next writer starts where the last committed one
+    stopped. Stamps are therefore gap-free per commit, which is what lets a
+    delta cursor stay exact. The UPDATE takes SQLite's write lock, but so
+    does the insert it stamps; concurrent writers were already serialised on
+    that and are not serialised any further by the counter.
+    """
+
+    def __init__(self, db: AsyncSession, name: str = SERVER_SEQ):
+        """Initialize with database session"""
+        self.db = db
+        self.name = name
+
+    async def allocate(self, count: int = 1) -> int:
+        """Reserve ``count`` consecutive stamps and return the first.
+
+        One statement in the steady state. The first allocation against a
+        database that has no counter row (new, migrated, or restored without
+        it) seeds the row from ``max(server_seq)``, once.
+
+        Does NOT flush or commit; it rides the caller's transaction.
+        """
+        if count < 1:
+            raise ValueError(f"count must be positive, got {count}")
+        result = await self.db.execute(
+            update(SequenceCounter)
+            .where(SequenceCounter.name == self.name)
+            .values(value=SequenceCounter.value + count)
+            .returning(SequenceCounter.value)
+        )
+        last = result.scalar()
+        if last is None:
+            last = await self._high_water() + count
+            await self.db.execute(insert(SequenceCounter).values(name=self.name, value=last))
+        return last - count + 1
+
+    async def advance_to(self, value: int) -> None:
+        """Move the counter forward to at least ``value``; never backwards.
+
+        For the drift repair in ReplicationStateRepository: a writer that
+        stamped rows without allocating leaves the counter behind the table,
+        and the next allocation would reuse its stamps.
+        """
+        await self.db.execute(
+            update(SequenceCounter)
+            .where(SequenceCounter.name == self.name, SequenceCounter.value < value)
+            .values(value=value)
+        )
+
+    async def _high_water(self) -> int:
+        result = await self.db.execute(_high_water_query())
+        return max(value or 0 for value in result.one())
+
+
+def _high_water_query():
+    """Highest stamp in either table, as one row of two scalar subqueries."""
+    return select(
+        select(func.max(Entity.server_seq)).scalar_subquery(),
+        select(func.max(EntityRelationship.server_seq)).scalar_subquery(),
+    )
@@ -209,6 +209,39 @@ async def test_tombstoned_entity_drops_out_of_traversal(async_client, auth, warm
     assert warm_index.rebuild_count == rebuilds_before
 
 
+@pytest.mark.asyncio
+async def test_analytics_follow_the_index_generation(async_client, auth, warm_index):
+    """Analytics are cached per generation: a write makes them stale until the
+    next run, and /graph/statistics carries the headline."""
+    hub = await _create_entity(async_client, auth, "Analytics Hub")
+    lamp = await _create_entity(async_client, auth, "Analytics Lamp")
+    await _create_relationship(async_client, auth, hub, lamp)
+
+    resp = await async_client.get(
+        f"{API}/graph/analytics", headers=auth, params={"wait": True, "entity_id": lamp["id"]}
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["status"] == "current"
+    assert body["generation"] == warm_index.generation
+    assert body["entity"]["authorities"] > 0
+    assert body["entity"]["component_size"] >= 2
+
+    stats = (await async_client.get(f"{API}/graph/statistics", headers=auth)).json()
+    assert stats["analytics"]["generation"] == warm_index.generation
+    assert stats["analytics"]["current"] is True
+
+    await _create_entity(async_client, auth, "Analytics Latecomer")
+    stale = (await async_client.get(f"{API}/graph/analytics", headers=auth)).json()
+    assert stale["status"] == "stale"
+    assert stale["generation"] < stale["index_generation"]
+
+    missing = await async_client.get(
+        f"{API}/graph/analytics", headers=auth, params={"wait": True, "entity_id": "no-such-entity"}
+    )
+    assert missing.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_index_is_owned_by_the_application(async_client, app, auth):
     """The index serving requests is the one on app.state -- no hidden global."""
@@ -333,14 +366,22 @@ async def test_write_bypassing_the_index_is_repaired_by_drift_detection(
     ))
     await test_session.commit()
 
-    path = await async_client.post(
-        f"{API}/graph/path",
-        headers=auth,
-        json={"from_entity_id": hub["id"], "to_entity_id": rogue.id, "max_depth": 5},
-    )
+    request = {"from_entity_id": hub["id"], "to_entity_id": rogue.id, "max_depth": 5}
+    # The read that notices drift is served the previous generation at once
+    # while the rebuild loads in the background.
+    stale = await async_client.post(f"{API}/graph/path", headers=auth, json=request)
+    assert stale.status_code == 200
+    await service.wait_for_rebuild()
+
+    path = await async_client.post(f"{API}/graph/path", headers=auth, json=request)
     assert path.json()["found"] is True, "drift check must repair a bypassed write"
     assert service.rebuild_count == rebuilds_before + 1
 
+    stats = (await async_client.get(f"{API}/graph/statistics", headers=auth)).json()
+    assert stats["index"]["rebuilds"] == service.rebuild_count
+    assert stats["index"]["rebuilding"] is False
+    assert stats["index"]["last_rebuild_ms"] > 0
+
 
 @pytest.mark.asyncio
 async def test_sync_applied_entity_is_immediately_traversable(
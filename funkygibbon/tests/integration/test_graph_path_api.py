@@ -0,0 +1,274 @@
+"""
+Path search options on `/graph/path` and the `find_path` MCP tool, and the
+batch queries (`/graph/paths`, `/graph/distances`, `/graph/reachable`),
+weighted / k-shortest routes, whole-graph cycle detection (`/graph/cycles`
+and the `find_cycles` MCP tool), and the streamed k-hop neighbourhood
+(`/graph/entities/{id}/subgraph`).
+
+Both run the index's bidirectional BFS, with `direction` ("outgoing" or
+"undirected") and a `relationship_types` filter. The fixture house is a lamp
+and a sensor LOCATED_IN one room: there is no outgoing path between the two
+devices, only one that crosses the room's edges backwards.
+"""
+
+import json
+import threading
+
+import pytest
+import pytest_asyncio
+
+from funkygibbon.graph.index import GraphIndex, ReadSnapshot
+
+API = "/api/v1"
+USER = "path-api-test"
+
+
+@pytest_asyncio.fixture
+async def auth(async_client):
+    resp = await async_client.post(f"{API}/auth/admin/login", json={"password": "admin"})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+@pytest_asyncio.fixture
+async def house(async_client, auth):
+    async def create(name, entity_type):
+        resp = await async_client.post(
+            f"{API}/graph/entities", headers=auth,
+            json={"entity_type": entity_type, "name": name, "content": {}, "user_id": USER},
+        )
+        assert resp.status_code == 200, resp.text
+        return resp.json()["entity"]["id"]
+
+    room = await create("Study", "room")
+    lamp = await create("Desk Lamp", "device")
+    sensor = await create("Study Sensor", "device")
+    for device in (lamp, sensor):
+        resp = await async_client.post(
+            f"{API}/graph/relationships", headers=auth,
+            json={"source_id": device, "target_id": room, "relationship_type": "located_in",
+                  "properties": {}, "user_id": USER},
+        )
+        assert resp.status_code == 200, resp.text
+    return {"room": room, "lamp": lamp, "sensor": sensor}
+
+
+async def _path(client, auth, house, **options):
+    resp = await client.post(f"{API}/graph/path", headers=auth, json={
+        "from_entity_id": house["lamp"], "to_entity_id": house["sensor"], **options,
+    })
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_path_endpoint_direction_and_type_filter(async_client, auth, house):
+    assert (await _path(async_client, auth, house))["found"] is False
+
+    undirected = await _path(async_client, auth, house, direction="undirected")
+    assert [hop["id"] for hop in undirected["path"]] == [
+        house["lamp"], house["room"], house["sensor"]
+    ]
+    assert undirected["length"] == 2
+
+    filtered = await _path(async_client, auth, house, direction="undirected",
+                           relationship_types=["controls"])
+    assert filtered["found"] is False
+
+
+@pytest.mark.asyncio
+async def test_path_endpoint_rejects_an_unknown_direction(async_client, auth, house):
+    resp = await async_client.post(f"{API}/graph/path", headers=auth, json={
+        "from_entity_id": house["lamp"], "to_entity_id": house["sensor"],
+        "direction": "sideways",
+    })
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_find_path_mcp_tool_takes_the_same_options(async_client, auth, house):
+    resp = await async_client.post(f"{API}/mcp/tools/find_path", headers=auth, json={
+        "arguments": {
+            "from_entity_id": house["lamp"],
+            "to_entity_id": house["sensor"],
+            "direction": "undirected",
+            "relationship_types": ["located_in"],
+        },
+    })
+    assert resp.status_code == 200, resp.text
+    result = resp.json()["result"]
+    assert result["found"] is True
+    assert [hop["id"] for hop in result["path"]] == [house["lamp"], house["room"], house["sensor"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_paths_distances_and_reachability(async_client, auth, house):
+    targets = [house["room"], house["sensor"]]
+
+    resp = await async_client.post(f"{API}/graph/paths", headers=auth, json={
+        "from_entity_id": house["lamp"], "to_entity_ids": targets,
+    })
+    assert resp.status_code == 200, resp.text
+    paths = resp.json()
+    assert paths["found"] == 1
+    assert paths["paths"][house["room"]]["length"] == 1
+    assert paths["paths"][house["sensor"]]["found"] is False
+
+    resp = await async_client.post(f"{API}/graph/distances", headers=auth, json={
+        "from_entity_ids": [house["lamp"], house["sensor"]], "to_entity_ids": targets,
+        "direction": "undirected",
+    })
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["distances"] == {
+        house["lamp"]: {house["room"]: 1, house["sensor"]: 2},
+        house["sensor"]: {house["room"]: 1, house["sensor"]: 0},
+    }
+
+    resp = await async_client.post(f"{API}/graph/reachable", headers=auth, json={
+        "from_entity_ids": [house["room"]], "to_entity_ids": [house["lamp"], house["sensor"]],
+    })
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["reachable"] == [] and body["count"] == 0
+    assert body["unreachable"] == [house["lamp"], house["sensor"]]
+
+
+@pytest.mark.asyncio
+async def test_weighted_and_k_shortest_routes(async_client, auth):
+    async def room(name):
+        resp = await async_client.post(f"{API}/graph/entities", headers=auth, json={
+            "entity_type": "room", "name": name, "content": {}, "user_id": USER,
+        })
+        return resp.json()["entity"]["id"]
+
+    kitchen, hall, garden = await room("Kitchen"), await room("Hall"), await room("Garden")
+    for source, target, via in [(kitchen, garden, "window"), (kitchen, hall, "door"),
+                                (hall, garden, "door")]:
+        resp = await async_client.post(f"{API}/graph/relationships", headers=auth, json={
+            "source_id": source, "target_id": target, "relationship_type": "connects_to",
+            "properties": {"via": via}, "user_id": USER,
+        })
+        assert resp.status_code == 200, resp.text
+
+    resp = await async_client.post(f"{API}/graph/path", headers=auth, json={
+        "from_entity_id": kitchen, "to_entity_id": garden, "weighted": True, "k": 2,
+    })
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert [hop["id"] for hop in body["path"]] == [kitchen, hall, garden]
+    assert body["cost"] == 2.0
+    assert [route["cost"] for route in body["paths"]] == [2.0, 10.0]
+    assert body["paths"][1]["relationship_types"] == ["connects_to"]
+
+    resp = await async_client.post(f"{API}/mcp/tools/find_path", headers=auth, json={
+        "arguments": {"from_entity_id": kitchen, "to_entity_id": garden, "k": 2},
+    })
+    assert resp.status_code == 200, resp.text
+    result = resp.json()["result"]
+    assert [route["length"] for route in result["paths"]] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_cycle_detection_finds_an_automation_feedback_loop(async_client, auth, house):
+    async def create(name, entity_type):
+        resp = await async_client.post(f"{API}/graph/entities", headers=auth, json={
+            "entity_type": entity_type, "name": name, "content": {}, "user_id": USER,
+        })
+        return resp.json()["entity"]["id"]
+
+    async def relate(source, target, rel_type):
+        resp = await async_client.post(f"{API}/graph/relationships", headers=auth, json={
+            "source_id": source, "target_id": target, "relationship_type": rel_type,
+            "properties": {}, "user_id": USER,
+        })
+        assert resp.status_code == 200, resp.text
+
+    # Lamp on -> sensor sees light -> automation turns the lamp on again.
+    automation = await create("Motion Lights", "automation")
+    await relate(automation, house["lamp"], "controls")
+    await relate(house["lamp"], house["sensor"], "controls")
+    await relate(house["sensor"], automation, "controls")
+
+    resp = await async_client.post(f"{API}/graph/cycles", headers=auth, json={
+        "relationship_types": ["controls"],
+    })
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["complete"] is True and body["count"] == 1
+    loop = [hop["id"] for hop in body["cycles"][0]["path"]]
+    assert loop[0] == loop[-1] and set(loop) == {automation, house["lamp"], house["sensor"]}
+    assert body["components"] == [{"entity_ids": body["components"][0]["entity_ids"], "size": 3}]
+
+    # LOCATED_IN edges only point up the hierarchy, so there is no loop there.
+    resp = await async_client.post(f"{API}/graph/cycles", headers=auth, json={
+        "relationship_types": ["located_in"],
+    })
+    assert resp.json()["count"] == 0
+
+    resp = await async_client.post(f"{API}/mcp/tools/find_cycles", headers=auth, json={
+        "arguments": {"relationship_types": ["controls"], "max_length": 2},
+    })
+    assert resp.status_code == 200, resp.text
+    result = resp.json()["result"]
+    assert result["count"] == 0 and result["components"] == [3]
+
+
+@pytest.mark.asyncio
+async def test_mcp_traversals_run_on_a_snapshot_off_the_loop(
+    async_client, auth, house, monkeypatch
+):
+    """The MCP tools' heavy searches must not hold the event loop."""
+    calls = []
+
+    def recording(name):
+        original = getattr(ReadSnapshot, name)
+
+        def record(self, *args, **kwargs):
+            calls.append((name, threading.current_thread()))
+            return original(self, *args, **kwargs)
+        return record
+
+    for name in ("find_path", "find_weighted_paths", "find_all_cycles"):
+        monkeypatch.setattr(ReadSnapshot, name, recording(name))
+        monkeypatch.setattr(GraphIndex, name, lambda *a, **k: pytest.fail("ran on the live index"))
+
+    for tool, arguments in (
+        ("find_path", {"from_entity_id": house["lamp"], "to_entity_id": house["room"]}),
+        ("find_path", {"from_entity_id": house["lamp"], "to_entity_id": house["room"], "k": 3}),
+        ("find_cycles", {}),
+    ):
+        resp = await async_client.post(f"{API}/mcp/tools/{tool}", headers=auth,
+                                       json={"arguments": arguments})
+        assert resp.status_code == 200, resp.text
+
+    assert [name for name, _ in calls] == ["find_path", "find_weighted_paths", "find_all_cycles"]
+    assert all(thread is not threading.current_thread() for _, thread in calls)
+
+
+@pytest.mark.asyncio
+async def test_subgraph_endpoint_streams_the_neighbourhood(async_client, auth, house):
+    resp = await async_client.get(
+        f"{API}/graph/entities/{house['lamp']}/subgraph", headers=auth, params={"depth": 2},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+
+    assert [line["kind"] for line in lines] == ["entity"] * 3 + ["relationship"] * 2 + ["trailer"]
+    depths = {line["entity"]["id"]: line["depth"] for line in lines if line["kind"] == "entity"}
+    assert depths == {house["lamp"]: 0, house["room"]: 1, house["sensor"]: 2}
+    assert lines[-1] == {"kind": "trailer", "entity_count": 3, "relationship_count": 2,
+                         "truncated": False}
+
+    # With a budget of one the lamp fills it, and the room it could still
+    # reach makes the answer partial.
+    resp = await async_client.get(
+        f"{API}/graph/entities/{house['lamp']}/subgraph", headers=auth,
+        params={"depth": 2, "entity_types": ["room"], "max_nodes": 1},
+    )
+    trailer = json.loads(resp.text.splitlines()[-1])
+    assert trailer == {"kind": "trailer", "entity_count": 1, "relationship_count": 0,
+                       "truncated": True}
+
+    resp = await async_client.get(f"{API}/graph/entities/no-such-entity/subgraph", headers=auth)
+    assert resp.status_code == 404
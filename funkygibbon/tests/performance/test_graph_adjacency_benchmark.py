@@ -0,0 +1,184 @@
+"""
+Memory and traversal latency of CompactAdjacency versus GraphNode lists.
+
+GraphIndex used to traverse ``GraphNode.outgoing``/``incoming``: per edge, two
+``(relationship, id)`` tuples in two Python lists, with every BFS step hashing
+entity id strings and copying the path so far. CompactAdjacency holds the same
+edges as integer CSR arrays per relationship type. This benchmark builds both
+over the same synthetic graph at 10k, 100k and 1M edges and compares:
+
+* bytes allocated by the adjacency structure alone (the relationship payloads
+  and id strings are created beforehand and shared, so they cancel out);
+* best-of-N latency of a batch of ``find_path`` and ``get_connected_entities``
+  style traversals, with the pre-CSR algorithms reproduced verbatim below as
+  the baseline.
+
+The graph is built directly from ids rather than through ORM objects, because
+constructing a million EntityRelationship rows would benchmark SQLAlchemy. The
+1M tier takes well over a minute under tracemalloc, so it only runs with
+``FUNKYGIBBON_BENCH_LARGE=1``.
+
+In CPython the win is memory: about a third of the bytes per edge. find_path
+runs at parity with the old engine on small graphs and ahead of it at 100k
+edges and above. Neighbourhood walks cost a few microseconds more per query,
+because they hand back edge payloads. Only memory is asserted; the timings
+are printed for comparison.
+"""
+
+import os
+import random
+import time
+import tracemalloc
+from collections import deque
+
+import pytest
+
+from funkygibbon.graph.adjacency import INCOMING, OUTGOING, CompactAdjacency
+from funkygibbon.graph.index import GraphNode
+
+SIZES = [
+    pytest.param(10_000, id="10k"),
+    pytest.param(100_000, id="100k"),
+    pytest.param(1_000_000, id="1M", marks=[
+        pytest.mark.slow,
+        pytest.mark.skipif(os.environ.get("FUNKYGIBBON_BENCH_LARGE") != "1",
+                           reason="set FUNKYGIBBON_BENCH_LARGE=1 for the 1M-edge tier"),
+    ]),
+]
+EDGES_PER_NODE = 4
+REL_TYPES = ("located_in", "controls", "connects_to", "part_of")
+QUERIES = 100
+REPEATS = 3
+MAX_DEPTH = 4
+# The CSR columns are a few dozen bytes per edge against well over a hundred
+# for the tuple lists; half is a loose bound that still fails a regression to
+# per-edge Python objects.
+MEMORY_RATIO_BOUND = 0.5
+
+
+def _graph(edge_count, seed=7):
+    rng = random.Random(seed)
+    node_count = edge_count // EDGES_PER_NODE
+    ids = [f"entity-{i:07d}" for i in range(node_count)]
+    edges = []
+    for i in range(edge_count):
+        source, target = rng.randrange(node_count), rng.randrange(node_count)
+        edges.append((f"rel-{i}", ids[source], ids[target], REL_TYPES[i % len(REL_TYPES)]))
+    return ids, edges
+
+
+def _build_nodes(ids, edges):
+    nodes = {entity_id: GraphNode(entity=None, outgoing=[], incoming=[]) for entity_id in ids}
+    for edge in edges:
+        _, source, target, _ = edge
+        nodes[source].outgoing.append((edge, target))
+        nodes[target].incoming.append((edge, source))
+    return nodes
+
+
+def _build_compact(ids, edges):
+    adjacency = CompactAdjacency()
+    adjacency.begin_bulk()
+    for entity_id in ids:
+        adjacency.add_node(entity_id)
+    for edge in edges:
+        adjacency.add_edge(edge, edge[1], edge[2], edge[3])
+    adjacency.compact()
+    return adjacency
+
+
+def _allocated(build, *args):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        structure = build(*args)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return structure, after - before
+
+
+# The pre-CSR traversals, kept as the baseline.
+
+def _nodes_find_path(nodes, from_id, to_id, max_depth):
+    if from_id == to_id:
+        return [from_id]
+    queue = deque([(from_id, [from_id])])
+    visited = {from_id}
+    depth = 0
+    while queue and depth < max_depth:
+        for _ in range(len(queue)):
+            current, path = queue.popleft()
+            for _, next_id in nodes[current].outgoing:
+                if next_id == to_id:
+                    return path + [to_id]
+                if next_id not in visited:
+                    visited.add(next_id)
+                    queue.append((next_id, path + [next_id]))
+        depth += 1
+    return []
+
+
+def _nodes_connected(nodes, entity_id, rel_type, max_depth):
+    results = []
+    visited = {entity_id}
+    queue = deque([(entity_id, 0)])
+    while queue:
+        current_id, depth = queue.popleft()
+        if depth >= max_depth:
+            continue
+        node = nodes[current_id]
+        for edges in (node.outgoing, node.incoming):
+            for edge, other_id in edges:
+                if rel_type and edge[3] != rel_type:
+                    continue
+                results.append(other_id)
+                if other_id not in visited and depth + 1 < max_depth:
+                    visited.add(other_id)
+                    queue.append((other_id, depth + 1))
+    return results
+
+
+def _best_ms(fn):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("edge_count", SIZES)
+def test_compact_adjacency_memory_and_latency(edge_count):
+    ids, edges = _graph(edge_count)
+    nodes, nodes_bytes = _allocated(_build_nodes, ids, edges)
+    compact, compact_bytes = _allocated(_build_compact, ids, edges)
+
+    rng = random.Random(edge_count)
+    pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(QUERIES)]
+    centres = [rng.choice(ids) for _ in range(QUERIES)]
+
+    for from_id, to_id in pairs:
+        expected = _nodes_find_path(nodes, from_id, to_id, MAX_DEPTH)
+        found = compact.find_path(from_id, to_id, MAX_DEPTH)
+        assert len(found) == len(expected), "both engines must find equally short paths"
+
+    timings = {
+        "find_path nodes": _best_ms(lambda: [
+            _nodes_find_path(nodes, a, b, MAX_DEPTH) for a, b in pairs]),
+        "find_path compact": _best_ms(lambda: [
+            compact.find_path(a, b, MAX_DEPTH) for a, b in pairs]),
+        "connected nodes": _best_ms(lambda: [
+            _nodes_connected(nodes, c, "controls", 2) for c in centres]),
+        "connected compact": _best_ms(lambda: [
+            list(compact.walk(c, (OUTGOING, INCOMING), 2, ["controls"])) for c in centres]),
+    }
+
+    print(f"\n{edge_count:,} edges over {len(ids):,} entities")
+    print(f"  memory   nodes {nodes_bytes / 2**20:8.1f} MiB ({nodes_bytes / edge_count:6.1f} B/edge)"
+          f"   compact {compact_bytes / 2**20:8.1f} MiB ({compact_bytes / edge_count:6.1f} B/edge)")
+    for name, ms in timings.items():
+        print(f"  {name:<18} {ms:9.2f} ms / {QUERIES} queries")
+
+    assert compact_bytes <= nodes_bytes * MEMORY_RATIO_BOUND
@@ -0,0 +1,146 @@
+"""
+GraphIndex full-load time and peak memory, streaming versus per-type ORM.
+
+``GraphIndex.load_from_storage`` used to call
+``GraphRepository.get_entities_by_type`` once per ``EntityType`` -- each query
+selectin-loading both relationship collections the index never reads -- and
+then ``get_relationships``, which loaded both endpoint entities of every edge
+again. It now streams two column-projected queries,
+``stream_index_entities`` and ``stream_index_relationships``, straight into
+the index. The old load is reproduced below through those same repository
+methods as the baseline.
+
+Rows are bulk-inserted with Core executemany so the subject is the read path.
+Each measurement gets a fresh session, so neither load profits from an
+identity map the other filled. The streaming load must be faster at every
+size; peak memory (tracemalloc, measured in a separate pass so tracing does
+not distort the timings) is printed for comparison.
+
+At 10k entities and 20k edges the streaming load runs in about a third of the
+time of the per-type load, with about a fifth less peak memory.
+"""
+
+import time
+import tracemalloc
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from funkygibbon.graph.index import GraphIndex
+from funkygibbon.repositories.graph import GraphRepository
+from inbetweenies.models import (
+    Base, Entity, EntityRelationship, EntityType, RelationshipType, SourceType,
+)
+
+SIZES = (1_000, 10_000)
+EDGES_PER_ENTITY = 2
+REPEATS = 3
+_TYPES = tuple(EntityType)
+_EPOCH = "2026-01-01T00:00:00.000000+00:00"
+
+
+def _entity_rows(count):
+    for i in range(count):
+        yield {
+            "id": f"entity-{i:06d}",
+            "version": f"{_EPOCH}-{i % 1000000:06d}-bench",
+            "entity_type": _TYPES[i % len(_TYPES)],
+            "name": f"Entity {i}",
+            "content": {"index": i, "room": f"Room {i % 40}"},
+            "source_type": SourceType.MANUAL,
+            "user_id": "bench",
+            "parent_versions": [],
+            "is_latest": True,
+            "server_seq": i + 1,
+        }
+
+
+def _relationship_rows(count):
+    for i in range(count * EDGES_PER_ENTITY):
+        source, target = i % count, (i * 7 + 1) % count
+        yield {
+            "id": f"rel-{i:07d}",
+            "from_entity_id": f"entity-{source:06d}",
+            "from_entity_version": f"{_EPOCH}-{source % 1000000:06d}-bench",
+            "to_entity_id": f"entity-{target:06d}",
+            "to_entity_version": f"{_EPOCH}-{target % 1000000:06d}-bench",
+            "relationship_type": RelationshipType.CONNECTS_TO,
+            "properties": {},
+            "user_id": "bench",
+            "server_seq": count + i + 1,
+        }
+
+
+async def _populated(tmp_path, count):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / f'index-load-{count}.db'}", poolclass=NullPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Entity.__table__), list(_entity_rows(count)))
+        await conn.execute(insert(EntityRelationship.__table__), list(_relationship_rows(count)))
+    return engine
+
+
+async def _per_type_load(index, repo):
+    """The pre-streaming load_from_storage, verbatim but for load_rows."""
+    entities = []
+    for entity_type in EntityType:
+        entities.extend(await repo.get_entities_by_type(entity_type))
+    relationships = await repo.get_relationships(include_all_versions=False)
+    index.load_rows(entities, relationships)
+
+
+async def _streaming_load(index, repo):
+    await index.load_from_storage(repo)
+
+
+LOADERS = {"per-type ORM": _per_type_load, "streaming": _streaming_load}
+
+
+async def _measure(sessions, loader, traced):
+    """One load in a fresh session: (seconds, peak traced bytes, index)."""
+    index = GraphIndex()
+    async with sessions() as session:
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            await loader(index, GraphRepository(session))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if traced else 0
+        finally:
+            if traced:
+                tracemalloc.stop()
+    return elapsed, peak, index
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", SIZES)
+async def test_streaming_load_beats_per_type_orm_load(tmp_path, count):
+    engine = await _populated(tmp_path, count)
+    try:
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        best, peaks, loaded = {}, {}, {}
+        for name, loader in LOADERS.items():
+            best[name] = min([(await _measure(sessions, loader, traced=False))[0]
+                              for _ in range(REPEATS)])
+            _, peaks[name], loaded[name] = await _measure(sessions, loader, traced=True)
+    finally:
+        await engine.dispose()
+
+    print(f"\n{count:>7,} entities, {count * EDGES_PER_ENTITY:>7,} edges: " + "; ".join(
+        f"{name} {best[name] * 1000:8.1f}ms peak {peaks[name] / 2**20:6.1f}MiB"
+        for name in LOADERS
+    ))
+    old, new = loaded["per-type ORM"], loaded["streaming"]
+    assert set(new.entities) == set(old.entities)
+    assert set(new.relationships_by_id) == set(old.relationships_by_id)
+    assert best["streaming"] < best["per-type ORM"], (
+        f"streaming load took {best['streaming'] * 1000:.1f}ms against "
+        f"{best['per-type ORM'] * 1000:.1f}ms for the per-type ORM load"
+    )
@@ -0,0 +1,87 @@
+"""
+Cost of re-pushing an edge on a hub versus the hub's degree.
+
+A sync re-push of an existing relationship replaces it in the index: the old
+object is detached and the new one added. ``_detach_relationship`` used to
+rebuild by list comprehension the source and target lists, the whole
+per-type list and both node adjacency lists, so re-pushing one of the
+``LOCATED_IN`` edges of a house with N rooms cost O(N) -- and re-pushing all
+of them O(N^2). Every structure is now an insertion-ordered dict keyed by the
+relationship, and the CSR adjacency scans the shorter endpoint row.
+
+The graph is a HOME with ``fan_in`` rooms LOCATED_IN it and a bridge that
+CONTROLS ``fan_in`` devices, so the hub sits at the target end of one type
+and the source end of the other. Per-re-push latency at the largest fan-in
+must stay within a constant factor of the smallest.
+"""
+
+import time
+from uuid import uuid4
+
+import pytest
+
+from funkygibbon.graph.index import GraphIndex
+from inbetweenies.models import (
+    Entity, EntityRelationship, EntityType, RelationshipType, SourceType,
+)
+
+FAN_INS = (500, 20_000)
+REPUSHES = 500
+REPEATS = 3
+# Generous: the list-rebuilding detach was ~28x slower at 20k than at 500
+# (about 3.2ms per re-push against 0.12ms); the keyed one is ~1.2x.
+FLATNESS_FACTOR = 4.0
+
+
+def _entity(entity_type, name):
+    return Entity(
+        id=str(uuid4()), version="v1", entity_type=entity_type, name=name,
+        content={}, source_type=SourceType.MANUAL,
+    )
+
+
+def _edge(rel_id, source, target, rel_type):
+    return EntityRelationship(
+        id=rel_id, from_entity_id=source.id, to_entity_id=target.id,
+        relationship_type=rel_type, properties={},
+    )
+
+
+def _house(fan_in):
+    home, bridge = _entity(EntityType.HOME, "Home"), _entity(EntityType.DEVICE, "Bridge")
+    rooms = [_entity(EntityType.ROOM, f"Room {i}") for i in range(fan_in)]
+    devices = [_entity(EntityType.DEVICE, f"Light {i}") for i in range(fan_in)]
+    edges = [(str(uuid4()), room, home, RelationshipType.LOCATED_IN) for room in rooms]
+    edges += [(str(uuid4()), bridge, device, RelationshipType.CONTROLS) for device in devices]
+
+    index = GraphIndex()
+    index.load_rows([home, bridge, *rooms, *devices], [_edge(*edge) for edge in edges])
+    return index, edges
+
+
+@pytest.mark.performance
+def test_repush_latency_is_flat_in_hub_degree():
+    per_repush_us = {}
+    for fan_in in FAN_INS:
+        index, edges = _house(fan_in)
+        # Alternate the two hubs; build the replacement objects up front so
+        # only the index work is timed.
+        picks = [edges[(i * 7919) % len(edges)] for i in range(REPUSHES)]
+        best = float("inf")
+        for _ in range(REPEATS):
+            batch = [_edge(*edge) for edge in picks]
+            start = time.perf_counter()
+            for rel in batch:
+                index.upsert_relationship(rel)
+            best = min(best, time.perf_counter() - start)
+        per_repush_us[fan_in] = best / REPUSHES * 1e6
+        assert len(index.relationships_by_id) == len(edges), "re-push must replace, not add"
+
+    print("\nre-push: " + ", ".join(
+        f"hub degree {fan_in:>6,} {us:6.1f}us" for fan_in, us in per_repush_us.items()
+    ))
+    smallest, largest = per_repush_us[FAN_INS[0]], per_repush_us[FAN_INS[-1]]
+    assert largest <= smallest * FLATNESS_FACTOR, (
+        f"re-push grew from {smallest:.1f}us at degree {FAN_INS[0]} to "
+        f"{largest:.1f}us at degree {FAN_INS[-1]} -- detach is scanning the hub"
+    )
@@ -0,0 +1,93 @@
+"""
+Fuzzy name lookup latency versus the number of distinct names.
+
+``GraphIndex.find_entities_by_name(fuzzy=True)`` used to test the query as a
+substring of every key of ``entities_by_name``. It now intersects trigram
+postings (``funkygibbon.graph.trigrams``) and verifies only the candidates.
+This benchmark runs both over the same names at 1k and 100k: results must be
+identical, and trigram latency for selective queries must stay within a
+constant factor between the two sizes while the scan grows with the names.
+
+Names are plain strings fed to ``TrigramIndex`` directly, because building
+100k Entity rows would benchmark SQLAlchemy instead of the lookup.
+"""
+
+import random
+import string
+import time
+
+import pytest
+
+from funkygibbon.graph.trigrams import TrigramIndex
+
+SIZES = (1_000, 100_000)
+REPEATS = 5
+# Selective queries: whole names and bare model tokens of the first names
+# generated, which are the same at every size (same seed).
+SAMPLED = 5
+FLATNESS_FACTOR = 5.0
+# Sub-millisecond timings are dominated by noise; compare above this floor.
+FLOOR_MS = 0.05
+
+_ROOMS = ("kitchen", "porch", "garage", "hallway", "bedroom", "office", "loft", "den")
+_THINGS = ("ceiling lamp", "sensor", "door opener", "smoke alarm", "blind", "speaker",
+           "thermostat", "plug")
+
+
+def _names(count, seed=11):
+    """``room thing model`` names. The model token is what tells them apart,
+    as a product name or nickname does in a real house."""
+    rng = random.Random(seed)
+    names = {}
+    for i in range(count):
+        model = "".join(rng.choice(string.ascii_lowercase) for _ in range(6))
+        names[f"{rng.choice(_ROOMS)} {rng.choice(_THINGS)} {model}"] = {f"entity-{i}"}
+    return names
+
+
+def _queries(names):
+    sampled = list(names)[:SAMPLED]
+    return sampled + [name.rsplit(" ", 1)[1] for name in sampled]
+
+
+def _scan(query, names):
+    """The pre-trigram fuzzy path, verbatim."""
+    return [name for name in names if query in name]
+
+
+def _best_ms(fn):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+@pytest.mark.performance
+def test_trigram_lookup_is_flat_in_name_count():
+    timings = {}
+    for count in SIZES:
+        names = _names(count)
+        index = TrigramIndex()
+        for name in names:
+            index.add(name)
+
+        queries = _queries(names)
+        # Unselective queries too, for correctness only.
+        for query in queries + ["sensor", "kitchen plug", "en"]:
+            assert sorted(index.containing(query, names)) == sorted(_scan(query, names)), query
+        timings[count] = (
+            _best_ms(lambda: [_scan(q, names) for q in queries]),
+            _best_ms(lambda: [index.containing(q, names) for q in queries]),
+        )
+
+    for count, (scan_ms, trigram_ms) in timings.items():
+        print(f"\n{count:>7,} names: scan {scan_ms:8.3f}ms  trigram {trigram_ms:8.3f}ms"
+              f" / {2 * SAMPLED} queries")
+    small, large = timings[SIZES[0]][1], timings[SIZES[-1]][1]
+    assert large <= max(small, FLOOR_MS) * FLATNESS_FACTOR, (
+        f"trigram lookup grew from {small:.3f}ms at {SIZES[0]} names to "
+        f"{large:.3f}ms at {SIZES[-1]}"
+    )
+    assert large < timings[SIZES[-1]][0], "trigram lookup must beat the scan at 100k names"
@@ -0,0 +1,143 @@
+"""
+Sync page latency versus graph size (ADR-002 §4).
+
+A sync page must cost O(page), not O(graph). `_outgoing_entities` used to load
+every current row past the cursor as ORM objects, filter by entity type and
+user in Python, and only then slice to PAGE_SIZE -- so the first page of a full
+sync of a 100k-row house read all 100k rows. The page query now carries the
+LIMIT and the filters itself, and these benchmarks hold it to that: page
+latency at 100k rows must stay within a small constant factor of the latency
+at the 300-row house the system was sized for.
+
+Rows are bulk-inserted with Core executemany, bypassing SyncHandler, because
+the subject here is the read path; building 100k rows through the push path
+would benchmark the writer instead.
+"""
+
+import time
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from funkygibbon.api.sync import PAGE_SIZE, SyncHandler
+from inbetweenies.models import Base, Entity, EntityType, SourceType
+from inbetweenies.sync import SyncFilters, SyncRequest
+
+SIZES = (300, 10_000, 100_000)
+# Generous on purpose: the old implementation was >100x slower at 100k, so a
+# bound this loose still fails it decisively without flaking on a busy runner.
+FLATNESS_FACTOR = 5.0
+# A 300-row house fills less than one page (a filtered one, far less), so its
+# timing is mostly fixed per-query overhead. Below this floor the comparison
+# would be measuring page size, not graph size.
+FLOOR_MS = 5.0
+_TYPES = (EntityType.DEVICE, EntityType.ROOM, EntityType.NOTE)
+_EPOCH = "2026-01-01T00:00:00.000000+00:00"
+
+
+def _rows(count):
+    for i in range(count):
+        yield {
+            "id": f"entity-{i:06d}",
+            "version": f"{_EPOCH}-{i % 1000000:06d}-bench",
+            "entity_type": _TYPES[i % len(_TYPES)],
+            "name": f"Entity {i}",
+            "content": {"index": i, "manufacturer": "Philips", "room": f"Room {i % 40}"},
+            "source_type": SourceType.MANUAL,
+            "user_id": f"user-{i % 5}",
+            "parent_versions": [],
+            "is_latest": True,
+            "server_seq": i + 1,
+        }
+
+
+async def _populated(tmp_path, count):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / f'paging-{count}.db'}", poolclass=NullPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Entity.__table__), list(_rows(count)))
+    return engine
+
+
+async def _best_page_ms(session, request, repeats=5):
+    """Best-of-N latency of producing one page, in milliseconds."""
+    handler = SyncHandler(session)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        page = await handler._outgoing_entities(request)
+        best = min(best, (time.perf_counter() - start) * 1000)
+        assert len(page) <= PAGE_SIZE + 1, "the page query must carry the LIMIT"
+    return best
+
+
+def _request(**kwargs):
+    return SyncRequest(device_id="bench", user_id="bench", **kwargs)
+
+
+SCENARIOS = {
+    "first full-sync page": lambda count: _request(sync_type="full"),
+    "resumed delta page": lambda count: _request(sync_type="delta", cursor=str(count // 2)),
+    "filtered full-sync page": lambda count: _request(
+        sync_type="full",
+        filters=SyncFilters(entity_types=["note"], modified_by=["user-3"]),
+    ),
+}
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+async def test_page_latency_is_flat_in_graph_size(tmp_path, scenario):
+    """Page latency at 100k rows stays within a constant factor of 300 rows."""
+    timings = {}
+    for count in SIZES:
+        engine = await _populated(tmp_path, count)
+        try:
+            sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            async with sessions() as session:
+                timings[count] = await _best_page_ms(session, SCENARIOS[scenario](count))
+        finally:
+            await engine.dispose()
+
+    print(f"\n{scenario}: " + ", ".join(
+        f"{count:>7,} rows {ms:7.2f}ms" for count, ms in timings.items()
+    ))
+    smallest, largest = timings[SIZES[0]], timings[SIZES[-1]]
+    assert largest <= max(smallest, FLOOR_MS) * FLATNESS_FACTOR, (
+        f"{scenario} grew from {smallest:.2f}ms at {SIZES[0]} rows to "
+        f"{largest:.2f}ms at {SIZES[-1]} rows -- the page is scanning the graph"
+    )
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_filtered_pages_are_exact_and_resumable(tmp_path):
+    """Filters in SQL must not change what a client receives across pages."""
+    engine = await _populated(tmp_path, PAGE_SIZE * 3)
+    try:
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessions() as session:
+            handler = SyncHandler(session)
+            filters = SyncFilters(entity_types=["device"])
+            seen, cursor = [], None
+            while True:
+                page = await handler._outgoing_entities(_request(
+                    sync_type="delta" if cursor else "full", cursor=cursor, filters=filters,
+                ))
+                more = len(page) > PAGE_SIZE
+                page = page[:PAGE_SIZE]
+                seen += [e.id for e in page]
+                if not more:
+                    break
+                cursor = str(page[-1].server_seq)
+    finally:
+        await engine.dispose()
+
+    expected = [f"entity-{i:06d}" for i in range(PAGE_SIZE * 3) if i % len(_TYPES) == 0]
+    assert seen == expected
@@ -0,0 +1,95 @@
+"""
+Sync body size and codec CPU on a populated house graph (PROTOCOL.md §3.7).
+
+A full sync of the house built by populate_graph_db is the body a phone pulls
+on first launch, and it is the repetitive one: every device carries the same
+content keys, and room and manufacturer names recur across dozens of rows.
+This measures, for every encoding and compression this process offers, the
+bytes that body puts on the wire and the CPU to encode and decode it, so the
+negotiated forms are justified by numbers rather than by assumption.
+
+Only JSON and gzip are guaranteed to be present; MessagePack, CBOR and zstd
+rows appear when their codecs are installed.
+"""
+
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from funkygibbon.api.sync import SyncHandler
+from funkygibbon.populate_graph_db import GraphPopulator
+from inbetweenies.sync import (
+    GZIP_CODING, JSON_MEDIA_TYPE, RELATIONSHIP_FEED_CAPABILITY, SyncRequest, wire,
+)
+
+REPEATS = 20
+# gzip on this body is about a fifth of plain JSON; half is a loose bound
+# that still fails if compression is silently skipped.
+GZIP_RATIO_BOUND = 0.5
+
+
+def _best_ms(fn, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+async def _house_sync_payload(tmp_path):
+    populator = GraphPopulator(f"sqlite+aiosqlite:///{tmp_path / 'house.db'}")
+    try:
+        await populator.setup_database()
+        await populator.populate()
+        sessions = async_sessionmaker(populator.engine, class_=AsyncSession,
+                                      expire_on_commit=False)
+        async with sessions() as session:
+            response = await SyncHandler(session).handle_sync_request(SyncRequest(
+                device_id="bench", user_id="bench", sync_type="full",
+                capabilities=[RELATIONSHIP_FEED_CAPABILITY],
+            ))
+    finally:
+        await populator.engine.dispose()
+    return response.model_dump(mode="json")
+
+
+def _measure(payload, media_type, coding):
+    body = wire.encode(payload, media_type)
+    wire_bytes = wire.compress(body, coding) if coding else body
+
+    def encode():
+        data = wire.encode(payload, media_type)
+        if coding:
+            wire.compress(data, coding)
+
+    def decode():
+        data = wire.decompress(wire_bytes, coding) if coding else wire_bytes
+        wire.decode(data, media_type)
+
+    return len(wire_bytes), _best_ms(encode), _best_ms(decode)
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_wire_bytes_and_codec_cpu_on_a_house_graph(tmp_path):
+    payload = await _house_sync_payload(tmp_path)
+    assert payload["changes"], "the populated house should produce a non-empty sync"
+
+    results = {}
+    for media_type in wire.supported_media_types():
+        for coding in [None] + wire.supported_codings():
+            results[(media_type, coding)] = _measure(payload, media_type, coding)
+
+    baseline = results[(JSON_MEDIA_TYPE, None)][0]
+    print(f"\nfull sync of the house graph: {len(payload['changes'])} changes")
+    for (media_type, coding), (size, encode_ms, decode_ms) in results.items():
+        print(f"  {media_type:<20} {coding or 'identity':<9} {size:>8,} B "
+              f"({size / baseline:6.1%})  encode {encode_ms:6.2f}ms  decode {decode_ms:6.2f}ms")
+
+    assert results[(JSON_MEDIA_TYPE, GZIP_CODING)][0] <= baseline * GZIP_RATIO_BOUND
+    for media_type in wire.supported_media_types():
+        assert results[(media_type, None)][0] <= baseline, (
+            f"{media_type} should never be larger than the JSON it replaces"
+        )
@@ -127,3 +127,25 @@ def test_dry_run_writes_nothing(conn):
     # Still the old doubled-Z versions and inline photos.
     assert conn.execute("SELECT COUNT(*) FROM entities WHERE version LIKE '%+00:00Z-%'").fetchone()[0] == 3
     assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
+
+
+def test_migration_backfills_digest_buckets(conn):
+    """Every row gets the §3.4 leaf bucket of its id, and re-running agrees."""
+    from inbetweenies.sync import bucket_of
+
+    run_migration(conn, apply=True)
+    run_migration(conn, apply=True)
+
+    rows = conn.execute("SELECT id, id_bucket FROM entities").fetchall()
+    assert rows and all(bucket == bucket_of(eid) for eid, bucket in rows)
+
+
+def test_migration_stamps_relationships_after_entities(conn):
+    """Edges join the replication axis (PROTOCOL.md §3.5) after every version."""
+    run_migration(conn, apply=True)
+    run_migration(conn, apply=True)
+
+    entity_max = conn.execute("SELECT MAX(server_seq) FROM entities").fetchone()[0]
+    assert conn.execute(
+        "SELECT server_seq FROM entity_relationships WHERE id = 'r1'"
+    ).fetchone()[0] == entity_max + 1
@@ -29,6 +29,9 @@ ordering, watermark persistence) are asserted in the client suites.
 """
 
 import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from sqlalchemy import select
@@ -37,9 +40,15 @@ from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 import funkygibbon.database as dbmod
+from funkygibbon.api import sync as sync_api
 from funkygibbon.api.app import create_app
 from funkygibbon.config import settings
 from inbetweenies.models import Entity
+from inbetweenies.sync import (
+    CBOR_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, NDJSON_MEDIA_TYPE,
+    RELATIONSHIP_FEED_CAPABILITY, STATE_DIGEST_SUM_CAPABILITY,
+    bucket_of, sorted_digest, sum_digest, wire,
+)
 
 # --- Domain vocabulary -------------------------------------------------------
 # The ADR-012 seam. Today these are the house vocabulary; after the abstraction
@@ -103,7 +112,8 @@ def edge(id, *, from_id, from_version, to_id, to_version, properties=None):
     }
 
 
-def sync(client, headers, sync_type="full", changes=None, since=None):
+def sync(client, headers, sync_type="full", changes=None, since=None, capabilities=None,
+         cursor=None):
     body = {
         "protocol_version": "inbetweenies-v2", "device_id": "conformance-device",
         "user_id": USER, "sync_type": sync_type, "changes": changes or [],
@@ -111,6 +121,10 @@ def sync(client, headers, sync_type="full", changes=None, since=None):
     }
     if since is not None:
         body["filters"] = {"since": since}
+    if capabilities is not None:
+        body["capabilities"] = capabilities
+    if cursor is not None:
+        body["cursor"] = cursor
     response = client.post("/api/v1/sync/", json=body, headers=headers)
     assert response.status_code == 200, response.text
     return response.json()
@@ -220,6 +234,170 @@ class TestAcknowledgement:
         assert body["conflicts"], "a loser must also be reported"
 
 
+# --------------------------------------------------------------------------- #
+# §3.3 Capabilities and the state digest
+# --------------------------------------------------------------------------- #
+class TestStateDigestDefinitions:
+    """§3.3: both digest definitions, computed independently of the server."""
+
+    @staticmethod
+    def _current_pairs():
+        async def _read():
+            async with dbmod.async_session() as session:
+                result = await session.execute(
+                    select(Entity.id, Entity.version).where(Entity.is_latest.is_(True))
+                )
+                return [tuple(row) for row in result.all()]
+        return asyncio.run(_read())
+
+    def test_the_default_digest_is_sorted_sha256(self, client, headers):
+        """The original definition, byte for byte, for clients that ask for nothing."""
+        sync(client, headers, changes=[
+            entity_change("create", id="B", version=Entity.create_version("a")),
+            entity_change("create", id="A", version=Entity.create_version("a")),
+        ])
+        body = sync(client, headers, "full")
+
+        assert body["capabilities"] == []
+        assert body["state_digest"] == sorted_digest(self._current_pairs())
+
+    def test_the_sum_capability_selects_the_sum_digest(self, client, headers):
+        sync(client, headers, changes=[
+            entity_change("create", id="A", version=Entity.create_version("a")),
+        ])
+        body = sync(client, headers, "full", capabilities=[STATE_DIGEST_SUM_CAPABILITY])
+
+        assert body["capabilities"] == [STATE_DIGEST_SUM_CAPABILITY]
+        assert body["state_digest"] == sum_digest(self._current_pairs())
+
+    def test_unknown_capabilities_are_ignored_not_rejected(self, client, headers):
+        body = sync(client, headers, "full", capabilities=["from-the-future"])
+
+        assert body["capabilities"] == []
+
+
+# --------------------------------------------------------------------------- #
+# §3.4 The digest tree
+# --------------------------------------------------------------------------- #
+class TestDigestTree:
+
+    def _node(self, client, headers, prefix=""):
+        response = client.get("/api/v1/sync/digest", params={"prefix": prefix}, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    def _seed(self, client, headers, count=40):
+        sync(client, headers, changes=[
+            entity_change("create", id=f"E{i}", version=Entity.create_version("a"))
+            for i in range(count)
+        ])
+
+    def test_the_root_is_the_sum_state_digest(self, client, headers):
+        self._seed(client, headers)
+        body = sync(client, headers, "full", capabilities=[STATE_DIGEST_SUM_CAPABILITY])
+
+        assert self._node(client, headers)["digest"] == body["state_digest"]
+
+    def test_children_sum_to_their_parent(self, client, headers):
+        """Recomputed client-side from the leaves alone."""
+        self._seed(client, headers)
+        root = self._node(client, headers)
+        child = next(iter(root["children"]))
+        node = self._node(client, headers, child)
+
+        assert node["digest"] == root["children"][child]
+        assert sum(int(d, 16) for d in node["children"].values()) % (1 << 256) == \
+               int(node["digest"], 16)
+
+    def test_a_leaf_carries_its_current_versions(self, client, headers):
+        self._seed(client, headers, count=1)
+        v2 = Entity.create_version("a")
+        sync(client, headers, changes=[entity_change(
+            "update", id="E0", version=v2, parents=[stored_versions("E0")[0].version],
+        )])
+        leaf = self._node(client, headers, bucket_of("E0"))
+
+        assert [c["entity"]["version"] for c in leaf["changes"]] == [v2]
+        assert leaf["digest"] == sum_digest([("E0", v2)])
+
+    def test_a_malformed_prefix_is_rejected(self, client, headers):
+        response = client.get("/api/v1/sync/digest", params={"prefix": "xyz0"}, headers=headers)
+
+        assert response.status_code == 400
+
+
+# --------------------------------------------------------------------------- #
+# §3.5 The relationship feed
+# --------------------------------------------------------------------------- #
+def served_edges(body):
+    return [r for c in body["changes"] if c.get("entity") is None
+            for r in c["relationships"]]
+
+
+class TestRelationshipFeed:
+
+    def _two_entities_and_an_edge(self, client, headers):
+        v1, v2 = Entity.create_version("a"), Entity.create_version("b")
+        sync(client, headers, changes=[
+            entity_change("create", id="A", version=v1),
+            entity_change("create", id="B", version=v2, rels=[
+                edge("EDGE", from_id="A", from_version=v1, to_id="B", to_version=v2)
+            ]),
+        ])
+        return v1, v2
+
+    def test_edges_are_served_only_to_clients_that_ask(self, client, headers):
+        """§3.5: an older client gets the entity-only feed it always had."""
+        self._two_entities_and_an_edge(client, headers)
+
+        assert served_edges(sync(client, headers, "full")) == []
+        body = sync(client, headers, "full", capabilities=[RELATIONSHIP_FEED_CAPABILITY])
+        assert body["capabilities"] == [RELATIONSHIP_FEED_CAPABILITY]
+        assert [r["id"] for r in served_edges(body)] == ["EDGE"]
+
+    def test_an_edge_is_served_after_its_endpoints(self, client, headers):
+        """§3.5 + §5: one sequence orders both tables, so list order is apply order."""
+        self._two_entities_and_an_edge(client, headers)
+
+        body = sync(client, headers, "full", capabilities=[RELATIONSHIP_FEED_CAPABILITY])
+
+        order = [c["entity"]["id"] if c.get("entity") else c["relationships"][0]["id"]
+                 for c in body["changes"]]
+        assert order == ["A", "B", "EDGE"]
+
+    def test_a_re_pushed_edge_reappears_in_the_delta(self, client, headers):
+        v1, v2 = self._two_entities_and_an_edge(client, headers)
+        watermark = sync(client, headers, "full")["server_time"]
+
+        sync(client, headers, changes=[{
+            "change_type": "update", "entity": None,
+            "relationships": [edge("EDGE", from_id="A", from_version=v1, to_id="B",
+                                   to_version=v2, properties={"moved": True})],
+        }])
+        body = sync(client, headers, "delta", since=watermark,
+                    capabilities=[RELATIONSHIP_FEED_CAPABILITY])
+
+        assert served_edges(body) == [edge("EDGE", from_id="A", from_version=v1, to_id="B",
+                                           to_version=v2, properties={"moved": True})]
+
+    def test_the_cursor_pages_through_entities_and_edges_together(
+        self, client, headers, monkeypatch
+    ):
+        import funkygibbon.api.sync as sync_module
+
+        monkeypatch.setattr(sync_module, "PAGE_SIZE", 2)
+        self._two_entities_and_an_edge(client, headers)
+
+        first = sync(client, headers, "full", capabilities=[RELATIONSHIP_FEED_CAPABILITY])
+        assert first["cursor"] is not None
+        rest = sync(client, headers, "delta", cursor=first["cursor"],
+                    capabilities=[RELATIONSHIP_FEED_CAPABILITY])
+
+        assert len(first["changes"]) == 2
+        assert [r["id"] for r in served_edges(rest)] == ["EDGE"]
+        assert rest["cursor"] is None
+
+
 # --------------------------------------------------------------------------- #
 # §4 Sync flows & the `since` watermark
 # --------------------------------------------------------------------------- #
@@ -496,3 +674,254 @@ class TestWireProtocol:
 
         assert body["sync_stats"]["entities_synced"] == len(body["applied"])
         assert body["sync_stats"]["relationships_synced"] == len(body["applied_relationships"])
+
+
+# --------------------------------------------------------------------------- #
+# §3.6 Streamed responses
+# --------------------------------------------------------------------------- #
+def stream_sync(client, headers, sync_type="full", changes=None, capabilities=None,
+                filters=None):
+    body = {
+        "protocol_version": "inbetweenies-v2", "device_id": "conformance-device",
+        "user_id": USER, "sync_type": sync_type, "changes": changes or [],
+        "vector_clock": {"clocks": {}}, "capabilities": capabilities or [],
+    }
+    if filters is not None:
+        body["filters"] = filters
+    response = client.post("/api/v1/sync/", json=body,
+                           headers={**headers, "Accept": NDJSON_MEDIA_TYPE})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+class TestStreamedSync:
+
+    def _seed(self, client, headers):
+        v1, v2 = Entity.create_version("a"), Entity.create_version("b")
+        sync(client, headers, changes=[
+            entity_change("create", id="A", version=v1),
+            entity_change("create", id="B", version=v2, rels=[
+                edge("EDGE", from_id="A", from_version=v1, to_id="B", to_version=v2)
+            ]),
+            entity_change("create", id="C", version=Entity.create_version("c")),
+        ])
+
+    def test_a_stream_carries_every_change_then_one_trailer(
+        self, client, headers, monkeypatch
+    ):
+        """§3.6: not paged — the whole feed, in server_seq order, then the metadata."""
+        import funkygibbon.api.sync as sync_module
+
+        monkeypatch.setattr(sync_module, "PAGE_SIZE", 2)
+        self._seed(client, headers)
+
+        records = stream_sync(client, headers, capabilities=[RELATIONSHIP_FEED_CAPABILITY])
+
+        assert [r["kind"] for r in records] == ["change"] * 4 + ["trailer"]
+        order = [r["change"]["entity"]["id"] if r["change"].get("entity")
+                 else r["change"]["relationships"][0]["id"] for r in records[:-1]]
+        assert order == ["A", "B", "C", "EDGE"]
+        seqs = [r["seq"] for r in records[:-1]]
+        assert seqs == sorted(seqs)
+        trailer = records[-1]
+        assert trailer["cursor"] is None
+        assert "changes" not in trailer
+        assert trailer["capabilities"] == [RELATIONSHIP_FEED_CAPABILITY]
+
+    def test_the_trailer_matches_the_paged_response(self, client, headers):
+        self._seed(client, headers)
+
+        paged = sync(client, headers, capabilities=[STATE_DIGEST_SUM_CAPABILITY])
+        trailer = stream_sync(client, headers, capabilities=[STATE_DIGEST_SUM_CAPABILITY])[-1]
+
+        assert trailer["state_digest"] == paged["state_digest"]
+        assert [r["change"] for r in stream_sync(client, headers)[:-1]] == paged["changes"]
+
+    def test_a_streamed_push_is_acknowledged_in_the_trailer(self, client, headers):
+        records = stream_sync(client, headers, "delta", changes=[
+            entity_change("create", id="P", version=Entity.create_version("p")),
+        ])
+
+        assert records[-1]["kind"] == "trailer"
+        assert records[-1]["applied"] == ["P"]
+
+    def test_a_bad_request_fails_before_the_stream_starts(self, client, headers):
+        response = client.post("/api/v1/sync/", json={
+            "protocol_version": "inbetweenies-v2", "device_id": "d", "user_id": USER,
+            "sync_type": "full", "filters": {"entity_types": ["not-a-type"]},
+        }, headers={**headers, "Accept": NDJSON_MEDIA_TYPE})
+
+        assert response.status_code == 400
+
+
+# --------------------------------------------------------------------------- #
+# §3.7 Wire encodings and compression
+# --------------------------------------------------------------------------- #
+def _sync_body(changes=None):
+    return {
+        "protocol_version": "inbetweenies-v2", "device_id": "conformance-device",
+        "user_id": USER, "sync_type": "full", "changes": changes or [],
+        "vector_clock": {"clocks": {}},
+    }
+
+
+class TestWireEncodings:
+
+    def _seed(self, client, headers, count=20):
+        sync(client, headers, changes=[
+            entity_change("create", id=f"E{i}", version=Entity.create_version("w"),
+                          content={"manufacturer": "Philips", "room": "Living Room"})
+            for i in range(count)
+        ])
+
+    def test_a_client_that_negotiates_nothing_gets_plain_json(self, client, headers):
+        self._seed(client, headers)
+
+        response = client.post("/api/v1/sync/", json=_sync_body(),
+                               headers={**headers, "Accept-Encoding": "identity"})
+
+        assert response.headers["content-type"].startswith(JSON_MEDIA_TYPE)
+        assert "content-encoding" not in response.headers
+        assert len(response.json()["changes"]) == 20
+
+    def test_gzip_is_honoured_and_carries_the_same_document(self, client, headers):
+        self._seed(client, headers)
+        plain = client.post("/api/v1/sync/", json=_sync_body(),
+                            headers={**headers, "Accept-Encoding": "identity"})
+
+        zipped = client.post("/api/v1/sync/", json=_sync_body(),
+                             headers={**headers, "Accept-Encoding": "gzip"})
+
+        assert zipped.headers["content-encoding"] == "gzip"
+        assert int(zipped.headers["content-length"]) < len(plain.content)
+        assert zipped.json()["changes"] == plain.json()["changes"]
+
+    def test_a_small_body_is_not_compressed(self, client, headers):
+        response = client.post("/api/v1/sync/", json=_sync_body(),
+                               headers={**headers, "Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_a_compressed_request_body_is_accepted(self, client, headers):
+        change = entity_change("create", id="GZ", version=Entity.create_version("w"))
+        body = wire.compress(wire.encode(_sync_body([change]), JSON_MEDIA_TYPE), "gzip")
+
+        response = client.post("/api/v1/sync/", content=body, headers={
+            **headers, "Content-Type": JSON_MEDIA_TYPE, "Content-Encoding": "gzip",
+        })
+
+        assert response.status_code == 200, response.text
+        assert response.json()["applied"] == ["GZ"]
+
+    def test_an_unreadable_encoding_is_415(self, client, headers):
+        response = client.post("/api/v1/sync/", content=b"\x00", headers={
+            **headers, "Content-Type": "application/x-protobuf",
+        })
+
+        assert response.status_code == 415
+
+    def test_a_corrupt_body_is_400(self, client, headers):
+        response = client.post("/api/v1/sync/", content=b"not gzip", headers={
+            **headers, "Content-Type": JSON_MEDIA_TYPE, "Content-Encoding": "gzip",
+        })
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("coding", ["gzip", "zstd"])
+    def test_a_body_that_inflates_past_the_limit_is_413(self, client, headers, coding,
+                                                        monkeypatch):
+        if coding not in wire.supported_codings():
+            pytest.skip(f"no codec for {coding} installed")
+        monkeypatch.setattr(sync_api, "MAX_DECOMPRESSED_BODY", 1024 * 1024)
+        bomb = wire.compress(b" " * (4 * 1024 * 1024), coding)
+
+        response = client.post("/api/v1/sync/", content=bomb, headers={
+            **headers, "Content-Type": JSON_MEDIA_TYPE, "Content-Encoding": coding,
+        })
+
+        assert len(bomb) < 64 * 1024
+        assert response.status_code == 413
+
+    @pytest.mark.parametrize("media_type", [MSGPACK_MEDIA_TYPE, CBOR_MEDIA_TYPE])
+    def test_binary_encodings_round_trip(self, client, headers, media_type):
+        if media_type not in wire.supported_media_types():
+            pytest.skip(f"no codec for {media_type} installed")
+        change = entity_change("create", id="BIN", version=Entity.create_version("w"))
+
+        response = client.post("/api/v1/sync/", content=wire.encode(_sync_body([change]), media_type),
+                               headers={**headers, "Content-Type": media_type, "Accept": media_type})
+
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"].startswith(media_type)
+        assert wire.decode(response.content, media_type)["applied"] == ["BIN"]
+
+
+# --------------------------------------------------------------------------- #
+# §3.8 Change feed
+# --------------------------------------------------------------------------- #
+class TestChangeFeed:
+
+    def _push(self, client, headers, entity_id):
+        sync(client, headers, "delta", changes=[
+            entity_change("create", id=entity_id, version=Entity.create_version("f")),
+        ])
+
+    def test_without_after_the_current_seq_is_returned_at_once(self, client, headers):
+        self._push(client, headers, "A")
+
+        notice = client.get("/api/v1/sync/changes", headers=headers).json()
+
+        assert notice == {"seq": 1, "changed": False}
+
+    def test_a_stale_after_returns_at_once(self, client, headers):
+        self._push(client, headers, "A")
+        self._push(client, headers, "B")
+
+        notice = client.get("/api/v1/sync/changes", params={"after": 1},
+                            headers=headers).json()
+
+        assert notice == {"seq": 2, "changed": True}
+
+    def test_an_idle_wait_times_out_unchanged(self, client, headers):
+        self._push(client, headers, "A")
+
+        started = time.monotonic()
+        notice = client.get("/api/v1/sync/changes", params={"after": 1, "timeout": 0.2},
+                            headers=headers).json()
+
+        assert notice == {"seq": 1, "changed": False}
+        assert time.monotonic() - started >= 0.2
+
+    def test_a_push_wakes_a_waiting_subscriber(self, client, headers):
+        self._push(client, headers, "A")
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            waiting = pool.submit(client.get, "/api/v1/sync/changes",
+                                  params={"after": 1, "timeout": 10}, headers=headers)
+            time.sleep(0.2)
+            started = time.monotonic()
+            self._push(client, headers, "B")
+            notice = waiting.result(timeout=10).json()
+
+        assert notice == {"seq": 2, "changed": True}
+        assert time.monotonic() - started < 5, "woken by the write, not by the timeout"
+
+    def test_the_event_stream_resumes_from_after(self, client, headers):
+        self._push(client, headers, "A")
+        self._push(client, headers, "B")
+
+        response = client.get("/api/v1/sync/changes/stream",
+                              params={"after": 1, "timeout": 0.2}, headers=headers)
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block for block in response.text.split("\n\n") if block.startswith("id:")]
+        assert events == ['id: 2\nevent: change\ndata: {"seq": 2}']
+
+    def test_the_event_stream_honours_last_event_id(self, client, headers):
+        self._push(client, headers, "A")
+
+        response = client.get("/api/v1/sync/changes/stream", params={"timeout": 0.1},
+                              headers={**headers, "Last-Event-ID": "0"})
+
+        assert 'event: change\ndata: {"seq": 1}' in response.text
@@ -0,0 +1,473 @@
+"""
+Unit tests for CompactAdjacency, the integer-array traversal engine behind
+GraphIndex.find_path and get_connected_entities.
+
+The same graph must traverse identically whether its edges sit in the
+compacted CSR base, in the write-through overlay, or in a mix of both.
+"""
+
+import random
+
+import pytest
+
+from funkygibbon.graph import adjacency as adjacency_module
+from funkygibbon.graph.adjacency import INCOMING, OUTGOING, CompactAdjacency
+
+
+def _chain(adj, ids, rel_type="next"):
+    for name in ids:
+        adj.add_node(name)
+    edges = []
+    for source, target in zip(ids, ids[1:]):
+        edge = (source, target, rel_type)
+        adj.add_edge(edge, source, target, rel_type)
+        edges.append(edge)
+    return edges
+
+
+@pytest.fixture(params=["overlay", "compacted"])
+def layout(request):
+    """Run a test against overlay-only and CSR-only edge storage."""
+    return request.param
+
+
+def _settle(adj, layout):
+    if layout == "compacted":
+        adj.compact()
+
+
+class TestCompactAdjacency:
+
+    def test_find_path_follows_outgoing_edges_only(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b", "c", "d"])
+        _settle(adj, layout)
+
+        assert adj.find_path("a", "d", max_depth=10) == ["a", "b", "c", "d"]
+        assert adj.find_path("d", "a", max_depth=10) == []
+
+    def test_find_path_respects_max_depth(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b", "c", "d"])
+        _settle(adj, layout)
+
+        assert adj.find_path("a", "d", max_depth=3) == ["a", "b", "c", "d"]
+        assert adj.find_path("a", "d", max_depth=2) == []
+
+    def test_type_filter_skips_other_relationship_types(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b"], rel_type="controls")
+        _chain(adj, ["a", "c"], rel_type="located_in")
+        _settle(adj, layout)
+
+        reached = [n for n, _, _, _ in adj.walk("a", (OUTGOING,), 1, ["controls"])]
+        assert reached == ["b"]
+        assert adj.find_path("a", "c", 5, ["controls"]) == []
+
+    def test_walk_reports_direction_and_distance(self, layout):
+        adj = CompactAdjacency()
+        edges = _chain(adj, ["a", "b", "c"])
+        _settle(adj, layout)
+
+        walked = list(adj.walk("b", (OUTGOING, INCOMING), 1))
+
+        assert walked == [("c", edges[1], OUTGOING, 1), ("a", edges[0], INCOMING, 1)]
+
+    def test_neighbourhood_returns_the_induced_k_hop_subgraph(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b", "c", "d"])
+        _edges(adj, [("c", "a"), ("x", "b")], rel_type="next")
+        _edges(adj, [("b", "y")], rel_type="controls")
+        _settle(adj, layout)
+
+        depths, payloads, truncated = adj.neighbourhood("b", (OUTGOING, INCOMING), 1, ["next"])
+        assert depths == {"b": 0, "c": 1, "a": 1, "x": 1}
+        # a -> b -> c -> a closes among the included nodes; c -> d leaves them.
+        assert sorted(payloads) == [("a", "b", "next"), ("b", "c", "next"),
+                                    ("c", "a", "next"), ("x", "b", "next")]
+        assert not truncated
+
+        depths, _, _ = adj.neighbourhood("b", (OUTGOING,), 2)
+        assert depths == {"b": 0, "c": 1, "y": 1, "a": 2, "d": 2}
+        assert adj.neighbourhood("b", (OUTGOING,), 0)[0] == {"b": 0}
+        assert adj.neighbourhood("missing", (OUTGOING,), 3) == ({}, [], False)
+
+    def test_neighbourhood_filters_and_budget(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "skip", "c"])
+        _chain(adj, ["a", "d", "e"])
+        _settle(adj, layout)
+
+        # A rejected node is not walked through, so c is out of reach.
+        depths, payloads, _ = adj.neighbourhood("a", (OUTGOING,), 3, admit=lambda i: i != "skip")
+        assert depths == {"a": 0, "d": 1, "e": 2}
+        assert len(payloads) == 2
+
+        depths, _, truncated = adj.neighbourhood("a", (OUTGOING,), 3, max_nodes=2)
+        assert len(depths) == 2 and truncated
+        depths, _, truncated = adj.neighbourhood("a", (OUTGOING,), 3, max_nodes=5)
+        assert len(depths) == 5 and not truncated
+
+    def test_snapshot_does_not_see_later_writes(self, layout):
+        adj = CompactAdjacency()
+        edges = _chain(adj, ["a", "b", "c"])
+        _settle(adj, layout)
+        snapshot = adj.snapshot()
+
+        adj.remove_edge(edges[0], "a", "next")
+        _chain(adj, ["c", "d"])
+        adj.remove_node("b")
+        assert adj.find_path("a", "c", 5) == []
+        adj.compact()
+
+        assert snapshot.find_path("a", "c", 5) == ["a", "b", "c"]
+        assert snapshot.find_path("c", "d", 5) == []
+        assert [n for n, _, _, _ in snapshot.walk("a", (OUTGOING,), 2)] == ["b", "c"]
+        assert adj.find_path("c", "d", 5) == ["c", "d"]
+
+    def test_snapshot_shares_the_base_and_copies_only_the_overlay(self):
+        adj = CompactAdjacency()
+        edges = _chain(adj, ["a", "b", "c"])
+        adj.compact()
+        _chain(adj, ["c", "d"])
+        snapshot = adj.snapshot()
+        assert snapshot._base is adj._base
+        assert snapshot.edges is adj.edges and snapshot.slots is adj.slots
+        assert snapshot._overlay[OUTGOING] is not adj._overlay[OUTGOING]
+        assert snapshot._edge_alive is adj._edge_alive
+
+        # The first write copies the flags it is about to flip; appends past
+        # the snapshot stay out of its reach through the shared tables.
+        adj.remove_edge(edges[1], "b", "next")
+        assert snapshot._edge_alive is not adj._edge_alive
+        _chain(adj, ["d", "e"])
+        assert not snapshot.has_node("e")
+        assert snapshot.find_path("a", "e", 5) == []
+        assert snapshot.search(["a"], 5, goals=["d", "e"])[0] == {"a": 0, "b": 1, "c": 2, "d": 3}
+        assert snapshot.find_path("a", "d", 5) == ["a", "b", "c", "d"]
+        assert adj.find_path("a", "d", 5) == []
+
+    def test_removed_edges_and_nodes_are_not_traversed(self, layout):
+        adj = CompactAdjacency()
+        edges = _chain(adj, ["a", "b", "c"])
+        _settle(adj, layout)
+
+        assert adj.remove_edge(edges[1], "b", "next")
+        assert adj.find_path("a", "c", 5) == []
+        adj.remove_node("b")
+        assert adj.find_path("a", "b", 5) == []
+        assert not adj.remove_edge(edges[1], "b", "next")
+
+    def test_remove_edge_scans_the_shorter_end_of_a_hub(self, layout):
+        adj = CompactAdjacency()
+        spokes = [f"device-{i}" for i in range(50)]
+        edges = {}
+        for spoke in spokes:
+            adj.add_node(spoke)
+            edge = (spoke, "hub")
+            adj.add_edge(edge, "hub", spoke, "controls")
+            edges[spoke] = edge
+        adj.add_node("hub")
+        _settle(adj, layout)
+        seen = []
+        scan = adj._adjacent
+        adj._adjacent = lambda slot, *a, **kw: seen.append(adj.ids[slot]) or scan(slot, *a, **kw)
+
+        assert adj.remove_edge(edges["device-7"], "hub", "controls", "device-7")
+        assert seen == ["device-7"], "the target's one-edge row, not the hub's fifty"
+        assert not adj.remove_edge(edges["device-7"], "hub", "controls", "device-7")
+        del adj._adjacent
+        assert adj.find_path("hub", "device-7", 1) == []
+        assert adj.find_path("hub", "device-8", 1) == ["hub", "device-8"]
+
+    def test_overlay_edges_join_compacted_ones(self):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b"])
+        adj.compact()
+        _chain(adj, ["b", "c"])
+
+        assert adj.find_path("a", "c", 5) == ["a", "b", "c"]
+
+    def test_compaction_renumbers_and_drops_dead_slots(self):
+        adj = CompactAdjacency()
+        edges = _chain(adj, ["a", "b", "c"])
+        adj.remove_edge(edges[0], "a", "next")
+        adj.remove_node("a")
+
+        adj.compact()
+
+        assert adj.ids == ["b", "c"]
+        assert adj.edge_count == 1
+        assert adj.find_path("b", "c", 5) == ["b", "c"]
+
+    def test_writes_trigger_compaction_past_the_threshold(self, monkeypatch):
+        monkeypatch.setattr(adjacency_module, "COMPACT_MIN_PENDING", 3)
+        adj = CompactAdjacency()
+
+        _chain(adj, ["a", "b", "c", "d", "e"])
+
+        # The fourth edge crossed the threshold and folded all four into CSR.
+        assert adj._base_edges == 4
+        assert adj._overlay == ({}, {})
+        assert adj.find_path("a", "e", 10) == ["a", "b", "c", "d", "e"]
+
+    def test_bulk_load_is_traversable_after_compact(self):
+        adj = CompactAdjacency()
+        adj.begin_bulk()
+        edges = _chain(adj, ["a", "b", "c"])
+
+        assert adj.remove_edge(edges[1], "b", "next")
+        assert adj.find_path("a", "b", 5) == ["a", "b"]
+        assert adj.find_path("a", "c", 5) == []
+
+
+class TestBidirectionalFindPath:
+
+    def test_meets_in_the_middle_on_the_shortest_route(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b", "c", "d", "e", "f"])
+        _chain(adj, ["a", "x", "f"])
+        _settle(adj, layout)
+
+        assert adj.find_path("a", "f", 10) == ["a", "x", "f"]
+
+    def test_max_depth_bounds_the_combined_search(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b", "c", "d", "e"])
+        _settle(adj, layout)
+
+        assert adj.find_path("a", "e", 4) == ["a", "b", "c", "d", "e"]
+        assert adj.find_path("a", "e", 3) == []
+
+    def test_undirected_follows_edges_against_their_direction(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["lamp", "room"], rel_type="located_in")
+        _chain(adj, ["sensor", "room"], rel_type="located_in")
+        _settle(adj, layout)
+
+        assert adj.find_path("lamp", "sensor", 5) == []
+        assert adj.find_path("lamp", "sensor", 5, undirected=True) == ["lamp", "room", "sensor"]
+
+    def test_type_filter_applies_to_both_frontiers(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b", "c"], rel_type="controls")
+        _chain(adj, ["a", "c"], rel_type="located_in")
+        _settle(adj, layout)
+
+        assert adj.find_path("a", "c", 5, ["controls"]) == ["a", "b", "c"]
+        assert adj.find_path("a", "c", 5, ["located_in"]) == ["a", "c"]
+
+
+class TestMultiSourceSearch:
+
+    def test_one_search_reaches_every_target(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["hub", "a", "b"])
+        _chain(adj, ["hub", "c"])
+        adj.add_node("island")
+        _settle(adj, layout)
+
+        distance, parent = adj.search(["hub"], 10, goals=["b", "c", "island"])
+
+        assert distance["b"] == 2 and distance["c"] == 1
+        assert "island" not in distance
+        assert parent["b"] == "a" and parent["hub"] is None
+
+    def test_search_stops_once_every_goal_is_reached(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "b", "c", "d"])
+        _settle(adj, layout)
+
+        distance, _ = adj.search(["a"], 10, goals=["b"])
+
+        assert "b" in distance and "c" not in distance
+
+    def test_several_sources_share_one_frontier(self, layout):
+        adj = CompactAdjacency()
+        _chain(adj, ["a", "x"])
+        _chain(adj, ["b", "y", "z"])
+        _settle(adj, layout)
+
+        distance, _ = adj.search(["a", "b"], 1)
+
+        assert distance == {"a": 0, "b": 0, "x": 1, "y": 1}
+
+
+def _weighted(adj, source, target, cost, rel_type="connects_to"):
+    edge = {"from": source, "to": target, "cost": cost}
+    adj.add_node(source)
+    adj.add_node(target)
+    adj.add_edge(edge, source, target, rel_type)
+    return edge
+
+
+def _cost(edge):
+    return edge["cost"]
+
+
+class TestCheapestPaths:
+
+    def test_dijkstra_prefers_the_cheaper_longer_route(self, layout):
+        adj = CompactAdjacency()
+        _weighted(adj, "a", "d", 10)
+        _weighted(adj, "a", "b", 1)
+        _weighted(adj, "b", "c", 1)
+        _weighted(adj, "c", "d", 1)
+        _settle(adj, layout)
+
+        [(cost, path, edges)] = adj.cheapest_paths("a", "d", _cost)
+
+        assert (cost, path) == (3, ["a", "b", "c", "d"])
+        assert [e["to"] for e in edges] == ["b", "c", "d"]
+
+    def test_hop_bound_falls_back_to_the_dearer_short_route(self, layout):
+        adj = CompactAdjacency()
+        _weighted(adj, "a", "d", 10)
+        _weighted(adj, "a", "b", 1)
+        _weighted(adj, "b", "c", 1)
+        _weighted(adj, "c", "d", 1)
+        _settle(adj, layout)
+
+        [(cost, path, _)] = adj.cheapest_paths("a", "d", _cost, max_depth=2)
+
+        assert (cost, path) == (10, ["a", "d"])
+
+    def test_hop_bound_keeps_a_dearer_label_with_fewer_hops(self, layout):
+        # b is cheapest via the long way round, but only the direct,
+        # dearer b leaves enough hops to reach d within three.
+        adj = CompactAdjacency()
+        _weighted(adj, "a", "x", 1)
+        _weighted(adj, "x", "y", 1)
+        _weighted(adj, "y", "b", 1)
+        _weighted(adj, "a", "b", 5)
+        _weighted(adj, "b", "c", 1)
+        _weighted(adj, "c", "d", 1)
+        _settle(adj, layout)
+
+        [(cost, path, _)] = adj.cheapest_paths("a", "d", _cost, max_depth=3)
+
+        assert (cost, path) == (7, ["a", "b", "c", "d"])
+
+    def test_yen_returns_k_loopless_alternatives_cheapest_first(self, layout):
+        adj = CompactAdjacency()
+        for source, target, cost in [("c", "d", 3), ("c", "e", 2), ("d", "f", 4), ("e", "d", 1),
+                                     ("e", "f", 2), ("e", "g", 3), ("f", "g", 2), ("f", "h", 1),
+                                     ("g", "h", 2)]:
+            _weighted(adj, source, target, cost)
+        _settle(adj, layout)
+
+        found = adj.cheapest_paths("c", "h", _cost, k=3)
+
+        assert [(cost, path) for cost, path, _ in found] == [
+            (5, ["c", "e", "f", "h"]),
+            (7, ["c", "e", "g", "h"]),
+            (8, ["c", "d", "f", "h"]),
+        ]
+
+    def test_fewer_than_k_paths_exist(self, layout):
+        adj = CompactAdjacency()
+        _weighted(adj, "a", "b", 1)
+        _settle(adj, layout)
+
+        assert len(adj.cheapest_paths("a", "b", _cost, k=5)) == 1
+        assert adj.cheapest_paths("b", "a", _cost) == []
+
+    def test_heuristic_search_agrees_with_dijkstra(self, layout):
+        adj = CompactAdjacency()
+        _weighted(adj, "a", "b", 2)
+        _weighted(adj, "b", "c", 2)
+        _weighted(adj, "a", "c", 5)
+        _settle(adj, layout)
+        remaining = {"a": 3, "b": 2, "c": 0}
+
+        [(cost, path, _)] = adj.cheapest_paths("a", "c", _cost, heuristic=remaining.get)
+
+        assert (cost, path) == (4, ["a", "b", "c"])
+
+    def test_negative_costs_are_refused(self, layout):
+        adj = CompactAdjacency()
+        _weighted(adj, "a", "b", -1)
+        _settle(adj, layout)
+
+        with pytest.raises(ValueError):
+            adj.cheapest_paths("a", "b", _cost)
+
+
+def _edges(adj, pairs, rel_type="controls"):
+    for source, target in pairs:
+        adj.add_node(source)
+        adj.add_node(target)
+        adj.add_edge((source, target, rel_type), source, target, rel_type)
+
+
+class TestCycles:
+
+    def test_components_are_the_looping_groups(self, layout):
+        adj = CompactAdjacency()
+        _edges(adj, [("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "e"), ("e", "d"),
+                     ("f", "f"), ("g", "h")])
+        _settle(adj, layout)
+
+        components = sorted(sorted(c) for c in adj.strongly_connected_components())
+        assert components == [["a", "b", "c"], ["d", "e"], ["f"]]
+
+    def test_every_cycle_once_each(self, layout):
+        adj = CompactAdjacency()
+        # Two loops sharing the edge a -> b, a parallel edge and a self-loop.
+        _edges(adj, [("a", "b"), ("b", "a"), ("b", "c"), ("c", "a"), ("b", "a"), ("c", "c")])
+        _edges(adj, [("b", "a")], rel_type="monitors")
+        _settle(adj, layout)
+
+        cycles, complete = adj.simple_cycles(rel_types=["controls"])
+        assert complete
+        assert sorted(cycles) == [["a", "b", "a"], ["a", "b", "c", "a"], ["c", "c"]]
+
+    def test_max_length_and_budgets(self, layout):
+        adj = CompactAdjacency()
+        ring = [f"n{i}" for i in range(6)]
+        _edges(adj, list(zip(ring, ring[1:] + ring[:1])) + [("n0", "n3"), ("n3", "n0")])
+        _settle(adj, layout)
+
+        # The ring, the chord's 2-cycle, and the two halves of the ring.
+        every, complete = adj.simple_cycles()
+        assert complete
+        assert sorted(len(cycle) - 1 for cycle in every) == [2, 4, 4, 6]
+        short, complete = adj.simple_cycles(max_length=4)
+        assert complete
+        assert sorted(len(cycle) - 1 for cycle in short) == [2, 4, 4]
+
+        assert adj.simple_cycles(max_cycles=1) == (every[:1], False)
+        assert adj.simple_cycles(max_steps=2)[1] is False
+
+    def test_matches_brute_force_enumeration(self):
+        for seed in range(40):
+            rng = random.Random(seed)
+            names = [f"n{i}" for i in range(rng.randint(2, 7))]
+            pairs = [(rng.choice(names), rng.choice(names)) for _ in range(rng.randint(1, 16))]
+            adj = CompactAdjacency()
+            _edges(adj, pairs)
+
+            def brute(max_length):
+                found, successors = set(), {}
+                for source, target in pairs:
+                    successors.setdefault(source, set()).add(target)
+
+                def extend(path):
+                    for successor in successors.get(path[-1], ()):
+                        if successor == path[0]:
+                            found.add(tuple(path))
+                        elif successor > path[0] and successor not in path and (
+                            max_length is None or len(path) < max_length
+                        ):
+                            extend(path + [successor])
+                for name in names:
+                    extend([name])
+                return found
+
+            for max_length in (None, 1, 3):
+                cycles, _ = adj.simple_cycles(max_length=max_length)
+                # Compare as sets of edges: the two root a cycle differently.
+                as_edges = {frozenset(zip(c, c[1:])) for c in cycles}
+                expected = {frozenset(zip(p + (p[0],), p[1:] + (p[0],))) for p in brute(max_length)}
+                assert len(as_edges) == len(cycles), seed
+                assert as_edges == expected, (seed, max_length)
@@ -0,0 +1,198 @@
+"""
+Unit tests for whole-graph analytics (funkygibbon/graph/analytics.py)
+"""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from funkygibbon.graph import analytics
+from funkygibbon.graph.analytics import AnalyticsEngine, compute_analytics, export_graph
+from funkygibbon.graph.index import GraphIndex
+from funkygibbon.models import (
+    Entity, EntityRelationship, EntityType, RelationshipType, SourceType,
+)
+
+
+def _entity(name, entity_type=EntityType.DEVICE):
+    return Entity(
+        id=name, version=f"v-{uuid4()}", entity_type=entity_type, name=name,
+        content={}, source_type=SourceType.MANUAL,
+    )
+
+
+def _edge(source, target, rel_type=RelationshipType.CONTROLS):
+    return EntityRelationship(
+        id=str(uuid4()), from_entity_id=source, to_entity_id=target, relationship_type=rel_type,
+    )
+
+
+def _index(names, edges):
+    index = GraphIndex()
+    index.load_rows([_entity(name) for name in names], [_edge(*edge) for edge in edges])
+    return index
+
+
+@pytest.fixture
+def house():
+    """A bridge CONTROLS three lights, which sit LOCATED_IN one room, plus a
+    disconnected pair of sensors."""
+    lights = ["light-1", "light-2", "light-3"]
+    edges = [("bridge", light) for light in lights]
+    edges += [(light, "room", RelationshipType.LOCATED_IN) for light in lights]
+    edges += [("sensor-a", "sensor-b", RelationshipType.CONNECTS_TO)]
+    return _index(["bridge", "room", "sensor-a", "sensor-b", *lights], edges)
+
+
+def _by_id(result, metric):
+    return dict(zip(result.ids, getattr(result, metric)))
+
+
+class TestComputeAnalytics:
+
+    def test_pagerank_sums_to_one_and_favours_the_room(self, house):
+        result = compute_analytics(export_graph(house), generation=4)
+        pagerank = _by_id(result, "pagerank")
+
+        assert result.generation == 4
+        assert sum(pagerank.values()) == pytest.approx(1.0)
+        assert max(pagerank, key=pagerank.get) == "room"
+        assert pagerank["light-1"] == pytest.approx(pagerank["light-3"])
+
+    def test_hits_bridge_is_the_hub_and_the_room_the_authority(self, house):
+        result = compute_analytics(export_graph(house), generation=1)
+        hubs, authorities = _by_id(result, "hubs"), _by_id(result, "authorities")
+
+        assert sum(hubs.values()) == pytest.approx(1.0)
+        assert sum(authorities.values()) == pytest.approx(1.0)
+        assert max(authorities, key=authorities.get) == "room"
+        assert hubs["room"] == 0.0
+        assert authorities["bridge"] == 0.0
+
+    def test_betweenness_of_a_path_and_a_star(self):
+        path = compute_analytics(export_graph(_index("abc", [("a", "b"), ("b", "c")])), 1)
+        assert _by_id(path, "betweenness") == {"a": 0.0, "b": 1.0, "c": 0.0}
+
+        # Undirected: edge direction and parallel edges do not matter.
+        star = _index(["hub", "x", "y", "z"], [("x", "hub"), ("hub", "y"), ("z", "hub"), ("z", "hub")])
+        betweenness = _by_id(compute_analytics(export_graph(star), 1), "betweenness")
+        assert betweenness["hub"] == pytest.approx(1.0)
+        assert betweenness["x"] == 0.0
+
+    def test_components_are_numbered_largest_first(self, house):
+        result = compute_analytics(export_graph(house), generation=1)
+
+        assert result.component_sizes == [5, 2]
+        assert result.scores("sensor-a")["component"] == 1
+        assert result.scores("bridge")["component_size"] == 5
+        assert result.scores("missing") is None
+        assert result.summary()["top_pagerank"][0] == "room"
+
+    def test_large_graphs_sample_betweenness(self, monkeypatch):
+        monkeypatch.setattr(analytics, "BETWEENNESS_PIVOTS", 3)
+        names = [f"n{i}" for i in range(8)]
+        chain = _index(names, list(zip(names, names[1:])))
+
+        result = compute_analytics(export_graph(chain), 1)
+        assert result.betweenness_sampled
+        assert compute_analytics(export_graph(chain), 1).betweenness == result.betweenness
+
+    def test_empty_and_edgeless_graphs(self):
+        empty = compute_analytics(export_graph(GraphIndex()), 0)
+        assert empty.ids == [] and empty.component_sizes == []
+
+        lonely = compute_analytics(export_graph(_index(["a", "b"], [])), 1)
+        assert _by_id(lonely, "pagerank") == {"a": 0.5, "b": 0.5}
+        assert lonely.hubs == [0.0, 0.0]
+        assert lonely.component_sizes == [1, 1]
+
+    def test_numpy_and_python_backends_agree(self, house, monkeypatch):
+        if analytics.np is None:
+            pytest.skip("numpy not installed")
+        export = export_graph(house)
+        vectorised = compute_analytics(export, 1)
+        monkeypatch.setattr(analytics, "np", None)
+        plain = compute_analytics(export, 1)
+
+        assert (vectorised.backend, plain.backend) == ("numpy", "python")
+        for metric in analytics.METRICS:
+            assert getattr(vectorised, metric) == pytest.approx(getattr(plain, metric))
+
+
+class TestAnalyticsEngine:
+
+    @pytest.mark.asyncio
+    async def test_recomputes_in_the_background_when_the_generation_moves(self, house):
+        generation = 1
+        engine = AnalyticsEngine(house, lambda: generation, debounce=0)
+
+        engine.notify()
+        assert engine.latest is None, "nothing runs before start()"
+
+        engine.start()
+        engine.notify()
+        await engine._task
+        assert engine.latest.generation == 1 and engine.is_current
+
+        house.upsert_entity(_entity("light-4"))
+        generation = 2
+        assert not engine.is_current
+        engine.notify()
+        engine.notify()  # coalesced into the run already scheduled
+        await engine._task
+        assert engine.latest.generation == 2
+        assert "light-4" in engine.latest.ids
+
+        await engine.stop()
+        assert not engine.started
+
+    @pytest.mark.asyncio
+    async def test_each_notify_restarts_the_quiet_period(self, house, monkeypatch):
+        generation = 0
+        engine = AnalyticsEngine(house, lambda: generation, debounce=0.05)
+        loop = asyncio.get_running_loop()
+        runs = []
+        real_compute = engine.compute_now
+
+        async def compute_now():
+            runs.append(loop.time())
+            return await real_compute()
+        monkeypatch.setattr(engine, "compute_now", compute_now)
+        engine.start()
+
+        for _ in range(5):
+            generation += 1
+            engine.notify()
+            last = loop.time()
+            await asyncio.sleep(0.02)
+        assert runs == [], "a burst shorter than the debounce apart never runs"
+        await engine._task
+
+        assert len(runs) == 1 and runs[0] - last >= 0.05
+        assert engine.latest.generation == 5
+
+    @pytest.mark.asyncio
+    async def test_a_steady_trickle_still_runs_within_the_max_delay(self, house):
+        generation = 0
+        engine = AnalyticsEngine(house, lambda: generation, debounce=0.05, max_delay=0.1)
+        engine.start()
+
+        ran_meanwhile = False
+        for _ in range(15):
+            ran_meanwhile = ran_meanwhile or engine.latest is not None
+            generation += 1
+            engine.notify()
+            await asyncio.sleep(0.02)
+
+        assert ran_meanwhile, "notifies 0.02s apart must not postpone the run past max_delay"
+        await engine.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_a_pending_run(self, house):
+        engine = AnalyticsEngine(house, lambda: 1, debounce=60)
+        engine.start()
+        engine.notify()
+        await asyncio.sleep(0)
+        await engine.stop()
+        assert engine.latest is None
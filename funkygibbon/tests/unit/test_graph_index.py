@@ -2,6 +2,8 @@
 Unit tests for GraphIndex
 """
 
+import random
+
 import pytest
 from uuid import uuid4
 
@@ -9,6 +11,7 @@ from funkygibbon.models import (
     Entity, EntityType, SourceType,
     EntityRelationship, RelationshipType
 )
+from funkygibbon.graph.costs import EdgeCosts, unit_cost
 from funkygibbon.graph.index import GraphIndex
 
 
@@ -78,6 +81,42 @@ class TestGraphIndex:
         assert rel in index.relationships_by_target[room.id]
         assert rel in index.relationships_by_type[RelationshipType.LOCATED_IN]
 
+    def test_repushed_edges_on_a_hub_replace_in_place(self):
+        """Re-adding an edge by id swaps one entry; its neighbours keep their order"""
+        index = GraphIndex()
+        home = self.create_test_entity(EntityType.HOME, "Home")
+        rooms = [self.create_test_entity(EntityType.ROOM, f"Room {i}") for i in range(5)]
+        for entity in [home, *rooms]:
+            index._add_entity(entity)
+
+        def located_in(room, rel_id, **properties):
+            return EntityRelationship(
+                id=rel_id,
+                from_entity_id=room.id,
+                to_entity_id=home.id,
+                relationship_type=RelationshipType.LOCATED_IN,
+                properties=properties
+            )
+
+        ids = [str(uuid4()) for _ in rooms]
+        for room, rel_id in zip(rooms, ids):
+            index.upsert_relationship(located_in(room, rel_id))
+        repushed = located_in(rooms[2], ids[2], floor=1)
+        index.upsert_relationship(repushed)
+
+        incoming = list(index.relationships_by_target[home.id])
+        assert [rel.id for rel in incoming] == ids[:2] + ids[3:] + [ids[2]]
+        assert incoming[-1] is repushed
+        assert len(index.relationships_by_type[RelationshipType.LOCATED_IN]) == 5
+        assert index.nodes[home.id].incoming[repushed] == rooms[2].id
+        assert len(index.nodes[home.id].incoming) == 5
+
+        assert index.remove_relationship(ids[2])
+        assert repushed not in index.relationships_by_source.get(rooms[2].id, {})
+        assert len(index.nodes[home.id].incoming) == 4
+        assert index.find_path(rooms[2].id, home.id) == []
+        assert index.find_path(rooms[3].id, home.id) == [rooms[3].id, home.id]
+
     def test_build_nodes(self):
         """Test building graph nodes"""
         index = GraphIndex()
@@ -197,6 +236,102 @@ class TestGraphIndex:
         path = index.find_path(entities[0].id, entities[4].id, max_depth=2)
         assert len(path) == 0
 
+    def test_find_path_direction_and_type_filter(self):
+        """Undirected search crosses edges backwards; filters limit the types"""
+        index = GraphIndex()
+
+        lamp = self.create_test_entity(EntityType.DEVICE, "Lamp")
+        sensor = self.create_test_entity(EntityType.DEVICE, "Sensor")
+        room = self.create_test_entity(EntityType.ROOM, "Room")
+        for entity in [lamp, sensor, room]:
+            index._add_entity(entity)
+        for device in [lamp, sensor]:
+            index._add_relationship(EntityRelationship(
+                from_entity_id=device.id,
+                to_entity_id=room.id,
+                relationship_type=RelationshipType.LOCATED_IN
+            ))
+
+        assert index.find_path(lamp.id, sensor.id) == []
+        assert index.find_path(lamp.id, sensor.id, direction="undirected") == [
+            lamp.id, room.id, sensor.id
+        ]
+        assert index.find_path(
+            lamp.id, sensor.id, direction="undirected",
+            rel_types=[RelationshipType.CONTROLS]
+        ) == []
+        with pytest.raises(ValueError):
+            index.find_path(lamp.id, sensor.id, direction="sideways")
+
+    def test_batch_path_queries(self):
+        """find_paths, distance_matrix and reachable agree with find_path"""
+        index = GraphIndex()
+
+        room = self.create_test_entity(EntityType.ROOM, "Room")
+        devices = [self.create_test_entity(EntityType.DEVICE, f"Device {i}") for i in range(3)]
+        loner = self.create_test_entity(EntityType.DEVICE, "Loner")
+        for entity in [room, loner, *devices]:
+            index._add_entity(entity)
+        for device in devices[:2]:
+            index._add_relationship(EntityRelationship(
+                from_entity_id=room.id,
+                to_entity_id=device.id,
+                relationship_type=RelationshipType.MANAGES
+            ))
+        index._add_relationship(EntityRelationship(
+            from_entity_id=devices[1].id,
+            to_entity_id=devices[2].id,
+            relationship_type=RelationshipType.CONTROLS
+        ))
+        targets = [d.id for d in devices] + [loner.id]
+
+        paths = index.find_paths(room.id, targets)
+        assert paths == {t: index.find_path(room.id, t) for t in targets}
+        assert paths[devices[2].id] == [room.id, devices[1].id, devices[2].id]
+        assert paths[loner.id] == []
+
+        matrix = index.distance_matrix([room.id, devices[1].id], targets)
+        assert matrix[room.id] == {
+            devices[0].id: 1, devices[1].id: 1, devices[2].id: 2, loner.id: None
+        }
+        assert matrix[devices[1].id][devices[1].id] == 0
+        assert matrix[devices[1].id][devices[0].id] is None
+
+        assert index.reachable([devices[0].id, devices[1].id], targets) == {
+            devices[0].id, devices[1].id, devices[2].id
+        }
+        assert index.reachable([loner.id], targets, direction="undirected") == {loner.id}
+
+    def test_weighted_paths_prefer_doors_over_windows(self):
+        """Default EdgeCosts rank a two-door route below a direct window"""
+        index = GraphIndex()
+
+        kitchen, hall, garden = [
+            self.create_test_entity(EntityType.ROOM, name) for name in ("Kitchen", "Hall", "Garden")
+        ]
+        for entity in [kitchen, hall, garden]:
+            index._add_entity(entity)
+        for source, target, via in [(kitchen, garden, "window"), (kitchen, hall, "door"),
+                                    (hall, garden, "Door")]:
+            index._add_relationship(EntityRelationship(
+                from_entity_id=source.id,
+                to_entity_id=target.id,
+                relationship_type=RelationshipType.CONNECTS_TO,
+                properties={"via": via}
+            ))
+
+        best, second = index.find_weighted_paths(kitchen.id, garden.id, k=2)
+        assert best["path"] == [kitchen.id, hall.id, garden.id] and best["cost"] == 2.0
+        assert second["path"] == [kitchen.id, garden.id] and second["cost"] == 10.0
+
+        by_hops = index.find_weighted_paths(kitchen.id, garden.id, costs=unit_cost)
+        assert by_hops[0]["path"] == [kitchen.id, garden.id]
+
+        explicit = EdgeCosts(type_costs={RelationshipType.CONNECTS_TO: 3.0})
+        assert index.find_weighted_paths(kitchen.id, garden.id, costs=explicit)[0]["cost"] == 6.0
+        with pytest.raises(ValueError):
+            EdgeCosts(type_costs={RelationshipType.CONNECTS_TO: -1.0})
+
     def test_get_connected_entities(self):
         """Test getting connected entities"""
         index = GraphIndex()
@@ -271,6 +406,115 @@ class TestGraphIndex:
         assert len(exact) == 1
         assert exact[0].name == "Smart Light"
 
+    def test_fuzzy_name_search_matches_a_full_scan(self):
+        """Trigram lookup returns what scanning every name would, through renames and removals"""
+        index = GraphIndex()
+        names = ["Smart Light", "Light Switch", "Lighting Control Room", "Hall Light",
+                 "Temperature Sensor", "Ceiling Fan", "Fan Light", "Lightning Rod"]
+        entities = [self.create_test_entity(EntityType.DEVICE, name) for name in names]
+        for entity in entities:
+            index._add_entity(entity)
+
+        renamed = self.create_test_entity(EntityType.DEVICE, "Porch Lamp")
+        renamed.id = entities[0].id
+        index._add_entity(renamed)
+        index.remove_entity(entities[3].id)
+
+        def scan(query):
+            return sorted(e.id for e in index.entities.values() if query.lower() in e.name.lower())
+
+        for query in ["light", "LIGHT", "ght", "ig", "l", "", "lightn", "porch", "smart", "xyz",
+                      "fan light", "room"]:
+            found = sorted(e.id for e in index.find_entities_by_name(query))
+            assert found == scan(query), query
+        assert "smart light" not in index.entities_by_name
+        assert "sma" not in index.name_trigrams.postings, "a vanished name leaves no postings"
+
+    def test_hierarchy_queries(self):
+        """Containment ancestry is answered from the closure, per relationship type"""
+        index = GraphIndex()
+        home = self.create_test_entity(EntityType.HOME, "Home")
+        floor = self.create_test_entity(EntityType.ZONE, "Ground Floor")
+        kitchen = self.create_test_entity(EntityType.ROOM, "Kitchen")
+        lamp = self.create_test_entity(EntityType.DEVICE, "Lamp")
+        for entity in [home, floor, kitchen, lamp]:
+            index._add_entity(entity)
+
+        def edge(source, target, rel_type=RelationshipType.LOCATED_IN):
+            rel = EntityRelationship(id=str(uuid4()), from_entity_id=source.id,
+                                     to_entity_id=target.id, relationship_type=rel_type)
+            index._add_relationship(rel)
+            return rel
+
+        edge(lamp, kitchen)
+        to_floor = edge(kitchen, floor)
+        edge(floor, home)
+        edge(kitchen, home, RelationshipType.PART_OF)
+        edge(lamp, kitchen, RelationshipType.CONTROLS)
+
+        located = RelationshipType.LOCATED_IN
+        assert index.is_ancestor(home.id, lamp.id, located)
+        assert not index.is_ancestor(lamp.id, home.id, located)
+        assert {e.id for e in index.get_ancestors(lamp.id, located)} == {kitchen.id, floor.id, home.id}
+        assert {e.id for e in index.get_descendants(home.id, located)} == {floor.id, kitchen.id, lamp.id}
+        assert {e.id for e in index.get_ancestors(lamp.id, RelationshipType.PART_OF)} == set()
+        assert {e.id for e in index.get_descendants(home.id, RelationshipType.PART_OF)} == {kitchen.id}
+        with pytest.raises(ValueError):
+            index.is_ancestor(kitchen.id, lamp.id, RelationshipType.CONTROLS)
+
+        index.remove_relationship(to_floor.id)
+        assert not index.is_ancestor(home.id, lamp.id, located)
+        assert {e.id for e in index.get_descendants(home.id, located)} == {floor.id}
+
+        index.remove_entity(floor.id)
+        assert index.get_descendants(home.id, located) == []
+        assert floor.id not in index.hierarchy.descendants[located]
+
+    def test_hierarchy_closure_matches_a_walk_under_churn(self):
+        """Linking and unlinking at random -- shared parents, re-pushed pairs and
+        cycles included -- leaves the closure equal to walking the edges"""
+        import random
+
+        rng = random.Random(7)
+        index = GraphIndex()
+        entities = [self.create_test_entity(EntityType.ZONE, f"Zone {i}") for i in range(30)]
+        for entity in entities:
+            index._add_entity(entity)
+        located = RelationshipType.LOCATED_IN
+
+        def walked_ancestors(entity_id):
+            found, frontier = set(), [entity_id]
+            while frontier:
+                current = frontier.pop()
+                for rel in index.relationships_by_source.get(current, ()):
+                    parent = rel.to_entity_id
+                    if rel.relationship_type == located and parent not in found and parent != entity_id:
+                        found.add(parent)
+                        frontier.append(parent)
+            return found
+
+        live = []
+        for step in range(400):
+            if live and rng.random() < 0.4:
+                index.remove_relationship(live.pop(rng.randrange(len(live))).id)
+            else:
+                # Mostly downward edges, the occasional upward one closes a loop.
+                a, b = sorted(rng.sample(range(len(entities)), 2))
+                if rng.random() < 0.1:
+                    a, b = b, a
+                rel = EntityRelationship(id=str(uuid4()), from_entity_id=entities[b].id,
+                                         to_entity_id=entities[a].id, relationship_type=located)
+                index._add_relationship(rel)
+                live.append(rel)
+            if step % 20 == 0 or step == 399:
+                for entity in entities:
+                    ancestors = walked_ancestors(entity.id)
+                    assert index.hierarchy.ancestors_of(entity.id, located) == ancestors
+                    for other in entities:
+                        assert (entity.id in index.hierarchy.descendants_of(other.id, located)) == (
+                            other.id in ancestors
+                        )
+
     def test_get_subgraph(self):
         """Test extracting a subgraph"""
         index = GraphIndex()
@@ -312,6 +556,47 @@ class TestGraphIndex:
         assert device1.id in subgraph["entities"]
         assert len(subgraph["relationships"]) == 1  # Only rel1
 
+    def test_ego_subgraph_matches_a_walk(self):
+        """The k-hop neighbourhood agrees with get_connected_entities and
+        carries every edge among its members"""
+        rng = random.Random(7)
+        index = GraphIndex()
+        entities = [
+            self.create_test_entity(rng.choice([EntityType.ROOM, EntityType.DEVICE]), f"E{i}")
+            for i in range(40)
+        ]
+        for entity in entities:
+            index._add_entity(entity)
+        for _ in range(80):
+            source, target = rng.sample(entities, 2)
+            index._add_relationship(EntityRelationship(
+                id=str(uuid4()), from_entity_id=source.id, to_entity_id=target.id,
+                relationship_type=rng.choice([RelationshipType.CONNECTS_TO, RelationshipType.CONTROLS]),
+            ))
+
+        center = entities[0]
+        for depth in (0, 1, 2, 3):
+            ego = index.get_ego_subgraph(center.id, depth=depth)
+            walked = {center.id: 0}
+            for connected in index.get_connected_entities(center.id, max_depth=depth):
+                walked.setdefault(connected["entity"].id, connected["distance"])
+            assert ego["depths"] == walked
+            members = set(ego["entities"])
+            induced = [rel for rel in index.relationships_by_id.values()
+                       if rel.from_entity_id in members and rel.to_entity_id in members]
+            assert sorted(r.id for r in ego["relationships"]) == sorted(r.id for r in induced)
+            assert list(ego["entities"]) == sorted(ego["entities"], key=ego["depths"].get)
+
+        devices = index.get_ego_subgraph(center.id, depth=3, entity_types=[EntityType.DEVICE])
+        assert all(e.entity_type == EntityType.DEVICE for eid, e in devices["entities"].items()
+                   if eid != center.id)
+        controls = index.get_ego_subgraph(center.id, depth=3, rel_types=[RelationshipType.CONTROLS])
+        assert all(r.relationship_type == RelationshipType.CONTROLS for r in controls["relationships"])
+
+        capped = index.get_ego_subgraph(center.id, depth=3, max_nodes=3)
+        assert len(capped["entities"]) <= 3
+        assert index.get_ego_subgraph("missing")["entities"] == {}
+
     def test_calculate_centrality(self):
         """Test calculating entity centrality"""
         index = GraphIndex()
@@ -374,3 +659,48 @@ class TestGraphIndex:
         assert stats["total_relationships"] == 2
         assert stats["relationship_types"]["located_in"] == 2
         assert stats["isolated_entities"] > 0
+
+    def test_statistics_counters_match_a_full_recompute(self):
+        """The degree counters the write-through paths keep equal a full scan
+        through adds, re-pushes, self-loops, edge removals and tombstones"""
+        rng = random.Random(3)
+        index = GraphIndex()
+        entities = [self.create_test_entity(EntityType.DEVICE, f"Device {i}") for i in range(20)]
+        live = []
+
+        def check():
+            assert (index.degree_total, index.isolated_count) == index.count_degrees()
+            stats = index.get_statistics()
+            assert stats["total_relationships"] == sum(
+                len(rels) for rels in index.relationships_by_source.values()
+            )
+            assert stats["isolated_entities"] == sum(
+                1 for node in index.nodes.values() if not node.incoming and not node.outgoing
+            )
+
+        for step in range(300):
+            roll = rng.random()
+            if roll < 0.2:
+                index.upsert_entity(rng.choice(entities))
+            elif roll < 0.3 and index.entities:
+                index.remove_entity(rng.choice(list(index.entities)))
+            elif roll < 0.5 and live:
+                index.remove_relationship(live.pop(rng.randrange(len(live))).id)
+            elif roll < 0.6 and live:
+                old = rng.choice(live)
+                index.upsert_relationship(EntityRelationship(
+                    id=old.id, from_entity_id=old.from_entity_id, to_entity_id=old.to_entity_id,
+                    relationship_type=old.relationship_type,
+                ))
+            elif len(index.entities) >= 1:
+                present = list(index.entities)
+                rel = EntityRelationship(
+                    id=str(uuid4()), from_entity_id=rng.choice(present),
+                    to_entity_id=rng.choice(present), relationship_type=RelationshipType.CONNECTS_TO,
+                )
+                index.upsert_relationship(rel)
+                live.append(rel)
+            check()
+
+        index._build_nodes()
+        check()
@@ -5,17 +5,23 @@ These cover the half of finding F2 that does not need an HTTP stack:
 
 * a change applied through the write-through path is visible immediately, with
   no rebuild and no restart (this is the shape of the sync-apply path);
-* a write that bypasses the index is caught by the drift check and repaired;
+* a write that bypasses the index is caught by the drift check and repaired by
+  a background rebuild, which readers never see half-done;
 * tombstoned entities never appear in traversal, at load or on write-through;
-* the index has exactly one owner -- no module global, one service per app.
+* the index has exactly one owner -- no module global, one service per app;
+* the same write-through hooks wake change-feed subscribers (PROTOCOL.md §3.8);
+* traversal snapshots are frozen per generation, untouched by later writes.
 """
 
+import asyncio
 import logging
 import uuid
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import delete, event, select
 
+from funkygibbon.graph import index_service as index_service_module
 from funkygibbon.graph.index import GraphIndex
 from funkygibbon.graph.index_service import (
     GraphIndexService,
@@ -192,12 +198,48 @@ class TestDriftDetection:
 
         with caplog.at_level(logging.WARNING, logger="funkygibbon.graph.index_service"):
             index = await service.ensure_current(db_session)
+            await service.wait_for_rebuild()
 
         assert service.rebuild_count == rebuilds_before + 1
         assert index.find_path(hub.id, sensor.id) == [hub.id, lamp.id, sensor.id]
         assert any("drift" in record.message.lower() for record in caplog.records), \
             "drift must be logged loudly -- it means a write path bypassed write-through"
 
+    @pytest.mark.asyncio
+    async def test_an_in_place_edge_update_is_caught(self, db_session, seeded):
+        """Same row counts, no new stamp: an edge rewritten in place by hand.
+
+        Every write path restamps the edge it rewrites; this one does not, so
+        the edge's own updated_at is what moves the marker.
+        """
+        service, hub, lamp = seeded
+        sensor = await _store_entity(db_session, "Rogue Sensor")
+        await service.apply_external_writes(db_session, entity_ids=[sensor.id])
+        rel = (await db_session.execute(select(EntityRelationship))).scalars().one()
+        rel.to_entity_id, rel.to_entity_version = sensor.id, sensor.version
+        await db_session.commit()
+        rebuilds_before = service.rebuild_count
+
+        index = await service.ensure_current(db_session)
+        await service.wait_for_rebuild()
+
+        assert service.rebuild_count == rebuilds_before + 1
+        assert index.find_path(hub.id, sensor.id) == [hub.id, sensor.id]
+
+    @pytest.mark.asyncio
+    async def test_a_purged_row_is_caught(self, db_session, seeded):
+        """A delete leaves the highest stamp where it was; the row count moves."""
+        service, hub, lamp = seeded
+        await db_session.execute(delete(EntityRelationship))
+        await db_session.commit()
+        rebuilds_before = service.rebuild_count
+
+        index = await service.ensure_current(db_session)
+        await service.wait_for_rebuild()
+
+        assert service.rebuild_count == rebuilds_before + 1
+        assert index.find_path(hub.id, lamp.id) == []
+
     @pytest.mark.asyncio
     async def test_reads_after_write_through_do_not_rebuild(self, db_session, seeded):
         """Write-through re-records the marker, so the drift net stays quiet."""
@@ -221,7 +263,167 @@ class TestDriftDetection:
         await _store_entity(db_session, "Rogue Sensor")
 
         rebuilt = await service.ensure_current(db_session)
-        assert rebuilt is held
+        await service.wait_for_rebuild()
+        assert service.rebuild_count == 2
+        assert rebuilt is held and service.index is held
+
+    @pytest.mark.asyncio
+    async def test_readers_keep_the_previous_generation_until_the_swap(
+        self, db_session, seeded, monkeypatch
+    ):
+        """Drift does not stall the read that found it, nor expose a half-built index."""
+        service, hub, lamp = seeded
+        sensor = await _store_entity(db_session, "Rogue Sensor")
+        await _store_relationship(db_session, lamp, sensor)
+        generation = service.generation
+
+        loading, release = asyncio.Event(), asyncio.Event()
+        load = GraphIndex.load_from_storage
+
+        async def slow_load(index, repo):
+            await load(index, repo)
+            loading.set()
+            await release.wait()
+
+        monkeypatch.setattr(GraphIndex, "load_from_storage", slow_load)
+        index = await service.ensure_current(db_session)
+        await loading.wait()
+
+        assert service.rebuilding
+        assert (await service.ensure_current(db_session)) is index
+        assert service.generation == generation
+        assert index.find_path(hub.id, lamp.id) == [hub.id, lamp.id]
+        assert sensor.id not in index.entities
+
+        release.set()
+        await service.wait_for_rebuild()
+        assert not service.rebuilding
+        assert service.generation == generation + 1
+        assert index.find_path(hub.id, sensor.id) == [hub.id, lamp.id, sensor.id]
+        assert service.last_rebuild_ms is not None and service.last_rebuild_ms > 0
+        assert service.total_rebuild_ms >= service.last_rebuild_ms
+
+    @pytest.mark.asyncio
+    async def test_write_through_during_a_rebuild_survives_the_swap(
+        self, db_session, seeded, monkeypatch
+    ):
+        """Changes written while the shadow loads are replayed onto it."""
+        service, hub, lamp = seeded
+        await _store_entity(db_session, "Rogue Sensor")
+
+        loading, release = asyncio.Event(), asyncio.Event()
+        load = GraphIndex.load_from_storage
+
+        async def slow_load(index, repo):
+            await load(index, repo)
+            loading.set()
+            await release.wait()
+
+        monkeypatch.setattr(GraphIndex, "load_from_storage", slow_load)
+        await service.ensure_current(db_session)
+        await loading.wait()
+
+        # Written after the shadow finished reading storage.
+        switch = await _store_entity(db_session, "Switch")
+        await service.entity_written(db_session, switch)
+        edge = await _store_relationship(db_session, switch, hub)
+        await service.relationship_written(db_session, edge)
+        await service.entity_written(db_session, await _store_entity(
+            db_session, "Lamp", entity_id=lamp.id, content={"deleted": True}, parent=lamp.version,
+        ))
+        assert service.index.find_path(switch.id, hub.id) == [switch.id, hub.id]
+
+        release.set()
+        await service.wait_for_rebuild()
+        assert service.index.find_path(switch.id, hub.id) == [switch.id, hub.id]
+        assert lamp.id not in service.index.entities
+
+        # The marker kept up with the write-through, so no second rebuild.
+        rebuilds = service.rebuild_count
+        await service.ensure_current(db_session)
+        assert not service.rebuilding and service.rebuild_count == rebuilds
+
+    @pytest.mark.asyncio
+    async def test_a_failed_rebuild_backs_off_instead_of_looping(
+        self, db_session, seeded, monkeypatch
+    ):
+        """Reads keep the old marker and index; retries wait, longer each time."""
+        service, hub, lamp = seeded
+        marker = service._marker
+        sensor = await _store_entity(db_session, "Rogue Sensor")
+        monkeypatch.setattr(index_service_module, "REBUILD_RETRY_SECONDS", 0.2)
+        attempts = []
+        load = GraphIndex.load_from_storage
+
+        async def failing_load(index, repo):
+            attempts.append(index)
+            raise RuntimeError("storage unavailable")
+
+        monkeypatch.setattr(GraphIndex, "load_from_storage", failing_load)
+        await service.ensure_current(db_session)
+        await service.wait_for_rebuild()
+        assert len(attempts) == 1 and service._marker is marker
+
+        for _ in range(3):
+            await service.ensure_current(db_session)
+        assert not service.rebuilding and len(attempts) == 1
+
+        await asyncio.sleep(0.25)
+        await service.ensure_current(db_session)
+        await service.wait_for_rebuild()
+        assert len(attempts) == 2
+        await asyncio.sleep(0.1)
+        await service.ensure_current(db_session)
+        assert not service.rebuilding, "the second failure doubles the backoff"
+
+        monkeypatch.setattr(GraphIndex, "load_from_storage", load)
+        await asyncio.sleep(0.35)
+        index = await service.ensure_current(db_session)
+        await service.wait_for_rebuild()
+        assert sensor.id in index.entities and service.rebuild_count == 2
+        await service.ensure_current(db_session)
+        assert not service.rebuilding and service.rebuild_count == 2
+
+    @pytest.mark.asyncio
+    async def test_read_snapshots_are_frozen_per_generation(self, db_session, seeded):
+        """A snapshot is shared within a generation and untouched by later writes"""
+        service, hub, lamp = seeded
+        snapshot = service.traversal_snapshot()
+        assert service.traversal_snapshot() is snapshot
+        assert snapshot.generation == service.generation
+
+        sensor = await _store_entity(db_session, "Motion Sensor")
+        edge = await _store_relationship(db_session, lamp, sensor)
+        await service.apply_external_writes(
+            db_session, entity_ids=[sensor.id], relationship_ids=[edge.id]
+        )
+        await service.entity_written(db_session, await _store_entity(
+            db_session, "Lamp", entity_id=lamp.id, content={"deleted": True}, parent=lamp.version,
+        ))
+
+        # Traversal runs in a worker thread against the snapshot it was given.
+        assert await asyncio.to_thread(snapshot.find_path, hub.id, lamp.id) == [hub.id, lamp.id]
+        assert sensor.id not in snapshot.entities
+        fresh = service.traversal_snapshot()
+        assert fresh is not snapshot and fresh.generation == service.generation
+        assert await asyncio.to_thread(fresh.find_path, hub.id, lamp.id) == []
+        assert sensor.id in fresh.entities
+
+
+    @pytest.mark.asyncio
+    async def test_read_snapshots_share_the_entity_map(self, db_session, seeded):
+        """Each generation's snapshot copies only the entities written since"""
+        service, hub, lamp = seeded
+        first = service.traversal_snapshot()
+        sensor = await _store_entity(db_session, "Motion Sensor")
+        await service.entity_written(db_session, sensor)
+        second = service.traversal_snapshot()
+
+        assert second.entities._base is first.entities._base
+        assert dict(second.entities._changed) == {sensor.id: sensor}
+        assert sensor.id in second.entities and sensor.id not in first.entities
+        assert set(second.entities) == set(service.index.entities)
+        assert len(first.entities) == len(service.index.entities) - 1
 
 
 class TestTombstones:
@@ -277,6 +479,59 @@ class TestTombstones:
         assert service.index.get_connected_entities(lamp.id, direction="outgoing") == []
 
 
+class TestChangeFeed:
+    """Write-through wakes change-feed subscribers (PROTOCOL.md §3.8)."""
+
+    @pytest.mark.asyncio
+    async def test_a_write_through_wakes_a_waiting_subscriber(self, db_session, seeded):
+        service, hub, lamp = seeded
+        feed = service.changes
+        cursor = feed.latest
+
+        async with feed.subscription():
+            waiter = asyncio.ensure_future(feed.wait_past(cursor, timeout=5))
+            await asyncio.sleep(0)
+            sensor = await _store_entity(db_session, "Sensor")
+            await service.apply_external_writes(db_session, entity_ids=[sensor.id])
+
+            assert await waiter is True
+        assert feed.latest == sensor.server_seq
+
+    @pytest.mark.asyncio
+    async def test_an_unloaded_index_still_publishes_to_subscribers(self, db_session):
+        service = GraphIndexService()
+        entity = await _store_entity(db_session, "Lamp")
+
+        async with service.changes.subscription():
+            await service.entity_written(db_session, entity)
+
+        assert not service.loaded
+        assert service.changes.latest == entity.server_seq
+
+    @pytest.mark.asyncio
+    async def test_nobody_subscribed_means_no_extra_read(self, db_session, async_engine):
+        service = GraphIndexService(enabled=False)
+        entity = await _store_entity(db_session, "Lamp")
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            await service.entity_written(db_session, entity)
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", _record)
+
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_a_wait_times_out_without_a_change(self):
+        feed = GraphIndexService(enabled=False).changes
+
+        assert await feed.wait_past(feed.latest, timeout=0.05) is False
+
+
 class TestOwnership:
     """ADR-003 decision 1: one owner, no module global."""
 
@@ -354,3 +354,48 @@ class TestGraphRepository:
             entity_types=[EntityType.DEVICE]
         )
         assert all(r.entity_type == EntityType.DEVICE for r in device_results)
+
+    async def test_stream_index_rows(self, db_session: AsyncSession):
+        """The index load streams latest versions and every edge, detached"""
+        repo = GraphRepository(db_session)
+
+        def version_of(entity_id, name, entity_type=EntityType.DEVICE):
+            return Entity(
+                id=entity_id,
+                version=Entity.create_version("user"),
+                entity_type=entity_type,
+                name=name,
+                content={"n": name},
+                source_type=SourceType.MANUAL,
+                user_id="user",
+                parent_versions=[]
+            )
+
+        hub_id, room_id = str(uuid4()), str(uuid4())
+        await repo.store_entity(version_of(hub_id, "Hub v1"))
+        hub = await repo.store_entity(version_of(hub_id, "Hub v2"))
+        room = await repo.store_entity(version_of(room_id, "Den", EntityType.ROOM))
+        await repo.store_relationship(EntityRelationship(
+            from_entity_id=hub.id,
+            from_entity_version=hub.version,
+            to_entity_id=room.id,
+            to_entity_version=room.version,
+            relationship_type=RelationshipType.LOCATED_IN,
+            properties={"since": 2024},
+            user_id="user"
+        ))
+        await db_session.commit()
+
+        entities = [e async for e in repo.stream_index_entities(batch_size=1)]
+        relationships = [r async for r in repo.stream_index_relationships(batch_size=1)]
+
+        assert sorted(e.name for e in entities) == ["Den", "Hub v2"]
+        streamed_room = next(e for e in entities if e.id == room_id)
+        assert streamed_room.entity_type == EntityType.ROOM
+        assert streamed_room.content == {"n": "Den"}
+        assert "incoming_relationships" not in streamed_room.__dict__, \
+            "the index load must not fetch relationship collections"
+        [rel] = relationships
+        assert (rel.from_entity_id, rel.to_entity_id) == (hub_id, room_id)
+        assert rel.relationship_type == RelationshipType.LOCATED_IN
+        assert rel.properties == {"since": 2024}
@@ -0,0 +1,170 @@
+"""
+Unit tests for the incrementally maintained state digest (ADR-011 §4).
+
+The digest used to be recomputed from the whole table on every sync response.
+It is now folded forward by each version insert, so the property that matters
+is that the running value never disagrees with a from-scratch recomputation,
+whichever writer produced the rows.
+"""
+
+import pytest
+from sqlalchemy import insert, select
+
+from funkygibbon.api.sync import SyncHandler
+from funkygibbon.repositories import GraphRepository, ReplicationStateRepository
+from inbetweenies.models import (
+    Entity, EntityType, ReplicationBucket, ReplicationState, SourceType,
+)
+from inbetweenies.sync import (
+    EntityChange, SyncChange, SyncRequest, STATE_DIGEST_SUM_CAPABILITY,
+    bucket_leaves, sorted_digest, sum_digest,
+)
+from inbetweenies.sync.digest import format_sum
+
+
+async def _current_pairs(session):
+    result = await session.execute(
+        select(Entity.id, Entity.version).where(Entity.is_latest.is_(True))
+    )
+    return [tuple(row) for row in result.all()]
+
+
+def _change(change_type, entity_id, version, parents=None):
+    return SyncChange(change_type=change_type, entity=EntityChange(
+        id=entity_id, version=version, entity_type="device", name="N",
+        content={}, source_type="manual", user_id="u",
+        parent_versions=parents or [],
+    ))
+
+
+async def _push(session, *changes, capabilities=()):
+    return await SyncHandler(session).handle_sync_request(SyncRequest(
+        device_id="d", user_id="u", sync_type="delta",
+        changes=list(changes), capabilities=list(capabilities),
+    ))
+
+
+def _entity(entity_id, version):
+    return Entity(
+        id=entity_id, version=version, entity_type=EntityType.DEVICE, name="N",
+        content={}, source_type=SourceType.MANUAL, user_id="u", parent_versions=[],
+    )
+
+
+@pytest.mark.asyncio
+class TestIncrementalDigest:
+
+    async def test_running_digest_matches_a_full_recompute(self, db_session):
+        """Creates, fast-forwards, conflicts (both outcomes) and tombstones."""
+        a1, a2 = "2026-01-01T00:00:00.000000+00:00-000001-u", \
+                 "2026-01-01T00:00:01.000000+00:00-000002-u"
+        b1 = "2026-01-01T00:00:02.000000+00:00-000003-u"
+        stale = "2020-01-01T00:00:00.000000+00:00-000004-u"
+        await _push(db_session, _change("create", "A", a1), _change("create", "B", b1))
+        await _push(db_session, _change("update", "A", a2, parents=[a1]))
+        # Loses to the incumbent: preserved as history, set unchanged.
+        await _push(db_session, _change("update", "B", stale, parents=["unknown"]))
+        await _push(db_session, _change("delete", "A", Entity.create_version("u")))
+        await GraphRepository(db_session).store_entity(_entity("C", Entity.create_version("u")))
+        await db_session.commit()
+
+        repo = ReplicationStateRepository(db_session)
+        assert await repo.digest() == sum_digest(await _current_pairs(db_session))
+
+    async def test_running_buckets_match_a_full_recompute(self, db_session):
+        """The digest tree (PROTOCOL.md §3.4) is maintained by the same writes."""
+        for i in range(30):
+            await _push(db_session, _change("create", f"E{i}", Entity.create_version("u")))
+        for i in range(0, 30, 3):
+            current = (await db_session.execute(select(Entity.version).where(
+                Entity.id == f"E{i}", Entity.is_latest.is_(True)))).scalar_one()
+            await _push(db_session, _change("update", f"E{i}", Entity.create_version("u"),
+                                            parents=[current]))
+
+        running = {
+            b.bucket: b.state_hash
+            for b in (await db_session.execute(select(ReplicationBucket))).scalars()
+        }
+        expected = {
+            bucket: format_sum(value)
+            for bucket, value in bucket_leaves(await _current_pairs(db_session)).items()
+        }
+        assert running == expected
+        root, _ = await ReplicationStateRepository(db_session).tree_node("")
+        assert root == sum_digest(await _current_pairs(db_session))
+
+    async def test_legacy_digest_is_unchanged_on_the_wire(self, db_session):
+        """A client without the capability still gets the sorted sha256."""
+        await _push(db_session, _change("create", "A", Entity.create_version("u")))
+
+        response = await _push(db_session)
+
+        assert response.capabilities == []
+        assert response.state_digest == sorted_digest(await _current_pairs(db_session))
+
+    async def test_legacy_digest_is_memoized_in_the_state_row(self, db_session):
+        """Sorted once per state, per database; the next write clears it."""
+        await _push(db_session, _change("create", "A", Entity.create_version("u")))
+        repo = ReplicationStateRepository(db_session)
+        expected = await repo.sorted_digest()
+        state = (await db_session.execute(select(ReplicationState))).scalar_one()
+        assert state.sorted_hash == expected
+
+        async def _no_scan():
+            raise AssertionError("sorted digest recomputed from the table")
+        repo._current_pairs = _no_scan
+        assert await repo.sorted_digest() == expected
+
+        await GraphRepository(db_session).store_entity(_entity("B", Entity.create_version("u")))
+        await db_session.refresh(state)
+        assert state.sorted_hash is None
+        assert (await _push(db_session)).state_digest == \
+            sorted_digest(await _current_pairs(db_session)) != expected
+
+    async def test_capability_selects_the_sum_digest(self, db_session):
+        await _push(db_session, _change("create", "A", Entity.create_version("u")))
+
+        response = await _push(
+            db_session, capabilities=[STATE_DIGEST_SUM_CAPABILITY, "not-a-feature"]
+        )
+
+        assert response.capabilities == [STATE_DIGEST_SUM_CAPABILITY]
+        assert response.state_digest == sum_digest(await _current_pairs(db_session))
+
+    async def test_serving_the_digest_does_not_read_the_table(self, db_session):
+        """O(1): an unchanged state is two point reads, never a scan."""
+        await _push(db_session, _change("create", "A", Entity.create_version("u")))
+        repo = ReplicationStateRepository(db_session)
+        expected = await repo.digest()
+
+        async def _no_scan():
+            raise AssertionError("digest rebuilt from the table")
+        repo._current_pairs = _no_scan
+
+        assert await repo.digest() == expected
+
+    async def test_a_writer_that_bypasses_maintenance_is_repaired(self, db_session, caplog):
+        await _push(db_session, _change("create", "A", Entity.create_version("u")))
+        # A raw insert with a new server_seq and no record_version call.
+        await db_session.execute(insert(Entity.__table__).values(
+            id="ROGUE", version=Entity.create_version("u"),
+            entity_type=EntityType.DEVICE, name="N", content={},
+            source_type=SourceType.MANUAL, user_id="u", parent_versions=[],
+            is_latest=True, server_seq=999,
+        ))
+
+        digest = await ReplicationStateRepository(db_session).digest()
+
+        assert digest == sum_digest(await _current_pairs(db_session))
+        assert "drifted" in caplog.text
+        state = (await db_session.execute(select(ReplicationState))).scalar_one()
+        assert state.state_seq == 999
+
+    async def test_a_rolled_back_push_rolls_back_its_digest(self, db_session):
+        await _push(db_session, _change("create", "A", Entity.create_version("u")))
+        before = await ReplicationStateRepository(db_session).digest()
+
+        await GraphRepository(db_session).store_entity(_entity("B", Entity.create_version("u")))
+        await db_session.rollback()
+
+        assert await ReplicationStateRepository(db_session).digest() == before
@@ -0,0 +1,126 @@
+"""
+Unit tests for the server_seq allocator (ADR-002 §2).
+
+Stamps used to come from a max(server_seq) aggregate per inserted row. They now
+come from a persisted counter, so the properties that matter are the ones the
+aggregate gave for free: stamps stay unique, gap-free per commit and in apply
+order across every writer, and a rolled-back writer gives its range back.
+"""
+
+import pytest
+from sqlalchemy import event, insert, select
+
+from funkygibbon.api.sync import SyncHandler
+from funkygibbon.repositories import (
+    GraphRepository, ReplicationStateRepository, SequenceAllocator,
+)
+from inbetweenies.models import Entity, EntityType, SequenceCounter, SourceType
+from inbetweenies.sync import EntityChange, SyncChange, SyncRequest
+
+
+def _entity(entity_id):
+    return Entity(
+        id=entity_id, version=Entity.create_version("u"), entity_type=EntityType.DEVICE,
+        name="N", content={}, source_type=SourceType.MANUAL, user_id="u", parent_versions=[],
+    )
+
+
+def _change(entity_id):
+    return SyncChange(change_type="create", entity=EntityChange(
+        id=entity_id, version=Entity.create_version("u"), entity_type="device", name="N",
+        content={}, source_type="manual", user_id="u", parent_versions=[],
+    ))
+
+
+async def _push(session, *ids):
+    return await SyncHandler(session).handle_sync_request(SyncRequest(
+        device_id="d", user_id="u", sync_type="delta", changes=[_change(i) for i in ids],
+    ))
+
+
+async def _stamps(session):
+    result = await session.execute(select(Entity.server_seq).order_by(Entity.server_seq))
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+class TestSequenceAllocator:
+
+    async def test_ranges_are_contiguous(self, db_session):
+        allocator = SequenceAllocator(db_session)
+
+        assert await allocator.allocate(3) == 1
+        assert await allocator.allocate() == 4
+        assert await allocator.allocate(10) == 5
+        assert await allocator.allocate() == 15
+
+    async def test_first_allocation_seeds_from_the_table(self, db_session):
+        """A database written before the counter existed continues its numbering."""
+        await db_session.execute(insert(Entity.__table__).values(
+            id="OLD", version=Entity.create_version("u"), entity_type=EntityType.DEVICE,
+            name="N", content={}, source_type=SourceType.MANUAL, user_id="u",
+            parent_versions=[], is_latest=True, server_seq=41,
+        ))
+
+        assert await SequenceAllocator(db_session).allocate() == 42
+
+    async def test_a_rolled_back_range_is_reused(self, db_session):
+        await GraphRepository(db_session).store_entity(_entity("A"))
+        await db_session.commit()
+
+        await GraphRepository(db_session).store_entity(_entity("B"))
+        await db_session.rollback()
+        await GraphRepository(db_session).store_entity(_entity("C"))
+        await db_session.commit()
+
+        assert await _stamps(db_session) == [1, 2]
+
+    async def test_every_writer_draws_from_one_sequence(self, db_session):
+        await _push(db_session, "P1", "P2")
+        await GraphRepository(db_session).store_entity(_entity("G1"))
+        await db_session.commit()
+        await _push(db_session, "P3")
+
+        assert await _stamps(db_session) == [1, 2, 3, 4]
+        counter = (await db_session.execute(select(SequenceCounter.value))).scalar_one()
+        assert counter == 4
+
+    async def test_a_plain_flush_allocates_nothing(self, db_session):
+        """Stamps come from the writers that ask; no flush hook hands them out."""
+        await GraphRepository(db_session).store_entity(_entity("G1"))
+        db_session.add(_entity("PLAIN"))
+        await db_session.flush()
+
+        assert await _stamps(db_session) == [None, 1]
+        counter = (await db_session.execute(select(SequenceCounter.value))).scalar_one()
+        assert counter == 1
+
+    async def test_writes_issue_no_max_aggregate(self, db_session, async_engine):
+        await GraphRepository(db_session).store_entity(_entity("seed"))  # seeds the counter
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement.lower())
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            for i in range(20):
+                await GraphRepository(db_session).store_entity(_entity(f"E{i}"))
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", _record)
+
+        assert not [s for s in statements if "max(" in s]
+        assert await _stamps(db_session) == list(range(1, 22))
+
+    async def test_drift_repair_moves_the_counter_past_a_rogue_stamp(self, db_session):
+        await _push(db_session, "A")
+        await db_session.execute(insert(Entity.__table__).values(
+            id="ROGUE", version=Entity.create_version("u"), entity_type=EntityType.DEVICE,
+            name="N", content={}, source_type=SourceType.MANUAL, user_id="u",
+            parent_versions=[], is_latest=True, server_seq=999,
+        ))
+        await ReplicationStateRepository(db_session).digest()
+
+        await _push(db_session, "B")
+
+        assert (await _stamps(db_session))[-1] == 1000
@@ -0,0 +1,213 @@
+"""
+Unit tests for the batched push apply path (ADR-011 §3).
+
+A push used to cost several statements per change: a current-row read, an
+idempotency probe, a demoting UPDATE, a max(server_seq) and a flush -- and
+three lookups and a flush per edge. These tests pin the batched replacement:
+the statement count does not grow with the push, and batching changes nothing
+a client can observe -- acks, conflict reports, which row is current, and the
+replication order.
+"""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from funkygibbon.api.sync import SyncHandler
+from inbetweenies.models import Entity, EntityRelationship, RelationshipType
+from inbetweenies.sync import EntityChange, RelationshipChange, SyncChange, SyncRequest
+
+
+def _change(change_type, entity_id, version, parents=None):
+    return SyncChange(change_type=change_type, entity=EntityChange(
+        id=entity_id, version=version, entity_type="device", name="N",
+        content={}, source_type="manual", user_id="u",
+        parent_versions=parents or [],
+    ))
+
+
+async def _push(session, changes):
+    return await SyncHandler(session).handle_sync_request(SyncRequest(
+        device_id="d", user_id="u", sync_type="delta", changes=changes,
+    ))
+
+
+class _StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._engine = engine.sync_engine
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self._engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self._engine, "before_cursor_execute", self._on_execute)
+
+
+async def _versions(session, entity_id):
+    result = await session.execute(
+        select(Entity).where(Entity.id == entity_id).order_by(Entity.server_seq)
+    )
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+class TestBatchedApply:
+
+    async def test_statement_count_does_not_grow_with_the_push(self, db_session, async_engine):
+        # The first write to an empty database builds the digest row; get that
+        # one-off out of the way so both pushes measure the steady state.
+        await _push(db_session, [_change("create", "warm", Entity.create_version("u"))])
+        counts = {}
+        for size in (10, 200):
+            creates = [_change("create", f"S{size}-{i}", Entity.create_version("u"))
+                       for i in range(size)]
+            with _StatementCounter(async_engine) as counter:
+                response = await _push(db_session, creates)
+            assert len(response.applied) == size
+            counts[size] = counter.count
+
+        # Bucket maintenance issues its UPDATE only when the push touches a
+        # bucket that already exists, so the two sizes may differ by that one
+        # statement -- never by anything proportional to the push.
+        assert abs(counts[200] - counts[10]) <= 1, counts
+
+    async def test_fast_forwards_demote_in_one_pass(self, db_session):
+        v1 = {i: Entity.create_version("u") for i in range(50)}
+        await _push(db_session, [_change("create", f"E{i}", v1[i]) for i in range(50)])
+        v2 = {i: Entity.create_version("u") for i in range(50)}
+
+        response = await _push(
+            db_session, [_change("update", f"E{i}", v2[i], parents=[v1[i]]) for i in range(50)]
+        )
+
+        assert response.applied == [f"E{i}" for i in range(50)]
+        current = (await db_session.execute(
+            select(Entity.id, Entity.version).where(Entity.is_latest.is_(True))
+        )).all()
+        assert sorted(current) == sorted((f"E{i}", v2[i]) for i in range(50))
+
+    async def test_an_id_edited_twice_in_one_push(self, db_session):
+        """The second change resolves against the first, as if pushed separately."""
+        v1, v2 = Entity.create_version("u"), Entity.create_version("u")
+
+        response = await _push(db_session, [
+            _change("create", "E", v1),
+            _change("update", "E", v2, parents=[v1]),
+            _change("update", "E", v2, parents=[v1]),  # idempotent re-send
+        ])
+
+        assert response.applied == ["E"]
+        rows = await _versions(db_session, "E")
+        assert [(r.version, r.is_latest) for r in rows] == [(v1, False), (v2, True)]
+        assert rows[1].server_seq == rows[0].server_seq + 1
+
+    async def test_a_loser_is_acked_preserved_and_not_current(self, db_session):
+        winner = "2026-01-01T00:00:10.000000+00:00-000001-u"
+        loser = "2026-01-01T00:00:00.000000+00:00-000002-u"
+        await _push(db_session, [_change("create", "E", winner)])
+
+        response = await _push(db_session, [_change("update", "E", loser, parents=["gone"])])
+
+        assert response.applied == ["E"]
+        assert response.conflicts[0].resolved_version == winner
+        rows = await _versions(db_session, "E")
+        assert {(r.version, r.is_latest) for r in rows} == {(winner, True), (loser, False)}
+
+    async def test_replication_order_is_apply_order(self, db_session):
+        await _push(db_session, [_change("create", "X", Entity.create_version("u"))])
+        ids = ["C", "A", "B"]
+
+        await _push(db_session, [_change("create", i, Entity.create_version("u")) for i in ids])
+
+        result = await db_session.execute(
+            select(Entity.id, Entity.server_seq).order_by(Entity.server_seq)
+        )
+        rows = result.all()
+        assert [r.id for r in rows] == ["X"] + ids
+        assert [r.server_seq for r in rows] == [1, 2, 3, 4]
+
+
+def _edge(rel_id, from_id, from_version, to_id, to_version, **properties):
+    return RelationshipChange(
+        id=rel_id, from_entity_id=from_id, from_entity_version=from_version,
+        to_entity_id=to_id, to_entity_version=to_version,
+        relationship_type="located_in", properties=properties,
+    )
+
+
+async def _push_edges(session, edges):
+    return await _push(session, [SyncChange(change_type="update", relationships=edges)])
+
+
+@pytest.mark.asyncio
+class TestBatchedRelationships:
+
+    async def _entities(self, session, count):
+        versions = {f"E{i}": Entity.create_version("u") for i in range(count)}
+        await _push(session, [_change("create", i, v) for i, v in versions.items()])
+        return versions
+
+    async def test_statement_count_does_not_grow_with_the_edges(self, db_session, async_engine):
+        v = await self._entities(db_session, 201)
+        counts = {}
+        for size in (10, 200):
+            edges = [_edge(f"R{size}-{i}", f"E{i}", v[f"E{i}"], "E200", v["E200"])
+                     for i in range(size)]
+            with _StatementCounter(async_engine) as counter:
+                response = await _push_edges(db_session, edges)
+            assert len(response.applied_relationships) == size
+            counts[size] = counter.count
+
+        assert counts[200] == counts[10], counts
+
+    async def test_acks_match_one_at_a_time_application(self, db_session):
+        v = await self._entities(db_session, 3)
+        await _push_edges(db_session, [_edge("OLD", "E0", v["E0"], "E1", v["E1"])])
+
+        response = await _push_edges(db_session, [
+            _edge("B", "E0", v["E0"], "E1", v["E1"], n=1),
+            _edge("DANGLING", "E0", v["E0"], "E9", "missing"),
+            _edge("OLD", "E0", v["E0"], "E2", v["E2"]),
+            _edge("B", "E1", v["E1"], "E2", v["E2"], n=2),   # later change wins
+            _edge("B", "E1", v["E1"], "E9", "missing"),      # invalid; ignored
+            _edge("A", "E2", v["E2"], "E0", v["E0"]),
+        ])
+
+        assert response.applied_relationships == ["B", "OLD", "A"]
+        rows = {
+            r.id: r for r in
+            (await db_session.execute(select(EntityRelationship))).scalars().all()
+        }
+        assert set(rows) == {"OLD", "A", "B"}
+        assert (rows["B"].from_entity_id, rows["B"].properties) == ("E1", {"n": 2})
+        assert rows["OLD"].to_entity_id == "E2"
+
+    async def test_a_rejected_repush_does_not_leak_its_type(self, db_session):
+        """The stored row is the accepted change, relationship_type included."""
+        v = await self._entities(db_session, 2)
+        dangling = _edge("R", "E0", v["E0"], "E9", "missing")
+        dangling.relationship_type = "controls"
+
+        response = await _push_edges(db_session, [
+            _edge("R", "E0", v["E0"], "E1", v["E1"]),
+            dangling,
+        ])
+
+        assert response.applied_relationships == ["R"]
+        row = (await db_session.execute(select(EntityRelationship))).scalar_one()
+        assert (row.to_entity_id, row.relationship_type) == ("E1", RelationshipType.LOCATED_IN)
+
+    async def test_unknown_relationship_type_is_rejected(self, db_session):
+        v = await self._entities(db_session, 2)
+        edge = _edge("R", "E0", v["E0"], "E1", v["E1"])
+        edge.relationship_type = "not_a_type"
+
+        with pytest.raises(HTTPException) as error:
+            await _push_edges(db_session, [edge])
+
+        assert error.value.status_code == 400
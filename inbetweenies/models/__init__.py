@@ -11,6 +11,8 @@ CORE MODELS:
 - Entity: Universal smart home entity (devices, rooms, homes, etc.)
 - EntityRelationship: Connections between entities with typed relationships
 - SyncMetadata: Client synchronization state tracking
+- ReplicationState: Server-side running state digest (ADR-011 §4)
+- SequenceCounter: Server-side server_seq allocator (ADR-002 §2)
 
 ENTITY TYPES:
 HOME, ROOM, DEVICE, ZONE, DOOR, WINDOW, PROCEDURE, MANUAL, NOTE,
@@ -36,6 +38,7 @@ from .sync_metadata import SyncMetadata
 from .entity import Entity, EntityType, SourceType
 from .relationship import EntityRelationship, RelationshipType
 from .blob import Blob, BlobType, BlobStatus
+from .replication_state import ReplicationState, ReplicationBucket, SequenceCounter
 
 __all__ = [
     'Base',
@@ -48,5 +51,8 @@ __all__ = [
     'RelationshipType',
     'Blob',
     'BlobType',
-    'BlobStatus'
+    'BlobStatus',
+    'ReplicationState',
+    'ReplicationBucket',
+    'SequenceCounter',
 ]
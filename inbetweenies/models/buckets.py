@@ -0,0 +1,19 @@
+"""
+Digest-tree buckets - which leaf of the state-digest tree an entity id is in.
+
+``Entity.id_bucket`` stores the value as a column default, and the digest
+tree (PROTOCOL.md §3.4, ``inbetweenies.sync.digest``) sums per leaf, so the
+definition lives with the models and the sync package imports it from here.
+"""
+
+import hashlib
+
+# Hex digits of sha256(id) that name a leaf bucket: 16**3 = 4096 leaves, so a
+# house-scale graph has a handful of entities per leaf and a 100k-row graph a
+# few dozen. The tree is BUCKET_DEPTH levels below the root, fan-out 16.
+BUCKET_DEPTH = 3
+
+
+def bucket_of(entity_id: str) -> str:
+    """The leaf bucket an entity id hashes into (``BUCKET_DEPTH`` hex digits)."""
+    return hashlib.sha256(entity_id.encode()).hexdigest()[:BUCKET_DEPTH]
@@ -16,12 +16,18 @@ from sqlalchemy import (
 from sqlalchemy.orm import relationship
 
 from .base import Base, InbetweeniesTimestampMixin
+from .buckets import bucket_of
 
 # Monotonic per-process counter for version-string tiebreaking. next() is atomic
 # under CPython's GIL, so this is safe across threads without extra locking.
 _version_counter = itertools.count()
 
 
+def _id_bucket_default(context) -> str:
+    """Column default for Entity.id_bucket, derived from the row's id."""
+    return bucket_of(context.get_current_parameters()["id"])
+
+
 class EntityType(str, Enum):
     """Types of entities in the knowledge graph"""
     # Core entity types
@@ -98,6 +104,12 @@ class Entity(Base, InbetweeniesTimestampMixin):
     # adjustment. Queries never consult it; sync never consults client time.
     server_seq = Column(Integer, nullable=True)
 
+    # The state-digest leaf bucket this id hashes into (models/buckets.py,
+    # PROTOCOL.md §3.4). Derived from `id` on insert by every writer that goes
+    # through SQLAlchemy, and stored so that serving one bucket of the Merkle
+    # tree is an index range rather than hashing every id in the table.
+    id_bucket = Column(String(8), nullable=True, default=_id_bucket_default)
+
     __table_args__ = (
         # The delta scan: `where is_latest and server_seq > :cursor`.
         Index("ix_entities_is_latest_server_seq", "is_latest", "server_seq"),
@@ -107,6 +119,8 @@ class Entity(Base, InbetweeniesTimestampMixin):
         Index("ix_entities_server_seq", "server_seq"),
         # Resolving one entity's history.
         Index("ix_entities_id_version", "id", "version"),
+        # One leaf of the digest tree: `where id_bucket = :b and is_latest`.
+        Index("ix_entities_id_bucket", "id_bucket", "is_latest"),
     )
 
     # Relationships defined in EntityRelationship model
@@ -7,7 +7,7 @@ between entities in the knowledge graph.
 
 from enum import Enum
 from typing import Dict, Any, Optional, TYPE_CHECKING
-from sqlalchemy import Column, String, JSON, Enum as SQLEnum, ForeignKeyConstraint
+from sqlalchemy import Column, Integer, String, JSON, Enum as SQLEnum, ForeignKeyConstraint, Index
 from sqlalchemy.orm import relationship
 
 from .base import Base, InbetweeniesTimestampMixin
@@ -63,6 +63,13 @@ class EntityRelationship(Base, InbetweeniesTimestampMixin):
     # Tracking
     user_id = Column(String(36), nullable=True)  # No foreign key, just track the user ID
 
+    # Replication axis (ADR-002 §2), drawn from the same counter as
+    # Entity.server_seq. Relationships are updated in place rather than
+    # versioned, so every write restamps the row: the stamp says when it last
+    # changed, and the sync feed serves edges past a cursor exactly as it
+    # serves entity versions.
+    server_seq = Column(Integer, nullable=True)
+
     # Foreign key constraints
     __table_args__ = (
         ForeignKeyConstraint(
@@ -75,6 +82,7 @@ class EntityRelationship(Base, InbetweeniesTimestampMixin):
             ["entities.id", "entities.version"],
             name="fk_to_entity"
         ),
+        Index("ix_entity_relationships_server_seq", "server_seq"),
     )
 
     from_entity = relationship(
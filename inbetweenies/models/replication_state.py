@@ -0,0 +1,73 @@
+"""
+Replication state - the server's running state digest (ADR-011 §4).
+
+A single-row table holding the ``sha256-sum`` digest of the current
+``(id, version)`` set, maintained by every write that inserts or demotes a
+version (see ``funkygibbon.repositories.replication``). Serving the digest is
+then one primary-key read instead of a scan and re-hash of every current row.
+
+``state_seq`` is the ``server_seq`` of the last write folded into
+``state_hash``. Every version insert allocates a new ``server_seq``, so a
+reader that finds ``state_seq`` behind ``max(server_seq)`` knows a writer
+bypassed the maintenance and recomputes from the table instead of serving a
+stale digest.
+
+``sorted_hash`` memoizes the legacy ``sha256-sorted`` digest of the same set,
+so a client that does not announce the sum capability pays the O(N) sort once
+per state rather than once per sync. Every write that moves ``state_hash``
+clears it.
+
+``replication_buckets`` holds the same sum per leaf of the digest tree
+(PROTOCOL.md §3.4), maintained by the same writes, so any node of the tree is
+a sum over at most 4096 small rows and never a scan of the entities.
+
+``sequence_counters`` holds the high-water mark of ``server_seq`` itself, so
+a writer allocates its stamps with one ``UPDATE ... RETURNING`` instead of a
+``max(server_seq)`` aggregate per row (see
+``funkygibbon.repositories.sequence``).
+
+Server-side bookkeeping: it is not part of the wire model and clients never
+sync it.
+"""
+
+from sqlalchemy import Column, Integer, String
+
+from .base import Base
+
+
+class ReplicationState(Base):
+    """Singleton row (``id == 1``) carrying the incremental state digest."""
+
+    __tablename__ = "replication_state"
+
+    SINGLETON_ID = 1
+
+    id = Column(Integer, primary_key=True)
+    # format_sum() of the accumulator: 64 lowercase hex characters.
+    state_hash = Column(String(64), nullable=False)
+    # server_seq of the newest version reflected in state_hash (0 when empty).
+    state_seq = Column(Integer, nullable=False, default=0)
+    # The legacy sorted sha256 of the same set, for clients without the sum
+    # capability: NULL until first asked for, and again after every write.
+    sorted_hash = Column(String(64), nullable=True)
+
+
+class ReplicationBucket(Base):
+    """One non-empty leaf of the state-digest tree."""
+
+    __tablename__ = "replication_buckets"
+
+    # bucket_of(id): BUCKET_DEPTH lowercase hex digits.
+    bucket = Column(String(8), primary_key=True)
+    # format_sum() of the accumulator over the bucket's current pairs.
+    state_hash = Column(String(64), nullable=False)
+
+
+class SequenceCounter(Base):
+    """A named, monotonically increasing counter; one row per sequence."""
+
+    __tablename__ = "sequence_counters"
+
+    name = Column(String(32), primary_key=True)
+    # The last value handed out (0 when nothing has been allocated).
+    value = Column(Integer, nullable=False, default=0)
@@ -9,7 +9,16 @@ from .conflict import ConflictResolver, ConflictResolution
 from .types import SyncOperation, Change, Conflict, SyncState, SyncResult
 from .protocol import (
     VectorClock, EntityChange, RelationshipChange, SyncChange,
-    SyncFilters, SyncRequest, ConflictInfo, SyncStats, SyncResponse
+    SyncFilters, SyncRequest, ConflictInfo, SyncStats, SyncResponse,
+    DigestTreeNode, ChangeNotice, RELATIONSHIP_FEED_CAPABILITY, NDJSON_MEDIA_TYPE,
+)
+from .digest import (
+    SORTED_SHA256, SUM_SHA256, STATE_DIGEST_SUM_CAPABILITY, BUCKET_DEPTH,
+    entry_hash, sorted_digest, sum_digest,
+    bucket_of, bucket_leaves, subtree_digests,
+)
+from .wire import (
+    JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, CBOR_MEDIA_TYPE, GZIP_CODING, ZSTD_CODING,
 )
 
 __all__ = [
@@ -29,5 +38,26 @@ __all__ = [
     'SyncRequest',
     'ConflictInfo',
     'SyncStats',
-    'SyncResponse'
+    'SyncResponse',
+    'DigestTreeNode',
+    'ChangeNotice',
+    'RELATIONSHIP_FEED_CAPABILITY',
+    'NDJSON_MEDIA_TYPE',
+    # State digest (ADR-011 §4)
+    'SORTED_SHA256',
+    'SUM_SHA256',
+    'STATE_DIGEST_SUM_CAPABILITY',
+    'entry_hash',
+    'sorted_digest',
+    'sum_digest',
+    'BUCKET_DEPTH',
+    'bucket_of',
+    'bucket_leaves',
+    'subtree_digests',
+    # Wire encodings (PROTOCOL.md §3.7)
+    'JSON_MEDIA_TYPE',
+    'MSGPACK_MEDIA_TYPE',
+    'CBOR_MEDIA_TYPE',
+    'GZIP_CODING',
+    'ZSTD_CODING',
 ]
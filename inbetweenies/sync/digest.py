@@ -0,0 +1,132 @@
+"""
+State digest definitions for the Inbetweenies v2 protocol (ADR-011 §4).
+
+Both sides of a sync compute a digest over the ``(id, version)`` pair of every
+current entity and compare them; a mismatch means resync. Two definitions
+exist, and a client chooses between them through ``SyncRequest.capabilities``:
+
+* ``sha256-sorted`` — the original: one sha256 over the pairs sorted by id.
+  Cheap to describe, but it has no algebra: a single changed row means
+  re-reading and re-hashing every row, because the hash of a set cannot be
+  adjusted by the row that changed. The server can only serve it in O(N).
+* ``sha256-sum`` — each pair is hashed on its own, and the digest is the sum of
+  those hashes modulo 2**256. Addition commutes and has an inverse, so the
+  digest is maintained by adding the hash of a version that becomes current
+  and subtracting the one it demotes — O(1) per write, O(1) to serve. Order
+  does not matter, so no sort is needed on either side.
+
+The sum form is the standard incremental multiset hash. It is weaker than a
+collision-resistant hash against an adversary choosing rows, which is not the
+threat here: the digest detects accidental divergence between a server and
+its own replicas, not tampering.
+
+The sum form also splits cleanly into a shallow Merkle tree: bucket each pair
+by a hex prefix of ``sha256(id)``, and the digest of a prefix is the sum of the
+digests of its sixteen children. The root of that tree *is* the sum digest, so
+a client whose digest disagrees can walk down only the branches that differ
+and re-pull only the leaf buckets that diverged, instead of the whole graph
+(``GET /api/v1/sync/digest``, PROTOCOL.md §3.4).
+
+Both definitions live here, in the shared package, so the server and every
+Python client compute them with literally the same code.
+"""
+
+import hashlib
+from typing import Dict, Iterable, Tuple
+
+from ..models.buckets import BUCKET_DEPTH, bucket_of
+
+# Digest algorithm names, as they appear in capability strings.
+SORTED_SHA256 = "sha256-sorted"
+SUM_SHA256 = "sha256-sum"
+
+# Announced by a client in SyncRequest.capabilities to receive the sum digest.
+# A client that does not announce it keeps receiving the sorted form, so
+# existing ports (KittenKong, older blowing-off builds) are unaffected.
+STATE_DIGEST_SUM_CAPABILITY = f"state-digest:{SUM_SHA256}"
+
+_MODULUS = 1 << 256
+
+_HEX = "0123456789abcdef"
+
+
+def entry_hash(entity_id: str, version: str) -> int:
+    """The sum-digest contribution of one current ``(id, version)`` pair."""
+    return int.from_bytes(
+        hashlib.sha256(f"{entity_id}\x1f{version}".encode()).digest(), "big"
+    )
+
+
+def combine(accumulator: int, added: Iterable[int] = (), removed: Iterable[int] = ()) -> int:
+    """Fold entry hashes into (and out of) a sum-digest accumulator."""
+    for value in added:
+        accumulator += value
+    for value in removed:
+        accumulator -= value
+    return accumulator % _MODULUS
+
+
+def format_sum(accumulator: int) -> str:
+    """Render a sum-digest accumulator as 64 lowercase hex characters."""
+    return f"{accumulator % _MODULUS:064x}"
+
+
+def parse_sum(digest: str) -> int:
+    """Inverse of :func:`format_sum`."""
+    return int(digest, 16)
+
+
+def sum_digest(pairs: Iterable[Tuple[str, str]]) -> str:
+    """The ``sha256-sum`` digest of a set of current ``(id, version)`` pairs."""
+    return format_sum(combine(0, (entry_hash(i, v) for i, v in pairs)))
+
+
+def sorted_digest(pairs: Iterable[Tuple[str, str]]) -> str:
+    """The ``sha256-sorted`` digest of a set of current ``(id, version)`` pairs.
+
+    Byte-for-byte the definition the server has always served: pairs sorted by
+    id (ids are unique among current rows), each framed as
+    ``id \\x1f version \\x1e``.
+    """
+    digest = hashlib.sha256()
+    for entity_id, version in sorted(pairs):
+        digest.update(f"{entity_id}\x1f{version}\x1e".encode())
+    return digest.hexdigest()
+
+
+def is_bucket_prefix(prefix: str) -> bool:
+    """Whether ``prefix`` names a node of the bucket tree ("" is the root)."""
+    return len(prefix) <= BUCKET_DEPTH and all(c in _HEX for c in prefix)
+
+
+def bucket_leaves(pairs: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+    """Sum-digest accumulator per non-empty leaf bucket."""
+    leaves: Dict[str, int] = {}
+    for entity_id, version in pairs:
+        bucket = bucket_of(entity_id)
+        leaves[bucket] = combine(leaves.get(bucket, 0), [entry_hash(entity_id, version)])
+    return leaves
+
+
+def subtree_digests(leaves: Dict[str, int], prefix: str) -> Tuple[str, Dict[str, str]]:
+    """Digest of the node at ``prefix`` and of each of its non-empty children.
+
+    ``leaves`` maps leaf bucket to accumulator, as from :func:`bucket_leaves`;
+    it may hold leaves outside ``prefix``, which are ignored. A leaf node has
+    no children. The root's digest equals :func:`sum_digest` over the pairs.
+    """
+    depth = len(prefix) + 1
+    node = 0
+    children: Dict[str, int] = {}
+    for bucket, accumulator in leaves.items():
+        if not bucket.startswith(prefix):
+            continue
+        node = combine(node, [accumulator])
+        if depth <= BUCKET_DEPTH:
+            child = bucket[:depth]
+            children[child] = combine(children.get(child, 0), [accumulator])
+    # An all-zero child is an empty subtree however it got there; omit it so
+    # a side that never held rows there and a side that did agree.
+    return format_sum(node), {
+        child: format_sum(value) for child, value in sorted(children.items()) if value
+    }
@@ -53,6 +53,16 @@ class SyncFilters(BaseModel):
     modified_by: Optional[List[str]] = None
 
 
+# Capability: the client wants relationship rows in the paged change feed
+# (PROTOCOL.md §3.5). Without it a response carries entity changes only, which
+# is all an older client knows how to apply.
+RELATIONSHIP_FEED_CAPABILITY = "relationship-feed"
+
+# Media type that opts a sync POST in to the streamed response (PROTOCOL.md
+# §3.6): one JSON record per line, changes first, metadata in a final trailer.
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
 class SyncRequest(BaseModel):
     """Sync request from client"""
     protocol_version: str = "inbetweenies-v2"
@@ -63,6 +73,10 @@ class SyncRequest(BaseModel):
     changes: List[SyncChange] = Field(default_factory=list)
     cursor: Optional[str] = None
     filters: Optional[SyncFilters] = None
+    # Optional protocol features the client understands, e.g.
+    # "state-digest:sha256-sum" (see inbetweenies.sync.digest). Unknown entries
+    # are ignored, so a client can announce ahead of the server it talks to.
+    capabilities: List[str] = Field(default_factory=list)
 
 
 class ConflictInfo(BaseModel):
@@ -94,12 +108,17 @@ class SyncResponse(BaseModel):
     # — that is the signal to stop looping, not an empty `changes` list, since a
     # filtered page can be empty while more rows remain (ADR-002 §4).
     cursor: Optional[str] = None
-    # sha256 over the sorted (id, version) set of every current row, so a client
-    # can tell whether its replica actually matches (ADR-011 §4). Divergence is
+    # Digest of the (id, version) set of every current row, so a client can
+    # tell whether its replica actually matches (ADR-011 §4). Divergence is
     # otherwise undetectable: both sides believe they are in sync because both
     # applied every change they were told about. Compared, never merged — a
-    # mismatch means resync, not a repair attempt.
+    # mismatch means resync, not a repair attempt. sha256 over the sorted set
+    # unless the client announced "state-digest:sha256-sum", in which case it
+    # is the incremental sum form (inbetweenies.sync.digest).
     state_digest: Optional[str] = None
+    # The subset of SyncRequest.capabilities the server honoured. A client
+    # reads the digest definition from here, never from what it asked for.
+    capabilities: List[str] = Field(default_factory=list)
     sync_stats: SyncStats = Field(default_factory=SyncStats)
     # UTC ISO-8601 server clock at response time. The client persists this and
     # sends it back as filters.since on the next delta sync (PROTOCOL.md §4).
@@ -111,3 +130,33 @@ class SyncResponse(BaseModel):
     # lists stay pending client-side and are retried on the next sync.
     applied: List[str] = Field(default_factory=list)
     applied_relationships: List[str] = Field(default_factory=list)
+
+
+class DigestTreeNode(BaseModel):
+    """One node of the state-digest bucket tree (PROTOCOL.md §3.4).
+
+    ``GET /api/v1/sync/digest?prefix=<hex>``. A client whose ``state_digest``
+    disagrees walks down from the root, following only the children whose
+    digest differs from its own, and re-pulls only the leaves that diverged.
+    """
+    algorithm: str = "sha256-sum"
+    prefix: str = ""
+    # Hex digits in a leaf prefix; a node with len(prefix) == leaf_depth is a leaf.
+    leaf_depth: int
+    digest: str
+    # Non-empty children, prefix -> digest. Absent means empty. Interior nodes only.
+    children: Dict[str, str] = Field(default_factory=dict)
+    # Leaves only: the current version of every entity in the bucket, shaped
+    # exactly like SyncResponse.changes so a client applies them the same way.
+    changes: List[SyncChange] = Field(default_factory=list)
+
+
+class ChangeNotice(BaseModel):
+    """Answer to a change-feed subscription (PROTOCOL.md §3.8).
+
+    ``seq`` is the highest server_seq the server has committed; send it back
+    as ``after`` to wait for the next change. ``changed`` says whether it
+    moved past the ``after`` that was sent, as opposed to the wait timing out.
+    """
+    seq: int
+    changed: bool = False
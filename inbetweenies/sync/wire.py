@@ -0,0 +1,212 @@
+"""
+Negotiated wire encodings for the sync endpoint (PROTOCOL.md §3.7).
+
+A sync body is JSON by default, and JSON is a poor fit for what it carries:
+entity content repeats the same keys, capabilities and room names across every
+entity in a house, and a first sync sends all of them, often over a phone link.
+Two independent axes are negotiated with ordinary HTTP headers:
+
+* the **encoding** of the document -- ``Content-Type``/``Accept``: JSON,
+  MessagePack or CBOR. The binary forms drop the quoting and punctuation and
+  encode numbers natively; they carry exactly the JSON data model, so a body
+  decodes to the same dict whatever it was sent as.
+* the **compression** of the bytes -- ``Content-Encoding``/``Accept-Encoding``:
+  zstd or gzip. This is where the repetition is removed.
+
+Only JSON and gzip are guaranteed. MessagePack, CBOR and zstd are offered when
+their codec is importable (``msgpack``, ``cbor2``; ``compression.zstd`` on
+Python 3.14, else ``zstandard``), and a peer that does not offer one is never
+sent it. Both sides use this module, so they agree on names and preference
+order by construction.
+"""
+
+import gzip
+import io
+import json
+import zlib
+from typing import Any, List, Optional, Sequence
+
+try:
+    import msgpack
+except ImportError:  # optional codec
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional codec
+    cbor2 = None
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:  # optional codec
+        _zstd = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+CBOR_MEDIA_TYPE = "application/cbor"
+
+GZIP_CODING = "gzip"
+ZSTD_CODING = "zstd"
+
+# Pre-registration name still sent by some MessagePack clients.
+_MEDIA_TYPE_ALIASES = {"application/x-msgpack": MSGPACK_MEDIA_TYPE}
+
+# Compressing a few hundred bytes costs more in CPU and framing than it saves;
+# a pure push acknowledgement is about that size.
+MIN_COMPRESS_BYTES = 1024
+
+# Largest body decompress() will inflate. Compression ratios of 1000:1 are
+# easy to construct, so the compressed size says nothing about the output.
+# Well above a first sync of a house-scale graph.
+MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+
+# gzip level 6 is the zlib default; level 3 is zstd's. Both are the usual
+# speed/ratio knee, and a sync body is compressed once per request.
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+
+class BodyTooLarge(ValueError):
+    """A compressed body inflates past the caller's limit."""
+
+
+def supported_media_types() -> List[str]:
+    """Encodings this process can read and write, most preferred first."""
+    preferred = []
+    if msgpack is not None:
+        preferred.append(MSGPACK_MEDIA_TYPE)
+    if cbor2 is not None:
+        preferred.append(CBOR_MEDIA_TYPE)
+    preferred.append(JSON_MEDIA_TYPE)
+    return preferred
+
+
+def supported_codings() -> List[str]:
+    """Compressions this process can read and write, most preferred first."""
+    return ([ZSTD_CODING] if _zstd is not None else []) + [GZIP_CODING]
+
+
+def media_type_of(content_type: Optional[str]) -> str:
+    """The bare media type of a Content-Type header; JSON when absent."""
+    if not content_type:
+        return JSON_MEDIA_TYPE
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return _MEDIA_TYPE_ALIASES.get(media_type, media_type)
+
+
+def negotiate(header: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """Pick from ``offered`` by an Accept or Accept-Encoding header.
+
+    Highest q-value wins, ties going to the order of ``offered``. Only names
+    listed explicitly count: a wildcard or a missing header selects nothing,
+    and the caller falls back to plain JSON, uncompressed. A client that has
+    never heard of this section therefore gets exactly what it always got.
+    """
+    if not header:
+        return None
+    weights = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = _MEDIA_TYPE_ALIASES.get(name.strip().lower(), name.strip().lower())
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = max(q, weights.get(name, 0.0))
+    ranked = [(weights[name], -rank, name) for rank, name in enumerate(offered)
+              if weights.get(name, 0.0) > 0]
+    return max(ranked)[2] if ranked else None
+
+
+def encode(payload: Any, media_type: str) -> bytes:
+    """Serialise a JSON-compatible payload (``model_dump(mode="json")``)."""
+    if media_type == MSGPACK_MEDIA_TYPE and msgpack is not None:
+        return msgpack.packb(payload, use_bin_type=True)
+    if media_type == CBOR_MEDIA_TYPE and cbor2 is not None:
+        return cbor2.dumps(payload)
+    if media_type == JSON_MEDIA_TYPE:
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def decode(data: bytes, media_type: str) -> Any:
+    """Inverse of :func:`encode`."""
+    if media_type == MSGPACK_MEDIA_TYPE and msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    if media_type == CBOR_MEDIA_TYPE and cbor2 is not None:
+        return cbor2.loads(data)
+    if media_type == JSON_MEDIA_TYPE:
+        return json.loads(data)
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def compress(data: bytes, coding: str) -> bytes:
+    """Compress with a content coding from :func:`supported_codings`."""
+    if coding == GZIP_CODING:
+        return gzip.compress(data, compresslevel=_GZIP_LEVEL, mtime=0)
+    if coding == ZSTD_CODING and _zstd is not None:
+        # The one-shot functions have the same signature in both modules.
+        return _zstd.compress(data, level=_ZSTD_LEVEL)
+    raise ValueError(f"Unsupported content coding: {coding}")
+
+
+def decompress(data: bytes, coding: str, max_size: int = MAX_DECOMPRESSED_BYTES) -> bytes:
+    """Inverse of :func:`compress`.
+
+    Inflates incrementally and raises :class:`BodyTooLarge` as soon as the
+    output passes ``max_size``, so a small hostile body cannot allocate
+    gigabytes before anything looks at it.
+    """
+    if coding == GZIP_CODING:
+        return _gunzip(data, max_size)
+    if coding == ZSTD_CODING and _zstd is not None:
+        return _unzstd(data, max_size)
+    raise ValueError(f"Unsupported content coding: {coding}")
+
+
+def _gunzip(data: bytes, max_size: int) -> bytes:
+    # One decompressobj per gzip member, as gzip.decompress reads them.
+    out = bytearray()
+    while True:
+        inflater = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        out += inflater.decompress(data, max_size - len(out) + 1)
+        if len(out) > max_size:
+            raise BodyTooLarge(f"Body inflates past {max_size} bytes")
+        if not inflater.eof:
+            raise ValueError("Truncated gzip body")
+        data = inflater.unused_data
+        if not data:
+            return bytes(out)
+
+
+def _unzstd(data: bytes, max_size: int) -> bytes:
+    if hasattr(_zstd, "ZstdFile"):  # Python 3.14 compression.zstd
+        # Raises EOFError itself on a truncated frame.
+        return _read_capped(_zstd.ZstdFile(io.BytesIO(data)), max_size)
+    out = _read_capped(
+        _zstd.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True),
+        max_size,
+    )
+    # zstandard's streaming reader stops quietly at a truncated frame. Its
+    # decompressobj notices, and is safe to run now the output is known to fit.
+    inflater = _zstd.ZstdDecompressor().decompressobj()
+    inflater.decompress(data)
+    if not inflater.eof:
+        raise ValueError("Truncated zstd body")
+    return out
+
+
+def _read_capped(reader, max_size: int) -> bytes:
+    with reader:
+        out = reader.read(max_size + 1)
+    if len(out) > max_size:
+        raise BodyTooLarge(f"Body inflates past {max_size} bytes")
+    return out
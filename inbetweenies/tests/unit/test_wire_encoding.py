@@ -0,0 +1,94 @@
+"""Test the negotiated sync wire encodings (PROTOCOL.md §3.7)."""
+
+import pytest
+
+from inbetweenies.sync import wire
+from inbetweenies.sync.wire import (
+    CBOR_MEDIA_TYPE, GZIP_CODING, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ZSTD_CODING,
+)
+
+PAYLOAD = {
+    "sync_type": "full",
+    "changes": [{"change_type": "update", "entity": {
+        "id": "e1", "name": "Lamp", "content": {"brightness": 80, "on": True, "tags": []},
+    }, "relationships": []}],
+    "cursor": None,
+    "sync_stats": {"duration_ms": 1.5},
+}
+
+
+class TestNegotiate:
+
+    def test_highest_q_wins(self):
+        offered = [MSGPACK_MEDIA_TYPE, JSON_MEDIA_TYPE]
+        header = "application/json;q=1, application/msgpack;q=0.5"
+
+        assert wire.negotiate(header, offered) == JSON_MEDIA_TYPE
+
+    def test_ties_go_to_the_server_preference(self):
+        assert wire.negotiate("gzip, zstd", [ZSTD_CODING, GZIP_CODING]) == ZSTD_CODING
+
+    def test_wildcards_and_absent_headers_select_nothing(self):
+        assert wire.negotiate("*/*", [JSON_MEDIA_TYPE]) is None
+        assert wire.negotiate(None, [GZIP_CODING]) is None
+
+    def test_q_zero_refuses(self):
+        assert wire.negotiate("gzip;q=0", [GZIP_CODING]) is None
+
+    def test_only_what_is_offered_is_chosen(self):
+        assert wire.negotiate("br, deflate", [GZIP_CODING]) is None
+
+    def test_the_legacy_msgpack_name_is_an_alias(self):
+        assert wire.negotiate("application/x-msgpack", [MSGPACK_MEDIA_TYPE]) == MSGPACK_MEDIA_TYPE
+        assert wire.media_type_of("application/x-msgpack") == MSGPACK_MEDIA_TYPE
+
+
+class TestCodecs:
+
+    def test_json_and_gzip_are_always_offered(self):
+        assert JSON_MEDIA_TYPE in wire.supported_media_types()
+        assert GZIP_CODING in wire.supported_codings()
+
+    @pytest.mark.parametrize("media_type", [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, CBOR_MEDIA_TYPE])
+    def test_every_encoding_round_trips_the_json_data_model(self, media_type):
+        if media_type not in wire.supported_media_types():
+            pytest.skip(f"no codec for {media_type} installed")
+
+        assert wire.decode(wire.encode(PAYLOAD, media_type), media_type) == PAYLOAD
+
+    @pytest.mark.parametrize("coding", [GZIP_CODING, ZSTD_CODING])
+    def test_every_coding_round_trips(self, coding):
+        if coding not in wire.supported_codings():
+            pytest.skip(f"no codec for {coding} installed")
+        data = wire.encode(PAYLOAD, JSON_MEDIA_TYPE) * 50
+
+        compressed = wire.compress(data, coding)
+
+        assert len(compressed) < len(data)
+        assert wire.decompress(compressed, coding) == data
+
+    def test_an_unknown_name_is_an_error_not_a_fallback(self):
+        with pytest.raises(ValueError):
+            wire.encode(PAYLOAD, "application/xml")
+        with pytest.raises(ValueError):
+            wire.compress(b"x", "br")
+
+    @pytest.mark.parametrize("coding", [GZIP_CODING, ZSTD_CODING])
+    def test_decompression_stops_at_the_size_limit(self, coding):
+        if coding not in wire.supported_codings():
+            pytest.skip(f"no codec for {coding} installed")
+        data = b"\0" * 100_000
+        compressed = wire.compress(data, coding)
+
+        assert wire.decompress(compressed, coding, max_size=len(data)) == data
+        with pytest.raises(wire.BodyTooLarge):
+            wire.decompress(compressed, coding, max_size=len(data) - 1)
+
+    @pytest.mark.parametrize("coding", [GZIP_CODING, ZSTD_CODING])
+    def test_a_truncated_body_is_an_error(self, coding):
+        if coding not in wire.supported_codings():
+            pytest.skip(f"no codec for {coding} installed")
+        compressed = wire.compress(wire.encode(PAYLOAD, JSON_MEDIA_TYPE) * 50, coding)
+
+        with pytest.raises(ValueError):
+            wire.decompress(compressed[:-4], coding)